@@ -0,0 +1,108 @@
+"""
+Micro-benchmark for the serialization of batch requests in the `DevCsi`.
+
+Compares the bytes based path of the `DevCsi` with the previous implementation for a
+chat request with a long conversation history. The previous implementation validated
+the requests into a `RootModel`, dumped it to dictionaries, which `requests` encoded
+to JSON, and encoded them once more for the span attributes. The response was decoded
+into dictionaries, validated and again encoded for the span attributes.
+
+Only the CPU time spent in the SDK is measured, no HTTP requests are made.
+
+Run with::
+
+    uv run python -m benchmarks.devcsi_serialization
+"""
+
+import json
+import time
+from collections.abc import Callable
+
+from pharia_skill import ChatParams, ChatRequest, ChatResponse, Message
+from pharia_skill.testing.dev.inference import (
+    ChatListAdapter,
+    ChatListDeserializer,
+    ChatRequestListAdapter,
+    ChatRequestListSerializer,
+)
+
+ITERATIONS = 200
+
+
+def conversation(turns: int, words_per_message: int) -> list[Message]:
+    text = " ".join(["lorem"] * words_per_message)
+    messages = [Message.system("You are a helpful assistant.")]
+    for _ in range(turns):
+        messages.append(Message.user(text))
+        messages.append(Message.assistant(text))
+    messages.append(Message.user("Summarize our conversation."))
+    return messages
+
+
+def engine_response(requests: list[ChatRequest]) -> bytes:
+    """The raw body the Engine sends back for the requests."""
+    content = " ".join(["ipsum"] * 500)
+    return json.dumps(
+        [
+            {
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": "stop",
+                "logprobs": [],
+                "usage": {"prompt": 10_000, "completion": 500},
+            }
+            for _ in requests
+        ]
+    ).encode()
+
+
+def legacy(requests: list[ChatRequest], response: bytes) -> list[ChatResponse]:
+    body = ChatRequestListSerializer(root=requests).model_dump()
+    json.dumps(body).encode()  # `requests.post(json=body)`
+    json.dumps(body)  # span input
+    output = json.loads(response)  # `response.json()`
+    result = ChatListDeserializer(root=output).root
+    json.dumps(output)  # span output
+    return result
+
+
+def bytes_path(requests: list[ChatRequest], response: bytes) -> list[ChatResponse]:
+    body = ChatRequestListAdapter.dump_json(requests)
+    result = ChatListAdapter.validate_json(response)
+    body.decode()  # span input
+    response.decode()  # span output
+    return result
+
+
+def measure(
+    path: Callable[[list[ChatRequest], bytes], list[ChatResponse]],
+    requests: list[ChatRequest],
+    response: bytes,
+) -> float:
+    start = time.perf_counter()
+    for _ in range(ITERATIONS):
+        path(requests, response)
+    return (time.perf_counter() - start) / ITERATIONS
+
+
+def report(scenario: str, requests: list[ChatRequest]) -> None:
+    response = engine_response(requests)
+    assert legacy(requests, response) == bytes_path(requests, response)
+    old = measure(legacy, requests, response)
+    new = measure(bytes_path, requests, response)
+    print(f"{scenario:<40}{old * 1000:>9.2f}ms{new * 1000:>9.2f}ms{old / new:>9.1f}x")
+
+
+def main() -> None:
+    print(f"{'scenario':<40}{'legacy':>11}{'bytes':>11}{'speedup':>10}")
+    params = ChatParams(max_tokens=512)
+    for turns in (10, 100, 500):
+        messages = conversation(turns, words_per_message=200)
+        request = ChatRequest("llama-3.1-8b-instruct", messages, params)
+        report(f"1 chat, {2 * turns + 2} messages", [request])
+    messages = conversation(100, words_per_message=200)
+    requests = [ChatRequest("llama-3.1-8b-instruct", messages, params)] * 16
+    report("16 chats, 202 messages each", requests)
+
+
+if __name__ == "__main__":
+    main()
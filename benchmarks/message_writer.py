@@ -0,0 +1,80 @@
+"""
+Host calls and added latency of the `WitMessageWriter` for different flush policies.
+
+Forwards a simulated chat response of many short tokens, arriving at a fixed interval,
+through a `WitMessageWriter`. The output stream of the Kernel is replaced by an object
+that counts the items and spends a fixed time per call, standing in for the cost of
+crossing the component boundary.
+
+For each policy, the table shows the number of host calls, the time spent in them and
+the mean and maximum time a token waited in the buffer before it was written.
+
+Run with::
+
+    uv run python -m benchmarks.message_writer
+"""
+
+import time
+
+from pharia_skill.bindings.imports import streaming_output as wit
+from pharia_skill.message_stream.wit_writer import WitMessageWriter
+from pharia_skill.message_stream.writer import FlushPolicy
+
+TOKENS = 2_000
+TOKEN = "lorem "
+TOKEN_INTERVAL = 0.0005
+HOST_CALL = 0.00002
+
+
+class HostOutput(wit.StreamOutput):
+    """Stand-in for the output stream resource of the Kernel."""
+
+    def __init__(self) -> None:
+        self.calls = 0
+
+    def write(self, item: wit.MessageItem) -> None:
+        self.calls += 1
+        deadline = time.perf_counter() + HOST_CALL
+        while time.perf_counter() < deadline:
+            pass
+
+    def __exit__(self, *args: object) -> None:
+        pass
+
+
+def forward(policy: FlushPolicy | None) -> tuple[int, float, float, float]:
+    output = HostOutput()
+    writer = WitMessageWriter[None](output, policy)
+    with writer:
+        writer.begin_message("assistant")
+        for _ in range(TOKENS):
+            time.sleep(TOKEN_INTERVAL)
+            writer.append_to_message(TOKEN)
+        writer.end_message()
+    metrics = writer.metrics
+    return (
+        output.calls,
+        output.calls * HOST_CALL,
+        metrics.mean_delay_seconds,
+        metrics.max_delay_seconds,
+    )
+
+
+def main() -> None:
+    print(f"{'policy':<28}{'calls':>8}{'host':>10}{'mean delay':>12}{'max delay':>12}")
+    for name, policy in [
+        ("unbuffered", None),
+        ("64 bytes", FlushPolicy(max_bytes=64, max_seconds=None)),
+        ("256 bytes", FlushPolicy(max_bytes=256, max_seconds=None)),
+        ("256 bytes / 10ms", FlushPolicy(max_bytes=256, max_seconds=0.01)),
+        ("default (256 bytes / 100ms)", FlushPolicy()),
+    ]:
+        calls, host, mean, worst = forward(policy)
+        print(
+            f"{name:<28}{calls:>8}{host * 1e3:>8.1f}ms"
+            f"{mean * 1e3:>10.2f}ms{worst * 1e3:>10.2f}ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+Micro-benchmark for parsing the server-sent event streams of the PhariaEngine.
+
+Compares the `EventStreamParser` with the previous implementation, which stitched
+events together by repeatedly concatenating `bytes` and decoded, stripped and split
+every event again before parsing it.
+
+Run with::
+
+    uv run python -m benchmarks.sse_parser
+"""
+
+import json
+import time
+from collections.abc import Callable, Iterable, Iterator
+
+from pharia_skill.testing.dev.sse import Event, EventStreamParser
+
+EVENTS = 100_000
+
+
+def engine_stream(
+    events: int, line_ending: bytes = b"\n", content: bytes = b" token"
+) -> bytes:
+    """A chat stream as the Engine would send it for a long (reasoning) response."""
+    append = (
+        b'event: message_append\ndata: {"content": "'
+        + content
+        + b'", "logprobs": []}\n\n'
+    )
+    stream = (
+        b'event: message_begin\ndata: {"role": "assistant"}\n\n'
+        + append * events
+        + b'event: message_end\ndata: {"finish_reason": "stop"}\n\n'
+    )
+    return stream.replace(b"\n", line_ending)
+
+
+def chunked(stream: bytes, chunk_size: int) -> list[bytes]:
+    return [stream[i : i + chunk_size] for i in range(0, len(stream), chunk_size)]
+
+
+def legacy_parse(chunks: Iterable[bytes]) -> Iterator[Event]:
+    """The implementation the `EventStreamParser` replaced."""
+
+    def read() -> Iterator[bytes]:
+        data = b""
+        for chunk in chunks:
+            for line in chunk.splitlines(True):
+                data += line
+                if data.endswith((b"\r\r", b"\n\n", b"\r\n\r\n")):
+                    yield data
+                    data = b""
+        if data:
+            yield data
+
+    for stream_item in read():
+        text = stream_item.decode().strip()
+        if not text:
+            continue
+        first_line, remaining = text.split("\n", 1)
+        event = first_line.split("event: ", 1)[1]
+        data = remaining.split("data: ", 1)[1]
+        yield Event(event=event, data=json.loads(data))
+
+
+def parse(chunks: Iterable[bytes]) -> Iterator[Event]:
+    parser = EventStreamParser()
+    for chunk in chunks:
+        yield from parser.feed(chunk)
+    yield from parser.finish()
+
+
+def measure(
+    parser: Callable[[Iterable[bytes]], Iterator[Event]],
+    chunks: list[bytes],
+    events: int,
+) -> float:
+    start = time.perf_counter()
+    count = sum(1 for _ in parser(chunks))
+    elapsed = time.perf_counter() - start
+    assert count == events + 2
+    return elapsed
+
+
+def report(scenario: str, chunks: list[bytes], events: int) -> None:
+    legacy = measure(legacy_parse, chunks, events)
+    new = measure(parse, chunks, events)
+    print(f"{scenario:<40}{legacy:>9.3f}s{new:>9.3f}s{legacy / new:>9.1f}x")
+
+
+def main() -> None:
+    print(f"{'scenario':<40}{'legacy':>10}{'new':>10}{'speedup':>10}")
+    # `requests` yields 128 byte chunks when iterating over a response, while a
+    # streaming read yields whatever the server has flushed.
+    for line_ending in (b"\n", b"\r\n"):
+        stream = engine_stream(EVENTS, line_ending)
+        for chunk_size in (128, 8192):
+            report(
+                f"{EVENTS:,} events, {line_ending!r}, {chunk_size} B chunks",
+                chunked(stream, chunk_size),
+                EVENTS,
+            )
+
+    # Events that span many chunks, e.g. a long tool call or a document in the data.
+    events = 100
+    stream = engine_stream(events, content=b"x" * 256_000)
+    report(f"{events} events of 256 kB, 128 B chunks", chunked(stream, 128), events)
+
+
+if __name__ == "__main__":
+    main()
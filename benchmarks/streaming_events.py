@@ -0,0 +1,162 @@
+"""
+Micro-benchmark for the per-event overhead of chat streams.
+
+Consumes a chat stream of many short message appends through the `ChatStreamResponse`
+base class, once for each of the three kinds of stream sources in the SDK:
+
+* `StubCsi`, which creates the events in Python.
+* `DevCsi`, which parses server-sent events of the Engine. No HTTP requests are made,
+  the events are replayed from memory.
+* `WitCsi`, which translates the events of the WIT bindings. The component model host
+  is replaced by an object that returns the binding types.
+
+For reference, the `legacy` row measures the previous core for the `WitCsi` source: a
+validated pydantic dataclass per event, a list as peek buffer and string concatenation
+to build the message.
+
+The stream sources are created up front, so that only the SDK is measured.
+
+Run with::
+
+    uv run python -m benchmarks.streaming_events
+"""
+
+import time
+from collections.abc import Callable, Generator
+from functools import cache
+from typing import Any
+
+from pharia_skill import ChatParams, Message
+from pharia_skill.bindings.imports import inference as wit
+from pharia_skill.csi.inference.types import (
+    ChatEvent,
+    FinishReason,
+    MessageAppend,
+    MessageBegin,
+    TokenUsage,
+)
+from pharia_skill.testing import DevCsi, StubCsi
+from pharia_skill.testing.dev.client import CsiClient, Event
+from pharia_skill.wit_csi.inference import WitChatStreamResponse
+
+EVENTS = 20_000
+ITERATIONS = 5
+TOKEN = "lorem "
+
+
+class ReplayEngine(CsiClient):
+    """Replay the server-sent events of a chat stream."""
+
+    def __init__(self, events: list[Event]):
+        self.events = events
+
+    def run(self, function: str, data: Any) -> Any:
+        raise NotImplementedError
+
+    def stream(
+        self, function: str, data: dict[str, Any]
+    ) -> Generator[Event, None, None]:
+        yield from self.events
+
+
+class WitHost:
+    """Stand-in for the `wit.ChatStream` resource of the component model host."""
+
+    def __init__(self, events: list[Any]):
+        self._events = iter(events)
+
+    def next(self) -> Any:
+        return next(self._events, None)
+
+
+@cache
+def sse_events() -> list[Event]:
+    append = {"content": TOKEN, "logprobs": []}
+    return [
+        Event(event="message_begin", data={"role": "assistant"}),
+        *[Event(event="message_append", data=append) for _ in range(EVENTS)],
+        Event(event="message_end", data={"finish_reason": "stop"}),
+        Event(event="usage", data={"usage": {"prompt": 1, "completion": EVENTS}}),
+    ]
+
+
+@cache
+def wit_events() -> list[Any]:
+    append = wit.ChatEvent_MessageAppend(wit.MessageAppend(content=TOKEN))
+    return [
+        wit.ChatEvent_MessageBegin("assistant"),
+        *[append for _ in range(EVENTS)],
+        wit.ChatEvent_MessageEnd(wit.FinishReason.STOP),
+        wit.ChatEvent_Usage(wit.TokenUsage(prompt=1, completion=EVENTS)),
+    ]
+
+
+@cache
+def messages() -> list[Message]:
+    """The `StubCsi` streams one append for each message it receives."""
+    return [Message.user(TOKEN) for _ in range(EVENTS)]
+
+
+def stub() -> str | None:
+    response = StubCsi().chat_stream("model", messages(), ChatParams())
+    return response.consume_message().content
+
+
+def dev() -> str | None:
+    csi = DevCsi._with_client(ReplayEngine(sse_events()))
+    response = csi.chat_stream("model", [Message.user("Hi")], ChatParams())
+    return response.consume_message().content
+
+
+def wit_shaped() -> str | None:
+    response = WitChatStreamResponse(WitHost(wit_events()))  # type: ignore[arg-type]
+    return response.consume_message().content
+
+
+def legacy() -> str:
+    """Previous core: validated events, `list.pop(0)` and `+=`."""
+
+    def event(item: Any) -> ChatEvent:
+        match item:
+            case wit.ChatEvent_MessageBegin(value):
+                return MessageBegin(value)
+            case wit.ChatEvent_MessageAppend(value):
+                return MessageAppend(content=value.content)
+            case wit.ChatEvent_MessageEnd(_):
+                return FinishReason.STOP
+            case wit.ChatEvent_Usage(value):
+                return TokenUsage(prompt=value.prompt, completion=value.completion)
+        raise ValueError(item)
+
+    host = WitHost(wit_events())
+    buffer: list[ChatEvent] = []
+    content = ""
+    while (item := host.next()) is not None:
+        buffer.append(event(item))
+        match buffer.pop(0):
+            case MessageAppend() as append:
+                content += append.content
+    return content
+
+
+def measure(path: Callable[[], str | None]) -> float:
+    assert path() == TOKEN * EVENTS
+    start = time.perf_counter()
+    for _ in range(ITERATIONS):
+        path()
+    return (time.perf_counter() - start) / ITERATIONS / EVENTS
+
+
+def main() -> None:
+    print(f"{'source':<12}{'per event':>12}")
+    for name, path in [
+        ("StubCsi", stub),
+        ("DevCsi", dev),
+        ("WitCsi", wit_shaped),
+        ("legacy", legacy),
+    ]:
+        print(f"{name:<12}{measure(path) * 1e6:>10.2f}us")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,18 @@
 from .csi import (
     After,
+    AgentBudget,
+    AsyncChatStreamResponse,
+    AsyncCompletionStreamResponse,
+    AsyncCsi,
     AtOrAfter,
     AtOrBefore,
     Before,
+    BudgetExceeded,
     ChatParams,
     ChatRequest,
     ChatResponse,
     ChatStreamResponse,
+    ChatStreams,
     Chunk,
     ChunkParams,
     ChunkRequest,
@@ -14,6 +20,7 @@ from .csi import (
     CompletionParams,
     CompletionRequest,
     CompletionStreamResponse,
+    CompletionStreams,
     Csi,
     Cursor,
     Distribution,
@@ -30,6 +37,7 @@ from .csi import (
     IsNull,
     JsonSerializable,
     Language,
+    LatencyStats,
     LessThan,
     LessThanOrEqualTo,
     Logprob,
@@ -44,11 +52,14 @@ from .csi import (
     SearchRequest,
     SearchResult,
     SelectLanguageRequest,
+    StreamTimings,
     Text,
     TokenUsage,
     Tool,
+    ToolDispatcher,
     ToolError,
     ToolOutput,
+    ToolRegistry,
     ToolResult,
     TopLogprobs,
     With,
@@ -58,6 +69,7 @@ from .csi import (
 from .message_stream import (
     AgentInput,
     AgentMessage,
+    FlushPolicy,
     MessageAppend,
     MessageBegin,
     MessageEnd,
@@ -72,7 +84,12 @@ __all__ = [
     "agent",
     "AgentInput",
     "AgentMessage",
+    "FlushPolicy",
     "After",
+    "AgentBudget",
+    "AsyncChatStreamResponse",
+    "AsyncCompletionStreamResponse",
+    "AsyncCsi",
     "AtOrAfter",
     "AtOrBefore",
     "Before",
@@ -80,6 +97,7 @@ __all__ = [
     "ChatRequest",
     "ChatResponse",
     "ChatStreamResponse",
+    "ChatStreams",
     "Chunk",
     "ChunkParams",
     "ChunkRequest",
@@ -87,6 +105,7 @@ __all__ = [
     "CompletionParams",
     "CompletionRequest",
     "CompletionStreamResponse",
+    "CompletionStreams",
     "Csi",
     "Cursor",
     "Distribution",
@@ -103,6 +122,7 @@ __all__ = [
     "IsNull",
     "JsonSerializable",
     "Language",
+    "LatencyStats",
     "LessThan",
     "LessThanOrEqualTo",
     "Logprob",
@@ -124,11 +144,15 @@ __all__ = [
     "SearchRequest",
     "SearchResult",
     "SelectLanguageRequest",
+    "StreamTimings",
     "skill",
     "Text",
     "TokenUsage",
+    "BudgetExceeded",
+    "ToolDispatcher",
     "ToolError",
     "ToolOutput",
+    "ToolRegistry",
     "ToolResult",
     "TopLogprobs",
     "Without",
@@ -1,18 +1,22 @@
+import contextlib
+import json
 import logging
 import os
 import subprocess
 import time
 from enum import Enum
 from pathlib import Path
-from typing import Optional
+from typing import Any, Optional
 
 import typer
 from rich.console import Console
 from rich.panel import Panel
 from rich.progress import Progress, SpinnerColumn, TextColumn, TimeElapsedColumn
 from rich.prompt import Confirm, Prompt
+from rich.table import Table
 from typing_extensions import Annotated
 
+from .csi import Csi
 from .pharia_skill_cli import Registry, cli_publish
 
 logging.basicConfig(
@@ -109,6 +113,12 @@ class SkillType(str, Enum):
     MESSAGE_STREAM_SKILL = "message-stream-skill"
 
 
+class BenchCsi(str, Enum):
+    STUB = "stub"
+    DEV = "dev"
+    EMULATOR = "emulator"
+
+
 def run_componentize_py(
     skill_module: str,
     output_file: str,
@@ -274,6 +284,94 @@ def prompt_for_publish(wasm_file: str) -> None:
         publish_skill(wasm_filename, name, tag)
 
 
+def display_bench_report(report: dict[str, Any]) -> None:
+    """Display the result of `pharia-skill bench` as tables.
+
+    Args:
+        report: The JSON representation of the `BenchReport`.
+    """
+    summary = Table(title="Runs", show_header=False)
+    summary.add_row("Runs", f"{report['runs']} ({report['errors']} failed)")
+    summary.add_row("Concurrency", str(report["concurrency"]))
+    summary.add_row("Duration", f"{report['duration_seconds']:.2f}s")
+    summary.add_row("Throughput", f"{report['throughput']:.2f} runs/s")
+    summary.add_row(
+        "Tokens",
+        f"{report['usage']['prompt']} prompt, {report['usage']['completion']} completion",
+    )
+    console.print(summary)
+
+    latency = Table(title="Latency (seconds)")
+    for column in ("", "mean", "p50", "p95", "p99", "max"):
+        latency.add_column(column, justify="right")
+    for name, key in (
+        ("End to end", "latency_seconds"),
+        ("First append", "time_to_first_append_seconds"),
+    ):
+        if (values := report[key]) is not None:
+            latency.add_row(
+                name,
+                *(f"{values[p]:.3f}" for p in ("mean", "p50", "p95", "p99", "max")),
+            )
+    console.print(latency)
+
+    methods = Table(title="CSI")
+    for column in ("method", "calls", "total", "mean"):
+        methods.add_column(column, justify="right")
+    for name, stats in report["csi"].items():
+        methods.add_row(
+            name,
+            str(stats["calls"]),
+            f"{stats['seconds']:.3f}s",
+            f"{stats['mean_seconds']:.3f}s",
+        )
+    console.print(methods)
+
+    for message in report["error_messages"]:
+        console.print(Panel(message, title="[bold red]Error[/bold red]"))
+
+
+def display_critical_paths(analyses: list[dict[str, Any]]) -> None:
+    """Display the result of `pharia-skill critical-path` as tables.
+
+    Args:
+        analyses: The JSON representations of the `RunAnalysis` of each run.
+    """
+    for run in analyses:
+        path = Table(
+            title=f"{run['name']} ({run['duration_seconds']:.3f}s, trace {run['trace_id']})"
+        )
+        for column in ("offset", "duration", "critical path"):
+            path.add_column(
+                column, justify="right" if column != "critical path" else "left"
+            )
+        for segment in run["critical_path"]:
+            path.add_row(
+                f"{segment['offset_seconds']:.3f}s",
+                f"{segment['duration_seconds']:.3f}s",
+                segment["name"],
+            )
+        console.print(path)
+        console.print(
+            f"CSI {run['csi_seconds']:.3f}s, own code {run['own_seconds']:.3f}s"
+        )
+        for group in run["sequential"]:
+            console.print(
+                Panel(
+                    f"{', '.join(group['calls'])} do not depend on each other. "
+                    f"Making them with {group['suggestion']} saves about "
+                    f"{group['saving_seconds']:.3f}s.",
+                    title="[bold yellow]Sequential calls[/bold yellow]",
+                    border_style="yellow",
+                )
+            )
+        if run["unknown_dependencies"]:
+            console.print(
+                f"{run['unknown_dependencies']} calls have no recorded payloads "
+                "and are assumed to be dependent."
+            )
+
+
 app = typer.Typer(rich_markup_mode="rich")
 
 
@@ -282,7 +380,7 @@ def callback() -> None:
     """
     [bold green]Pharia Skill CLI Tool[/bold green].
 
-    A tool for building and publishing Pharia Skills.
+    A tool for building, publishing, benchmarking and analyzing Pharia Skills.
     """
 
 
@@ -418,5 +516,163 @@ def publish(
     publish_skill(skill, name, tag)
 
 
+@app.command()
+def bench(
+    skill: Annotated[
+        str,
+        typer.Argument(
+            help="The Skill to run as [green]module:function[/green], e.g. [green]haiku:run[/green].",
+            show_default=False,
+        ),
+    ],
+    inputs: Annotated[
+        Path,
+        typer.Option(
+            help="JSON Lines file with one input of the Skill per line.",
+            show_default=False,
+        ),
+    ],
+    runs: Annotated[
+        Optional[int],
+        typer.Option(help="Number of runs.", show_default="One per input"),
+    ] = None,
+    concurrency: Annotated[
+        int, typer.Option(help="Number of runs in flight at the same time.")
+    ] = 1,
+    csi: Annotated[
+        BenchCsi,
+        typer.Option(
+            help="Run against the [green]stub[/green] CSI, a PhariaEngine "
+            "([green]dev[/green]) or a local [green]emulator[/green] of it."
+        ),
+    ] = BenchCsi.STUB,
+    namespace: Annotated[
+        Optional[str],
+        typer.Option(help="Namespace of the tools the Skill uses.", show_default=False),
+    ] = None,
+    cassette: Annotated[
+        Optional[Path],
+        typer.Option(
+            help="Let the emulator replay a cassette instead of answering like the stub CSI.",
+            show_default=False,
+        ),
+    ] = None,
+    request_seconds: Annotated[
+        float,
+        typer.Option(help="Emulated time to the first response or stream event."),
+    ] = 0.0,
+    tokens_per_second: Annotated[
+        Optional[float],
+        typer.Option(help="Emulated token rate of the models.", show_default=False),
+    ] = None,
+    output_json: Annotated[
+        bool,
+        typer.Option("--json", help="Print the report as JSON."),
+    ] = False,
+) -> None:
+    """
+    [bold blue]Benchmark[/bold blue] a skill.
+
+    Runs a Skill decorated with @skill or @message_stream many times and reports its
+    throughput, latency percentiles, time spent per CSI method and token usage.
+    """
+    from pharia_skill.testing import (
+        DevCsi,
+        LatencyModel,
+        ReplayClient,
+        StubBackend,
+        StubCsi,
+    )
+    from pharia_skill.testing.bench import bench as run_bench
+    from pharia_skill.testing.bench import (
+        emulated_csi,
+        input_model,
+        load_inputs,
+        load_skill,
+    )
+
+    try:
+        function = load_skill(skill)
+        model, _ = input_model(function)
+        skill_inputs = load_inputs(inputs, model)
+    except (ValueError, ImportError, AttributeError, OSError) as e:
+        console.print(
+            Panel(str(e), title="[bold red]Error[/bold red]", border_style="red")
+        )
+        raise typer.Exit(code=1)
+
+    with contextlib.ExitStack() as stack:
+        match csi:
+            case BenchCsi.STUB:
+                target: Csi = StubCsi()
+            case BenchCsi.DEV:
+                target = DevCsi(namespace=namespace)
+            case BenchCsi.EMULATOR:
+                backend = ReplayClient(cassette) if cassette else StubBackend()
+                latency = LatencyModel(
+                    request_seconds=request_seconds,
+                    tokens_per_second=tokens_per_second,
+                )
+                target = stack.enter_context(emulated_csi(backend, latency, namespace))
+        report = run_bench(
+            function, target, skill_inputs, runs or len(skill_inputs), concurrency
+        )
+
+    if output_json:
+        print(json.dumps(report.to_json(), indent=2))
+    else:
+        display_bench_report(report.to_json())
+    if report.errors:
+        raise typer.Exit(code=1)
+
+
+@app.command()
+def critical_path(
+    traces: Annotated[
+        Path,
+        typer.Argument(
+            help="File with the spans of Skill runs, as JSON documents of the "
+            "ConsoleSpanExporter or in the OTLP JSON encoding.",
+            show_default=False,
+        ),
+    ],
+    min_saving: Annotated[
+        float,
+        typer.Option(help="Only report sequential calls that save this many seconds."),
+    ] = 0.0,
+    output_json: Annotated[
+        bool,
+        typer.Option("--json", help="Print the analysis as JSON."),
+    ] = False,
+) -> None:
+    """
+    [bold blue]Analyze[/bold blue] the traces of skill runs.
+
+    Reconstructs the timeline of each run, prints its critical path and reports CSI
+    calls that were made one after another but could have been made concurrently.
+    """
+    from pharia_skill.testing.critical_path import analyze, load_spans
+
+    try:
+        spans = load_spans(traces)
+    except (ValueError, KeyError, OSError) as e:
+        console.print(
+            Panel(str(e), title="[bold red]Error[/bold red]", border_style="red")
+        )
+        raise typer.Exit(code=1)
+
+    analyses = [run.to_json() for run in analyze(spans)]
+    for run in analyses:
+        run["sequential"] = [
+            group
+            for group in run["sequential"]
+            if group["saving_seconds"] >= min_saving
+        ]
+    if output_json:
+        print(json.dumps(analyses, indent=2))
+    else:
+        display_critical_paths(analyses)
+
+
 if __name__ == "__main__":
     app()
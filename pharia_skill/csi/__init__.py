@@ -7,6 +7,7 @@ implementation at runtime, which does a translation step from the Python types w
 to those in `wit.imports`, which are automatically generated from the WIT world via `componentize-py`.
 """
 
+from .async_csi import AsyncCsi
 from .chunking import Chunk, ChunkParams, ChunkRequest
 from .csi import Csi
 from .document_index import (
@@ -38,27 +39,37 @@ from .document_index import (
     Without,
 )
 from .inference import (
+    AgentBudget,
+    AsyncChatStreamResponse,
+    AsyncCompletionStreamResponse,
+    BudgetExceeded,
     ChatParams,
     ChatRequest,
     ChatResponse,
     ChatStreamResponse,
+    ChatStreams,
     Completion,
     CompletionParams,
     CompletionRequest,
     CompletionStreamResponse,
+    CompletionStreams,
     Distribution,
     FinishReason,
     InvokeRequest,
+    LatencyStats,
     Logprob,
     Logprobs,
     Message,
     NoLogprobs,
     Role,
     SampledLogprobs,
+    StreamTimings,
     TokenUsage,
     Tool,
+    ToolDispatcher,
     ToolError,
     ToolOutput,
+    ToolRegistry,
     ToolResult,
     TopLogprobs,
 )
@@ -66,6 +77,10 @@ from .language import Language, SelectLanguageRequest
 
 __all__ = [
     "After",
+    "AgentBudget",
+    "AsyncChatStreamResponse",
+    "AsyncCompletionStreamResponse",
+    "AsyncCsi",
     "AtOrAfter",
     "AtOrBefore",
     "Before",
@@ -73,6 +88,7 @@ __all__ = [
     "ChatRequest",
     "ChatResponse",
     "ChatStreamResponse",
+    "ChatStreams",
     "Chunk",
     "ChunkParams",
     "ChunkRequest",
@@ -80,6 +96,7 @@ __all__ = [
     "CompletionParams",
     "CompletionRequest",
     "CompletionStreamResponse",
+    "CompletionStreams",
     "Csi",
     "Cursor",
     "Distribution",
@@ -96,6 +113,7 @@ __all__ = [
     "IsNull",
     "JsonSerializable",
     "Language",
+    "LatencyStats",
     "LessThan",
     "LessThanOrEqualTo",
     "Logprob",
@@ -111,11 +129,15 @@ __all__ = [
     "SearchRequest",
     "SearchResult",
     "SelectLanguageRequest",
+    "StreamTimings",
     "Text",
     "TokenUsage",
     "Tool",
+    "BudgetExceeded",
+    "ToolDispatcher",
     "ToolError",
     "ToolOutput",
+    "ToolRegistry",
     "ToolResult",
     "TopLogprobs",
     "Without",
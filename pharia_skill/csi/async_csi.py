@@ -0,0 +1,408 @@
+"""
+The asyncio counterpart of the `Csi` protocol.
+
+Skills that run inside PhariaEngine use the blocking `Csi`. Services that evaluate Skills
+or talk to the Engine from an asyncio application can use the `AsyncCsi`, which mirrors
+every method of the `Csi` as a coroutine. This allows many in-flight requests to share a
+single event loop instead of requiring one thread per request.
+"""
+
+from typing import Protocol, Sequence
+
+from pydantic.types import JsonValue
+
+from .chunking import Chunk, ChunkParams, ChunkRequest
+from .document_index import (
+    Document,
+    DocumentPath,
+    IndexPath,
+    JsonSerializable,
+    SearchFilter,
+    SearchRequest,
+    SearchResult,
+)
+from .inference import (
+    AgentBudget,
+    AsyncChatStreamResponse,
+    AsyncCompletionStreamResponse,
+    ChatParams,
+    ChatRequest,
+    ChatResponse,
+    Completion,
+    CompletionParams,
+    CompletionRequest,
+    InvokeRequest,
+    Message,
+    Tool,
+    ToolCall,
+    ToolDispatcher,
+    ToolError,
+    ToolOutput,
+    ToolResult,
+)
+from .inference.budget import AgentRun
+from .language import Language, SelectLanguageRequest
+
+
+class AsyncCsi(Protocol):
+    """The asynchronous version of the Cognitive System Interface (CSI).
+
+    All methods behave like their counterparts on :class:`~pharia_skill.Csi`, but need to
+    be awaited. As for the `Csi`, it is guaranteed that the responses of all concurrent
+    requests are returned in the same order as the requests.
+
+    Streaming methods return responses whose `stream()` method is an async iterator::
+
+        response = await csi.chat_stream(model, messages)
+        async with response:
+            async for event in response.stream():
+                print(event.content)
+    """
+
+    async def invoke_tool(self, name: str, **kwargs: JsonValue) -> ToolOutput:
+        """Invoke a tool that is configured with the Engine.
+
+        Parameters:
+            name (str, required): Name of the tool to invoke.
+            **kwargs (JsonValue, required): Arguments to pass to the tool.
+
+        Raises:
+            ToolError: If the tool invocation fails.
+        """
+        request = InvokeRequest(name, kwargs)
+        result = (await self.invoke_tool_concurrent([request]))[0]
+        if isinstance(result, ToolOutput):
+            return result
+        else:
+            raise ToolError(result.message)
+
+    async def invoke_tool_concurrent(
+        self, requests: Sequence[InvokeRequest]
+    ) -> list[ToolResult]:
+        """Invoke multiple tools concurrently.
+
+        Parameters:
+            requests (list[InvokeRequest], required): List of invoke requests.
+
+        Returns:
+            list[ToolResult]: List of tool results in the same order as the requests.
+        """
+        ...
+
+    async def list_tools(self) -> list[Tool]:
+        """List all tools that are available to the skill.
+
+        Returns:
+            list[Tool]: List of tools.
+        """
+        ...
+
+    async def _list_tool_schemas(self, tools: list[str]) -> list[Tool]:
+        """List all tool schemas that are specified in the tools parameter.
+
+        This function raises an error if a tool is specified in the tools parameter but not
+        available in the namespace.
+
+        Returns:
+            list[Tool]: List of tool schemas.
+        """
+        tool_schemas = {t.name: t for t in await self.list_tools() if t.name in tools}
+        for t in tools:
+            if t not in tool_schemas:
+                raise ValueError(
+                    f"Tool {t} required by Skill but not configured in namespace."
+                )
+        return list(tool_schemas.values())
+
+    async def complete(
+        self, model: str, prompt: str, params: CompletionParams | None = None
+    ) -> Completion:
+        """Complete a prompt using a specific model.
+
+        Parameters:
+            model (str, required): Name of model to use.
+            prompt (str, required): The text to be completed.
+            params (CompletionParams, optional, Default None):
+                Parameters for the requested completion.
+        """
+        params = params or CompletionParams()
+        request = CompletionRequest(model, prompt, params)
+        return (await self.complete_concurrent([request]))[0]
+
+    async def complete_concurrent(
+        self, requests: Sequence[CompletionRequest]
+    ) -> list[Completion]:
+        """Complete multiple prompts concurrently.
+
+        Parameters:
+            requests (list[CompletionRequest], required): List of completion requests.
+
+        Returns:
+            list[Completion]: List of completions in the same order as the requests.
+        """
+        ...
+
+    async def completion_stream(
+        self, model: str, prompt: str, params: CompletionParams | None = None
+    ) -> AsyncCompletionStreamResponse:
+        """Complete a prompt using a specific model and stream the result.
+
+        Parameters:
+            model (str, required): Name of model to use.
+            prompt (str, required): The text to be completed.
+            params (CompletionParams, optional, Default None):
+                Parameters for the requested completion.
+        """
+        params = params or CompletionParams()
+        return await self._completion_stream(model, prompt, params)
+
+    async def _completion_stream(
+        self, model: str, prompt: str, params: CompletionParams
+    ) -> AsyncCompletionStreamResponse: ...
+
+    async def chunk(self, text: str, params: ChunkParams) -> list[Chunk]:
+        """Chunks a text into chunks according to params.
+
+        Parameters:
+            text (str, required): Text to be chunked.
+            params (ChunkParams, required):
+                Parameter used for chunking, model and maximal number of tokens.
+        """
+        request = ChunkRequest(text, params)
+        return (await self.chunk_concurrent([request]))[0]
+
+    async def chunk_concurrent(
+        self, requests: Sequence[ChunkRequest]
+    ) -> list[list[Chunk]]:
+        """Chunk a text into chunks concurrently.
+
+        Parameters:
+            requests (list[ChunkRequest], required): List of chunk requests.
+        """
+        ...
+
+    async def chat(
+        self, model: str, messages: list[Message], params: ChatParams | None = None
+    ) -> ChatResponse:
+        """Generate a model response from a list of messages comprising a conversation.
+
+        Parameters:
+            model (str, required): Name of model to use.
+            messages (list[Message], required):
+                List of messages, alternating between messages from user and assistant.
+            params (ChatParams, optional, Default None): Parameters used for the chat.
+        """
+        params = params or ChatParams()
+        request = ChatRequest(model, messages, params)
+        return (await self.chat_concurrent([request]))[0]
+
+    async def chat_concurrent(
+        self, requests: Sequence[ChatRequest]
+    ) -> list[ChatResponse]:
+        """Generate model responses for a list of chat requests concurrently.
+
+        Parameters:
+            requests (list[ChatRequest], required): List of chat requests.
+
+        Returns:
+            list[ChatResponse]: List of chat responses in the same order as the requests.
+        """
+        ...
+
+    async def chat_stream(
+        self,
+        model: str,
+        messages: list[Message],
+        params: ChatParams | None = None,
+        tools: list[str] | None = None,
+        dispatcher: ToolDispatcher | None = None,
+        budget: AgentBudget | None = None,
+    ) -> AsyncChatStreamResponse:
+        """Chat with a model with automatic tool invocation.
+
+        See :func:`~pharia_skill.Csi.chat_stream` for details.
+
+        Parameters:
+            model (str, required): Name of model to use.
+            messages (list[Message], required):
+                List of messages, alternating between messages from user and assistant.
+            params (ChatParams, optional, Default None): Parameters used for the chat.
+            tools (list[str], optional, Default None):
+                List of tool names that are available to the model.
+            dispatcher (ToolDispatcher, optional, Default None):
+                Executes the tool calls of each turn. By default, the tool calls of a
+                turn are invoked concurrently, identical calls only once.
+            budget (AgentBudget, optional, Default None):
+                Limits the turns, tokens and time of the tool calling loop, and the
+                size of the conversation. Defaults to the budget of the `@agent`, if
+                any, and otherwise no limits.
+        """
+        params = params or ChatParams()
+        if tools:
+            params.tools = await self._list_tool_schemas(tools)
+        response = await self.chat_stream_step(model, messages, params)
+
+        if tools:
+            dispatcher = dispatcher or ToolDispatcher()
+            run = AgentRun(budget)
+            while (tool_calls := await response.tool_calls()) is not None:
+                run.record(response._usage)
+                await self._handle_tool_calls(tool_calls, messages, dispatcher)
+                run.compact(messages)
+                response = await self.chat_stream_step(
+                    model, messages, run.params(params)
+                )
+
+        return response
+
+    async def chat_stream_step(
+        self,
+        model: str,
+        messages: list[Message],
+        params: ChatParams | None = None,
+    ) -> AsyncChatStreamResponse:
+        """Generate a model response from a list of messages comprising a conversation.
+
+        Parameters:
+            model (str, required): Name of model to use.
+            messages (list[Message], required):
+                List of messages, alternating between messages from user and assistant.
+            params (ChatParams, optional, Default None): Parameters used for the chat.
+        """
+        params = params or ChatParams()
+        return await self._chat_stream(model, messages, params)
+
+    async def _handle_tool_calls(
+        self,
+        tool_calls: list[ToolCall],
+        messages: list[Message],
+        dispatcher: ToolDispatcher | None = None,
+    ) -> None:
+        """Handle a list of tool calls from the model.
+
+        The assistant message requesting the tool calls is added to the conversation
+        and the tool responses are added to the conversation, in the order of the
+        tool calls.
+        """
+        messages.append(Message._from_tool_calls(tool_calls))
+        dispatcher = dispatcher or ToolDispatcher()
+        messages.extend(
+            await dispatcher.dispatch_async(self.invoke_tool_concurrent, tool_calls)
+        )
+
+    async def _chat_stream(
+        self,
+        model: str,
+        messages: list[Message],
+        params: ChatParams,
+    ) -> AsyncChatStreamResponse: ...
+
+    async def select_language(
+        self, text: str, languages: list[Language]
+    ) -> Language | None:
+        """Select the detected language for the provided input based on the list of
+        possible languages.
+
+        Parameters:
+            text (str, required): Text input.
+            languages (list[Language], required):
+                All languages that should be considered during detection.
+        """
+        request = SelectLanguageRequest(text, languages)
+        return (await self.select_language_concurrent([request]))[0]
+
+    async def select_language_concurrent(
+        self, requests: Sequence[SelectLanguageRequest]
+    ) -> list[Language | None]:
+        """Detect the language for multiple texts concurrently.
+
+        Parameters:
+            requests (list[SelectLanguageRequest], required):
+                List of select language requests.
+
+        Returns:
+            list[Language | None]: List of detected languages in the same order as the requests.
+        """
+        ...
+
+    async def search(
+        self,
+        index_path: IndexPath,
+        query: str,
+        max_results: int = 1,
+        min_score: float | None = None,
+        filters: list[SearchFilter] | None = None,
+    ) -> list[SearchResult]:
+        """Search an existing Index in the Document Index.
+
+        Parameters:
+            index_path (IndexPath, required):
+                Index path in the Document Index to access.
+            query (str, required): Text to be search for.
+            max_results (int, optional, Default 1): Maximal number of results.
+            min_score (float, optional, Default None):
+                Minimal score for result to be included.
+            filters (list[SearchFilter], optional, Default None):
+                Filters to be applied to the search.
+        """
+        request = SearchRequest(
+            index_path, query, max_results, min_score, filters or []
+        )
+        return (await self.search_concurrent([request]))[0]
+
+    async def search_concurrent(
+        self, requests: Sequence[SearchRequest]
+    ) -> list[list[SearchResult]]:
+        """Execute multiple search requests against the Document Index.
+
+        Parameters:
+            requests (list[SearchRequest], required): List of search requests.
+
+        Returns:
+            list[list[SearchResult]]: List of search results in the same order as the requests.
+        """
+        ...
+
+    async def document(self, document_path: DocumentPath) -> Document:
+        """Fetch a document from the Document Index.
+
+        Parameters:
+            document_path (DocumentPath, required):
+                The document path to get the document from.
+        """
+        return (await self.documents([document_path]))[0]
+
+    async def documents(self, document_paths: Sequence[DocumentPath]) -> list[Document]:
+        """Fetch multiple documents from the Document Index.
+
+        Parameters:
+            document_paths (list[DocumentPath], required):
+                The document paths to get the documents from.
+
+        Returns:
+            list[Document]: List of documents in the same order as the provided document paths.
+        """
+        ...
+
+    async def document_metadata(self, document_path: DocumentPath) -> JsonSerializable:
+        """Return the metadata of a document in the Document Index.
+
+        Parameters:
+            document_path (DocumentPath, required):
+                The document path to get metadata from.
+        """
+        return (await self.documents_metadata([document_path]))[0]
+
+    async def documents_metadata(
+        self, document_paths: Sequence[DocumentPath]
+    ) -> list[JsonSerializable]:
+        """Return the metadata of multiple documents in the Document Index.
+
+        Parameters:
+            document_paths (list[DocumentPath], required):
+                The document paths to get metadata from.
+
+        Returns:
+            list[JsonSerializable]: List of metadata in the same order as the provided document paths.
+        """
+        ...
@@ -34,22 +34,28 @@ from .document_index import (
     SearchResult,
 )
 from .inference import (
+    AgentBudget,
     ChatParams,
     ChatRequest,
     ChatResponse,
     ChatStreamResponse,
+    ChatStreams,
     Completion,
     CompletionParams,
     CompletionRequest,
     CompletionStreamResponse,
+    CompletionStreams,
     InvokeRequest,
     Message,
     Tool,
     ToolCall,
+    ToolDispatcher,
     ToolError,
     ToolOutput,
+    ToolRegistry,
     ToolResult,
 )
+from .inference.budget import AgentRun
 from .language import Language, SelectLanguageRequest
 
 
@@ -109,22 +115,32 @@ class Csi(Protocol):
         """
         ...
 
+    def tool_registry(self) -> ToolRegistry:
+        """The cached tools of the namespace, indexed by name.
+
+        The registry is created on first use and lives as long as the `Csi`. It can be
+        used to prefetch the tools early or to invalidate them after the namespace
+        configuration changed.
+
+        Implementations keep the registry they create, e.g. in a `_tool_registry`
+        attribute. This default can not store it and returns a new registry on every
+        call, so that the tools are listed for each lookup.
+
+        Returns:
+            ToolRegistry: The tool registry of the namespace.
+        """
+        return ToolRegistry(self.list_tools)
+
     def _list_tool_schemas(self, tools: list[str]) -> list[Tool]:
         """List all tool schemas that are specified in the tools parameter.
 
         This function raises an error if a tool is specified in the tools parameter but not
-        available in the namespace.
+        available in the namespace. The schemas are taken from the `tool_registry`.
 
         Returns:
             list[Tool]: List of tool schemas.
         """
-        tool_schemas = {t.name: t for t in self.list_tools() if t.name in tools}
-        for t in tools:
-            if t not in tool_schemas:
-                raise ValueError(
-                    f"Tool {t} required by Skill but not configured in namespace."
-                )
-        return list(tool_schemas.values())
+        return self.tool_registry().select(tools)
 
     def complete(
         self, model: str, prompt: str, params: CompletionParams | None = None
@@ -190,6 +206,29 @@ class Csi(Protocol):
         self, model: str, prompt: str, params: CompletionParams
     ) -> CompletionStreamResponse: ...
 
+    def completion_stream_concurrent(
+        self, requests: Sequence[CompletionRequest]
+    ) -> CompletionStreams:
+        """Stream the completions of multiple prompts concurrently.
+
+        This represents the concurrent version of :func:`~pharia_skill.Csi.completion_stream`.
+        Iterating over the result yields `(index, event)` tuples as the events of the
+        individual streams arrive, where `index` is the position of the request.
+
+        Parameters:
+            requests (list[CompletionRequest], required): List of completion requests.
+
+        Returns:
+            CompletionStreams: The interleaved events. The individual responses, e.g.
+            to access their finish reason and usage, are available as `responses`.
+        """
+        return CompletionStreams(
+            [
+                self._completion_stream(request.model, request.prompt, request.params)
+                for request in requests
+            ]
+        )
+
     def chunk(self, text: str, params: ChunkParams) -> list[Chunk]:
         """Chunks a text into chunks according to params.
 
@@ -261,12 +300,47 @@ class Csi(Protocol):
         """
         ...
 
+    def chat_stream_concurrent(self, requests: Sequence[ChatRequest]) -> ChatStreams:
+        """Stream the responses to multiple chat requests concurrently.
+
+        This represents the concurrent version of :func:`~pharia_skill.Csi.chat_stream_step`.
+        Iterating over the result yields `(index, event)` tuples as the events of the
+        individual streams arrive, where `index` is the position of the request.
+
+        Parameters:
+            requests (list[ChatRequest], required): List of chat requests.
+
+        Returns:
+            ChatStreams: The interleaved events. The individual responses, e.g. to
+            access their role, finish reason and usage, are available as `responses`.
+
+        Examples::
+
+            perspectives = ["an optimist", "a pessimist", "a realist"]
+            requests = [
+                ChatRequest(model, [Message.system(f"You are {p}."), user], params)
+                for p in perspectives
+            ]
+            with csi.chat_stream_concurrent(requests) as streams:
+                for index, event in streams:
+                    if isinstance(event, MessageAppend):
+                        print(perspectives[index], event.content)
+        """
+        return ChatStreams(
+            [
+                self._chat_stream(request.model, request.messages, request.params)
+                for request in requests
+            ]
+        )
+
     def chat_stream(
         self,
         model: str,
         messages: list[Message],
         params: ChatParams | None = None,
         tools: list[str] | None = None,
+        dispatcher: ToolDispatcher | None = None,
+        budget: AgentBudget | None = None,
     ) -> ChatStreamResponse:
         """Chat with a model with automatic tool invocation.
 
@@ -284,6 +358,13 @@ class Csi(Protocol):
             params (ChatParams, optional, Default None): Parameters used for the chat.
             tools (list[str], optional, Default None):
                 List of tool names that are available to the model.
+            dispatcher (ToolDispatcher, optional, Default None):
+                Executes the tool calls of each turn. By default, the tool calls of a
+                turn are invoked concurrently, identical calls only once.
+            budget (AgentBudget, optional, Default None):
+                Limits the turns, tokens and time of the tool calling loop, and the
+                size of the conversation. Defaults to the budget of the `@agent`, if
+                any, and otherwise no limits.
         """
         params = params or ChatParams()
         if tools:
@@ -291,9 +372,13 @@ class Csi(Protocol):
         response = self.chat_stream_step(model, messages, params)
 
         if tools:
+            dispatcher = dispatcher or ToolDispatcher()
+            run = AgentRun(budget)
             while (tool_calls := response.tool_calls()) is not None:
-                self._handle_tool_calls(tool_calls, messages)
-                response = self.chat_stream_step(model, messages, params)
+                run.record(response._usage)
+                self._handle_tool_calls(tool_calls, messages, dispatcher)
+                run.compact(messages)
+                response = self.chat_stream_step(model, messages, run.params(params))
 
         return response
 
@@ -322,25 +407,20 @@ class Csi(Protocol):
         return self._chat_stream(model, messages, params)
 
     def _handle_tool_calls(
-        self, tool_calls: list[ToolCall], messages: list[Message]
+        self,
+        tool_calls: list[ToolCall],
+        messages: list[Message],
+        dispatcher: ToolDispatcher | None = None,
     ) -> None:
         """Handle a list of tool calls from the model.
 
         The assistant message requesting the tool calls is added to the conversation
-        and the tool responses are added to the conversation.
+        and the tool responses are added to the conversation, in the order of the
+        tool calls.
         """
         messages.append(Message._from_tool_calls(tool_calls))
-        for tool_call in tool_calls:
-            try:
-                tool_response = self.invoke_tool(tool_call.name, **tool_call.arguments)
-                messages.append(tool_response.as_message(tool_call.id))
-            except ToolError as e:
-                messages.append(
-                    Message.tool(
-                        f'failed[stderr]:{{"error": {e.message}}}[/stderr]',
-                        tool_call_id=tool_call.id,
-                    )
-                )
+        dispatcher = dispatcher or ToolDispatcher()
+        messages.extend(dispatcher.dispatch(self.invoke_tool_concurrent, tool_calls))
 
     def _chat_stream(
         self,
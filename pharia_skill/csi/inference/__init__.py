@@ -1,4 +1,8 @@
+from .budget import AgentBudget, BudgetExceeded
+from .dispatch import ToolDispatcher
 from .inference import (
+    AsyncChatStreamResponse,
+    AsyncCompletionStreamResponse,
     ChatParams,
     ChatRequest,
     ChatResponse,
@@ -20,6 +24,9 @@ from .inference import (
     ToolChoice,
     TopLogprobs,
 )
+from .multiplex import ChatStreams, CompletionStreams, MultiplexedStream
+from .registry import ToolRegistry
+from .timing import LatencyStats, StreamTimings
 from .tool import (
     InvokeRequest,
     ToolError,
@@ -43,31 +50,41 @@ from .types import (
 )
 
 __all__ = [
+    "AgentBudget",
+    "AsyncChatStreamResponse",
+    "AsyncCompletionStreamResponse",
+    "BudgetExceeded",
     "ChatEvent",
     "ChatParams",
     "ChatRequest",
     "ChatResponse",
     "ChatStreamResponse",
+    "ChatStreams",
     "Completion",
     "CompletionAppend",
     "CompletionEvent",
     "CompletionParams",
     "CompletionRequest",
     "CompletionStreamResponse",
+    "CompletionStreams",
     "InvokeRequest",
     "ToolCall",
     "ToolChoice",
+    "ToolDispatcher",
     "ToolError",
+    "ToolRegistry",
     "ToolOutput",
     "Distribution",
     "Tool",
     "FinishReason",
     "JsonSchema",
+    "LatencyStats",
     "Logprob",
     "Logprobs",
     "Message",
     "MessageAppend",
     "MessageBegin",
+    "MultiplexedStream",
     "NamedToolChoice",
     "NoLogprobs",
     "Reasoning",
@@ -75,6 +92,7 @@ __all__ = [
     "ResponseFormat",
     "Role",
     "SampledLogprobs",
+    "StreamTimings",
     "TokenUsage",
     "TopLogprobs",
     "ToolCallChunk",
@@ -0,0 +1,180 @@
+"""
+Bound the tool calling loop of `chat_stream` in turns, tokens, time and prompt size.
+"""
+
+import json
+import time
+from collections.abc import Generator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, replace
+
+from .inference import ChatParams
+from .types import Message, Role, TokenUsage
+
+
+class BudgetExceeded(Exception):
+    """The tool calling loop of `chat_stream` ran out of budget.
+
+    Attributes:
+        reason: Which limit of the `AgentBudget` was reached.
+    """
+
+    def __init__(self, reason: str):
+        super().__init__(f"Agent budget exceeded: {reason}")
+        self.reason = reason
+
+
+@dataclass(frozen=True)
+class AgentBudget:
+    """Limits for the tool calling loop of `Csi.chat_stream`.
+
+    Each turn of the loop sends the whole conversation, including all tool outputs so
+    far, to the model. Without limits, the number of turns and the size of the prompt,
+    and with them latency and cost, are only bounded by the model.
+
+    Once a limit on turns, tokens or time is reached, the model is asked one last time
+    to answer without calling tools, or `BudgetExceeded` is raised if `final_answer` is
+    disabled. Compaction keeps the prompt small by eliding the content of old tool
+    outputs, the most recent ones are kept as they are.
+
+    Attributes:
+        max_turns: Model responses with tool calls, after which the model has to answer.
+        max_tokens: Prompt and completion tokens of all turns, after which the model has
+            to answer.
+        max_seconds: Time since the first turn, after which the model has to answer.
+        compact_above_bytes: Compact the conversation when its content is larger.
+        compact_above_tokens: Compact the conversation when the prompt and completion
+            tokens of the last turn are more.
+        keep_tool_outputs: Number of most recent tool outputs that are never compacted.
+        elided_output_chars: Characters of a compacted tool output that are kept.
+        final_answer: Ask for an answer without tools once a limit is reached, instead
+            of raising `BudgetExceeded`.
+
+    Examples::
+
+        budget = AgentBudget(max_turns=8, max_seconds=60, compact_above_bytes=50_000)
+        response = csi.chat_stream(model, messages, tools=tools, budget=budget)
+    """
+
+    max_turns: int | None = None
+    max_tokens: int | None = None
+    max_seconds: float | None = None
+    compact_above_bytes: int | None = None
+    compact_above_tokens: int | None = None
+    keep_tool_outputs: int = 2
+    elided_output_chars: int = 200
+    final_answer: bool = True
+
+    def __post_init__(self) -> None:
+        for name in (
+            "max_turns",
+            "max_tokens",
+            "max_seconds",
+            "compact_above_bytes",
+            "compact_above_tokens",
+        ):
+            value = getattr(self, name)
+            if value is not None and value <= 0:
+                raise ValueError(f"`{name}` must be positive.")
+        if self.keep_tool_outputs < 0 or self.elided_output_chars < 0:
+            raise ValueError(
+                "`keep_tool_outputs` and `elided_output_chars` must not be negative."
+            )
+
+
+_current_budget: ContextVar[AgentBudget | None] = ContextVar(
+    "current_budget", default=None
+)
+
+
+@contextmanager
+def budget_scope(budget: AgentBudget | None) -> Generator[None, None, None]:
+    """Use the budget for all `chat_stream` calls that do not specify one."""
+    if budget is None:
+        yield
+        return
+    token = _current_budget.set(budget)
+    try:
+        yield
+    finally:
+        _current_budget.reset(token)
+
+
+class AgentRun:
+    """Track one tool calling loop against its budget."""
+
+    def __init__(self, budget: AgentBudget | None = None):
+        self.budget = budget or _current_budget.get() or AgentBudget()
+        self.start = time.monotonic()
+        self.turns = 0
+        self.tokens = 0
+        self.last_usage: TokenUsage | None = None
+        self.final = False
+
+    def record(self, usage: TokenUsage | None) -> None:
+        """Account for a model response that called tools."""
+        if self.final:
+            raise BudgetExceeded("the model called tools in its final answer")
+        self.turns += 1
+        self.last_usage = usage
+        if usage is not None:
+            self.tokens += usage.prompt + usage.completion
+
+    def params(self, params: ChatParams) -> ChatParams:
+        """The parameters of the next turn, without tools if the budget is exhausted."""
+        if (reason := self.exhausted()) is None:
+            return params
+        if not self.budget.final_answer:
+            raise BudgetExceeded(reason)
+        self.final = True
+        return replace(params, tool_choice="none")
+
+    def exhausted(self) -> str | None:
+        """Which limit has been reached, if any."""
+        budget = self.budget
+        if budget.max_turns is not None and self.turns >= budget.max_turns:
+            return f"{self.turns} turns"
+        if budget.max_tokens is not None and self.tokens >= budget.max_tokens:
+            return f"{self.tokens} tokens"
+        if budget.max_seconds is not None:
+            elapsed = time.monotonic() - self.start
+            if elapsed >= budget.max_seconds:
+                return f"{elapsed:.1f} seconds"
+        return None
+
+    def compact(self, messages: list[Message]) -> None:
+        """Elide old tool outputs in place if the conversation is too large."""
+        budget = self.budget
+        usage = self.last_usage
+        over_tokens = (
+            budget.compact_above_tokens is not None
+            and usage is not None
+            and usage.prompt + usage.completion > budget.compact_above_tokens
+        )
+        size = sum(map(_message_bytes, messages))
+        limit = budget.compact_above_bytes
+        if not over_tokens and (limit is None or size <= limit):
+            return
+
+        outputs = [i for i, m in enumerate(messages) if m.role == Role.Tool]
+        old = outputs[: len(outputs) - budget.keep_tool_outputs]
+        for index in old:
+            message = messages[index]
+            content = message.content or ""
+            keep = budget.elided_output_chars
+            if len(content) <= keep:
+                continue
+            elided = f"{content[:keep]}... [elided {len(content) - keep} characters]"
+            messages[index] = replace(message, content=elided)
+            size -= _message_bytes(message) - len(elided.encode())
+            # Without a token threshold, compacting stops once the size is in budget.
+            if not over_tokens and limit is not None and size <= limit:
+                return
+
+
+def _message_bytes(message: Message) -> int:
+    size = len((message.content or "").encode())
+    for tool_call in message.tool_calls or ():
+        size += len(json.dumps(tool_call.arguments))
+    return size
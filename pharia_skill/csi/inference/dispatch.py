@@ -0,0 +1,219 @@
+"""
+Execute the tool calls of a model turn, as done by `chat_stream` with `tools`.
+"""
+
+import json
+import time
+from collections.abc import Awaitable, Callable, Mapping, Sequence
+from contextvars import copy_context
+from typing import TYPE_CHECKING
+
+from .tool import InvokeRequest, ToolError, ToolOutput, ToolResult
+from .types import Message, ToolCall
+
+if TYPE_CHECKING:
+    from concurrent.futures import Future
+
+_Key = tuple[str, str]
+"""Identifies tool calls with the same name and arguments."""
+
+
+class ToolDispatcher:
+    """Invoke the tool calls of each model turn together.
+
+    All tool calls the model requests in one turn are sent as one
+    `invoke_tool_concurrent` batch, so a turn takes as long as its slowest tool instead
+    of the sum of all of them. Calls with the same name and arguments are only invoked
+    once. The tool messages are returned in the order of the tool calls, regardless of
+    the order in which the tools finish.
+
+    Args:
+        timeouts: Seconds to wait for the tools with the given names. A tool that does
+            not respond in time is reported to the model as a `ToolError`. Calls with
+            different timeouts are sent as separate, concurrent batches. Waiting with a
+            timeout requires a thread, which is not available inside the Kernel, so
+            timeouts only apply when developing with the `DevCsi`. A batch that times
+            out keeps running on a daemon thread until it returns, its results are
+            discarded.
+        default_timeout: Timeout of the tools not listed in `timeouts`.
+        cache: Reuse the output of a successful call for identical calls in later
+            turns. The cache lives as long as the dispatcher, which is one
+            `chat_stream` call unless a dispatcher is passed in.
+
+    Examples::
+
+        dispatcher = ToolDispatcher(timeouts={"search_web": 10}, cache=True)
+        response = csi.chat_stream(model, messages, tools=tools, dispatcher=dispatcher)
+    """
+
+    def __init__(
+        self,
+        timeouts: Mapping[str, float] | None = None,
+        default_timeout: float | None = None,
+        cache: bool = False,
+    ):
+        self.timeouts = dict(timeouts or {})
+        if any(t <= 0 for t in self.timeouts.values()) or (
+            default_timeout is not None and default_timeout <= 0
+        ):
+            raise ValueError("Tool timeouts must be positive.")
+        self.default_timeout = default_timeout
+        self.cache = cache
+        self._outputs: dict[_Key, ToolOutput] = {}
+
+    def timeout(self, name: str) -> float | None:
+        """Seconds to wait for the tool with the given name."""
+        return self.timeouts.get(name, self.default_timeout)
+
+    def dispatch(
+        self,
+        invoke: Callable[[Sequence[InvokeRequest]], list[ToolResult]],
+        tool_calls: Sequence[ToolCall],
+    ) -> list[Message]:
+        """Invoke the tool calls of one turn and render the results as tool messages.
+
+        Args:
+            invoke: Invokes a batch of tools, e.g. `csi.invoke_tool_concurrent`.
+            tool_calls: The tool calls requested by the model.
+        """
+        keys, results, batches = self._plan(tool_calls)
+        start = time.monotonic()
+        # Batches with a timeout run in the background, the other one on this thread.
+        started = {
+            timeout: self._start(invoke, list(batch.values()))
+            for timeout, batch in batches.items()
+            if timeout is not None
+        }
+        if (untimed := batches.get(None)) is not None:
+            results.update(zip(untimed, invoke(list(untimed.values()))))
+        for timeout, future in started.items():
+            batch = batches[timeout]
+            results.update(zip(batch, self._wait(future, batch, start, timeout)))
+        return self._messages(tool_calls, keys, results)
+
+    async def dispatch_async(
+        self,
+        invoke: Callable[[Sequence[InvokeRequest]], Awaitable[list[ToolResult]]],
+        tool_calls: Sequence[ToolCall],
+    ) -> list[Message]:
+        """Asynchronous counterpart of `dispatch`."""
+        import asyncio
+
+        keys, results, batches = self._plan(tool_calls)
+        outputs = await asyncio.gather(
+            *(
+                self._invoke_async(invoke, batch, timeout)
+                for timeout, batch in batches.items()
+            )
+        )
+        for batch, batch_outputs in zip(batches.values(), outputs):
+            results.update(zip(batch, batch_outputs))
+        return self._messages(tool_calls, keys, results)
+
+    def _plan(
+        self, tool_calls: Sequence[ToolCall]
+    ) -> tuple[
+        list[_Key],
+        dict[_Key, ToolResult],
+        dict[float | None, dict[_Key, InvokeRequest]],
+    ]:
+        """Find the calls that need to be invoked, grouped by their timeout."""
+        keys = [
+            (call.name, json.dumps(call.arguments, sort_keys=True))
+            for call in tool_calls
+        ]
+        results: dict[_Key, ToolResult] = {}
+        batches: dict[float | None, dict[_Key, InvokeRequest]] = {}
+        for call, key in zip(tool_calls, keys):
+            if key in results or any(key in batch for batch in batches.values()):
+                continue
+            if key in self._outputs:
+                results[key] = self._outputs[key]
+                continue
+            batch = batches.setdefault(self.timeout(call.name), {})
+            batch[key] = InvokeRequest(call.name, call.arguments)
+        return keys, results, batches
+
+    def _messages(
+        self,
+        tool_calls: Sequence[ToolCall],
+        keys: list[_Key],
+        results: dict[_Key, ToolResult],
+    ) -> list[Message]:
+        if self.cache:
+            self._outputs.update(
+                (key, result)
+                for key, result in results.items()
+                if isinstance(result, ToolOutput)
+            )
+        return [
+            _tool_message(results[key], call.id) for call, key in zip(tool_calls, keys)
+        ]
+
+    @staticmethod
+    def _start(
+        invoke: Callable[[Sequence[InvokeRequest]], list[ToolResult]],
+        requests: list[InvokeRequest],
+    ) -> "Future[list[ToolResult]]":
+        """Invoke a batch on a daemon thread.
+
+        A batch that never returns must not keep the process alive, which rules out the
+        worker threads of a `ThreadPoolExecutor`.
+        """
+        import threading
+        from concurrent.futures import Future
+
+        future: Future[list[ToolResult]] = Future()
+
+        def run() -> None:
+            try:
+                future.set_result(invoke(requests))
+            except BaseException as e:
+                future.set_exception(e)
+
+        context = copy_context()
+        threading.Thread(target=context.run, args=(run,), daemon=True).start()
+        return future
+
+    @staticmethod
+    def _wait(
+        future: "Future[list[ToolResult]]",
+        batch: dict[_Key, InvokeRequest],
+        start: float,
+        timeout: float,
+    ) -> list[ToolResult]:
+        """Wait for a batch that has been started at `start` for up to `timeout`."""
+        remaining = start + timeout - time.monotonic()
+        try:
+            return future.result(timeout=max(remaining, 0.0))
+        except TimeoutError:
+            return [_timeout_error(request, timeout) for request in batch.values()]
+
+    @staticmethod
+    async def _invoke_async(
+        invoke: Callable[[Sequence[InvokeRequest]], Awaitable[list[ToolResult]]],
+        batch: dict[_Key, InvokeRequest],
+        timeout: float | None,
+    ) -> list[ToolResult]:
+        import asyncio
+
+        requests = list(batch.values())
+        try:
+            return await asyncio.wait_for(invoke(requests), timeout)
+        except TimeoutError:
+            assert timeout is not None
+            return [_timeout_error(request, timeout) for request in requests]
+
+
+def _timeout_error(request: InvokeRequest, timeout: float) -> ToolError:
+    return ToolError(f"The tool `{request.name}` did not respond within {timeout}s.")
+
+
+def _tool_message(result: ToolResult, tool_call_id: str) -> Message:
+    """Render the result of a tool call, so that the model can react to failures."""
+    if isinstance(result, ToolOutput):
+        return result.as_message(tool_call_id)
+    return Message.tool(
+        f'failed[stderr]:{{"error": {result.message}}}[/stderr]',
+        tool_call_id=tool_call_id,
+    )
@@ -7,7 +7,7 @@ import json
 import typing
 from abc import ABC, abstractmethod
 from collections import deque
-from collections.abc import Generator
+from collections.abc import AsyncGenerator, Callable, Generator
 from dataclasses import field
 from enum import Enum
 from types import TracebackType
@@ -17,6 +17,7 @@ from typing import Any, Literal, Self
 # See the docstring of `csi` module for more information on the why.
 from pydantic.dataclasses import dataclass
 
+from .timing import StreamClock, StreamTimings
 from .types import (
     ChatEvent,
     Distribution,
@@ -30,6 +31,7 @@ from .types import (
     ToolCall,
     ToolCallEvent,
     _merge_tool_call_chunks,
+    _ToolCallAssembler,
 )
 
 # We don't want to make opentelemetry a dependency of the wasm module
@@ -113,7 +115,7 @@ class CompletionParams:
         return attributes
 
 
-@dataclass
+@dataclass(slots=True)
 class CompletionAppend:
     """A chunk of a completion returned by a completion stream.
 
@@ -125,6 +127,14 @@ class CompletionAppend:
     text: str
     logprobs: list[Distribution]
 
+    @classmethod
+    def _trusted(cls, text: str, logprobs: list[Distribution]) -> Self:
+        """Create the event without validation, see `MessageAppend._trusted`."""
+        event = object.__new__(cls)
+        event.text = text
+        event.logprobs = logprobs
+        return event
+
     @classmethod
     def from_dict(cls, body: dict[str, Any]) -> "CompletionAppend":
         return cls(
@@ -152,6 +162,8 @@ class CompletionStreamResponse(ABC):
 
     _finish_reason: FinishReason | None = None
     _usage: TokenUsage | None = None
+    _clock: StreamClock | None = None
+    _cancelled: bool = False
 
     def __enter__(self) -> Self:
         """Enter the context manager."""
@@ -189,17 +201,36 @@ class CompletionStreamResponse(ABC):
 
     def _consume_stream(self) -> None:
         deque(self.stream(), maxlen=0)
+        if self._cancelled:
+            raise RuntimeError("The stream has been cancelled")
         if self._finish_reason is None or self._usage is None:
             raise ValueError("Invalid event stream")
 
-    def stream(self) -> Generator[CompletionAppend, None, None]:
-        """Stream completion chunks."""
+    def stream(
+        self, until: Callable[[CompletionAppend], bool] | None = None
+    ) -> Generator[CompletionAppend, None, None]:
+        """Stream completion chunks.
+
+        Args:
+            until: Cancel the stream after the first chunk for which this returns
+                `True`. The chunk itself is still yielded.
+
+        Example::
+
+            with csi.completion_stream(model, prompt, params) as response:
+                for chunk in response.stream(until=lambda c: "\n\n" in c.text):
+                    writer.append_to_message(chunk.text)
+        """
 
         if self._usage:
             raise RuntimeError("The stream has already been consumed")
-        while (event := self.next()) is not None:
+        while not self._cancelled and (event := self._read()) is not None:
             match event:
                 case CompletionAppend():
+                    if until is not None and until(event):
+                        self.cancel()
+                        yield event
+                        return
                     yield event
                 case FinishReason():
                     self._finish_reason = event
@@ -208,6 +239,55 @@ class CompletionStreamResponse(ABC):
                 case _:
                     raise ValueError("Invalid event")
 
+    def _read(self) -> CompletionEvent | None:
+        """Get the next completion event and record its arrival time.
+
+        Readers of the stream, like `stream()` or `CompletionStreams`, use this instead
+        of `next()`, so that the timings are taken no matter how the stream is read.
+        """
+        if self._cancelled:
+            return None
+        clock = self._clock or self._stream_clock()
+        event = self.next()
+        if event is None:
+            clock.finish()
+        elif isinstance(event, CompletionAppend):
+            clock.token()
+        return event
+
+    def cancel(self) -> None:
+        """Stop generating and release the stream.
+
+        Chunks that have not been read are discarded and the model stops generating.
+        Afterwards, no more events are returned and neither the finish reason nor the
+        usage are available. Cancelling more than once has no effect.
+        """
+        if self._cancelled:
+            return
+        self._cancelled = True
+        self._stream_clock().finish()
+        self.__exit__(None, None, None)
+
+    def timings(self) -> StreamTimings:
+        """Latencies of the stream, measured while it is read.
+
+        The timestamps are taken for the events read via `stream()`, `finish_reason()`,
+        `usage()` or `CompletionStreams`, starting with the first read.
+
+        Example::
+
+            with csi.completion_stream(model, prompt, params) as response:
+                text = "".join(append.text for append in response.stream())
+            if (ttft := response.timings().time_to_first_token) and ttft > 2:
+                logger.warning("Slow first token: %.2fs", ttft)
+        """
+        return self._stream_clock().timings(self._usage)
+
+    def _stream_clock(self) -> StreamClock:
+        if self._clock is None:
+            self._clock = StreamClock()
+        return self._clock
+
 
 class ChatStreamResponse(ABC):
     """Abstract base class for streaming chat responses.
@@ -231,11 +311,13 @@ class ChatStreamResponse(ABC):
     """
 
     role: str
-    buffer: list[ChatEvent]
+    buffer: deque[ChatEvent]
 
     _tool_call_chunks: list[ToolCallEvent] | None = None
     _finish_reason: FinishReason | None = None
     _usage: TokenUsage | None = None
+    _clock: StreamClock | None = None
+    _cancelled: bool = False
 
     def __enter__(self) -> Self:
         """Enter the context manager."""
@@ -259,25 +341,57 @@ class ChatStreamResponse(ABC):
         stream. An example where this is necessary is when checking for a tool call.
         """
         if self.buffer:
-            return self.buffer.pop(0)
+            return self.buffer.popleft()
         else:
-            return self._next()
+            return self._read()
 
     @abstractmethod
     def _next(self) -> ChatEvent | None:
         """Get the next chat event from the stream."""
         ...
 
+    def _read(self) -> ChatEvent | None:
+        """Get the next chat event from the stream and record its arrival time."""
+        if self._cancelled:
+            return None
+        clock = self._clock or self._stream_clock()
+        event = self._next()
+        if event is None:
+            clock.finish()
+        elif isinstance(event, (MessageAppend, Reasoning, ToolCallEvent)):
+            clock.token()
+        return event
+
     def _peek(self) -> ChatEvent | None:
         """Peek at the next chat event without changing the stream."""
-        event = self._next()
+        event = self._read()
         if event is not None:
             self.buffer.append(event)
         return event
 
+    def _stream_clock(self) -> StreamClock:
+        if self._clock is None:
+            self._clock = StreamClock()
+        return self._clock
+
+    def timings(self) -> StreamTimings:
+        """Latencies of the stream, measured while it is read.
+
+        The clock starts when the response is created, which reads the first event of
+        the stream. Message, reasoning and tool call events count as tokens.
+
+        Example::
+
+            with csi.chat_stream(model, messages, params) as response:
+                message = response.consume_message()
+            timings = response.timings()
+            print(timings.time_to_first_token, timings.tokens_per_second)
+        """
+        return self._stream_clock().timings(self._usage)
+
     def __init__(self) -> None:
-        self.buffer = []
-        first_event = self._next()
+        self.buffer = deque()
+        first_event = self._read()
         if not isinstance(first_event, MessageBegin):
             raise ValueError(f"Invalid first stream event: {first_event}")
         self.role = first_event.role
@@ -320,9 +434,62 @@ class ChatStreamResponse(ABC):
         tool_calls = _merge_tool_call_chunks(self._tool_call_chunks)
 
         # If we have found the tool calls, we may exit, allowing the span to be closed.
+        self._read_tool_call_end()
         self.__exit__(None, None, None)
         return tool_calls
 
+    def _read_tool_call_end(self) -> None:
+        """Read the finish reason and usage that follow the tool calls."""
+        while self._usage is None and (event := self.next()) is not None:
+            match event:
+                case FinishReason():
+                    self._finish_reason = event
+                case TokenUsage():
+                    self._usage = event
+
+    def stream_tool_calls(self) -> Generator[ToolCall, None, None]:
+        """Yield the tool calls of the response as soon as their arguments are complete.
+
+        In contrast to `tool_calls()`, a tool call is available as soon as the JSON
+        object of its arguments is closed, while the model may still be generating the
+        following tool calls. This allows to start executing the first tool early.
+
+        If the response is not a tool call, nothing is yielded and the message can be
+        streamed as usual. Once the generator is exhausted, `tool_calls()` returns all
+        tool calls without reading the stream again.
+
+        Example::
+
+            response = csi.chat_stream_step(model, messages, params)
+            futures = [
+                executor.submit(run_tool, tool_call)
+                for tool_call in response.stream_tool_calls()
+            ]
+        """
+        if self._tool_call_chunks is not None:
+            yield from _merge_tool_call_chunks(self._tool_call_chunks)
+            return
+
+        assembler = _ToolCallAssembler()
+        while (event := self.next()) is not None:
+            if not isinstance(event, ToolCallEvent):
+                # Leave the first event of the message to `stream()`.
+                self.buffer.appendleft(event)
+                break
+            if self._tool_call_chunks is None:
+                self._tool_call_chunks = [event]
+            else:
+                self._tool_call_chunks.append(event)
+            yield from assembler.feed(event)
+
+        if self._tool_call_chunks is None:
+            return
+        yield from assembler.finish()
+
+        # If we have found the tool calls, we may exit, allowing the span to be closed.
+        self._read_tool_call_end()
+        self.__exit__(None, None, None)
+
     def finish_reason(self) -> FinishReason:
         """The reason the model finished generating."""
 
@@ -341,15 +508,29 @@ class ChatStreamResponse(ABC):
 
     def _consume_stream(self) -> None:
         deque(self.stream(), maxlen=0)
+        if self._cancelled:
+            raise RuntimeError("The stream has been cancelled")
         if self._finish_reason is None or self._usage is None:
             raise ValueError("Invalid event stream")
 
-    def stream(self) -> Generator[MessageAppend | Reasoning, None, None]:
+    def stream(
+        self, until: Callable[[MessageAppend | Reasoning], bool] | None = None
+    ) -> Generator[MessageAppend | Reasoning, None, None]:
         """Stream the content of the message.
 
         This does not include the role, any tool calls, or the finish reason and usage.
         If you are using the tool calling abilties, you should check via `tool_calls()`
         to see if the model is calling a tool.
+
+        Args:
+            until: Cancel the stream after the first event for which this returns
+                `True`. The event itself is still yielded.
+
+        Example::
+
+            with csi.chat_stream(model, messages, params) as response:
+                for event in response.stream(until=lambda e: "</answer>" in e.content):
+                    writer.append_to_message(event.content)
         """
         if self._usage:
             raise RuntimeError("The stream has already been consumed")
@@ -358,12 +539,31 @@ class ChatStreamResponse(ABC):
                 case MessageBegin():
                     raise ValueError("Invalid event stream")
                 case Reasoning() | MessageAppend():
+                    if until is not None and until(event):
+                        self.cancel()
+                        yield event
+                        return
                     yield event
                 case FinishReason():
                     self._finish_reason = event
                 case TokenUsage():
                     self._usage = event
 
+    def cancel(self) -> None:
+        """Stop generating and release the stream.
+
+        Events that have not been read, including peeked ones, are discarded and the
+        model stops generating. Afterwards, no more events are returned and neither
+        the finish reason nor the usage are available. Cancelling more than once has
+        no effect.
+        """
+        if self._cancelled:
+            return
+        self._cancelled = True
+        self.buffer.clear()
+        self._stream_clock().finish()
+        self.__exit__(None, None, None)
+
     def consume_message(self) -> Message:
         """A helper method that extracts the contained message from a chat stream.
 
@@ -385,16 +585,282 @@ class ChatStreamResponse(ABC):
         Returns:
             The message of the chat request.
         """
-        reasoning_content = ""
-        content = ""
+        reasoning_parts: list[str] = []
+        parts: list[str] = []
         for event in self.stream():
+            if isinstance(event, MessageAppend):
+                parts.append(event.content)
+            else:
+                reasoning_parts.append(event.content)
+        return Message(
+            role=Role(self.role),
+            content="".join(parts),
+            reasoning_content="".join(reasoning_parts),
+        )
+
+
+class AsyncCompletionStreamResponse(ABC):
+    """Abstract base class for streaming completion responses in an asyncio context.
+
+    This is the asynchronous counterpart of :class:`CompletionStreamResponse`, which is
+    returned by :func:`~pharia_skill.AsyncCsi.completion_stream`. Concrete
+    implementations only need to implement the `next()` coroutine.
+    """
+
+    _finish_reason: FinishReason | None = None
+    _usage: TokenUsage | None = None
+
+    async def __aenter__(self) -> Self:
+        """Enter the async context manager."""
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> bool | None:
+        """Exit the async context manager and ensure resources are properly cleaned up."""
+        pass
+
+    @abstractmethod
+    async def next(self) -> CompletionEvent | None:
+        """Get the next completion event."""
+        ...
+
+    async def finish_reason(self) -> FinishReason:
+        """The reason the model finished generating."""
+
+        if self._usage is None:
+            await self._consume_stream()
+        assert self._finish_reason is not None
+        return self._finish_reason
+
+    async def usage(self) -> TokenUsage:
+        """Usage statistics for the completion request."""
+
+        if self._usage is None:
+            await self._consume_stream()
+        assert self._usage is not None
+        return self._usage
+
+    async def _consume_stream(self) -> None:
+        async for _ in self.stream():
+            pass
+        if self._finish_reason is None or self._usage is None:
+            raise ValueError("Invalid event stream")
+
+    async def stream(self) -> AsyncGenerator[CompletionAppend, None]:
+        """Stream completion chunks."""
+
+        if self._usage:
+            raise RuntimeError("The stream has already been consumed")
+        while (event := await self.next()) is not None:
             match event:
-                case Reasoning():
-                    reasoning_content += event.content
-                case MessageAppend():
-                    content += event.content
+                case CompletionAppend():
+                    yield event
+                case FinishReason():
+                    self._finish_reason = event
+                case TokenUsage():
+                    self._usage = event
+                case _:
+                    raise ValueError("Invalid event")
+
+
+class AsyncChatStreamResponse(ABC):
+    """Abstract base class for streaming chat responses in an asyncio context.
+
+    This is the asynchronous counterpart of :class:`ChatStreamResponse`, which is
+    returned by :func:`~pharia_skill.AsyncCsi.chat_stream`. As reading the first event
+    of the stream requires awaiting it, implementations must call `_start()` before
+    handing out the response. Concrete implementations only need to implement the
+    `_next()` coroutine.
+
+    Attributes:
+        role (str, required): The role of the message.
+    """
+
+    role: str
+    buffer: deque[ChatEvent]
+
+    _tool_call_chunks: list[ToolCallEvent] | None = None
+    _finish_reason: FinishReason | None = None
+    _usage: TokenUsage | None = None
+
+    def __init__(self) -> None:
+        self.buffer = deque()
+
+    async def _start(self) -> None:
+        """Read the first event of the stream, which must specify the role."""
+        first_event = await self._next()
+        if not isinstance(first_event, MessageBegin):
+            raise ValueError(f"Invalid first stream event: {first_event}")
+        self.role = first_event.role
+
+    async def __aenter__(self) -> Self:
+        """Enter the async context manager."""
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> bool | None:
+        """Exit the async context manager and ensure resources are properly cleaned up."""
+        pass
+
+    async def next(self) -> ChatEvent | None:
+        """Get the next chat event.
+
+        See :func:`ChatStreamResponse.next` for the role of the internal buffer.
+        """
+        if self.buffer:
+            return self.buffer.popleft()
+        else:
+            return await self._next()
+
+    @abstractmethod
+    async def _next(self) -> ChatEvent | None:
+        """Get the next chat event from the stream."""
+        ...
+
+    async def _peek(self) -> ChatEvent | None:
+        """Peek at the next chat event without changing the stream."""
+        event = await self._next()
+        if event is not None:
+            self.buffer.append(event)
+        return event
+
+    async def tool_calls(self) -> list[ToolCall] | None:
+        """Inspect the stream to find out if the model is calling a tool.
+
+        See :func:`ChatStreamResponse.tool_calls` for details.
+
+        Returns:
+            The tool call if there is one in the request, otherwise `None`.
+        """
+        if self._tool_call_chunks is None:
+            while (event := await self._peek()) is not None:
+                if isinstance(event, ToolCallEvent):
+                    if self._tool_call_chunks is None:
+                        self._tool_call_chunks = [event]
+                    else:
+                        self._tool_call_chunks.append(event)
+                else:
+                    # once we get a non-tool call event, we can stop accumulating
+                    break
+
+        if self._tool_call_chunks is None:
+            return None
+
+        tool_calls = _merge_tool_call_chunks(self._tool_call_chunks)
+
+        # If we have found the tool calls, we may exit, allowing the span to be closed.
+        await self._read_tool_call_end()
+        await self.__aexit__(None, None, None)
+        return tool_calls
+
+    async def _read_tool_call_end(self) -> None:
+        """Read the finish reason and usage that follow the tool calls."""
+        while self._usage is None and (event := await self.next()) is not None:
+            match event:
+                case FinishReason():
+                    self._finish_reason = event
+                case TokenUsage():
+                    self._usage = event
+
+    async def stream_tool_calls(self) -> AsyncGenerator[ToolCall, None]:
+        """Yield the tool calls of the response as soon as their arguments are complete.
+
+        See :func:`ChatStreamResponse.stream_tool_calls` for details.
+        """
+        if self._tool_call_chunks is not None:
+            for tool_call in _merge_tool_call_chunks(self._tool_call_chunks):
+                yield tool_call
+            return
+
+        assembler = _ToolCallAssembler()
+        while (event := await self.next()) is not None:
+            if not isinstance(event, ToolCallEvent):
+                # Leave the first event of the message to `stream()`.
+                self.buffer.appendleft(event)
+                break
+            if self._tool_call_chunks is None:
+                self._tool_call_chunks = [event]
+            else:
+                self._tool_call_chunks.append(event)
+            for tool_call in assembler.feed(event):
+                yield tool_call
+
+        if self._tool_call_chunks is None:
+            return
+        for tool_call in assembler.finish():
+            yield tool_call
+
+        # If we have found the tool calls, we may exit, allowing the span to be closed.
+        await self._read_tool_call_end()
+        await self.__aexit__(None, None, None)
+
+    async def finish_reason(self) -> FinishReason:
+        """The reason the model finished generating."""
+
+        if self._usage is None:
+            await self._consume_stream()
+        assert self._finish_reason is not None
+        return self._finish_reason
+
+    async def usage(self) -> TokenUsage:
+        """Usage statistics for the chat request."""
+
+        if self._usage is None:
+            await self._consume_stream()
+        assert self._usage is not None
+        return self._usage
+
+    async def _consume_stream(self) -> None:
+        async for _ in self.stream():
+            pass
+        if self._finish_reason is None or self._usage is None:
+            raise ValueError("Invalid event stream")
+
+    async def stream(self) -> AsyncGenerator[MessageAppend | Reasoning, None]:
+        """Stream the content of the message.
+
+        This does not include the role, any tool calls, or the finish reason and usage.
+        """
+        if self._usage:
+            raise RuntimeError("The stream has already been consumed")
+        while (event := await self.next()) is not None:
+            match event:
+                case MessageBegin():
+                    raise ValueError("Invalid event stream")
+                case Reasoning() | MessageAppend():
+                    yield event
+                case FinishReason():
+                    self._finish_reason = event
+                case TokenUsage():
+                    self._usage = event
+
+    async def consume_message(self) -> Message:
+        """A helper method that extracts the contained message from a chat stream.
+
+        See :func:`ChatStreamResponse.consume_message` for details.
+
+        Returns:
+            The message of the chat request.
+        """
+        reasoning_parts: list[str] = []
+        parts: list[str] = []
+        async for event in self.stream():
+            if isinstance(event, MessageAppend):
+                parts.append(event.content)
+            else:
+                reasoning_parts.append(event.content)
         return Message(
-            role=Role(self.role), content=content, reasoning_content=reasoning_content
+            role=Role(self.role),
+            content="".join(parts),
+            reasoning_content="".join(reasoning_parts),
         )
 
 
@@ -425,17 +891,25 @@ class Completion:
             usage=body["usage"],
         )
 
-    def as_gen_ai_otel_attributes(self) -> dict[str, "AttributeValue"]:
+    def as_gen_ai_otel_attributes(
+        self, include_content: bool = True
+    ) -> dict[str, "AttributeValue"]:
         """The attributes specified by the GenAI Otel Semantic convention.
 
         See <https://opentelemetry.io/docs/specs/semconv/registry/attributes/gen-ai/#genai-attributes>
         for more details.
+
+        Parameters:
+            include_content (bool, optional, Default True):
+                Whether to include the completed text.
         """
-        return {
-            "gen_ai.content.completion": self.text,
+        attributes: dict[str, "AttributeValue"] = {
             **self.finish_reason.as_gen_ai_otel_attributes(),
             **self.usage.as_gen_ai_otel_attributes(),
         }
+        if include_content:
+            attributes["gen_ai.content.completion"] = self.text
+        return attributes
 
 
 class ReasoningEffort(str, Enum):
@@ -467,18 +941,26 @@ class CompletionRequest:
     prompt: str
     params: CompletionParams = field(default_factory=CompletionParams)
 
-    def as_gen_ai_otel_attributes(self) -> dict[str, "AttributeValue"]:
+    def as_gen_ai_otel_attributes(
+        self, include_content: bool = True
+    ) -> dict[str, "AttributeValue"]:
         """The attributes specified by the GenAI Otel Semantic convention.
 
         See <https://opentelemetry.io/docs/specs/semconv/registry/attributes/gen-ai/#genai-attributes>
         for more details.
+
+        Parameters:
+            include_content (bool, optional, Default True):
+                Whether to include the prompt.
         """
-        return {
+        attributes: dict[str, "AttributeValue"] = {
             "gen_ai.operation.name": "text_completion",
             "gen_ai.request.model": self.model,
-            "gen_ai.content.prompt": self.prompt,
             **self.params.as_gen_ai_otel_attributes(),
         }
+        if include_content:
+            attributes["gen_ai.content.prompt"] = self.prompt
+        return attributes
 
 
 @dataclass
@@ -613,7 +1095,9 @@ class ChatRequest:
     messages: list[Message]
     params: ChatParams = field(default_factory=ChatParams)
 
-    def as_gen_ai_otel_attributes(self) -> dict[str, "AttributeValue"]:
+    def as_gen_ai_otel_attributes(
+        self, include_content: bool = True
+    ) -> dict[str, "AttributeValue"]:
         """The attributes specified by the GenAI Otel Semantic convention.
 
         See <https://opentelemetry.io/docs/specs/semconv/registry/attributes/gen-ai/#genai-attributes>
@@ -621,15 +1105,22 @@ class ChatRequest:
 
         Note that the list of attributes specified here is currently not complete, as we
         are still in exploring the conventions.
+
+        Parameters:
+            include_content (bool, optional, Default True):
+                Whether to include the input messages. Serializing them can be
+                expensive for long conversations.
         """
-        return {
+        attributes: dict[str, "AttributeValue"] = {
             "gen_ai.operation.name": "chat",
             "gen_ai.request.model": self.model,
-            "gen_ai.input.messages": json.dumps(
-                [m.as_gen_ai_otel_attributes() for m in self.messages]
-            ),
             **self.params.as_gen_ai_otel_attributes(),
         }
+        if include_content:
+            attributes["gen_ai.input.messages"] = json.dumps(
+                [m.as_gen_ai_otel_attributes() for m in self.messages]
+            )
+        return attributes
 
 
 @dataclass
@@ -656,15 +1147,24 @@ class ChatResponse:
         usage = TokenUsage(body["usage"]["prompt"], body["usage"]["completion"])
         return ChatResponse(message, finish_reason, logprobs, usage)
 
-    def as_gen_ai_otel_attributes(self) -> dict[str, "AttributeValue"]:
+    def as_gen_ai_otel_attributes(
+        self, include_content: bool = True
+    ) -> dict[str, "AttributeValue"]:
         """The attributes specified by the GenAI Otel Semantic convention.
 
         See <https://opentelemetry.io/docs/specs/semconv/registry/attributes/gen-ai/#genai-attributes>
         for more details.
+
+        Parameters:
+            include_content (bool, optional, Default True):
+                Whether to include the output message.
         """
-        messages = json.dumps([self.message.as_gen_ai_otel_attributes()])
-        return {
-            "gen_ai.output.messages": messages,
+        attributes: dict[str, "AttributeValue"] = {
             **self.finish_reason.as_gen_ai_otel_attributes(),
             **self.usage.as_gen_ai_otel_attributes(),
         }
+        if include_content:
+            attributes["gen_ai.output.messages"] = json.dumps(
+                [self.message.as_gen_ai_otel_attributes()]
+            )
+        return attributes
@@ -0,0 +1,215 @@
+"""
+Consume multiple streams at once, as returned by the `*_stream_concurrent` methods.
+"""
+
+from abc import ABC, abstractmethod
+from collections.abc import Callable, Generator, Iterator, Sequence
+from contextvars import copy_context
+from types import TracebackType
+from typing import Generic, Self, TypeVar
+
+from .inference import (
+    ChatStreamResponse,
+    CompletionEvent,
+    CompletionStreamResponse,
+)
+from .types import ChatEvent, FinishReason, TokenUsage
+
+Response = TypeVar("Response", ChatStreamResponse, CompletionStreamResponse)
+Event = TypeVar("Event", ChatEvent, CompletionEvent)
+T = TypeVar("T")
+Item = TypeVar("Item")
+
+
+class MultiplexedStream(ABC, Generic[Response, Event]):
+    """Interleaved events of multiple stream responses.
+
+    Iterating yields `(index, event)` tuples, where `index` is the position of the
+    request the event belongs to. Events of one stream keep their order, while events
+    of different streams are interleaved. The finish reason and the usage of each stream
+    are available from `responses` once the stream has been consumed.
+
+    Which stream an event is taken from next depends on the `Csi`. The default is to
+    take one event from each unfinished stream in turn. The `DevCsi` reads the streams
+    on parallel connections and yields the events in the order they arrive.
+
+    For chat streams, the `MessageBegin` event has already been read when the stream is
+    created, the role is available as `responses[index].role`.
+
+    Examples::
+
+        requests = [ChatRequest(model, [Message.user(q)], params) for q in questions]
+        with csi.chat_stream_concurrent(requests) as streams:
+            for index, event in streams:
+                if isinstance(event, MessageAppend):
+                    writer.append_to_message(f"[{index}] {event.content}")
+            usages = [response.usage() for response in streams.responses]
+    """
+
+    def __init__(
+        self,
+        responses: Sequence[Response],
+        events: Iterator[tuple[int, Event | None]] | None = None,
+    ):
+        """Multiplex the responses.
+
+        Args:
+            responses: The stream responses in the order of their requests.
+            events: The events of all responses, tagged with their index. A `None`
+                event signals the end of a stream. By default, the responses are read
+                in turn on the calling thread.
+        """
+        self.responses: list[Response] = list(responses)
+        self._finished: set[int] = set()
+        self._events: Iterator[tuple[int, Event | None]] = (
+            events if events is not None else self._round_robin()
+        )
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        self.close()
+        for response in self.responses:
+            response.__exit__(exc_type, exc_value, traceback)
+
+    def __iter__(self) -> Iterator[tuple[int, Event]]:
+        for index, event in self._events:
+            response = self.responses[index]
+            match event:
+                case None:
+                    self._finished.add(index)
+                    continue
+                case FinishReason():
+                    response._finish_reason = event
+                case TokenUsage():
+                    response._usage = event
+            yield index, event
+
+    def close(self) -> None:
+        """Stop reading from the streams and cancel those that have not finished yet.
+
+        Cancelling stops the model from generating the rest of the response, see
+        `ChatStreamResponse.cancel`.
+        """
+        close = getattr(self._events, "close", None)
+        if close is not None:
+            close()
+        for index, response in enumerate(self.responses):
+            if index not in self._finished:
+                response.cancel()
+
+    def _round_robin(self) -> Iterator[tuple[int, Event | None]]:
+        active = list(range(len(self.responses)))
+        while active:
+            for index in list(active):
+                event = self._next(index)
+                if event is None:
+                    active.remove(index)
+                yield index, event
+
+    @abstractmethod
+    def _next(self, index: int) -> Event | None:
+        """Read the next event of the stream at `index`."""
+        ...
+
+
+class ChatStreams(MultiplexedStream[ChatStreamResponse, ChatEvent]):
+    """Interleaved events of concurrent chat streams."""
+
+    def _next(self, index: int) -> ChatEvent | None:
+        return self.responses[index].next()
+
+
+class CompletionStreams(MultiplexedStream[CompletionStreamResponse, CompletionEvent]):
+    """Interleaved events of concurrent completion streams."""
+
+    def _next(self, index: int) -> CompletionEvent | None:
+        return self.responses[index]._read()
+
+
+def _open_streams(
+    start: Callable[[T], Response], requests: Sequence[T], max_workers: int
+) -> list[Response]:
+    """Open one stream per request, with up to `max_workers` in parallel.
+
+    Opening a stream waits for its first event, so opening them one after another
+    would add up the time to first token of all requests. Threads are not available
+    inside the Kernel, so this is only used by the `Csi` implementations for testing.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    if not requests:
+        return []
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(requests))) as executor:
+        futures = [
+            executor.submit(copy_context().run, start, request) for request in requests
+        ]
+    responses = [f.result() for f in futures if f.exception() is None]
+    if len(responses) < len(futures):
+        for response in responses:
+            response.__exit__(None, None, None)
+        for future in futures:
+            future.result()
+    return responses
+
+
+def _interleave(
+    streams: Sequence[Response], read: Callable[[Response], Item | None]
+) -> Generator[tuple[int, Item | None], None, None]:
+    """Read the streams on one thread each and yield their events as they arrive.
+
+    The next event of a stream is taken with `read`, which records its arrival for the
+    timings of the stream.
+
+    Each stream ends with a `None` event. Errors of a stream are raised once they are
+    reached. If the generator is closed early, the streams that have not ended are
+    cancelled. A stream is only cancelled once its thread has returned from reading,
+    as a stream must not be read and released at the same time.
+    """
+    import queue
+    import threading
+
+    events: queue.Queue[tuple[int, Item | None | Exception]] = queue.Queue()
+    stop = threading.Event()
+    reading = [threading.Lock() for _ in streams]
+    ended: set[int] = set()
+
+    def consume(index: int, stream: Response) -> None:
+        try:
+            while True:
+                with reading[index]:
+                    if stop.is_set():
+                        return
+                    event = read(stream)
+                events.put((index, event))
+                if event is None:
+                    return
+        except Exception as e:
+            events.put((index, e))
+
+    for index, stream in enumerate(streams):
+        context = copy_context()
+        threading.Thread(
+            target=context.run, args=(consume, index, stream), daemon=True
+        ).start()
+    try:
+        while len(ended) < len(streams):
+            index, event = events.get()
+            if isinstance(event, Exception):
+                ended.add(index)
+                raise event
+            if event is None:
+                ended.add(index)
+            yield index, event
+    finally:
+        stop.set()
+        for index, stream in enumerate(streams):
+            if index not in ended:
+                with reading[index]:
+                    stream.cancel()
@@ -0,0 +1,123 @@
+"""
+Cache the tools of a namespace, so that they are not listed again for every chat.
+"""
+
+import logging
+import threading
+import time
+from collections.abc import Callable, Sequence
+from contextvars import copy_context
+
+from .inference import Tool
+
+logger = logging.getLogger(__name__)
+
+
+class ToolRegistry:
+    """The tools of a namespace, indexed by name and refreshed after a time to live.
+
+    `Csi.chat_stream` looks up the schemas of the requested tools here instead of
+    listing all tools of the namespace for each call. The tools are listed once and
+    kept, including their parsed parameter schemas, until the time to live expires or
+    the registry is invalidated.
+
+    Args:
+        list_tools: Lists the tools of the namespace, e.g. `csi.list_tools`.
+        ttl: Seconds after which the tools are listed again. `None` keeps them until
+            the registry is invalidated.
+        background: Whether `prefetch` lists the tools on a separate thread. Threads
+            are not available inside the Kernel, where prefetching lists the tools on
+            the calling thread.
+
+    Examples::
+
+        registry = csi.tool_registry()
+        registry.prefetch()
+        documents = csi.search(index, query)  # tools are listed meanwhile
+        response = csi.chat_stream(model, messages, tools=["search_web"])
+    """
+
+    def __init__(
+        self,
+        list_tools: Callable[[], list[Tool]],
+        ttl: float | None = 300.0,
+        background: bool = False,
+    ):
+        if ttl is not None and ttl <= 0:
+            raise ValueError("`ttl` must be positive.")
+        self.list_tools = list_tools
+        self.ttl = ttl
+        self.background = background
+        self._index: dict[str, Tool] | None = None
+        self._expires: float | None = None
+        # Held while the tools are listed, so concurrent lookups wait for one listing.
+        self._lock = threading.Lock()
+        self._prefetch: threading.Thread | None = None
+
+    def tools(self) -> dict[str, Tool]:
+        """All tools of the namespace by name, listed again if they have expired."""
+        if (index := self._valid_index()) is not None:
+            return index
+        with self._lock:
+            if (index := self._valid_index()) is not None:
+                return index
+            index = {tool.name: tool for tool in self.list_tools()}
+            self._index = index
+            self._expires = None if self.ttl is None else time.monotonic() + self.ttl
+            return index
+
+    def get(self, name: str) -> Tool | None:
+        """The tool with the given name, if the namespace has one."""
+        return self.tools().get(name)
+
+    def select(self, names: Sequence[str]) -> list[Tool]:
+        """The tools with the given names, in the order they are listed.
+
+        Raises:
+            ValueError: If one of the tools is not configured in the namespace.
+        """
+        index = self.tools()
+        for name in names:
+            if name not in index:
+                raise ValueError(
+                    f"Tool {name} required by Skill but not configured in namespace."
+                )
+        wanted = set(names)
+        return [tool for name, tool in index.items() if name in wanted]
+
+    def invalidate(self) -> None:
+        """Forget the tools, so that they are listed again on the next lookup."""
+        with self._lock:
+            self._index = None
+            self._expires = None
+
+    def prefetch(self) -> None:
+        """List the tools ahead of the first lookup, unless they are still valid."""
+        if self._valid_index() is not None:
+            return
+        if not self.background:
+            self.tools()
+            return
+        if self._prefetch is not None and self._prefetch.is_alive():
+            return
+        # Copy the context, so that a traced listing belongs to the current trace.
+        self._prefetch = threading.Thread(
+            target=copy_context().run,
+            args=(self._prefetch_quietly,),
+            name="pharia-skill-tool-prefetch",
+            daemon=True,
+        )
+        self._prefetch.start()
+
+    def _prefetch_quietly(self) -> None:
+        # A failed prefetch is retried, and raised, by the next lookup.
+        try:
+            self.tools()
+        except Exception:
+            logger.exception("Prefetching the tools failed.")
+
+    def _valid_index(self) -> dict[str, Tool] | None:
+        index, expires = self._index, self._expires
+        if index is None or (expires is not None and time.monotonic() >= expires):
+            return None
+        return index
@@ -0,0 +1,83 @@
+"""
+Detect the end of a JSON object while its text is still being streamed.
+
+Models generate the arguments of a tool call as a sequence of small text fragments.
+To act on a tool call as soon as its arguments are complete, the fragments are scanned
+as they arrive. Only the characters that change the nesting are inspected, the text is
+decoded once when the object is complete.
+"""
+
+import json
+import re
+from typing import Any
+
+_STRUCTURAL = re.compile(r'[{}\[\]"\\]')
+"""Characters that open or close objects, arrays, strings and escape sequences."""
+
+
+class JsonObjectScanner:
+    """Collect the fragments of a streamed JSON value and tell when it is complete.
+
+    The value is complete once the object or array it starts with is closed. Anything
+    but whitespace after that is an error, just like for `json.loads`.
+
+    Examples::
+
+        scanner = JsonObjectScanner()
+        scanner.feed('{"city": "Ber')  # False
+        scanner.feed('lin"}')  # True
+        scanner.value()  # {"city": "Berlin"}
+    """
+
+    __slots__ = ("_parts", "_depth", "_in_string", "_escaped", "complete")
+
+    def __init__(self) -> None:
+        self._parts: list[str] = []
+        self._depth = 0
+        self._in_string = False
+        # The previous fragment ended in a backslash inside a string.
+        self._escaped = False
+        self.complete = False
+
+    def feed(self, fragment: str) -> bool:
+        """Add the next fragment and tell if the value is complete."""
+        if self.complete:
+            if fragment.strip():
+                raise ValueError(f"Unexpected data after JSON value: {fragment!r}")
+            return True
+        self._parts.append(fragment)
+        skip = 0 if self._escaped else -1
+        depth, in_string = self._depth, self._in_string
+        for match in _STRUCTURAL.finditer(fragment):
+            position = match.start()
+            if position == skip:
+                continue
+            char = match.group()
+            if in_string:
+                if char == '"':
+                    in_string = False
+                elif char == "\\":
+                    skip = position + 1
+            elif char == '"':
+                in_string = True
+            elif char in "{[":
+                depth += 1
+            elif char in "}]":
+                depth -= 1
+                if depth == 0:
+                    rest = fragment[position + 1 :]
+                    if rest.strip():
+                        raise ValueError(f"Unexpected data after JSON value: {rest!r}")
+                    self.complete = True
+                    break
+        self._depth, self._in_string = depth, in_string
+        self._escaped = skip == len(fragment)
+        return self.complete
+
+    def text(self) -> str:
+        """The text received so far."""
+        return "".join(self._parts)
+
+    def value(self) -> Any:
+        """Decode the text received so far."""
+        return json.loads(self.text())
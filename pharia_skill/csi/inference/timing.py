@@ -0,0 +1,111 @@
+"""
+Client side latencies of chat and completion streams.
+
+The timestamps are taken with a monotonic clock while the events are read, which costs
+one clock read per event. This allows Skills to report or alert on the time to first
+token and the token rate of the models they use.
+"""
+
+import math
+import time
+
+from pydantic.dataclasses import dataclass
+
+from .types import TokenUsage
+
+
+@dataclass(frozen=True)
+class LatencyStats:
+    """Distribution of the gaps between consecutive tokens, in seconds.
+
+    Attributes:
+        p50 (float, required): Median gap.
+        p95 (float, required): 95th percentile of the gaps.
+        max (float, required): Longest gap.
+    """
+
+    p50: float
+    p95: float
+    max: float
+
+
+@dataclass(frozen=True)
+class StreamTimings:
+    """Latencies of a stream as observed by the Skill, in seconds.
+
+    All durations are measured from the moment the Skill started reading the stream.
+    Values that can not be determined yet, e.g. because no token has been received or
+    the stream has not been consumed, are `None`.
+
+    Attributes:
+        time_to_first_token (float, optional): Time until the first content event.
+        inter_token_latency (LatencyStats, optional): Gaps between content events.
+        duration (float, optional): Time until the end of the stream.
+        tokens_per_second (float, optional): Completion tokens reported in the usage
+            of the stream, divided by the time between the first token and the end of
+            the stream.
+    """
+
+    time_to_first_token: float | None
+    inter_token_latency: LatencyStats | None
+    duration: float | None
+    tokens_per_second: float | None
+
+
+class StreamClock:
+    """Collect the timestamps of a stream."""
+
+    __slots__ = ("_start", "_first", "_last", "_end", "_gaps")
+
+    def __init__(self) -> None:
+        """Start the clock."""
+        self._start = time.monotonic()
+        self._first: float | None = None
+        self._last: float | None = None
+        self._end: float | None = None
+        self._gaps: list[float] = []
+
+    def token(self) -> None:
+        """Mark the arrival of a content event."""
+        now = time.monotonic()
+        if self._last is None:
+            self._first = now
+        else:
+            self._gaps.append(now - self._last)
+        self._last = now
+
+    def finish(self) -> None:
+        """Mark the end of the stream, only the first call has an effect."""
+        if self._end is None:
+            self._end = time.monotonic()
+
+    def timings(self, usage: TokenUsage | None) -> StreamTimings:
+        start, first, end = self._start, self._first, self._end
+        tokens_per_second = None
+        if usage is not None and first is not None and end is not None and end > first:
+            tokens_per_second = usage.completion / (end - first)
+        return StreamTimings(
+            time_to_first_token=None
+            if start is None or first is None
+            else first - start,
+            inter_token_latency=_latency_stats(self._gaps),
+            duration=None if start is None or end is None else end - start,
+            tokens_per_second=tokens_per_second,
+        )
+
+
+def _latency_stats(gaps: list[float]) -> LatencyStats | None:
+    if not gaps:
+        return None
+    ordered = sorted(gaps)
+    return LatencyStats(
+        p50=_percentile(ordered, 0.5),
+        p95=_percentile(ordered, 0.95),
+        max=ordered[-1],
+    )
+
+
+def _percentile(ordered: list[float], share: float) -> float:
+    """Nearest-rank percentile of sorted values."""
+    rank = max(1, math.ceil(share * len(ordered)))
+    return ordered[rank - 1]
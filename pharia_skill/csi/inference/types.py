@@ -7,6 +7,8 @@ from pydantic import BeforeValidator, field_serializer, field_validator
 from pydantic.dataclasses import dataclass
 from pydantic.types import JsonValue
 
+from .streaming_json import JsonObjectScanner
+
 # We don't want to make opentelemetry a dependency of the wasm module
 if typing.TYPE_CHECKING:
     from opentelemetry.util.types import AttributeValue
@@ -63,7 +65,10 @@ class Distribution:
         )
 
 
-@dataclass
+# Stream events are created once per token. They use slots and offer a `_trusted`
+# constructor that skips the validation for callers that already guarantee the types,
+# e.g. because the values come from the typed WIT bindings.
+@dataclass(slots=True)
 class MessageAppend:
     """A chunk of a message generated by the model.
 
@@ -73,13 +78,25 @@ class MessageAppend:
 
     content: str
 
+    @classmethod
+    def _trusted(cls, content: str) -> Self:
+        event = object.__new__(cls)
+        event.content = content
+        return event
 
-@dataclass
+
+@dataclass(slots=True)
 class Reasoning:
     """A chunk of a reasoning trace generated by the model."""
 
     content: str
 
+    @classmethod
+    def _trusted(cls, content: str) -> Self:
+        event = object.__new__(cls)
+        event.content = content
+        return event
+
 
 class Role(str, Enum):
     """A role used for a message in a chat."""
@@ -91,18 +108,31 @@ class Role(str, Enum):
     Tool = "tool"
 
 
-@dataclass
+@dataclass(slots=True)
 class MessageBegin:
     role: str
 
+    @classmethod
+    def _trusted(cls, role: str) -> Self:
+        event = object.__new__(cls)
+        event.role = role
+        return event
 
-@dataclass
+
+@dataclass(slots=True)
 class TokenUsage:
     """Usage statistics for the completion request."""
 
     prompt: int
     completion: int
 
+    @classmethod
+    def _trusted(cls, prompt: int, completion: int) -> Self:
+        event = object.__new__(cls)
+        event.prompt = prompt
+        event.completion = completion
+        return event
+
     def as_gen_ai_otel_attributes(self) -> dict[str, int]:
         """The attributes specified by the GenAI Otel Semantic convention.
 
@@ -187,58 +217,86 @@ class ToolCallEvent:
     tool_calls: list[ToolCallChunk]
 
 
-def _merge_tool_call_chunks(events: list[ToolCallEvent]) -> list[ToolCall]:
-    """Merge a list of tool call chunks to a list of tool calls.
+class _InProgressToolCall:
+    """A tool call whose chunks are still being received."""
 
-    Each `ToolCallChunks` contains parts of one or multiple tool calls. If the models
-    response contains multiple tool calls, the first `ToolCallChunks` could e.g. contain
-    the name of the first and second tool call, while the second `ToolCallChunks` could
-    contain the arguments of the first and second tool call.
+    __slots__ = ("id", "name", "arguments", "tool_call")
 
-    This function merges the chunks into a list of tool calls.
-    """
+    def __init__(self, chunk: ToolCallChunk):
+        assert chunk.id is not None, "expected first chunk to have an id"
+        assert chunk.name is not None, "expected first chunk to have a name"
+        self.id = chunk.id
+        self.name = chunk.name
+        self.arguments = JsonObjectScanner()
+        self.tool_call: ToolCall | None = None
+        if chunk.arguments:
+            self.arguments.feed(chunk.arguments)
+
+    def extend(self, chunk: ToolCallChunk) -> None:
+        if chunk.name is not None:
+            self.name += chunk.name
+        if chunk.arguments:
+            self.arguments.feed(chunk.arguments)
 
-    @dataclass
-    class InProgressToolCall:
-        id: str
-        name: str
-        arguments: str
-
-        @classmethod
-        def from_chunk(cls, chunk: ToolCallChunk) -> Self:
-            assert chunk.id is not None, "expected first chunk to have an id"
-            assert chunk.name is not None, "expected first chunk to have a name"
-
-            return cls(
-                id=chunk.id,
-                name=chunk.name,
-                arguments=chunk.arguments or "",
+    def finish(self) -> ToolCall:
+        if self.tool_call is None:
+            self.tool_call = ToolCall(
+                id=self.id, name=self.name, arguments=self.arguments.value()
             )
+        return self.tool_call
 
-        def extend(self, chunk: ToolCallChunk) -> None:
-            if chunk.name is not None:
-                self.name += chunk.name
-            if chunk.arguments is not None:
-                self.arguments += chunk.arguments
 
-        def as_tool_call(self) -> ToolCall:
-            return ToolCall(
-                id=self.id, name=self.name, arguments=json.loads(self.arguments)
-            )
+class _ToolCallAssembler:
+    """Merge streamed tool call chunks and complete each call as early as possible.
 
-    if not events:
-        return []
+    A tool call is complete as soon as the JSON object of its arguments is closed, even
+    if the chunks of later tool calls are still to come.
+    """
 
-    in_progress: dict[int, InProgressToolCall] = {}
-    for event in events:
+    def __init__(self) -> None:
+        self._in_progress: dict[int, _InProgressToolCall] = {}
+
+    def feed(self, event: ToolCallEvent) -> list[ToolCall]:
+        """Add the chunks of an event and return the tool calls they complete."""
+        completed: list[ToolCall] = []
         for chunk in event.tool_calls:
             is_first_chunk = chunk.id is not None and chunk.name is not None
             if is_first_chunk:
-                in_progress[chunk.index] = InProgressToolCall.from_chunk(chunk)
+                call = self._in_progress[chunk.index] = _InProgressToolCall(chunk)
             else:
-                in_progress[chunk.index].extend(chunk)
+                call = self._in_progress[chunk.index]
+                call.extend(chunk)
+            if call.tool_call is None and call.arguments.complete:
+                completed.append(call.finish())
+        return completed
+
+    def finish(self) -> list[ToolCall]:
+        """Complete the remaining tool calls, once no more chunks are coming."""
+        return [
+            call.finish()
+            for call in self._in_progress.values()
+            if call.tool_call is None
+        ]
+
+    def tool_calls(self) -> list[ToolCall]:
+        """All tool calls in the order of their first chunk."""
+        return [call.finish() for call in self._in_progress.values()]
+
+
+def _merge_tool_call_chunks(events: list[ToolCallEvent]) -> list[ToolCall]:
+    """Merge a list of tool call chunks to a list of tool calls.
+
+    Each `ToolCallChunks` contains parts of one or multiple tool calls. If the models
+    response contains multiple tool calls, the first `ToolCallChunks` could e.g. contain
+    the name of the first and second tool call, while the second `ToolCallChunks` could
+    contain the arguments of the first and second tool call.
 
-    return list(map(InProgressToolCall.as_tool_call, in_progress.values()))
+    This function merges the chunks into a list of tool calls.
+    """
+    assembler = _ToolCallAssembler()
+    for event in events:
+        assembler.feed(event)
+    return assembler.tool_calls()
 
 
 ChatEvent = (
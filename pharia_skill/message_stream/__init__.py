@@ -1,21 +1,25 @@
 from .agent import AgentInput, AgentMessage, agent
 from .decorator import message_stream
 from .writer import (
+    FlushPolicy,
     MessageAppend,
     MessageBegin,
     MessageEnd,
     MessageItem,
     MessageWriter,
+    WriterMetrics,
 )
 
 __all__ = [
     "agent",
     "AgentInput",
     "AgentMessage",
+    "FlushPolicy",
     "message_stream",
     "MessageAppend",
     "MessageBegin",
     "MessageEnd",
     "MessageItem",
     "MessageWriter",
+    "WriterMetrics",
 ]
@@ -1,11 +1,11 @@
-from typing import Callable, Literal
+from typing import Callable, Literal, overload
 
 from pydantic import BaseModel
 
-from pharia_skill.csi import Csi, Message
+from pharia_skill.csi import AgentBudget, Csi, Message
 
-from .decorator import message_stream
-from .writer import MessageWriter
+from .decorator import _message_stream
+from .writer import FlushPolicy, MessageWriter
 
 
 class AgentMessage(BaseModel):
@@ -30,7 +30,25 @@ class AgentInput(BaseModel):
 AgentSkill = Callable[[Csi, MessageWriter[None], AgentInput], None]
 
 
-def agent(func: AgentSkill) -> AgentSkill:
+@overload
+def agent(func: AgentSkill) -> AgentSkill: ...
+
+
+@overload
+def agent(
+    func: None = None,
+    *,
+    budget: AgentBudget | None = None,
+    flush: FlushPolicy | None = None,
+) -> Callable[[AgentSkill], AgentSkill]: ...
+
+
+def agent(
+    func: AgentSkill | None = None,
+    *,
+    budget: AgentBudget | None = None,
+    flush: FlushPolicy | None = None,
+) -> AgentSkill | Callable[[AgentSkill], AgentSkill]:
     """Define agents that can be deployed on PhariaEngine.
 
     While the `message_stream` and `skill` decorator leave the developer some room to
@@ -46,5 +64,18 @@ def agent(func: AgentSkill) -> AgentSkill:
     where the agent responds quickly with a message, without creating a task. A2A
     supports both streaming and non-streaming responses, but we'll start with only
     streaming ones.
+
+    Agents typically call `chat_stream` with tools in a loop. A `budget` limits the
+    turns, tokens and time of these loops and the size of their conversations, for all
+    `chat_stream` calls of the agent that do not pass their own budget. A `flush`
+    policy merges the streamed text chunks, see `message_stream`.
+
+    Example::
+
+        @agent(budget=AgentBudget(max_turns=8, compact_above_bytes=50_000))
+        def research(csi: Csi, writer: MessageWriter[None], input: AgentInput) -> None:
+            ...
     """
-    return message_stream(func)
+    if func is None:
+        return lambda func: _message_stream(func, budget, flush)
+    return _message_stream(func, budget, flush)
@@ -1,18 +1,43 @@
 import inspect
 import traceback
-from typing import Callable, Type, TypeVar
+from typing import Callable, Type, TypeVar, overload
 
 from pydantic import BaseModel
 
-from pharia_skill import Csi
-from pharia_skill.message_stream.writer import MessageWriter, Payload
+from pharia_skill import AgentBudget, Csi
+from pharia_skill.csi.inference.budget import budget_scope
+from pharia_skill.message_stream.writer import FlushPolicy, MessageWriter, Payload
 
 UserInput = TypeVar("UserInput", bound=BaseModel)
 
+MessageStreamSkill = Callable[[Csi, MessageWriter[Payload], UserInput], None]
+
+
+@overload
+def message_stream(
+    func: MessageStreamSkill[Payload, UserInput],
+) -> MessageStreamSkill[Payload, UserInput]: ...
+
+
+@overload
+def message_stream(
+    func: None = None, *, flush: FlushPolicy | None = None
+) -> Callable[
+    [MessageStreamSkill[Payload, UserInput]], MessageStreamSkill[Payload, UserInput]
+]: ...
+
 
 def message_stream(
-    func: Callable[[Csi, MessageWriter[Payload], UserInput], None],
-) -> Callable[[Csi, MessageWriter[Payload], UserInput], None]:
+    func: MessageStreamSkill[Payload, UserInput] | None = None,
+    *,
+    flush: FlushPolicy | None = None,
+) -> (
+    MessageStreamSkill[Payload, UserInput]
+    | Callable[
+        [MessageStreamSkill[Payload, UserInput]],
+        MessageStreamSkill[Payload, UserInput],
+    ]
+):
     """Turn a function with a specific signature into a (streaming) skill that can be deployed on PhariaEngine.
 
     By using the response object, a Skill decorated with `@message_stream` can return intermediate results
@@ -47,6 +72,26 @@ def message_stream(
                 for event in response.stream():
                     writer.append_to_message(event.content)
                 writer.end_message(SkillOutput(finish_reason=response.finish_reason()))
+
+    By default, every item is passed on to the Kernel as it is written. Passing a
+    `FlushPolicy`, e.g. `@message_stream(flush=FlushPolicy())`, merges consecutive text
+    chunks, which saves a host call for each model token that is forwarded.
+    """
+    if func is None:
+        return lambda func: _message_stream(func, flush=flush)
+    return _message_stream(func, flush=flush)
+
+
+def _message_stream(
+    func: MessageStreamSkill[Payload, UserInput],
+    budget: AgentBudget | None = None,
+    flush: FlushPolicy | None = None,
+) -> MessageStreamSkill[Payload, UserInput]:
+    """Create the message stream Skill.
+
+    Args:
+        budget: Default budget of the `chat_stream` calls of the Skill.
+        flush: Merge the text chunks written to the Kernel.
     """
     # The import is inside the decorator to ensure the imports only run when the decorator is interpreted.
     # This is because we can only import them when targeting the `message-stream-skill` world.
@@ -88,7 +133,10 @@ def message_stream(
             except Exception:
                 raise Err(Error_InvalidInput(traceback.format_exc()))
             try:
-                with WitMessageWriter[Payload](output) as writer:
+                with (
+                    WitMessageWriter[Payload](output, flush) as writer,
+                    budget_scope(budget),
+                ):
                     func(WitCsi(), writer, validated)
             except Exception:
                 raise Err(Error_Internal(traceback.format_exc()))
@@ -108,12 +156,15 @@ def message_stream(
         from opentelemetry import trace
 
         from pharia_skill.testing.dev.streaming_output import MessageRecorder
+        from pharia_skill.testing.profiling import profile_invocation
 
         with trace.get_tracer(__name__).start_as_current_span(func.__name__) as span:
             writer.span = span  # type: ignore
 
             span.set_attribute("input", input.model_dump_json())
-            func(csi, writer, input)
+            with budget_scope(budget), profile_invocation(func, span, csi) as profiled:
+                func(profiled, writer, input)
+            writer.flush()
 
             # We do rely on the user passing in a message recorder at test time if they
             # want tracing to work.
@@ -123,4 +174,6 @@ def message_stream(
 
     func.__globals__["MessageStream"] = MessageStream
     trace_message_stream.__globals__["MessageStream"] = MessageStream
+    # Expose the signature of the Skill, e.g. for `pharia-skill bench` to find the input.
+    trace_message_stream.__wrapped__ = func  # type: ignore[attr-defined]
     return trace_message_stream
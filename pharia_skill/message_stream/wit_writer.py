@@ -4,12 +4,14 @@ This module references bindings which can only be resolved if targeting the `mes
 Having this module in the import graph when targeting the `skill` world will lead to a build error.
 """
 
+import time
 from types import TracebackType
 from typing import Self
 
 from pharia_skill.bindings.imports import streaming_output as wit
 
 from .writer import (
+    FlushPolicy,
     MessageAppend,
     MessageBegin,
     MessageEnd,
@@ -17,6 +19,7 @@ from .writer import (
     MessageWriter,
     Payload,
     Reasoning,
+    WriterMetrics,
 )
 
 
@@ -35,8 +38,23 @@ def message_item_to_wit(item: MessageItem[Payload]) -> wit.MessageItem:
 
 
 class WitMessageWriter(MessageWriter[Payload]):
-    def __init__(self, output: wit.StreamOutput):
+    """Write message items to the output stream of the Kernel.
+
+    Every item written to the output stream crosses the boundary between the
+    component and the host. By default, each item is written as it comes. With a
+    `FlushPolicy`, consecutive text chunks are merged and written together, which
+    saves host calls at the cost of delaying the chunks a little.
+    """
+
+    def __init__(self, output: wit.StreamOutput, flush: FlushPolicy | None = None):
         self.inner = output
+        self.flush_policy = flush
+        self.metrics = WriterMetrics()
+        self._pending: list[str] = []
+        self._pending_kind: type[MessageAppend] | type[Reasoning] = MessageAppend
+        self._pending_bytes = 0
+        self._first_arrival = 0.0
+        self._arrival_sum = 0.0
 
     def __enter__(self) -> Self:
         self.inner.__enter__()
@@ -48,8 +66,52 @@ class WitMessageWriter(MessageWriter[Payload]):
         exc_value: BaseException | None,
         traceback: TracebackType | None,
     ) -> bool | None:
+        self.flush()
         return self.inner.__exit__(exc_type, exc_value, traceback)
 
     def write(self, item: MessageItem[Payload]) -> None:
-        message_item = message_item_to_wit(item)
-        self.inner.write(message_item)
+        self.metrics.items += 1
+        policy = self.flush_policy
+        match item:
+            case MessageAppend(text) | Reasoning(text) if policy is not None:
+                if type(item) is not self._pending_kind:
+                    self.flush()
+                    self._pending_kind = type(item)
+                self._buffer(text, policy)
+            case _:
+                self.flush()
+                self._write(item)
+
+    def flush(self) -> None:
+        """Write the merged text chunks to the output stream."""
+        if not self._pending:
+            return
+        now = time.monotonic()
+        count = len(self._pending)
+        metrics = self.metrics
+        metrics.delay_seconds += count * now - self._arrival_sum
+        metrics.max_delay_seconds = max(
+            metrics.max_delay_seconds, now - self._first_arrival
+        )
+        text = "".join(self._pending)
+        self._pending = []
+        self._pending_bytes = 0
+        self._arrival_sum = 0.0
+        self._write(self._pending_kind(text))
+
+    def _buffer(self, text: str, policy: FlushPolicy) -> None:
+        now = time.monotonic()
+        if not self._pending:
+            self._first_arrival = now
+        self._pending.append(text)
+        self._pending_bytes += len(text.encode())
+        self._arrival_sum += now
+        if self._pending_bytes >= policy.max_bytes or (
+            policy.max_seconds is not None
+            and now - self._first_arrival >= policy.max_seconds
+        ):
+            self.flush()
+
+    def _write(self, item: MessageItem[Payload]) -> None:
+        self.metrics.output_writes += 1
+        self.inner.write(message_item_to_wit(item))
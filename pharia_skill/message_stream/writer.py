@@ -33,6 +33,53 @@ class Reasoning:
 MessageItem = MessageBegin | Reasoning | MessageAppend | MessageEnd[Payload]
 
 
+@dataclass(frozen=True)
+class FlushPolicy:
+    """When a buffering writer passes merged message text on to the output stream.
+
+    Consecutive message appends and consecutive reasoning chunks are merged into one
+    item. The merged text is written once it reaches `max_bytes`, once its oldest
+    chunk is `max_seconds` old at the time of the next write, when the message begins
+    or ends, when switching between message and reasoning, and on `flush()`.
+
+    Attributes:
+        max_bytes: Size of the merged text, in UTF-8 bytes, that triggers a write.
+        max_seconds: Age of the merged text that triggers a write. As there is no
+            timer, the age is only checked when the next item is written.
+    """
+
+    max_bytes: int = 256
+    max_seconds: float | None = 0.1
+
+    def __post_init__(self) -> None:
+        if self.max_bytes < 1:
+            raise ValueError("`max_bytes` must be positive.")
+        if self.max_seconds is not None and self.max_seconds < 0:
+            raise ValueError("`max_seconds` must not be negative.")
+
+
+@dataclass
+class WriterMetrics:
+    """Counters of a buffering writer.
+
+    Attributes:
+        items: Items passed to `write`.
+        output_writes: Items written to the output stream, i.e. host calls.
+        delay_seconds: Total time the chunks waited in the buffer.
+        max_delay_seconds: Longest time a chunk waited in the buffer.
+    """
+
+    items: int = 0
+    output_writes: int = 0
+    delay_seconds: float = 0.0
+    max_delay_seconds: float = 0.0
+
+    @property
+    def mean_delay_seconds(self) -> float:
+        """Mean time an item waited before it was written to the output stream."""
+        return self.delay_seconds / self.items if self.items else 0.0
+
+
 class MessageWriter(Protocol, Generic[Payload]):
     """Write messages to the output stream."""
 
@@ -52,6 +99,13 @@ class MessageWriter(Protocol, Generic[Payload]):
     def end_message(self, payload: Payload | None = None) -> None:
         self.write(MessageEnd(payload))
 
+    def flush(self) -> None:
+        """Write the items held back by a buffering writer to the output stream.
+
+        Writers that do not buffer have nothing to flush.
+        """
+        return None
+
     def forward_response(
         self,
         response: CompletionStreamResponse | ChatStreamResponse,
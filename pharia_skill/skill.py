@@ -110,12 +110,17 @@ def skill(
         """
         from opentelemetry import trace
 
+        from pharia_skill.testing.profiling import profile_invocation
+
         with trace.get_tracer(__name__).start_as_current_span(func.__name__) as span:
             span.set_attribute("input", input.model_dump_json())
-            result = func(csi, input)
+            with profile_invocation(func, span, csi) as profiled:
+                result = func(profiled, input)
             span.set_attribute("output", result.model_dump_json())
             return result
 
     func.__globals__["SkillHandler"] = SkillHandler
     trace_skill.__globals__["SkillHandler"] = SkillHandler
+    # Expose the signature of the Skill, e.g. for `pharia-skill bench` to find the input.
+    trace_skill.__wrapped__ = func  # type: ignore[attr-defined]
     return trace_skill
@@ -1,10 +1,11 @@
 import os
-from typing import Optional, cast
+from typing import Literal, Optional, cast, overload
 from urllib.parse import urljoin
 
 import requests
 from dotenv import load_dotenv
 from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+from opentelemetry.sdk.trace.export import SpanExporter
 from pydantic import BaseModel
 from requests.exceptions import ConnectionError, HTTPError, MissingSchema
 
@@ -55,16 +56,35 @@ class StudioClient:
         self._project_name = project_name
         self._project_id: str | None = None
 
-    def exporter(self) -> OTLPSpanExporter:
+    @overload
+    def exporter(self, background: Literal[False] = False) -> OTLPSpanExporter: ...
+
+    @overload
+    def exporter(self, background: Literal[True]) -> SpanExporter: ...
+
+    @overload
+    def exporter(self, background: bool) -> SpanExporter: ...
+
+    def exporter(self, background: bool = False) -> SpanExporter:
         """Create an OTLP exporter for Studio.
 
         This exporter uses OpenTelemetry's OTLP HTTP/PROTOBUF exporter to send traces
         directly to Studio's traces_v2 endpoint.
+
+        Args:
+            background: Wrap the exporter in a `BackgroundExporter`, which ships the
+                spans in batches on a background thread.
         """
         self.assert_new_trace_endpoint_is_available()
-        return OTLPSpanExporter(
+        exporter = OTLPSpanExporter(
             endpoint=self.trace_endpoint, headers=self._auth_headers
         )
+        if background:
+            # Imported here, as the testing package depends on this module.
+            from pharia_skill.testing.dev.export import BackgroundExporter
+
+            return BackgroundExporter(exporter)
+        return exporter
 
     @property
     def trace_endpoint(self) -> str:
@@ -8,7 +8,62 @@ The CSI which is available to the Skill at runtime can be substituted with a Dev
 Developers can write tests, step through their Python code and inspect the state of variables.
 """
 
-from .dev import DevCsi, MessageRecorder, RecordedMessage
+from .batching import BatchingCsi
+from .caching import CachePolicy, CachingCsi, MemoryCache, SqliteCache
+from .dev import (
+    AsyncDevCsi,
+    BackgroundExporter,
+    DevCsi,
+    DropPolicy,
+    ExportMetrics,
+    MessageRecorder,
+    PayloadMode,
+    RecordedMessage,
+    RecordingClient,
+    ReplayClient,
+    StreamUpdates,
+    TracingPolicy,
+)
+from .emulator import EmulatorServer, LatencyModel, ScriptedBackend, StubBackend
+from .profiling import (
+    HotFunction,
+    ProfilePolicy,
+    ProfilerMode,
+    SkillProfile,
+    profiling,
+)
+from .simulation import Latency, SimulatedCsi, SimulatedFailure
 from .stub import StubCsi
 
-__all__ = ["StubCsi", "DevCsi", "MessageRecorder", "RecordedMessage"]
+__all__ = [
+    "AsyncDevCsi",
+    "BatchingCsi",
+    "CachePolicy",
+    "CachingCsi",
+    "MemoryCache",
+    "SqliteCache",
+    "StubCsi",
+    "DevCsi",
+    "EmulatorServer",
+    "LatencyModel",
+    "ScriptedBackend",
+    "StubBackend",
+    "HotFunction",
+    "ProfilePolicy",
+    "ProfilerMode",
+    "SkillProfile",
+    "profiling",
+    "Latency",
+    "SimulatedCsi",
+    "SimulatedFailure",
+    "BackgroundExporter",
+    "DropPolicy",
+    "ExportMetrics",
+    "MessageRecorder",
+    "PayloadMode",
+    "RecordedMessage",
+    "RecordingClient",
+    "ReplayClient",
+    "StreamUpdates",
+    "TracingPolicy",
+]
@@ -0,0 +1,257 @@
+"""
+BatchingCsi coalesces single CSI calls from many threads into batch requests.
+
+Skills mostly use the single-item helpers of the CSI, e.g. `Csi.chat` or `Csi.complete`.
+Each of these becomes a `*_concurrent` call with a single request. When many threads
+run Skills against the same CSI, e.g. when evaluating a Skill on a dataset, this results
+in one round trip per call. The `BatchingCsi` queues these calls for a short window and
+sends them to the wrapped CSI as one batch.
+"""
+
+import threading
+from collections.abc import Callable, Sequence
+from concurrent.futures import Future
+from typing import Generic, TypeVar
+
+from pydantic.types import JsonValue
+
+from pharia_skill import (
+    ChatParams,
+    ChatRequest,
+    ChatResponse,
+    Chunk,
+    ChunkParams,
+    ChunkRequest,
+    Completion,
+    CompletionParams,
+    CompletionRequest,
+    Csi,
+    Document,
+    DocumentPath,
+    IndexPath,
+    InvokeRequest,
+    JsonSerializable,
+    Language,
+    Message,
+    SearchFilter,
+    SearchRequest,
+    SearchResult,
+    SelectLanguageRequest,
+    Tool,
+    ToolOutput,
+    ToolRegistry,
+    ToolResult,
+)
+from pharia_skill.csi.inference import (
+    ChatStreamResponse,
+    ChatStreams,
+    CompletionStreamResponse,
+    CompletionStreams,
+)
+
+Request = TypeVar("Request")
+Response = TypeVar("Response")
+
+
+class _Batcher(Generic[Request, Response]):
+    """Collect requests from multiple threads and dispatch them together.
+
+    There is no background thread. The first caller that finds the queue empty becomes
+    the leader of the next batch: it waits until either `max_wait` seconds have passed
+    or `max_batch_size` requests are queued, and then dispatches everything that has
+    been queued so far. All other callers wait for the leader to resolve their result.
+    """
+
+    def __init__(
+        self,
+        dispatch: Callable[[list[Request]], list[Response]],
+        max_wait: float,
+        max_batch_size: int,
+    ):
+        self._dispatch = dispatch
+        self._max_wait = max_wait
+        self._max_batch_size = max_batch_size
+        self._pending: list[tuple[Request, Future[Response]]] = []
+        self._condition = threading.Condition()
+
+    def __call__(self, request: Request) -> Response:
+        future: Future[Response] = Future()
+        with self._condition:
+            self._pending.append((request, future))
+            is_leader = len(self._pending) == 1
+            if len(self._pending) >= self._max_batch_size:
+                self._condition.notify_all()
+
+        if is_leader:
+            with self._condition:
+                self._condition.wait_for(
+                    lambda: len(self._pending) >= self._max_batch_size,
+                    timeout=self._max_wait,
+                )
+                pending, self._pending = self._pending, []
+            # Every sub-batch is resolved, even if an earlier one raised an error that
+            # is not passed on to the callers, so that no caller waits forever.
+            error: BaseException | None = None
+            for i in range(0, len(pending), self._max_batch_size):
+                try:
+                    self._resolve(pending[i : i + self._max_batch_size])
+                except BaseException as e:
+                    error = error or e
+            if error is not None:
+                raise error
+
+        return future.result()
+
+    def _resolve(self, batch: list[tuple[Request, Future[Response]]]) -> None:
+        """Resolve the future of every request in the batch.
+
+        Errors are set on all futures that are not resolved yet. Errors that are not an
+        `Exception`, e.g. a `KeyboardInterrupt`, are re-raised for the leader as well.
+        """
+        try:
+            responses = self._dispatch([request for request, _ in batch])
+            if len(responses) != len(batch):
+                raise ValueError(
+                    f"Expected {len(batch)} responses, received {len(responses)}."
+                )
+            for (_, future), response in zip(batch, responses):
+                future.set_result(response)
+        except BaseException as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            if not isinstance(e, Exception):
+                raise
+
+
+class BatchingCsi(Csi):
+    """Wrap a CSI to merge single calls from many threads into batch requests.
+
+    Calls to `chat`, `complete`, `chunk`, `search` and `select_language` are queued for
+    up to `max_wait` seconds, or until `max_batch_size` calls of the same kind are
+    queued, and then sent to the wrapped CSI with a single `*_concurrent` call. Each
+    caller receives its own response, or the error raised for the batch. All other
+    methods, including the `*_concurrent` methods, are passed through unchanged.
+
+    Batching only pays off if the CSI is shared between threads. A single-threaded
+    caller waits `max_wait` seconds for every call.
+
+    Args:
+        csi: The CSI to forward the batched requests to.
+        max_wait: Seconds to wait for further calls before a batch is sent.
+        max_batch_size: Number of queued calls after which a batch is sent immediately.
+
+    Examples::
+
+        from concurrent.futures import ThreadPoolExecutor
+
+        csi = BatchingCsi(DevCsi(), max_wait=0.005, max_batch_size=32)
+        with ThreadPoolExecutor(max_workers=32) as executor:
+            outputs = list(executor.map(lambda input: run(csi, input), inputs))
+    """
+
+    def __init__(self, csi: Csi, max_wait: float = 0.005, max_batch_size: int = 32):
+        if max_wait < 0:
+            raise ValueError("`max_wait` must not be negative.")
+        if max_batch_size < 1:
+            raise ValueError("`max_batch_size` must be at least 1.")
+        self.csi = csi
+        self._chat = _Batcher(csi.chat_concurrent, max_wait, max_batch_size)
+        self._complete = _Batcher(csi.complete_concurrent, max_wait, max_batch_size)
+        self._chunk = _Batcher(csi.chunk_concurrent, max_wait, max_batch_size)
+        self._search = _Batcher(csi.search_concurrent, max_wait, max_batch_size)
+        self._select_language = _Batcher(
+            csi.select_language_concurrent, max_wait, max_batch_size
+        )
+
+    def chat(
+        self, model: str, messages: list[Message], params: ChatParams | None = None
+    ) -> ChatResponse:
+        params = params or ChatParams()
+        return self._chat(ChatRequest(model, messages, params))
+
+    def complete(
+        self, model: str, prompt: str, params: CompletionParams | None = None
+    ) -> Completion:
+        params = params or CompletionParams()
+        return self._complete(CompletionRequest(model, prompt, params))
+
+    def chunk(self, text: str, params: ChunkParams) -> list[Chunk]:
+        return self._chunk(ChunkRequest(text, params))
+
+    def search(
+        self,
+        index_path: IndexPath,
+        query: str,
+        max_results: int = 1,
+        min_score: float | None = None,
+        filters: list[SearchFilter] | None = None,
+    ) -> list[SearchResult]:
+        request = SearchRequest(
+            index_path, query, max_results, min_score, filters or []
+        )
+        return self._search(request)
+
+    def select_language(self, text: str, languages: list[Language]) -> Language | None:
+        return self._select_language(SelectLanguageRequest(text, languages))
+
+    def invoke_tool(self, name: str, **kwargs: JsonValue) -> ToolOutput:
+        return self.csi.invoke_tool(name, **kwargs)
+
+    def invoke_tool_concurrent(
+        self, requests: Sequence[InvokeRequest]
+    ) -> list[ToolResult]:
+        return self.csi.invoke_tool_concurrent(requests)
+
+    def list_tools(self) -> list[Tool]:
+        return self.csi.list_tools()
+
+    def tool_registry(self) -> ToolRegistry:
+        return self.csi.tool_registry()
+
+    def complete_concurrent(
+        self, requests: Sequence[CompletionRequest]
+    ) -> list[Completion]:
+        return self.csi.complete_concurrent(list(requests))
+
+    def _completion_stream(
+        self, model: str, prompt: str, params: CompletionParams
+    ) -> CompletionStreamResponse:
+        return self.csi._completion_stream(model, prompt, params)
+
+    def completion_stream_concurrent(
+        self, requests: Sequence[CompletionRequest]
+    ) -> CompletionStreams:
+        return self.csi.completion_stream_concurrent(requests)
+
+    def chunk_concurrent(self, requests: Sequence[ChunkRequest]) -> list[list[Chunk]]:
+        return self.csi.chunk_concurrent(requests)
+
+    def chat_concurrent(self, requests: Sequence[ChatRequest]) -> list[ChatResponse]:
+        return self.csi.chat_concurrent(requests)
+
+    def _chat_stream(
+        self, model: str, messages: list[Message], params: ChatParams
+    ) -> ChatStreamResponse:
+        return self.csi._chat_stream(model, messages, params)
+
+    def chat_stream_concurrent(self, requests: Sequence[ChatRequest]) -> ChatStreams:
+        return self.csi.chat_stream_concurrent(requests)
+
+    def select_language_concurrent(
+        self, requests: Sequence[SelectLanguageRequest]
+    ) -> list[Language | None]:
+        return self.csi.select_language_concurrent(requests)
+
+    def search_concurrent(
+        self, requests: Sequence[SearchRequest]
+    ) -> list[list[SearchResult]]:
+        return self.csi.search_concurrent(requests)
+
+    def documents(self, document_paths: Sequence[DocumentPath]) -> list[Document]:
+        return self.csi.documents(document_paths)
+
+    def documents_metadata(
+        self, document_paths: Sequence[DocumentPath]
+    ) -> list[JsonSerializable]:
+        return self.csi.documents_metadata(document_paths)
@@ -0,0 +1,262 @@
+"""
+Load test a Skill: run it many times at a fixed concurrency and measure where the time goes.
+
+This is the implementation of the `pharia-skill bench` command. Every CSI call of the
+Skill is timed by wrapping the CSI it runs against, so the breakdown is available for
+the `DevCsi`, the `StubCsi` and the local emulator alike.
+"""
+
+import contextvars
+import importlib
+import inspect
+import os
+import sys
+import time
+from collections.abc import Callable, Iterator, Sequence
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, get_type_hints
+
+from pydantic import BaseModel
+
+from pharia_skill import Csi, TokenUsage
+from pharia_skill.csi.inference.timing import _percentile
+from pharia_skill.message_stream.writer import MessageAppend, MessageItem, Payload
+
+from .dev.client import CsiClient
+from .dev.csi import DevCsi
+from .dev.streaming_output import MessageRecorder
+from .emulator import EmulatorServer, LatencyModel
+from .timed import MethodStats, OpenedStream, TimedCsi, run_streams
+
+
+@dataclass(frozen=True)
+class Percentiles:
+    """Distribution of a latency over all successful runs, in seconds."""
+
+    mean: float
+    p50: float
+    p95: float
+    p99: float
+    max: float
+
+    @classmethod
+    def of(cls, values: Sequence[float]) -> "Percentiles | None":
+        if not values:
+            return None
+        ordered = sorted(values)
+        return cls(
+            mean=sum(ordered) / len(ordered),
+            p50=_percentile(ordered, 0.5),
+            p95=_percentile(ordered, 0.95),
+            p99=_percentile(ordered, 0.99),
+            max=ordered[-1],
+        )
+
+
+@dataclass
+class BenchReport:
+    """Result of running a Skill many times.
+
+    Attributes:
+        runs: Number of runs, including failed ones.
+        errors: Number of runs that raised an exception.
+        concurrency: Number of runs in flight at the same time.
+        duration_seconds: Wall clock time of all runs.
+        latency: End-to-end latency of the successful runs.
+        time_to_first_append: Time until a message stream Skill wrote its first
+            `MessageAppend`, `None` for other Skills.
+        csi: Time spent per CSI method.
+        usage: Tokens of all chat and completion requests, as far as they were
+            reported by the model.
+        error_messages: Distinct errors of the failed runs.
+    """
+
+    runs: int
+    errors: int
+    concurrency: int
+    duration_seconds: float
+    latency: Percentiles | None
+    time_to_first_append: Percentiles | None
+    csi: dict[str, MethodStats]
+    usage: TokenUsage
+    error_messages: list[str] = field(default_factory=list)
+
+    @property
+    def throughput(self) -> float:
+        """Successful runs per second."""
+        if not self.duration_seconds:
+            return 0.0
+        return (self.runs - self.errors) / self.duration_seconds
+
+    def to_json(self) -> dict[str, Any]:
+        """Machine-readable representation, e.g. to gate a release on."""
+        return {
+            "runs": self.runs,
+            "errors": self.errors,
+            "concurrency": self.concurrency,
+            "duration_seconds": self.duration_seconds,
+            "throughput": self.throughput,
+            "latency_seconds": _asdict(self.latency),
+            "time_to_first_append_seconds": _asdict(self.time_to_first_append),
+            "csi": {
+                name: {**asdict(stats), "mean_seconds": stats.seconds / stats.calls}
+                for name, stats in sorted(self.csi.items())
+                if stats.calls
+            },
+            "usage": {"prompt": self.usage.prompt, "completion": self.usage.completion},
+            "error_messages": self.error_messages,
+        }
+
+
+def _asdict(percentiles: Percentiles | None) -> dict[str, float] | None:
+    return None if percentiles is None else asdict(percentiles)
+
+
+def load_skill(spec: str) -> Callable[..., Any]:
+    """Import a decorated Skill from a `module:function` specification.
+
+    The current working directory is added to the import path, just like for builds.
+    """
+    module_name, _, name = spec.partition(":")
+    if not module_name or not name:
+        raise ValueError(
+            f"Expected the Skill as `module:function`, e.g. `haiku:run`, got `{spec}`."
+        )
+    if "" not in sys.path:
+        sys.path.insert(0, "")
+    module = importlib.import_module(module_name)
+    skill: Callable[..., Any] = getattr(module, name)
+    return skill
+
+
+def input_model(skill: Callable[..., Any]) -> tuple[type[BaseModel], bool]:
+    """The input model of a Skill and whether it is a message stream Skill."""
+    func = inspect.unwrap(skill)
+    parameters = list(inspect.signature(func).parameters)
+    if len(parameters) not in (2, 3):
+        raise ValueError(
+            "Expected a function decorated with `@skill` or `@message_stream`."
+        )
+    model = get_type_hints(func)[parameters[-1]]
+    if not (isinstance(model, type) and issubclass(model, BaseModel)):
+        raise ValueError(f"The input of the Skill must be a Pydantic model: {model}.")
+    return model, len(parameters) == 3
+
+
+def load_inputs(path: str | Path, model: type[BaseModel]) -> list[BaseModel]:
+    """Read one input per line of a JSON Lines file."""
+    with open(path, encoding="utf-8") as file:
+        inputs = [model.model_validate_json(line) for line in file if line.strip()]
+    if not inputs:
+        raise ValueError(f"No inputs found in `{path}`.")
+    return inputs
+
+
+def bench(
+    skill: Callable[..., Any],
+    csi: Csi,
+    inputs: Sequence[BaseModel],
+    runs: int,
+    concurrency: int = 1,
+) -> BenchReport:
+    """Run the Skill `runs` times, cycling through the inputs.
+
+    Args:
+        skill: A function decorated with `@skill` or `@message_stream`.
+        csi: The CSI the Skill runs against.
+        inputs: Inputs of the runs, reused in order if there are fewer than `runs`.
+        runs: Number of times the Skill is run.
+        concurrency: Number of runs in flight at the same time.
+    """
+    if runs < 1 or concurrency < 1:
+        raise ValueError("`runs` and `concurrency` must be at least 1.")
+    _, streaming = input_model(skill)
+    timed = TimedCsi(csi)
+
+    def run(index: int) -> tuple[float, float | None]:
+        input = inputs[index % len(inputs)]
+        streams: list[OpenedStream] = []
+        run_streams.set(streams)
+        start = time.perf_counter()
+        try:
+            if streaming:
+                writer = _FirstAppendRecorder[Any]()
+                skill(timed, writer, input)
+                first = writer.first_append
+                return time.perf_counter() - start, (
+                    None if first is None else first - start
+                )
+            skill(timed, input)
+            return time.perf_counter() - start, None
+        finally:
+            timed.finish_streams(streams)
+
+    latencies: list[float] = []
+    first_appends: list[float] = []
+    errors: dict[str, None] = {}
+    failed = 0
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        futures = [
+            executor.submit(contextvars.copy_context().run, run, index)
+            for index in range(runs)
+        ]
+        for future in futures:
+            try:
+                latency, first_append = future.result()
+            except Exception as e:
+                failed += 1
+                errors[f"{type(e).__name__}: {e}"] = None
+                continue
+            latencies.append(latency)
+            if first_append is not None:
+                first_appends.append(first_append)
+    duration = time.perf_counter() - start
+
+    return BenchReport(
+        runs=runs,
+        errors=failed,
+        concurrency=concurrency,
+        duration_seconds=duration,
+        latency=Percentiles.of(latencies),
+        time_to_first_append=Percentiles.of(first_appends) if streaming else None,
+        csi=timed.stats,
+        usage=timed.usage,
+        error_messages=list(errors),
+    )
+
+
+class _FirstAppendRecorder(MessageRecorder[Payload]):
+    """Validate the stream without keeping it, and remember the first append."""
+
+    def __init__(self) -> None:
+        super().__init__(keep_items=False)
+        self.first_append: float | None = None
+
+    def write(self, item: MessageItem[Payload]) -> None:
+        if self.first_append is None and isinstance(item, MessageAppend):
+            self.first_append = time.perf_counter()
+        super().write(item)
+
+
+@contextmanager
+def emulated_csi(
+    backend: CsiClient,
+    latency: LatencyModel | None = None,
+    namespace: str | None = None,
+) -> Iterator[DevCsi]:
+    """A `DevCsi` that talks to a local emulator for as long as the context lasts."""
+    with EmulatorServer(backend, latency) as server:
+        previous = os.environ.get("PHARIA_KERNEL_ADDRESS")
+        os.environ["PHARIA_KERNEL_ADDRESS"] = server.address
+        try:
+            csi = DevCsi(namespace=namespace)
+        finally:
+            if previous is None:
+                del os.environ["PHARIA_KERNEL_ADDRESS"]
+            else:
+                os.environ["PHARIA_KERNEL_ADDRESS"] = previous
+        yield csi
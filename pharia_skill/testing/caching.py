@@ -0,0 +1,388 @@
+"""
+CachingCsi answers repeated CSI requests from a cache instead of the wrapped CSI.
+
+Test suites often send identical requests to the PhariaEngine over and over again.
+The `CachingCsi` keys every response on a canonical serialization of its request and
+stores it serialized, either in memory, on disk or both. Every cache hit therefore
+returns a fresh copy of the response, which the caller is free to mutate.
+"""
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Sequence
+from enum import Enum
+from pathlib import Path
+from typing import Any, Protocol, TypeVar
+
+from pydantic import TypeAdapter
+from pydantic_core import to_jsonable_python
+
+from pharia_skill import (
+    ChatParams,
+    ChatRequest,
+    ChatResponse,
+    Chunk,
+    ChunkRequest,
+    Completion,
+    CompletionParams,
+    CompletionRequest,
+    Csi,
+    Document,
+    DocumentPath,
+    InvokeRequest,
+    JsonSerializable,
+    Language,
+    Message,
+    SearchRequest,
+    SearchResult,
+    SelectLanguageRequest,
+    Tool,
+    ToolRegistry,
+    ToolResult,
+)
+from pharia_skill.csi.inference import (
+    ChatStreamResponse,
+    ChatStreams,
+    CompletionStreamResponse,
+    CompletionStreams,
+)
+
+Request = TypeVar("Request")
+Response = TypeVar("Response")
+
+
+class CacheBackend(Protocol):
+    """Storage for serialized responses."""
+
+    def get(self, key: str) -> bytes | None:
+        """Return the value stored for the key, or `None` if there is none."""
+        ...
+
+    def set(self, key: str, value: bytes) -> None:
+        """Store a value for the key, replacing any existing value."""
+        ...
+
+
+class MemoryCache(CacheBackend):
+    """Least-recently-used in-memory cache with an optional time to live.
+
+    Args:
+        max_size: Maximum number of entries. The least recently used entry is evicted
+            once the cache is full.
+        ttl: Seconds after which an entry expires. Entries never expire if not set.
+    """
+
+    def __init__(self, max_size: int = 1024, ttl: float | None = None):
+        if max_size < 1:
+            raise ValueError("`max_size` must be at least 1.")
+        self._max_size = max_size
+        self._ttl = ttl
+        self._entries: OrderedDict[str, tuple[float, bytes]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> bytes | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            created, value = entry
+            if self._ttl is not None and time.monotonic() - created > self._ttl:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: bytes) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic(), value)
+            self._entries.move_to_end(key)
+            if len(self._entries) > self._max_size:
+                self._entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class SqliteCache(CacheBackend):
+    """Persistent cache stored in a SQLite database file.
+
+    The cache survives between test runs and can be shared by multiple processes.
+
+    Args:
+        path: Location of the database file. It is created if it does not exist.
+        ttl: Seconds after which an entry expires. Entries never expire if not set.
+            Expired entries are deleted when the cache is opened, and at most once per
+            `ttl` while it is written to.
+    """
+
+    def __init__(self, path: str | Path, ttl: float | None = None):
+        self._ttl = ttl
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        with self._connection:
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS responses "
+                "(key TEXT PRIMARY KEY, value BLOB NOT NULL, created REAL NOT NULL)"
+            )
+        self._purged = 0.0
+        with self._lock:
+            self._purge_expired()
+
+    def _purge_expired(self) -> None:
+        """Delete expired entries, so that the file does not grow without bound."""
+        if self._ttl is None:
+            return
+        now = time.time()
+        with self._connection:
+            self._connection.execute(
+                "DELETE FROM responses WHERE created < ?", (now - self._ttl,)
+            )
+        self._purged = now
+
+    def get(self, key: str) -> bytes | None:
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT value, created FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None:
+            return None
+        value: bytes = row[0]
+        created: float = row[1]
+        if self._ttl is not None and time.time() - created > self._ttl:
+            return None
+        return value
+
+    def set(self, key: str, value: bytes) -> None:
+        with self._lock:
+            if self._ttl is not None and time.time() - self._purged > self._ttl:
+                self._purge_expired()
+            with self._connection:
+                self._connection.execute(
+                    "INSERT OR REPLACE INTO responses (key, value, created) "
+                    "VALUES (?, ?, ?)",
+                    (key, value, time.time()),
+                )
+
+    def close(self) -> None:
+        """Close the connection to the database."""
+        self._connection.close()
+
+
+class CachePolicy(str, Enum):
+    """When the responses of a CSI method are cached.
+
+    Attributes:
+        DETERMINISTIC: Cache, unless the request samples with a temperature above zero
+            or with the default temperature of the model. Responses to such requests
+            are expected to differ between calls.
+        ALWAYS: Cache every response.
+        NEVER: Always forward the request to the wrapped CSI.
+    """
+
+    DETERMINISTIC = "deterministic"
+    ALWAYS = "always"
+    NEVER = "never"
+
+
+class CachingCsi(Csi):
+    """Wrap a CSI to answer repeated requests from a cache.
+
+    The responses of `chat`, `complete`, `chunk`, `search` and `select_language` and
+    their `*_concurrent` counterparts are cached. For a batch, only the requests that
+    miss the cache are forwarded to the wrapped CSI in a single `*_concurrent` call,
+    and the results are merged back in the order of the requests. Streams, tools and
+    documents are never cached.
+
+    Whether a response is cached can be configured per method by passing a
+    :class:`CachePolicy` for the method name, e.g. `{"search": CachePolicy.NEVER}`.
+    By default, chat and completion requests are only cached if their temperature is
+    set to zero, while all other requests are always cached.
+
+    Args:
+        csi: The CSI to forward cache misses to.
+        memory: In-memory cache that is looked up first. Defaults to a `MemoryCache`.
+        disk: Optional persistent cache that is looked up on a memory miss.
+        policies: Cache policy per method name, overriding the default.
+
+    Examples::
+
+        csi = CachingCsi(DevCsi(), disk=SqliteCache(".csi-cache.sqlite"))
+        result = run(csi, input)
+    """
+
+    def __init__(
+        self,
+        csi: Csi,
+        memory: MemoryCache | None = None,
+        disk: SqliteCache | None = None,
+        policies: dict[str, CachePolicy] | None = None,
+    ):
+        self.csi = csi
+        self._memory = memory if memory is not None else MemoryCache()
+        self._disk = disk
+        self._policies = policies or {}
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def chat_concurrent(self, requests: Sequence[ChatRequest]) -> list[ChatResponse]:
+        return self._cached(
+            "chat",
+            requests,
+            self.csi.chat_concurrent,
+            _CHAT_RESPONSE,
+            lambda request: _is_sampled(request.params.temperature),
+        )
+
+    def complete_concurrent(
+        self, requests: Sequence[CompletionRequest]
+    ) -> list[Completion]:
+        return self._cached(
+            "complete",
+            requests,
+            self.csi.complete_concurrent,
+            _COMPLETION,
+            lambda request: _is_sampled(request.params.temperature),
+        )
+
+    def chunk_concurrent(self, requests: Sequence[ChunkRequest]) -> list[list[Chunk]]:
+        return self._cached("chunk", requests, self.csi.chunk_concurrent, _CHUNKS)
+
+    def search_concurrent(
+        self, requests: Sequence[SearchRequest]
+    ) -> list[list[SearchResult]]:
+        return self._cached(
+            "search", requests, self.csi.search_concurrent, _SEARCH_RESULTS
+        )
+
+    def select_language_concurrent(
+        self, requests: Sequence[SelectLanguageRequest]
+    ) -> list[Language | None]:
+        return self._cached(
+            "select_language",
+            requests,
+            self.csi.select_language_concurrent,
+            _LANGUAGE,
+        )
+
+    def invoke_tool_concurrent(
+        self, requests: Sequence[InvokeRequest]
+    ) -> list[ToolResult]:
+        return self.csi.invoke_tool_concurrent(requests)
+
+    def list_tools(self) -> list[Tool]:
+        return self.csi.list_tools()
+
+    def tool_registry(self) -> ToolRegistry:
+        return self.csi.tool_registry()
+
+    def _completion_stream(
+        self, model: str, prompt: str, params: CompletionParams
+    ) -> CompletionStreamResponse:
+        return self.csi._completion_stream(model, prompt, params)
+
+    def completion_stream_concurrent(
+        self, requests: Sequence[CompletionRequest]
+    ) -> CompletionStreams:
+        return self.csi.completion_stream_concurrent(requests)
+
+    def _chat_stream(
+        self, model: str, messages: list[Message], params: ChatParams
+    ) -> ChatStreamResponse:
+        return self.csi._chat_stream(model, messages, params)
+
+    def chat_stream_concurrent(self, requests: Sequence[ChatRequest]) -> ChatStreams:
+        return self.csi.chat_stream_concurrent(requests)
+
+    def documents(self, document_paths: Sequence[DocumentPath]) -> list[Document]:
+        return self.csi.documents(document_paths)
+
+    def documents_metadata(
+        self, document_paths: Sequence[DocumentPath]
+    ) -> list[JsonSerializable]:
+        return self.csi.documents_metadata(document_paths)
+
+    def _cached(
+        self,
+        method: str,
+        requests: Sequence[Request],
+        forward: Callable[[list[Request]], list[Response]],
+        adapter: TypeAdapter[Response],
+        is_sampled: Callable[[Request], bool] = lambda _: False,
+    ) -> list[Response]:
+        """Look up each request in the cache and forward the misses in one batch."""
+        policy = self._policies.get(method, CachePolicy.DETERMINISTIC)
+        if policy == CachePolicy.NEVER:
+            return forward(list(requests))
+
+        keys: list[str | None] = [
+            None
+            if policy == CachePolicy.DETERMINISTIC and is_sampled(request)
+            else _cache_key(method, request)
+            for request in requests
+        ]
+        responses: list[Response | None] = [None] * len(requests)
+        misses: list[int] = []
+        for i, key in enumerate(keys):
+            value = self._get(key) if key is not None else None
+            if value is None:
+                misses.append(i)
+            else:
+                responses[i] = adapter.validate_json(value)
+
+        with self._lock:
+            self.hits += len(requests) - len(misses)
+            self.misses += len(misses)
+
+        if misses:
+            fetched = forward([requests[i] for i in misses])
+            for i, response in zip(misses, fetched, strict=True):
+                responses[i] = response
+                if (key := keys[i]) is not None:
+                    self._set(key, adapter.dump_json(response))
+
+        return responses  # type: ignore[return-value]
+
+    def _get(self, key: str) -> bytes | None:
+        if (value := self._memory.get(key)) is not None:
+            return value
+        if self._disk is not None and (value := self._disk.get(key)) is not None:
+            self._memory.set(key, value)
+            return value
+        return None
+
+    def _set(self, key: str, value: bytes) -> None:
+        self._memory.set(key, value)
+        if self._disk is not None:
+            self._disk.set(key, value)
+
+
+def _cache_key(method: str, request: Any) -> str:
+    """Hash the canonical serialization of a request.
+
+    Keys are sorted so that the key does not depend on the order in which dictionaries
+    in the request, e.g. metadata filters, have been built.
+    """
+    canonical = json.dumps(
+        [method, to_jsonable_python(request)],
+        sort_keys=True,
+        separators=(",", ":"),
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+def _is_sampled(temperature: float | None) -> bool:
+    """Whether a request samples, which is the default of most models."""
+    return temperature is None or temperature > 0
+
+
+_CHAT_RESPONSE = TypeAdapter(ChatResponse)
+_COMPLETION = TypeAdapter(Completion)
+_CHUNKS = TypeAdapter(list[Chunk])
+_SEARCH_RESULTS = TypeAdapter(list[SearchResult])
+_LANGUAGE: TypeAdapter[Language | None] = TypeAdapter(Language | None)
@@ -0,0 +1,480 @@
+"""
+Find the critical path of Skill runs in their traces.
+
+At test time, every run of a Skill is traced in a span, and the `DevCsi` traces each
+CSI call in a child span. Together, the spans are the timeline of the run. The critical
+path of a run is the chain of CSI calls and of the Skill's own code in between that
+determines how long the run takes.
+
+Skills often make CSI calls one after another, even if a later call does not need the
+result of an earlier one, e.g. a search for each of several queries. Such calls can be
+sent in one `*_concurrent` call, or run on parallel threads, so that the run only
+waits for the slowest of them. A later call depends on an earlier one if a value of the
+earlier output appears in the later input. This is judged from the payloads on the
+spans, so calls whose payloads were not recorded, e.g. because of a `TracingPolicy`,
+are treated as dependent.
+"""
+
+import json
+from collections.abc import Iterable, Iterator, Sequence
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any
+
+from opentelemetry.sdk.trace import ReadableSpan
+
+CSI_FUNCTIONS = {
+    "chat": "chat_concurrent",
+    "text_completion": "complete_concurrent",
+    "search": "search_concurrent",
+    "chunk_with_offsets": "chunk_concurrent",
+    "select_language": "select_language_concurrent",
+    "documents": "documents",
+    "document_metadata": "documents_metadata",
+    "invoke_tool": "invoke_tool_concurrent",
+    "list_tools": "list_tools",
+}
+"""Names of the spans of CSI calls, with the CSI method that sends several of them."""
+
+STREAM_FUNCTIONS = {
+    "chat": "chat_stream_concurrent",
+    "text_completion": "completion_stream_concurrent",
+}
+"""CSI calls that can be streamed, with the CSI method that opens several streams."""
+
+STREAM_ATTRIBUTES = (
+    "langfuse.observation.completion_start_time",
+    "pharia.stream.cancelled",
+)
+"""Attributes that only the spans of streams carry.
+
+Streams are traced under the same span names as the calls they stream, e.g.
+`chat {model}`, but record the arrival of their first token or their cancellation.
+"""
+
+INPUT_ATTRIBUTES = ("input", "gen_ai.input.messages", "gen_ai.content.prompt")
+OUTPUT_ATTRIBUTES = ("output", "gen_ai.output.messages", "gen_ai.content.completion")
+
+STRUCTURAL_KEYS = frozenset(
+    {"role", "type", "finish_reason", "namespace", "collection", "index"}
+)
+"""Keys whose values are the same in many payloads and do not carry data.
+
+The namespace and collection of the document paths a search returns are those of the
+searched index, so they would make every search depend on the one before.
+"""
+
+
+@dataclass(frozen=True)
+class SpanRecord:
+    """The parts of a span that describe the timeline of a run.
+
+    Attributes:
+        name: Name of the span.
+        trace_id: Id of the trace, as a hex string.
+        span_id: Id of the span, as a hex string.
+        parent_id: Id of the parent span, if any.
+        start: Start of the span, in seconds since the epoch.
+        end: End of the span, in seconds since the epoch.
+        attributes: Attributes of the span.
+    """
+
+    name: str
+    trace_id: str
+    span_id: str
+    parent_id: str | None
+    start: float
+    end: float
+    attributes: dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def duration(self) -> float:
+        return self.end - self.start
+
+    @property
+    def function(self) -> str | None:
+        """The CSI function of the span, if it traces a CSI call."""
+        function = self.name.split(" ", 1)[0]
+        return function if function in CSI_FUNCTIONS else None
+
+    @property
+    def streamed(self) -> bool:
+        """Whether the span traces a stream rather than a single response."""
+        return any(key in self.attributes for key in STREAM_ATTRIBUTES)
+
+    @staticmethod
+    def from_span(span: ReadableSpan) -> "SpanRecord":
+        assert span.context is not None and span.start_time is not None
+        return SpanRecord(
+            name=span.name,
+            trace_id=f"{span.context.trace_id:032x}",
+            span_id=f"{span.context.span_id:016x}",
+            parent_id=None if span.parent is None else f"{span.parent.span_id:016x}",
+            start=span.start_time / 1e9,
+            end=(span.end_time or span.start_time) / 1e9,
+            attributes=dict(span.attributes or {}),
+        )
+
+
+@dataclass(frozen=True)
+class Segment:
+    """A part of the critical path.
+
+    Attributes:
+        start: Start of the segment, in seconds since the epoch.
+        end: End of the segment, in seconds since the epoch.
+        call: The CSI call, or `None` for the Skill's own code between two calls.
+    """
+
+    start: float
+    end: float
+    call: SpanRecord | None = None
+
+    @property
+    def duration(self) -> float:
+        return self.end - self.start
+
+
+@dataclass(frozen=True)
+class SequentialCalls:
+    """CSI calls that were made one after another, but do not depend on each other.
+
+    Attributes:
+        calls: The calls, in the order in which they were made.
+        saving_seconds: Estimated time saved by making the calls at the same time,
+            after which the run only waits for the slowest call.
+    """
+
+    calls: list[SpanRecord]
+
+    @property
+    def saving_seconds(self) -> float:
+        durations = [call.duration for call in self.calls]
+        return sum(durations) - max(durations)
+
+    @property
+    def suggestion(self) -> str:
+        """How to make the calls at the same time."""
+        kinds = {(call.function, call.streamed) for call in self.calls}
+        if len(kinds) != 1:
+            return "parallel threads"
+        function, streamed = kinds.pop()
+        if function is None:
+            return "parallel threads"
+        if streamed and function in STREAM_FUNCTIONS:
+            return f"csi.{STREAM_FUNCTIONS[function]}"
+        return f"csi.{CSI_FUNCTIONS[function]}"
+
+
+@dataclass(frozen=True)
+class RunAnalysis:
+    """The timeline of a single Skill run.
+
+    Attributes:
+        run: The span of the run.
+        calls: The CSI calls of the run, in the order in which they were made.
+        critical_path: The segments that determine the duration of the run.
+        sequential: Groups of independent calls that were made one after another.
+        unknown: Number of calls whose dependencies could not be judged, because
+            their payloads were not recorded.
+    """
+
+    run: SpanRecord
+    calls: list[SpanRecord]
+    critical_path: list[Segment]
+    sequential: list[SequentialCalls]
+    unknown: int = 0
+
+    @property
+    def csi_seconds(self) -> float:
+        """Time of the critical path spent waiting for CSI calls."""
+        return sum(s.duration for s in self.critical_path if s.call is not None)
+
+    @property
+    def own_seconds(self) -> float:
+        """Time of the critical path spent in the Skill's own code."""
+        return sum(s.duration for s in self.critical_path if s.call is None)
+
+    @property
+    def saving_seconds(self) -> float:
+        return sum(group.saving_seconds for group in self.sequential)
+
+    def to_json(self) -> dict[str, Any]:
+        """Machine-readable representation of the analysis."""
+        return {
+            "name": self.run.name,
+            "trace_id": self.run.trace_id,
+            "duration_seconds": self.run.duration,
+            "csi_seconds": self.csi_seconds,
+            "own_seconds": self.own_seconds,
+            "saving_seconds": self.saving_seconds,
+            "unknown_dependencies": self.unknown,
+            "critical_path": [
+                {
+                    "name": "skill" if s.call is None else s.call.name,
+                    "offset_seconds": s.start - self.run.start,
+                    "duration_seconds": s.duration,
+                }
+                for s in self.critical_path
+            ],
+            "sequential": [
+                {
+                    "calls": [call.name for call in group.calls],
+                    "offsets_seconds": [
+                        call.start - self.run.start for call in group.calls
+                    ],
+                    "saving_seconds": group.saving_seconds,
+                    "suggestion": group.suggestion,
+                }
+                for group in self.sequential
+            ],
+        }
+
+
+def analyze(
+    spans: Iterable[SpanRecord | ReadableSpan], min_overlap: int = 24
+) -> list[RunAnalysis]:
+    """Analyze the timeline of each Skill run in the spans.
+
+    A run is a span without a parent among the spans, e.g. the span of a Skill
+    invocation, that contains CSI calls. CSI calls made by other CSI calls, e.g. the
+    sub-batches of a large request, are part of their parent call.
+
+    Args:
+        spans: The spans of one or more traces.
+        min_overlap: Number of consecutive characters of a long output value, at any
+            position, that must appear in a later input for the later call to depend
+            on the earlier one. Shorter values must appear in full.
+
+    Examples::
+
+        exporter = InMemorySpanExporter()
+        ...
+        for run in analyze(exporter.get_finished_spans()):
+            print(run.run.name, run.saving_seconds)
+    """
+    if min_overlap < 1:
+        raise ValueError("`min_overlap` must be at least 1.")
+    records = [
+        span if isinstance(span, SpanRecord) else SpanRecord.from_span(span)
+        for span in spans
+    ]
+    by_id = {record.span_id: record for record in records}
+    children: dict[str, list[SpanRecord]] = {}
+    for record in records:
+        if record.parent_id is not None and record.parent_id in by_id:
+            children.setdefault(record.parent_id, []).append(record)
+
+    analyses = []
+    for root in records:
+        if root.parent_id in by_id or root.function is not None:
+            continue
+        calls = sorted(_top_level_calls(root, children), key=lambda c: c.start)
+        if calls:
+            analyses.append(_analyze_run(root, calls, min_overlap))
+    return sorted(analyses, key=lambda analysis: analysis.run.start)
+
+
+def _top_level_calls(
+    span: SpanRecord, children: dict[str, list[SpanRecord]]
+) -> Iterator[SpanRecord]:
+    for child in children.get(span.span_id, []):
+        if child.function is not None:
+            yield child
+        else:
+            yield from _top_level_calls(child, children)
+
+
+def _analyze_run(
+    run: SpanRecord, calls: list[SpanRecord], min_overlap: int
+) -> RunAnalysis:
+    payloads = {call.span_id: _Payloads.of(call) for call in calls}
+    unknown = sum(not p.known for p in payloads.values())
+
+    def independent(call: SpanRecord, earlier: SpanRecord) -> bool:
+        return not payloads[call.span_id].depends_on(
+            payloads[earlier.span_id], min_overlap
+        )
+
+    sequential = []
+    group = calls[:1]
+    for call in calls[1:]:
+        if call.start >= max(c.end for c in group) and all(
+            independent(call, earlier) for earlier in group
+        ):
+            group.append(call)
+            continue
+        if len(group) > 1:
+            sequential.append(SequentialCalls(group))
+        group = [call]
+    if len(group) > 1:
+        sequential.append(SequentialCalls(group))
+
+    return RunAnalysis(
+        run=run,
+        calls=calls,
+        critical_path=critical_path(run, calls),
+        sequential=sequential,
+        unknown=unknown,
+    )
+
+
+def critical_path(run: SpanRecord, calls: Sequence[SpanRecord]) -> list[Segment]:
+    """Find the chain of calls and own code that determines the duration of a run.
+
+    Starting from the end of the run, the path steps back to the call that ended last
+    before the current point in time. The time between two calls is spent in the
+    Skill's own code.
+    """
+    path = []
+    now = run.end
+    remaining = sorted(calls, key=lambda call: call.end)
+    while remaining:
+        before = [call for call in remaining if call.end <= now]
+        if not before:
+            break
+        call = before[-1]
+        if now > call.end:
+            path.append(Segment(call.end, now))
+        path.append(Segment(call.start, call.end, call))
+        now = call.start
+        remaining = [c for c in remaining if c.end <= now]
+    if now > run.start:
+        path.append(Segment(run.start, now))
+    return list(reversed(path))
+
+
+@dataclass(frozen=True)
+class _Payloads:
+    """The string values of the input and output of a CSI call."""
+
+    inputs: list[str] | None
+    outputs: list[str] | None
+    _slices: dict[int, set[str]] = field(default_factory=dict, compare=False)
+
+    @property
+    def known(self) -> bool:
+        return self.inputs is not None and self.outputs is not None
+
+    @staticmethod
+    def of(call: SpanRecord) -> "_Payloads":
+        return _Payloads(
+            _values(call.attributes, INPUT_ATTRIBUTES),
+            _values(call.attributes, OUTPUT_ATTRIBUTES),
+        )
+
+    def depends_on(self, earlier: "_Payloads", min_overlap: int) -> bool:
+        if self.inputs is None or earlier.outputs is None:
+            return True
+        inputs = set(self.inputs)
+        text = "\n".join(self.inputs)
+        slices = self._input_slices(text, min_overlap)
+        for value in earlier.outputs:
+            if value in inputs or value in text:
+                return True
+            windows = range(len(value) - min_overlap + 1)
+            if any(value[i : i + min_overlap] in slices for i in windows):
+                return True
+        return False
+
+    def _input_slices(self, text: str, length: int) -> set[str]:
+        """All slices of the input with the given length, to look up output slices."""
+        if length not in self._slices:
+            self._slices[length] = {
+                text[i : i + length] for i in range(len(text) - length + 1)
+            }
+        return self._slices[length]
+
+
+def _values(attributes: dict[str, Any], keys: Sequence[str]) -> list[str] | None:
+    payloads = [attributes[key] for key in keys if isinstance(attributes.get(key), str)]
+    if not payloads:
+        return None
+    values: list[str] = []
+    for payload in payloads:
+        try:
+            values.extend(_leaves(json.loads(payload)))
+        except json.JSONDecodeError:
+            # Truncated payloads and plain text, e.g. prompts and completions.
+            values.append(payload)
+    return [value for value in values if value.strip()]
+
+
+def _leaves(value: Any, key: str | None = None) -> Iterator[str]:
+    if isinstance(value, dict):
+        for k, v in value.items():
+            yield from _leaves(v, k)
+    elif isinstance(value, list):
+        for item in value:
+            yield from _leaves(item, key)
+    elif isinstance(value, str) and key not in STRUCTURAL_KEYS:
+        yield value
+
+
+def load_spans(path: Path) -> list[SpanRecord]:
+    """Read spans from a file of JSON documents.
+
+    The documents can be spans as written by OpenTelemetry's `ConsoleSpanExporter`,
+    or OTLP exports in their JSON encoding, as written by the file exporter of the
+    OpenTelemetry Collector. They can be separated by newlines or follow each other.
+    """
+    text = path.read_text()
+    decoder = json.JSONDecoder()
+    spans: list[SpanRecord] = []
+    position = 0
+    while True:
+        while position < len(text) and text[position].isspace():
+            position += 1
+        if position == len(text):
+            return spans
+        try:
+            document, position = decoder.raw_decode(text, position)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"{path}: invalid JSON at position {e.pos}") from e
+        if "resourceSpans" in document:
+            spans.extend(_from_otlp(document))
+        else:
+            spans.append(_from_console(document))
+
+
+def _from_console(span: dict[str, Any]) -> SpanRecord:
+    def seconds(timestamp: str) -> float:
+        return datetime.fromisoformat(timestamp).timestamp()
+
+    parent = span.get("parent_id")
+    return SpanRecord(
+        name=span["name"],
+        trace_id=span["context"]["trace_id"].removeprefix("0x"),
+        span_id=span["context"]["span_id"].removeprefix("0x"),
+        parent_id=parent.removeprefix("0x") if parent else None,
+        start=seconds(span["start_time"]),
+        end=seconds(span["end_time"] or span["start_time"]),
+        attributes=span.get("attributes") or {},
+    )
+
+
+def _from_otlp(document: dict[str, Any]) -> Iterator[SpanRecord]:
+    for resource in document["resourceSpans"]:
+        for scope in resource.get("scopeSpans", []):
+            for span in scope.get("spans", []):
+                yield SpanRecord(
+                    name=span["name"],
+                    trace_id=span["traceId"].lower(),
+                    span_id=span["spanId"].lower(),
+                    parent_id=span.get("parentSpanId", "").lower() or None,
+                    start=int(span["startTimeUnixNano"]) / 1e9,
+                    end=int(span["endTimeUnixNano"]) / 1e9,
+                    attributes={
+                        a["key"]: _otlp_value(a["value"])
+                        for a in span.get("attributes", [])
+                    },
+                )
+
+
+def _otlp_value(value: dict[str, Any]) -> Any:
+    if "arrayValue" in value:
+        return [_otlp_value(v) for v in value["arrayValue"].get("values", [])]
+    if "intValue" in value:
+        return int(value["intValue"])
+    return next(iter(value.values()), None)
@@ -1,4 +1,21 @@
+from .async_csi import AsyncDevCsi
+from .cassette import RecordingClient, ReplayClient
 from .csi import DevCsi
+from .export import BackgroundExporter, DropPolicy, ExportMetrics
 from .streaming_output import MessageRecorder, RecordedMessage
+from .tracing import PayloadMode, StreamUpdates, TracingPolicy
 
-__all__ = ["DevCsi", "MessageRecorder", "RecordedMessage"]
+__all__ = [
+    "AsyncDevCsi",
+    "BackgroundExporter",
+    "DevCsi",
+    "DropPolicy",
+    "ExportMetrics",
+    "MessageRecorder",
+    "PayloadMode",
+    "RecordedMessage",
+    "RecordingClient",
+    "ReplayClient",
+    "StreamUpdates",
+    "TracingPolicy",
+]
@@ -0,0 +1,333 @@
+"""
+The asyncio counterpart of the `DevCsi`.
+
+Requests are made with a non-blocking HTTP client, so that many CSI requests can be in
+flight on the same event loop. Serialization and tracing are shared with the `DevCsi`.
+"""
+
+import json
+import os
+from collections.abc import AsyncGenerator
+from types import TracebackType
+from typing import Any, Self, Sequence
+
+from opentelemetry import trace
+from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+from opentelemetry.sdk.environment_variables import OTEL_EXPORTER_OTLP_ENDPOINT
+from opentelemetry.sdk.trace.export import SpanExporter
+from opentelemetry.trace import StatusCode
+
+from pharia_skill import (
+    AsyncCsi,
+    ChatParams,
+    ChatRequest,
+    ChatResponse,
+    Chunk,
+    ChunkRequest,
+    Completion,
+    CompletionParams,
+    CompletionRequest,
+    Document,
+    DocumentPath,
+    InvokeRequest,
+    JsonSerializable,
+    Language,
+    Message,
+    SearchRequest,
+    SearchResult,
+    SelectLanguageRequest,
+    Tool,
+    ToolResult,
+)
+from pharia_skill.csi.inference import (
+    AsyncChatStreamResponse,
+    AsyncCompletionStreamResponse,
+)
+from pharia_skill.studio import StudioClient
+from pharia_skill.testing.dev.logfire import set_logfire_attributes
+from pharia_skill.testing.dev.tracing import CAPTURE_ALL, TracingPolicy
+
+from .chunking import ChunkDeserializer, ChunkRequestSerializer
+from .client import AsyncClient, AsyncCsiClient, Event
+from .csi import DevCsi
+from .document_index import (
+    DocumentDeserializer,
+    DocumentMetadataDeserializer,
+    DocumentMetadataSerializer,
+    DocumentSerializer,
+    SearchRequestSerializer,
+    SearchResultDeserializer,
+)
+from .inference import (
+    AsyncDevChatStreamResponse,
+    AsyncDevCompletionStreamResponse,
+    ChatListDeserializer,
+    ChatRequestListSerializer,
+    ChatRequestSerializer,
+    CompletionListDeserializer,
+    CompletionRequestListSerializer,
+    CompletionRequestSerializer,
+)
+from .language import SelectLanguageDeserializer, SelectLanguageRequestSerializer
+from .tool import deserialize_tool_output, deserialize_tools, serialize_tool_requests
+
+
+class AsyncDevCsi(AsyncCsi):
+    """The `AsyncDevCsi` allows to talk to a PhariaEngine from an asyncio application.
+
+    It behaves like the :class:`DevCsi`, including the tracing, but all methods are
+    coroutines backed by a non-blocking HTTP client. This allows many CSI requests to
+    be in flight on the same event loop, e.g. when evaluating a Skill on a large dataset.
+
+    The same environment variables as for the `DevCsi` are required. Spans are exported
+    via the same exporters that are configured for the `DevCsi`.
+
+    Args:
+        namespace: The namespace to use for tool invocations.
+        project: The name of the studio project to export traces to.
+            Will be created if it does not exist.
+        max_connections: Maximum number of concurrent connections to the Engine.
+        tracing: Which request and response payloads are recorded on the spans.
+            By default, all payloads are recorded in full.
+
+    Examples::
+
+        async def evaluate(inputs: list[str]) -> list[ChatResponse]:
+            async with AsyncDevCsi() as csi:
+                return await asyncio.gather(
+                    *(csi.chat(model, [Message.user(input)]) for input in inputs)
+                )
+    """
+
+    def __init__(
+        self,
+        namespace: str | None = None,
+        project: str | None = None,
+        max_connections: int | None = 100,
+        tracing: TracingPolicy | None = None,
+    ) -> None:
+        self.client: AsyncCsiClient = AsyncClient(max_connections)
+        self._namespace = namespace
+        self.tracing = tracing or CAPTURE_ALL
+
+        if project is not None:
+            studio_client = StudioClient.with_project(project)
+            self.set_span_exporter(studio_client.exporter())
+
+        elif os.getenv(OTEL_EXPORTER_OTLP_ENDPOINT):
+            self.set_span_exporter(OTLPSpanExporter())
+
+    @classmethod
+    def _with_client(
+        cls, client: AsyncCsiClient, tracing: TracingPolicy | None = None
+    ) -> "AsyncDevCsi":
+        """Create an `AsyncDevCsi` with a custom client, bypassing environment variable requirements."""
+        instance = cls.__new__(cls)
+        instance.client = client
+        instance._namespace = None
+        instance.tracing = tracing or CAPTURE_ALL
+        return instance
+
+    async def __aenter__(self) -> Self:
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        """Close the connection pool of the underlying HTTP client."""
+        if isinstance(self.client, AsyncClient):
+            await self.client.aclose()
+
+    @staticmethod
+    def set_span_exporter(exporter: SpanExporter, background: bool = False) -> None:
+        """Set a span exporter, sharing the exporter configuration with the `DevCsi`."""
+        DevCsi.set_span_exporter(exporter, background)
+
+    def _namespace_or_raise(self) -> str:
+        """Raise an error if the namespace is not set."""
+        if self._namespace is None:
+            raise ValueError(
+                "Specifying a namespace when constructing the `AsyncDevCsi` is required when invoking or listing tools."
+            )
+        return self._namespace
+
+    async def invoke_tool_concurrent(
+        self, requests: Sequence[InvokeRequest]
+    ) -> list[ToolResult]:
+        body = serialize_tool_requests(
+            namespace=self._namespace_or_raise(), requests=requests
+        )
+        output = await self.run("invoke_tool", body)
+        return deserialize_tool_output(output)
+
+    async def list_tools(self) -> list[Tool]:
+        body = {"namespace": self._namespace_or_raise()}
+        output = await self.run("list_tools", body)
+        return deserialize_tools(output)
+
+    async def _completion_stream(
+        self, model: str, prompt: str, params: CompletionParams
+    ) -> AsyncCompletionStreamResponse:
+        body = CompletionRequestSerializer(
+            model=model, prompt=prompt, params=params
+        ).model_dump()
+        span = trace.get_tracer(__name__).start_span(f"text_completion {model}")
+        request = CompletionRequest(model, prompt, params)
+        payloads = self.tracing.payloads(span, "completion_stream")
+        payloads.set_gen_ai_attributes(request)
+        events = await self.stream("completion_stream", body, span)
+        return AsyncDevCompletionStreamResponse(events, span, payloads)
+
+    async def _chat_stream(
+        self,
+        model: str,
+        messages: list[Message],
+        params: ChatParams,
+    ) -> AsyncChatStreamResponse:
+        request = ChatRequest(model=model, messages=messages, params=params)
+        body = ChatRequestSerializer(
+            model=model, messages=messages, params=params
+        ).model_dump()
+        span = trace.get_tracer(__name__).start_span(f"chat {model}")
+        payloads = self.tracing.payloads(span, "chat_stream")
+        payloads.set_gen_ai_attributes(request)
+        events = await self.stream("chat_stream", body, span)
+        response = AsyncDevChatStreamResponse(events, span, request, payloads)
+        await response._start()
+        return response
+
+    async def chat_concurrent(
+        self, requests: Sequence[ChatRequest]
+    ) -> list[ChatResponse]:
+        """Generate model responses for a list of chat requests concurrently.
+
+        The GenAI specific tracing attributes are set in the same way as for the `DevCsi`.
+        """
+        body = ChatRequestListSerializer(root=requests).model_dump()
+        span_name = f"chat {requests[0].model}" if len(requests) == 1 else "chat"
+        with trace.get_tracer(__name__).start_as_current_span(span_name) as span:
+            payloads = self.tracing.payloads(span, "chat")
+            if len(requests) == 1:
+                payloads.set_gen_ai_attributes(requests[0])
+            else:
+                payloads.set("input", lambda: json.dumps(body))
+            try:
+                output = await self.client.run("chat", body)
+                response = ChatListDeserializer(root=output).root
+            except Exception as e:
+                span.set_status(StatusCode.ERROR, str(e))
+                raise e
+            if len(response) == 1:
+                set_logfire_attributes(
+                    payloads, requests[0].messages, response[0].message
+                )
+                payloads.set_gen_ai_attributes(response[0])
+            else:
+                payloads.set("output", lambda: json.dumps(output))
+            return response
+
+    async def complete_concurrent(
+        self, requests: Sequence[CompletionRequest]
+    ) -> list[Completion]:
+        """Generate model responses for a list of completion requests concurrently.
+
+        The GenAI specific tracing attributes are set in the same way as for the `DevCsi`.
+        """
+        body = CompletionRequestListSerializer(root=requests).model_dump()
+        span_name = (
+            f"text_completion {requests[0].model}"
+            if len(requests) == 1
+            else "text_completion"
+        )
+        with trace.get_tracer(__name__).start_as_current_span(span_name) as span:
+            payloads = self.tracing.payloads(span, "complete")
+            if len(requests) == 1:
+                payloads.set_gen_ai_attributes(requests[0])
+            else:
+                payloads.set("input", lambda: json.dumps(body))
+            try:
+                output = await self.client.run("complete", body)
+                response = CompletionListDeserializer(root=output).root
+            except Exception as e:
+                span.set_status(StatusCode.ERROR, str(e))
+                raise e
+            if len(response) == 1:
+                payloads.set_gen_ai_attributes(response[0])
+            else:
+                payloads.set("output", lambda: json.dumps(output))
+            return response
+
+    async def chunk_concurrent(
+        self, requests: Sequence[ChunkRequest]
+    ) -> list[list[Chunk]]:
+        body = ChunkRequestSerializer(root=requests).model_dump()
+        output = await self.run("chunk_with_offsets", body)
+        return ChunkDeserializer(root=output).root
+
+    async def select_language_concurrent(
+        self, requests: Sequence[SelectLanguageRequest]
+    ) -> list[Language | None]:
+        body = SelectLanguageRequestSerializer(root=requests).model_dump()
+        output = await self.run("select_language", body)
+        return SelectLanguageDeserializer(root=output).root
+
+    async def search_concurrent(
+        self, requests: Sequence[SearchRequest]
+    ) -> list[list[SearchResult]]:
+        body = SearchRequestSerializer(root=requests).model_dump()
+        output = await self.run("search", body)
+        return SearchResultDeserializer(root=output).root
+
+    async def documents_metadata(
+        self, document_paths: Sequence[DocumentPath]
+    ) -> list[JsonSerializable | None]:
+        body = DocumentMetadataSerializer(root=document_paths).model_dump()
+        output = await self.run("document_metadata", body)
+        return DocumentMetadataDeserializer(root=output).root
+
+    async def documents(self, document_paths: Sequence[DocumentPath]) -> list[Document]:
+        body = DocumentSerializer(root=document_paths).model_dump()
+        output = await self.run("documents", body)
+        return DocumentDeserializer(root=output).root
+
+    async def run(self, function: str, data: dict[str, Any]) -> Any:
+        with trace.get_tracer(__name__).start_as_current_span(function) as span:
+            payloads = self.tracing.payloads(span, function)
+            payloads.set("input", lambda: json.dumps(data))
+            try:
+                output = await self.client.run(function, data)
+            except Exception as e:
+                span.set_status(StatusCode.ERROR, str(e))
+                raise e
+            payloads.set("output", lambda: json.dumps(output))
+
+        return output
+
+    async def stream(
+        self, function: str, data: dict[str, Any], span: trace.Span
+    ) -> AsyncGenerator[Event, None]:
+        """Open an event stream against the Engine.
+
+        As for the `DevCsi`, the stream responses take over the responsibility for the
+        span once the stream has been opened successfully.
+        """
+        try:
+            events = await self.client.stream(function, data)
+        except Exception as e:
+            span.set_status(StatusCode.ERROR, str(e))
+            span.end()
+            raise e
+
+        async def checked() -> AsyncGenerator[Event, None]:
+            async for event in events:
+                if event.event == "error":
+                    raise ValueError(event.data["message"])
+                yield event
+
+        return checked()
@@ -0,0 +1,187 @@
+"""
+Record the traffic between the `DevCsi` and the PhariaEngine and replay it offline.
+
+A cassette is a gzip-compressed JSON Lines file with one interaction per line. An
+interaction holds the CSI function, the request body and either the response of a
+`run` call, the events of a `stream` call or the error returned by the Engine, together
+with the time it took. Tests that replay a cassette need no network access and always
+receive the same responses, which also makes them a stable input for benchmarks.
+"""
+
+import gzip
+import json
+import threading
+import time
+from collections import defaultdict, deque
+from collections.abc import Generator
+from pathlib import Path
+from types import TracebackType
+from typing import Any, Self
+
+from .client import CsiClient, EngineError, Event
+
+
+class RecordingClient(CsiClient):
+    """Forward requests to another client and write every interaction to a cassette.
+
+    An existing cassette at the given path is overwritten. Streams are written once
+    they have been consumed or closed, so partially consumed streams are recorded with
+    the events that were received.
+
+    Args:
+        client: The client that sends the requests, usually a `Client`.
+        path: Location of the cassette.
+
+    Examples::
+
+        with RecordingClient(Client(), "haiku.jsonl.gz") as client:
+            csi = DevCsi._with_client(client)
+            run(csi, input)
+    """
+
+    def __init__(self, client: CsiClient, path: str | Path) -> None:
+        self.client = client
+        self._file = gzip.open(path, "wt", encoding="utf-8")
+        self._lock = threading.Lock()
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Finish writing the cassette."""
+        with self._lock:
+            self._file.close()
+
+    def run(self, function: str, data: Any) -> Any:
+        start = time.perf_counter()
+        try:
+            output = self.client.run(function, data)
+        except EngineError as e:
+            self._write(function, data, start, error=_error_to_dict(e))
+            raise e
+        self._write(function, data, start, output=output)
+        return output
+
+    def stream(
+        self, function: str, data: dict[str, Any]
+    ) -> Generator[Event, None, None]:
+        start = time.perf_counter()
+        try:
+            events = self.client.stream(function, data)
+        except EngineError as e:
+            self._write(function, data, start, error=_error_to_dict(e))
+            raise e
+        return self._record_events(function, data, start, events)
+
+    def _record_events(
+        self,
+        function: str,
+        data: dict[str, Any],
+        start: float,
+        events: Generator[Event, None, None],
+    ) -> Generator[Event, None, None]:
+        recorded: list[dict[str, Any]] = []
+        last = start
+        try:
+            for event in events:
+                now = time.perf_counter()
+                recorded.append({**event.model_dump(), "delay": now - last})
+                last = now
+                yield event
+        finally:
+            self._write(function, data, start, events=recorded)
+
+    def _write(self, function: str, data: Any, start: float, **result: Any) -> None:
+        interaction = {
+            "function": function,
+            "request": data,
+            "duration": time.perf_counter() - start,
+            **result,
+        }
+        line = json.dumps(interaction, separators=(",", ":"))
+        with self._lock:
+            self._file.write(line + "\n")
+            self._file.flush()
+
+
+class ReplayClient(CsiClient):
+    """Serve the interactions of a cassette instead of making requests to the Engine.
+
+    Requests are matched on the CSI function and the request body. If the same request
+    has been recorded multiple times, the recorded responses are returned in order, and
+    the last one is repeated once they are used up.
+
+    Args:
+        path: Location of the cassette.
+        realtime: Whether to wait as long as the Engine took for the recorded response.
+            For streams, each event is delayed by the time that passed before it was
+            originally received.
+
+    Examples::
+
+        csi = DevCsi._with_client(ReplayClient("haiku.jsonl.gz"))
+        result = run(csi, input)
+    """
+
+    def __init__(self, path: str | Path, realtime: bool = False) -> None:
+        self.realtime = realtime
+        self._interactions: dict[str, deque[dict[str, Any]]] = defaultdict(deque)
+        self._lock = threading.Lock()
+        with gzip.open(path, "rt", encoding="utf-8") as file:
+            for line in file:
+                interaction = json.loads(line)
+                key = _key(interaction["function"], interaction["request"])
+                self._interactions[key].append(interaction)
+
+    def run(self, function: str, data: Any) -> Any:
+        interaction = self._next(function, data)
+        if self.realtime:
+            time.sleep(interaction["duration"])
+        self._raise_recorded_error(interaction)
+        return interaction["output"]
+
+    def stream(
+        self, function: str, data: dict[str, Any]
+    ) -> Generator[Event, None, None]:
+        interaction = self._next(function, data)
+        self._raise_recorded_error(interaction)
+        return self._replay_events(interaction["events"])
+
+    def _replay_events(
+        self, events: list[dict[str, Any]]
+    ) -> Generator[Event, None, None]:
+        for event in events:
+            if self.realtime:
+                time.sleep(event["delay"])
+            yield Event(event=event["event"], data=event["data"])
+
+    def _next(self, function: str, data: Any) -> dict[str, Any]:
+        with self._lock:
+            recorded = self._interactions.get(_key(function, data))
+            if not recorded:
+                raise ValueError(
+                    f"No interaction for a `{function}` request with this body has "
+                    "been recorded in the cassette."
+                )
+            return recorded.popleft() if len(recorded) > 1 else recorded[0]
+
+    @staticmethod
+    def _raise_recorded_error(interaction: dict[str, Any]) -> None:
+        if (error := interaction.get("error")) is not None:
+            raise EngineError(error["message"], error["status_code"])
+
+
+def _key(function: str, data: Any) -> str:
+    return json.dumps([function, data], sort_keys=True, separators=(",", ":"))
+
+
+def _error_to_dict(error: EngineError) -> dict[str, Any]:
+    return {"message": str(error), "status_code": error.status_code}
@@ -1,6 +1,6 @@
 from typing import Sequence
 
-from pydantic import RootModel
+from pydantic import RootModel, TypeAdapter
 
 from pharia_skill.csi import Chunk, ChunkRequest
 
@@ -8,3 +8,11 @@ ChunkRequestSerializer = RootModel[Sequence[ChunkRequest]]
 
 
 ChunkDeserializer = RootModel[list[list[Chunk]]]
+
+
+ChunkRequestListAdapter: TypeAdapter[Sequence[ChunkRequest]] = TypeAdapter(
+    Sequence[ChunkRequest]
+)
+
+
+ChunkListAdapter = TypeAdapter(list[list[Chunk]])
@@ -8,16 +8,14 @@ and other functionality of the `DevCsi` without making HTTP requests.
 import json
 import os
 from http import HTTPStatus
-from typing import Any, Generator, Protocol
+from typing import Any, AsyncGenerator, Generator, Protocol, runtime_checkable
 
+import httpx
 import requests
 from dotenv import load_dotenv
-from pydantic import BaseModel
 
-
-class Event(BaseModel):
-    event: str
-    data: dict[str, Any]
+from .sse import Event as Event
+from .sse import EventStreamParser
 
 
 class CsiClient(Protocol):
@@ -27,26 +25,83 @@ class CsiClient(Protocol):
     ) -> Generator[Event, None, None]: ...
 
 
-class Client(CsiClient):
+@runtime_checkable
+class RawCsiClient(CsiClient, Protocol):
+    """A client that can exchange already serialized JSON bodies with the Engine.
+
+    The `DevCsi` prefers this over `run` if the client supports it, as it saves building
+    and re-encoding Python dictionaries for every request and response.
+    """
+
+    def run_raw(self, function: str, body: bytes) -> bytes: ...
+
+
+class AsyncCsiClient(Protocol):
+    async def run(self, function: str, data: dict[str, Any]) -> Any: ...
+    async def stream(
+        self, function: str, data: dict[str, Any]
+    ) -> AsyncGenerator[Event, None]: ...
+
+
+HTTP_CSI_VERSION = "v1"
+
+
+class EngineError(Exception):
+    """The PhariaEngine responded to a CSI request with an error status code."""
+
+    def __init__(self, message: str, status_code: int) -> None:
+        super().__init__(message)
+        self.status_code = status_code
+
+
+def _engine_address_from_env() -> tuple[str, dict[str, str]]:
+    """Load the PhariaEngine address and the authentication headers from the environment."""
+    load_dotenv()
+    engine_address = os.environ["PHARIA_KERNEL_ADDRESS"]
+
+    # Authentication for PhariaEngine is optional.
+    headers = {}
+    if token := os.environ.get("PHARIA_AI_TOKEN"):
+        headers["Authorization"] = f"Bearer {token}"
+    return engine_address, headers
+
+
+def _format_error(engine_address: str, status_code: int, error: Any) -> str:
+    return (
+        "Error resolving the Csi request against the Engine.\n"
+        "This could mean that some environment variables are not set correctly.\n"
+        "Please check the values set for `PHARIA_KERNEL_ADDRESS` and `PHARIA_AI_TOKEN`.\n"
+        f"PHARIA_KERNEL_ADDRESS: {engine_address}\n"
+        f"Status Code: {status_code} {HTTPStatus(status_code).phrase}\n"
+        f"Original Error: {error}"
+    )
+
+
+def _raise_for_auth_status(status_code: int) -> None:
+    if status_code == 401:
+        raise Exception(
+            "Unauthenticated: Please set the `PHARIA_AI_TOKEN` environment variable."
+        )
+    if status_code == 403:
+        raise Exception(
+            "Unauthorized: Please check the `PHARIA_AI_TOKEN` environment variable."
+        )
+
+
+class Client(RawCsiClient):
     """Make requests with a given payload against a running PhariaEngine."""
 
-    HTTP_CSI_VERSION = "v1"
+    HTTP_CSI_VERSION = HTTP_CSI_VERSION
 
     def __init__(self) -> None:
         """Create a new HTTP client.
 
         The session is stored to allow for re-use of the same connection between tests.
         """
-        load_dotenv()
-        self.engine_address = os.environ["PHARIA_KERNEL_ADDRESS"]
+        self.engine_address, headers = _engine_address_from_env()
         self.url = f"{self.engine_address}/csi/{self.HTTP_CSI_VERSION}"
         self.session = requests.Session()
-
-        # Authentication for PhariaEngine is optional.
-        if token := os.environ.get("PHARIA_AI_TOKEN"):
-            self.session.headers = {
-                "Authorization": f"Bearer {token}",
-            }
+        self.session.headers.update(headers)
 
     def __del__(self) -> None:
         if hasattr(self, "session"):
@@ -61,6 +116,16 @@ class Client(CsiClient):
         self._raise_for_status(response)
         return response.json()
 
+    def run_raw(self, function: str, body: bytes) -> bytes:
+        url = f"{self.url}/{function}"
+        response = self.session.post(
+            url,
+            data=body,
+            headers={"Content-Type": "application/json"},
+        )
+        self._raise_for_status(response)
+        return response.content
+
     def stream(
         self, function: str, data: dict[str, Any]
     ) -> Generator[Event, None, None]:
@@ -71,77 +136,120 @@ class Client(CsiClient):
         return EngineStreamDeserializer(response).events()
 
     def _raise_for_status(self, response: requests.Response) -> None:
-        if response.status_code == 401:
-            raise Exception(
-                "Unauthenticated: Please set the `PHARIA_AI_TOKEN` environment variable."
-            )
-        if response.status_code == 403:
-            raise Exception(
-                "Unauthorized: Please check the `PHARIA_AI_TOKEN` environment variable."
-            )
+        _raise_for_auth_status(response.status_code)
         if response.status_code >= 400:
             try:
                 error = response.json()
             except requests.JSONDecodeError:
                 error = response.text
-            raise Exception(self.format_error(response.status_code, error))
+            raise EngineError(
+                self.format_error(response.status_code, error), response.status_code
+            )
 
     def format_error(self, status_code: int, error: Any) -> str:
-        return (
-            "Error resolving the Csi request against the Engine.\n"
-            "This could mean that some environment variables are not set correctly.\n"
-            "Please check the values set for `PHARIA_KERNEL_ADDRESS` and `PHARIA_AI_TOKEN`.\n"
-            f"PHARIA_KERNEL_ADDRESS: {self.engine_address}\n"
-            f"Status Code: {status_code} {HTTPStatus(status_code).phrase}\n"
-            f"Original Error: {error}"
+        return _format_error(self.engine_address, status_code, error)
+
+
+class AsyncClient(AsyncCsiClient):
+    """Make non-blocking requests with a given payload against a running PhariaEngine.
+
+    All requests share one connection pool, so many requests can be in flight on the
+    same event loop. As the underlying `httpx.AsyncClient` is bound to the event loop it
+    is first used on, the client should not be shared between event loops.
+
+    Args:
+        max_connections: Maximum number of concurrent connections to the Engine.
+    """
+
+    def __init__(self, max_connections: int | None = 100) -> None:
+        self.engine_address, headers = _engine_address_from_env()
+        self.url = f"{self.engine_address}/csi/{HTTP_CSI_VERSION}"
+        # Inference requests may take arbitrarily long, so we do not impose a timeout,
+        # in line with the behavior of the blocking `Client`.
+        self.session = httpx.AsyncClient(
+            headers=headers,
+            timeout=None,
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_connections,
+            ),
+        )
+
+    async def aclose(self) -> None:
+        await self.session.aclose()
+
+    async def run(self, function: str, data: Any) -> Any:
+        url = f"{self.url}/{function}"
+        response = await self.session.post(url, json=data)
+        self._raise_for_status(response)
+        return response.json()
+
+    async def stream(
+        self, function: str, data: dict[str, Any]
+    ) -> AsyncGenerator[Event, None]:
+        url = f"{self.url}/{function}"
+        request = self.session.build_request(
+            "POST", url, json=data, headers={"Accept": "text/event-stream"}
         )
+        response = await self.session.send(request, stream=True)
+        if response.status_code >= 400:
+            await response.aread()
+            await response.aclose()
+        self._raise_for_status(response)
+        return AsyncEngineStreamDeserializer(response).events()
+
+    def _raise_for_status(self, response: httpx.Response) -> None:
+        _raise_for_auth_status(response.status_code)
+        if response.status_code >= 400:
+            try:
+                error = response.json()
+            except json.JSONDecodeError:
+                error = response.text
+            raise EngineError(
+                _format_error(self.engine_address, response.status_code, error),
+                response.status_code,
+            )
 
 
 class EngineStreamDeserializer:
     def __init__(self, response: requests.Response) -> None:
         self.response = response
 
-    def _read(self) -> Generator[bytes, None, None]:
-        """Read the incoming event source stream and yield event chunks.
-
-        Unfortunately it is possible for some servers to decide to break an
-        event into multiple HTTP chunks in the response. It is thus necessary
-        to correctly stitch together consecutive response chunks and find the
-        SSE delimiter (empty new line) to yield full, correct event chunks."""
-        data = b""
-        for chunk in self.response:
-            for line in chunk.splitlines(True):
-                data += line
-                if data.endswith((b"\r\r", b"\n\n", b"\r\n\r\n")):
-                    yield data
-                    data = b""
-        if data:
-            yield data
-
     def events(self) -> Generator[Event, None, None]:
         """Yield events from the engine stream.
 
+        Unfortunately it is possible for some servers to decide to break an event into
+        multiple HTTP chunks in the response. The `EventStreamParser` takes care of
+        stitching consecutive chunks together. Chunks are consumed as they arrive
+        instead of being split into fixed-size pieces.
+
         This method does not raise on error events, but rather deserializes them and
-        leaves it to the caller to raise an exception.
+        leaves it to the caller to raise an exception. The connection is released once
+        the stream ends or the generator is closed.
         """
-        for stream_item in self._read():
-            text = stream_item.decode().strip()
-            if not text:
-                continue
-
-            # Engine events always have this format:
-            # event: <event>
-            # data: <data>
-            if "\n" not in text:
-                raise ValueError(f"Unexpected event format: {text}")
-            first_line, remaining = text.split("\n", 1)
-
-            if not first_line.startswith("event: "):
-                raise ValueError(f"Unexpected event prefix: {first_line}")
-            event = first_line.split("event: ", 1)[1]
-
-            if not remaining.startswith("data: "):
-                raise ValueError(f"Unexpected data prefix: {remaining}")
-            data = remaining.split("data: ", 1)[1]
-
-            yield Event(event=event, data=json.loads(data))
+        parser = EventStreamParser()
+        try:
+            for chunk in self.response.iter_content(chunk_size=None):
+                yield from parser.feed(chunk)
+            yield from parser.finish()
+        finally:
+            self.response.close()
+
+
+class AsyncEngineStreamDeserializer:
+    """Asynchronous counterpart of the `EngineStreamDeserializer`."""
+
+    def __init__(self, response: httpx.Response) -> None:
+        self.response = response
+
+    async def events(self) -> AsyncGenerator[Event, None]:
+        """Yield events from the engine stream and release the connection at the end."""
+        parser = EventStreamParser()
+        try:
+            async for chunk in self.response.aiter_bytes():
+                for event in parser.feed(chunk):
+                    yield event
+            for event in parser.finish():
+                yield event
+        finally:
+            await self.response.aclose()
@@ -8,27 +8,37 @@ uncoupling these interfaces brings two advantages:
 2. We can use Pydantic models for serialization/deserialization without exposing these to the SDK users. We prefer dataclasses as they do not require keyword arguments for setup.
 """
 
+import contextvars
+import functools
 import json
 import os
-from collections.abc import Generator
-from typing import Any, Sequence
+import time
+from collections.abc import Callable, Generator
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+from typing import Any, Sequence, TypeVar
 
+import requests
 from opentelemetry import trace
 from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
 from opentelemetry.sdk.environment_variables import OTEL_EXPORTER_OTLP_ENDPOINT
 from opentelemetry.sdk.trace import TracerProvider
 from opentelemetry.sdk.trace.export import SimpleSpanProcessor, SpanExporter
 from opentelemetry.trace import StatusCode
+from pydantic import TypeAdapter
+from pydantic_core import from_json, to_json
 
 from pharia_skill import (
     ChatParams,
     ChatRequest,
     ChatResponse,
+    ChatStreams,
     Chunk,
     ChunkRequest,
     Completion,
     CompletionParams,
     CompletionRequest,
+    CompletionStreams,
     Csi,
     Document,
     DocumentPath,
@@ -40,34 +50,40 @@ from pharia_skill import (
     SearchResult,
     SelectLanguageRequest,
     Tool,
+    ToolRegistry,
     ToolResult,
 )
 from pharia_skill.csi.inference import ChatStreamResponse, CompletionStreamResponse
+from pharia_skill.csi.inference.multiplex import _interleave, _open_streams
 from pharia_skill.studio import StudioClient
 from pharia_skill.testing.dev.logfire import set_logfire_attributes
 
-from .chunking import ChunkDeserializer, ChunkRequestSerializer
-from .client import Client, CsiClient, Event
+from .chunking import ChunkListAdapter, ChunkRequestListAdapter
+from .client import Client, CsiClient, EngineError, Event, RawCsiClient
 from .document_index import (
-    DocumentDeserializer,
-    DocumentMetadataDeserializer,
-    DocumentMetadataSerializer,
-    DocumentSerializer,
-    SearchRequestSerializer,
-    SearchResultDeserializer,
+    DocumentListAdapter,
+    DocumentMetadataListAdapter,
+    DocumentPathListAdapter,
+    SearchRequestListAdapter,
+    SearchResultListAdapter,
 )
+from .export import BackgroundExporter
 from .inference import (
-    ChatListDeserializer,
-    ChatRequestListSerializer,
+    ChatListAdapter,
+    ChatRequestListAdapter,
     ChatRequestSerializer,
-    CompletionListDeserializer,
-    CompletionRequestListSerializer,
+    CompletionListAdapter,
+    CompletionRequestListAdapter,
     CompletionRequestSerializer,
     DevChatStreamResponse,
     DevCompletionStreamResponse,
 )
-from .language import SelectLanguageDeserializer, SelectLanguageRequestSerializer
+from .language import SelectLanguageListAdapter, SelectLanguageRequestListAdapter
 from .tool import deserialize_tool_output, deserialize_tools, serialize_tool_requests
+from .tracing import CAPTURE_ALL, TracingPolicy
+
+T = TypeVar("T")
+Response = TypeVar("Response")
 
 
 class DevCsi(Csi):
@@ -81,10 +97,25 @@ class DevCsi(Csi):
     traces to PhariaStudio, simply provide a project name on construction. If not set,
     a default exporter will be loaded from the corresponding environment variables.
 
+    Large lists passed to the `*_concurrent` methods can be split into sub-batches of
+    at most `max_batch_size` items. The sub-batches are sent to the Engine in parallel
+    and the results are reassembled in the order of the requests. Each sub-batch is
+    retried on its own if the Engine is temporarily unavailable.
+
+    Only requests that can safely be sent twice are retried. Tool invocations may have
+    side effects, so a failed `invoke_tool` request is never retried.
+
     Args:
         namespace: The namespace to use for tool invocations.
         project: The name of the studio project to export traces to.
             Will be created if it does not exist.
+        max_batch_size: Maximum number of items sent to the Engine in one request.
+            If not set, all items are sent in a single request.
+        max_parallel_batches: Maximum number of sub-batches in flight at the same time.
+        max_retries: How often a request is retried after a transient failure, e.g.
+            a gateway timeout or a connection error. Tool invocations are never retried.
+        tracing: Which request and response payloads are recorded on the spans.
+            By default, all payloads are recorded in full.
 
     Examples::
 
@@ -118,11 +149,24 @@ class DevCsi(Csi):
     basic auth string.
     """
 
+    RETRY_BACKOFF = 0.5
+    """Seconds to wait before the first retry, doubled for every further attempt."""
+
+    _tool_registry: ToolRegistry | None = None
+
     def __init__(
-        self, namespace: str | None = None, project: str | None = None
+        self,
+        namespace: str | None = None,
+        project: str | None = None,
+        max_batch_size: int | None = None,
+        max_parallel_batches: int = 4,
+        max_retries: int = 2,
+        tracing: TracingPolicy | None = None,
     ) -> None:
         self.client: CsiClient = Client()
         self._namespace = namespace
+        self._configure_batching(max_batch_size, max_parallel_batches, max_retries)
+        self.tracing = tracing or CAPTURE_ALL
 
         if project is not None:
             studio_client = StudioClient.with_project(project)
@@ -132,7 +176,14 @@ class DevCsi(Csi):
             self.set_span_exporter(OTLPSpanExporter())
 
     @classmethod
-    def _with_client(cls, client: CsiClient) -> "DevCsi":
+    def _with_client(
+        cls,
+        client: CsiClient,
+        max_batch_size: int | None = None,
+        max_parallel_batches: int = 4,
+        max_retries: int = 2,
+        tracing: TracingPolicy | None = None,
+    ) -> "DevCsi":
         """Create a `DevCsi` with a custom client, bypassing environment variable requirements.
 
         This is primarily useful for testing, where you can inject a mock client
@@ -141,8 +192,23 @@ class DevCsi(Csi):
         # Create instance without calling __init__ to avoid Client() construction
         instance = cls.__new__(cls)
         instance.client = client
+        instance._configure_batching(max_batch_size, max_parallel_batches, max_retries)
+        instance.tracing = tracing or CAPTURE_ALL
         return instance
 
+    def _configure_batching(
+        self, max_batch_size: int | None, max_parallel_batches: int, max_retries: int
+    ) -> None:
+        if max_batch_size is not None and max_batch_size < 1:
+            raise ValueError("`max_batch_size` must be at least 1.")
+        if max_parallel_batches < 1:
+            raise ValueError("`max_parallel_batches` must be at least 1.")
+        if max_retries < 0:
+            raise ValueError("`max_retries` must not be negative.")
+        self._max_batch_size = max_batch_size
+        self._max_parallel_batches = max_parallel_batches
+        self._max_retries = max_retries
+
     def _namespace_or_raise(self) -> str:
         """Raise an error if the namespace is not set."""
         if self._namespace is None:
@@ -165,6 +231,12 @@ class DevCsi(Csi):
         output = self.run("list_tools", body)
         return deserialize_tools(output)
 
+    def tool_registry(self) -> ToolRegistry:
+        """The cached tools of the namespace, prefetched on a background thread."""
+        if self._tool_registry is None:
+            self._tool_registry = ToolRegistry(self.list_tools, background=True)
+        return self._tool_registry
+
     def _completion_stream(
         self, model: str, prompt: str, params: CompletionParams
     ) -> CompletionStreamResponse:
@@ -176,9 +248,10 @@ class DevCsi(Csi):
         span_name = f"text_completion {model}"
         span = trace.get_tracer(__name__).start_span(span_name)
         request = CompletionRequest(model, prompt, params)
-        span.set_attributes(request.as_gen_ai_otel_attributes())
+        payloads = self.tracing.payloads(span, "completion_stream")
+        payloads.set_gen_ai_attributes(request)
         events = self.stream("completion_stream", body, span)
-        return DevCompletionStreamResponse(events, span)
+        return DevCompletionStreamResponse(events, span, payloads)
 
     def _chat_stream(
         self,
@@ -194,9 +267,38 @@ class DevCsi(Csi):
         # for conventions around span names.
         span_name = f"chat {model}"
         span = trace.get_tracer(__name__).start_span(span_name)
-        span.set_attributes(request.as_gen_ai_otel_attributes())
+        payloads = self.tracing.payloads(span, "chat_stream")
+        payloads.set_gen_ai_attributes(request)
         events = self.stream("chat_stream", body, span)
-        return DevChatStreamResponse(events, span, request)
+        return DevChatStreamResponse(events, span, request, payloads)
+
+    def completion_stream_concurrent(
+        self, requests: Sequence[CompletionRequest]
+    ) -> CompletionStreams:
+        """Stream the completions of multiple prompts on parallel connections.
+
+        The events are yielded in the order in which they arrive from the Engine.
+        """
+        responses = _open_streams(
+            lambda r: self._completion_stream(r.model, r.prompt, r.params),
+            requests,
+            self._max_parallel_batches,
+        )
+        return CompletionStreams(
+            responses, _interleave(responses, CompletionStreamResponse._read)
+        )
+
+    def chat_stream_concurrent(self, requests: Sequence[ChatRequest]) -> ChatStreams:
+        """Stream the responses to multiple chat requests on parallel connections.
+
+        The events are yielded in the order in which they arrive from the Engine.
+        """
+        responses = _open_streams(
+            lambda r: self._chat_stream(r.model, r.messages, r.params),
+            requests,
+            self._max_parallel_batches,
+        )
+        return ChatStreams(responses, _interleave(responses, ChatStreamResponse.next))
 
     def chat_concurrent(self, requests: Sequence[ChatRequest]) -> list[ChatResponse]:
         """Generate model responses for a list of chat requests concurrently.
@@ -208,27 +310,28 @@ class DevCsi(Csi):
         See <https://opentelemetry.io/docs/specs/semconv/registry/attributes/gen-ai/#genai-attributes>
         for more details.
         """
-        body = ChatRequestListSerializer(root=requests).model_dump()
-
         # See https://github.com/open-telemetry/semantic-conventions/blob/v1.37.0/docs/gen-ai/gen-ai-spans.md
         # for conventions around span names.
         span_name = f"chat {requests[0].model}" if len(requests) == 1 else "chat"
         with trace.get_tracer(__name__).start_as_current_span(span_name) as span:
+            payloads = self.tracing.payloads(span, "chat")
             if len(requests) == 1:
-                span.set_attributes(requests[0].as_gen_ai_otel_attributes())
-            else:
-                span.set_attribute("input", json.dumps(body))
+                payloads.set_gen_ai_attributes(requests[0])
             try:
-                output = self.client.run("chat", body)
-                response = ChatListDeserializer(root=output).root
+                response, body, output = self._run_json(
+                    "chat", requests, ChatRequestListAdapter, ChatListAdapter
+                )
             except Exception as e:
                 span.set_status(StatusCode.ERROR, str(e))
                 raise e
             if len(response) == 1:
-                set_logfire_attributes(span, requests[0].messages, response[0].message)
-                span.set_attributes(response[0].as_gen_ai_otel_attributes())
+                set_logfire_attributes(
+                    payloads, requests[0].messages, response[0].message
+                )
+                payloads.set_gen_ai_attributes(response[0])
             else:
-                span.set_attribute("output", json.dumps(output))
+                payloads.set("input", body)
+                payloads.set("output", output)
             return response
 
     def complete_concurrent(
@@ -240,7 +343,6 @@ class DevCsi(Csi):
         out how to do tracing for multiple requests, we can at least provide some GenAI
         specific attributes for the single request case.
         """
-        body = CompletionRequestListSerializer(root=requests).model_dump()
         # See https://github.com/open-telemetry/semantic-conventions/blob/v1.37.0/docs/gen-ai/gen-ai-spans.md
         # for conventions around span names.
         span_name = (
@@ -249,64 +351,95 @@ class DevCsi(Csi):
             else "text_completion"
         )
         with trace.get_tracer(__name__).start_as_current_span(span_name) as span:
+            payloads = self.tracing.payloads(span, "complete")
             if len(requests) == 1:
-                span.set_attributes(requests[0].as_gen_ai_otel_attributes())
-            else:
-                span.set_attribute("input", json.dumps(body))
+                payloads.set_gen_ai_attributes(requests[0])
             try:
-                output = self.client.run("complete", body)
-                response = CompletionListDeserializer(root=output).root
+                response, body, output = self._run_json(
+                    "complete",
+                    requests,
+                    CompletionRequestListAdapter,
+                    CompletionListAdapter,
+                )
             except Exception as e:
                 span.set_status(StatusCode.ERROR, str(e))
                 raise e
             if len(response) == 1:
-                span.set_attributes(response[0].as_gen_ai_otel_attributes())
+                payloads.set_gen_ai_attributes(response[0])
             else:
-                span.set_attribute("output", json.dumps(output))
+                payloads.set("input", body)
+                payloads.set("output", output)
             return response
 
     def chunk_concurrent(self, requests: Sequence[ChunkRequest]) -> list[list[Chunk]]:
-        body = ChunkRequestSerializer(root=requests).model_dump()
-        output = self.run("chunk_with_offsets", body)
-        return ChunkDeserializer(root=output).root
+        return self._run_traced(
+            "chunk_with_offsets",
+            requests,
+            ChunkRequestListAdapter,
+            ChunkListAdapter,
+        )
 
     def select_language_concurrent(
         self, requests: Sequence[SelectLanguageRequest]
     ) -> list[Language | None]:
-        body = SelectLanguageRequestSerializer(root=requests).model_dump()
-        output = self.run("select_language", body)
-        return SelectLanguageDeserializer(root=output).root
+        return self._run_traced(
+            "select_language",
+            requests,
+            SelectLanguageRequestListAdapter,
+            SelectLanguageListAdapter,
+        )
 
     def search_concurrent(
         self, requests: Sequence[SearchRequest]
     ) -> list[list[SearchResult]]:
-        body = SearchRequestSerializer(root=requests).model_dump()
-        output = self.run("search", body)
-        return SearchResultDeserializer(root=output).root
+        return self._run_traced(
+            "search", requests, SearchRequestListAdapter, SearchResultListAdapter
+        )
 
     def documents_metadata(
         self, document_paths: Sequence[DocumentPath]
     ) -> list[JsonSerializable | None]:
-        body = DocumentMetadataSerializer(root=document_paths).model_dump()
-        output = self.run("document_metadata", body)
-        return DocumentMetadataDeserializer(root=output).root
+        return self._run_traced(
+            "document_metadata",
+            document_paths,
+            DocumentPathListAdapter,
+            DocumentMetadataListAdapter,
+        )
 
     def documents(self, document_paths: Sequence[DocumentPath]) -> list[Document]:
-        body = DocumentSerializer(root=document_paths).model_dump()
-        output = self.run("documents", body)
-        return DocumentDeserializer(root=output).root
+        return self._run_traced(
+            "documents", document_paths, DocumentPathListAdapter, DocumentListAdapter
+        )
 
     @classmethod
-    def set_span_exporter(cls, exporter: SpanExporter) -> None:
+    def set_span_exporter(
+        cls, exporter: SpanExporter, background: bool = False
+    ) -> None:
         """Set a span exporter for Studio if it has not been set yet.
 
         This method overwrites any existing exporters, thereby ensuring that there
-        are never two exporters to Studio attached at the same time.
+        are never two exporters to Studio attached at the same time. A replaced
+        `BackgroundExporter` is shut down, which exports its queued spans and stops
+        its worker thread.
+
+        Args:
+            exporter: The exporter that receives the spans of the SDK.
+            background: Export the spans in batches on a background thread instead of
+                on the thread that ends them. Pass a `BackgroundExporter` to configure
+                the queue size, the batch size or the drop policy.
         """
+        if background and not isinstance(exporter, BackgroundExporter):
+            exporter = BackgroundExporter(exporter)
 
         provider = cls.provider()
         for processor in provider._active_span_processor._span_processors:
             if isinstance(processor, PhariaSkillProcessor):
+                previous = processor.span_exporter
+                if (
+                    isinstance(previous, BackgroundExporter)
+                    and previous is not exporter
+                ):
+                    previous.shutdown()
                 processor.span_exporter = exporter
                 return
 
@@ -334,18 +467,159 @@ class DevCsi(Csi):
 
         return trace.get_tracer_provider()  # type: ignore
 
-    def run(self, function: str, data: dict[str, Any]) -> Any:
+    def run(self, function: str, data: Any) -> Any:
         with trace.get_tracer(__name__).start_as_current_span(function) as span:
-            span.set_attribute("input", json.dumps(data))
+            payloads = self.tracing.payloads(span, function)
+            payloads.set("input", lambda: json.dumps(data))
             try:
-                output = self.client.run(function, data)
+                if self._needs_split(data):
+
+                    def send(batch: Any) -> Any:
+                        return self.client.run(function, batch)
+
+                    output = self._run_batched(function, data, send)
+                else:
+                    output = self._run_with_retry(
+                        function, lambda: self.client.run(function, data)
+                    )
             except Exception as e:
                 span.set_status(StatusCode.ERROR, str(e))
                 raise e
-            span.set_attribute("output", json.dumps(output))
+            payloads.set("output", lambda: json.dumps(output))
 
         return output
 
+    def _run_traced(
+        self,
+        function: str,
+        requests: Sequence[Any],
+        serializer: TypeAdapter[Any],
+        deserializer: TypeAdapter[list[Response]],
+    ) -> list[Response]:
+        """Run a batch request in a span that records the raw input and output."""
+        with trace.get_tracer(__name__).start_as_current_span(function) as span:
+            payloads = self.tracing.payloads(span, function)
+            # The body is serialized once, for the request and the input attribute.
+            body = functools.cache(lambda: serializer.dump_json(requests))
+            payloads.set("input", body)
+            try:
+                response, _, output = self._run_json(
+                    function, requests, serializer, deserializer, body
+                )
+            except Exception as e:
+                span.set_status(StatusCode.ERROR, str(e))
+                raise e
+            payloads.set("output", output)
+            return response
+
+    def _run_json(
+        self,
+        function: str,
+        requests: Sequence[Any],
+        serializer: TypeAdapter[Any],
+        deserializer: TypeAdapter[list[Response]],
+        body: Callable[[], bytes] | None = None,
+    ) -> tuple[list[Response], Callable[[], bytes], Callable[[], bytes]]:
+        """Send a batch request to the Engine without building intermediate dicts.
+
+        The requests are serialized straight to JSON bytes and the response is
+        validated from the raw bytes of the HTTP response. The request body and the raw
+        response are returned alongside the results as callables, so they can be reused
+        for span attributes. If the request is split into sub-batches, they are only
+        serialized as a whole once a captured span attribute asks for them.
+
+        Args:
+            body: The serialized requests, if the caller already has them.
+        """
+        if body is None:
+            body = functools.cache(lambda: serializer.dump_json(requests))
+        if not self._needs_split(requests):
+            output = self._run_with_retry(
+                function, lambda: self._run_raw(function, body())
+            )
+            return deserializer.validate_json(output), body, lambda: output
+
+        response = self._run_batched(
+            function,
+            requests,
+            lambda batch: deserializer.validate_json(
+                self._run_raw(function, serializer.dump_json(batch))
+            ),
+        )
+        return response, body, lambda: deserializer.dump_json(response)
+
+    def _run_raw(self, function: str, body: bytes) -> bytes:
+        if isinstance(self.client, RawCsiClient):
+            return self.client.run_raw(function, body)
+        return to_json(self.client.run(function, from_json(body)))
+
+    def _needs_split(self, data: Any) -> bool:
+        size = self._max_batch_size
+        return size is not None and isinstance(data, Sequence) and len(data) > size
+
+    def _run_batched(
+        self,
+        function: str,
+        items: Sequence[T],
+        send: Callable[[Sequence[T]], list[Response]],
+    ) -> list[Response]:
+        """Send a batch request to the Engine in sub-batches of at most `max_batch_size`.
+
+        The bodies of all batch endpoints are lists whose responses have one entry per
+        item, in the same order. Sub-batches can therefore be sent independently and
+        their outputs concatenated.
+        """
+        size = self._max_batch_size
+        assert size is not None
+        batches = [items[i : i + size] for i in range(0, len(items), size)]
+        workers = min(self._max_parallel_batches, len(batches))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            # Each worker runs in a copy of the current context, so that the spans of
+            # the sub-batches are children of the span of the whole request.
+            futures = [
+                executor.submit(
+                    contextvars.copy_context().run,
+                    self._run_sub_batch,
+                    function,
+                    batch,
+                    index,
+                    send,
+                )
+                for index, batch in enumerate(batches)
+            ]
+            return [item for future in futures for item in future.result()]
+
+    def _run_sub_batch(
+        self,
+        function: str,
+        batch: Sequence[T],
+        index: int,
+        send: Callable[[Sequence[T]], list[Response]],
+    ) -> list[Response]:
+        name = f"{function} batch"
+        with trace.get_tracer(__name__).start_as_current_span(name) as span:
+            span.set_attribute("batch.index", index)
+            span.set_attribute("batch.size", len(batch))
+            try:
+                return self._run_with_retry(function, lambda: send(batch))
+            except Exception as e:
+                span.set_status(StatusCode.ERROR, str(e))
+                raise e
+
+    def _run_with_retry(self, function: str, send: Callable[[], T]) -> T:
+        retries = 0 if function in _NOT_RETRIED else self._max_retries
+        for attempt in range(retries + 1):
+            try:
+                return send()
+            except Exception as e:
+                if attempt == retries or not _is_transient(e):
+                    raise e
+                trace.get_current_span().add_event(
+                    "retry", {"attempt": attempt + 1, "error": str(e)}
+                )
+                time.sleep(self.RETRY_BACKOFF * 2**attempt)
+        raise AssertionError("unreachable")
+
     def stream(
         self, function: str, data: dict[str, Any], span: trace.Span
     ) -> Generator[Event, None, None]:
@@ -358,6 +632,9 @@ class DevCsi(Csi):
 
         However, if an error occurs while constructing each one of these classes, we
         need to notify the span about the error in here.
+
+        Closing this generator, e.g. when the stream is cancelled, also closes the
+        stream of the client and with it the connection to the Kernel.
         """
         try:
             events = self.client.stream(function, data)
@@ -366,10 +643,31 @@ class DevCsi(Csi):
             span.end()
             raise e
 
-        for event in events:
-            if event.event == "error":
-                raise ValueError(event.data["message"])
-            yield event
+        try:
+            for event in events:
+                if event.event == "error":
+                    raise ValueError(event.data["message"])
+                yield event
+        finally:
+            events.close()
+
+
+_NOT_RETRIED = frozenset({"invoke_tool"})
+"""CSI functions with side effects, which must not be sent more than once."""
+
+_TRANSIENT_STATUS_CODES = {
+    HTTPStatus.TOO_MANY_REQUESTS,
+    HTTPStatus.BAD_GATEWAY,
+    HTTPStatus.SERVICE_UNAVAILABLE,
+    HTTPStatus.GATEWAY_TIMEOUT,
+}
+
+
+def _is_transient(error: Exception) -> bool:
+    """Whether a failed request may succeed if it is sent again."""
+    if isinstance(error, EngineError):
+        return error.status_code in _TRANSIENT_STATUS_CODES
+    return isinstance(error, (requests.ConnectionError, requests.Timeout))
 
 
 class PhariaSkillProcessor(SimpleSpanProcessor):
@@ -1,6 +1,6 @@
 from typing import Sequence
 
-from pydantic import RootModel
+from pydantic import RootModel, TypeAdapter
 
 from pharia_skill.csi import (
     Document,
@@ -26,3 +26,24 @@ SearchRequestSerializer = RootModel[Sequence[SearchRequest]]
 
 
 SearchResultDeserializer = RootModel[list[list[SearchResult]]]
+
+
+DocumentPathListAdapter: TypeAdapter[Sequence[DocumentPath]] = TypeAdapter(
+    Sequence[DocumentPath]
+)
+
+
+DocumentMetadataListAdapter: TypeAdapter[list[JsonSerializable | None]] = TypeAdapter(
+    list[JsonSerializable | None]
+)
+
+
+DocumentListAdapter = TypeAdapter(list[Document])
+
+
+SearchRequestListAdapter: TypeAdapter[Sequence[SearchRequest]] = TypeAdapter(
+    Sequence[SearchRequest]
+)
+
+
+SearchResultListAdapter = TypeAdapter(list[list[SearchResult]])
@@ -0,0 +1,207 @@
+"""
+Export spans on a background thread instead of the thread that ends them.
+
+The `DevCsi` registers a single `SimpleSpanProcessor`, which hands every span to its
+exporter as soon as the span ends. With an OTLP exporter, this means an HTTP request to
+the collector on the calling thread for every CSI request, every streamed response and
+every traced skill. A `BackgroundExporter` wraps such an exporter: `export` only puts
+the spans into a bounded queue, and a worker thread ships them in batches.
+"""
+
+import atexit
+import logging
+import threading
+import time
+from collections import deque
+from collections.abc import Sequence
+from dataclasses import dataclass, replace
+from enum import Enum
+
+from opentelemetry.context import (
+    _SUPPRESS_INSTRUMENTATION_KEY,
+    attach,
+    detach,
+    set_value,
+)
+from opentelemetry.sdk.trace import ReadableSpan
+from opentelemetry.sdk.trace.export import SpanExporter, SpanExportResult
+
+logger = logging.getLogger(__name__)
+
+
+class DropPolicy(str, Enum):
+    """Which spans are dropped if the queue of a `BackgroundExporter` is full.
+
+    Attributes:
+        NEWEST: Drop the spans that are being added, keeping the queued ones.
+        OLDEST: Drop the longest queued spans to make room for the new ones.
+    """
+
+    NEWEST = "newest"
+    OLDEST = "oldest"
+
+
+@dataclass
+class ExportMetrics:
+    """Counters of a `BackgroundExporter`.
+
+    Attributes:
+        exported: Spans that the wrapped exporter accepted.
+        failed: Spans that the wrapped exporter rejected or raised an error for.
+        dropped: Spans that never reached the wrapped exporter because the queue was
+            full or the exporter has been shut down.
+        batches: Number of calls to the wrapped exporter.
+        export_seconds: Total time spent in the wrapped exporter.
+        max_export_seconds: Longest time a single batch took to export.
+    """
+
+    exported: int = 0
+    failed: int = 0
+    dropped: int = 0
+    batches: int = 0
+    export_seconds: float = 0.0
+    max_export_seconds: float = 0.0
+
+    @property
+    def mean_export_seconds(self) -> float:
+        return self.export_seconds / self.batches if self.batches else 0.0
+
+
+class BackgroundExporter(SpanExporter):
+    """Queue spans and export them in batches on a background thread.
+
+    Pending spans are flushed when the interpreter exits, when `force_flush` is called
+    and when the exporter is shut down.
+
+    Args:
+        exporter: The exporter that ships the spans, e.g. an `OTLPSpanExporter`.
+        max_queue_size: Maximum number of spans waiting to be exported.
+        max_batch_size: Maximum number of spans passed to the wrapped exporter at once.
+        schedule_delay: Seconds to wait for a batch to fill up before exporting it.
+        drop: Which spans to drop once the queue is full.
+
+    Examples::
+
+        exporter = BackgroundExporter(OTLPSpanExporter(), drop=DropPolicy.OLDEST)
+        DevCsi.set_span_exporter(exporter)
+        ...
+        print(exporter.metrics.dropped, exporter.metrics.mean_export_seconds)
+    """
+
+    def __init__(
+        self,
+        exporter: SpanExporter,
+        max_queue_size: int = 2048,
+        max_batch_size: int = 512,
+        schedule_delay: float = 0.5,
+        drop: DropPolicy = DropPolicy.NEWEST,
+    ):
+        if max_queue_size < 1 or max_batch_size < 1:
+            raise ValueError("`max_queue_size` and `max_batch_size` must be positive.")
+        if schedule_delay < 0:
+            raise ValueError("`schedule_delay` must not be negative.")
+        self.exporter = exporter
+        self.max_queue_size = max_queue_size
+        self.max_batch_size = max_batch_size
+        self.schedule_delay = schedule_delay
+        self.drop = drop
+        self._queue: deque[ReadableSpan] = deque()
+        self._condition = threading.Condition()
+        # Serializes calls to the wrapped exporter between the worker and flushes.
+        self._export_lock = threading.Lock()
+        self._metrics = ExportMetrics()
+        self._worker: threading.Thread | None = None
+        self._shutdown = False
+        atexit.register(self._flush_at_exit)
+
+    @property
+    def metrics(self) -> ExportMetrics:
+        """A snapshot of the export counters."""
+        with self._condition:
+            return replace(self._metrics)
+
+    def export(self, spans: Sequence[ReadableSpan]) -> SpanExportResult:
+        with self._condition:
+            if self._shutdown:
+                self._metrics.dropped += len(spans)
+                return SpanExportResult.FAILURE
+            for span in spans:
+                if len(self._queue) >= self.max_queue_size:
+                    self._metrics.dropped += 1
+                    if self.drop == DropPolicy.NEWEST:
+                        continue
+                    self._queue.popleft()
+                self._queue.append(span)
+            if self._worker is None:
+                self._worker = threading.Thread(
+                    target=self._work, name="pharia-skill-span-export", daemon=True
+                )
+                self._worker.start()
+            if len(self._queue) >= self.max_batch_size:
+                self._condition.notify()
+        return SpanExportResult.SUCCESS
+
+    def force_flush(self, timeout_millis: int = 30000) -> bool:
+        """Export all queued spans on the calling thread."""
+        deadline = time.monotonic() + timeout_millis / 1000
+        while self._export_batch():
+            if time.monotonic() > deadline:
+                return False
+        return self.exporter.force_flush(timeout_millis)
+
+    def shutdown(self) -> None:
+        with self._condition:
+            if self._shutdown:
+                return
+            self._shutdown = True
+            self._condition.notify()
+        atexit.unregister(self._flush_at_exit)
+        if self._worker is not None:
+            self._worker.join()
+        self.force_flush()
+        self.exporter.shutdown()
+
+    def _flush_at_exit(self) -> None:
+        self.force_flush()
+
+    def _work(self) -> None:
+        while True:
+            with self._condition:
+                self._condition.wait_for(
+                    lambda: self._shutdown or len(self._queue) >= self.max_batch_size,
+                    timeout=self.schedule_delay,
+                )
+                if self._shutdown:
+                    return
+            while self._export_batch():
+                pass
+
+    def _export_batch(self) -> bool:
+        """Export up to one batch of queued spans and tell if there were any."""
+        with self._export_lock:
+            with self._condition:
+                count = min(len(self._queue), self.max_batch_size)
+                batch = [self._queue.popleft() for _ in range(count)]
+            if not batch:
+                return False
+            # Do not trace the HTTP requests of the exporter itself.
+            token = attach(set_value(_SUPPRESS_INSTRUMENTATION_KEY, True))
+            start = time.perf_counter()
+            try:
+                success = self.exporter.export(batch) == SpanExportResult.SUCCESS
+            except Exception:
+                logger.exception("Exception while exporting spans.")
+                success = False
+            finally:
+                detach(token)
+            duration = time.perf_counter() - start
+        with self._condition:
+            metrics = self._metrics
+            if success:
+                metrics.exported += len(batch)
+            else:
+                metrics.failed += len(batch)
+            metrics.batches += 1
+            metrics.export_seconds += duration
+            metrics.max_export_seconds = max(metrics.max_export_seconds, duration)
+        return True
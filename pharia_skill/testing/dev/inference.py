@@ -1,14 +1,16 @@
 import datetime as dt
 import json
-from collections.abc import Generator
+from collections.abc import AsyncGenerator, Generator
 from types import TracebackType
-from typing import Sequence
+from typing import Any, Sequence
 
 from opentelemetry import trace
 from opentelemetry.trace import StatusCode
 from pydantic import BaseModel, RootModel, TypeAdapter
 
 from pharia_skill.csi.inference import (
+    AsyncChatStreamResponse,
+    AsyncCompletionStreamResponse,
     ChatEvent,
     ChatParams,
     ChatRequest,
@@ -31,6 +33,7 @@ from pharia_skill.csi.inference import (
 from pharia_skill.csi.inference.types import Role
 from pharia_skill.testing.dev.client import Event
 from pharia_skill.testing.dev.logfire import set_logfire_attributes
+from pharia_skill.testing.dev.tracing import CAPTURE_ALL, SpanPayloads
 
 LANGFUSE_COMPLETION_START_TIME = "langfuse.observation.completion_start_time"
 """Setting this attribute allows Langfuse to show the time to first token.
@@ -41,61 +44,166 @@ GenAI OTel conventions. Looking at the Langfuse codebase, they also check for th
 set by the Vercel SDK.
 """
 
+STREAM_CANCELLED = "pharia.stream.cancelled"
+"""Set on the span of a stream that the Skill cancelled before it ended.
+
+The output recorded on such a span only contains the events read before the
+cancellation, and there is no finish reason or usage.
+"""
+
+
+class CompletionSpanRecorder:
+    """Record the events of a completion stream on a span.
+
+    Shared between the blocking and the asyncio implementation of the completion stream.
+    The text is accumulated as a list of parts and only joined when it is written to the
+    span, which happens as often as the `StreamUpdates` of the tracing policy allow, and
+    once more when the span ends.
+    """
+
+    def __init__(self, span: trace.Span, payloads: SpanPayloads | None = None):
+        self.span = span
+        self.payloads = payloads or CAPTURE_ALL.payloads(span, "completion_stream")
+        self._parts: list[str] = []
+        self._throttle = self.payloads.throttle()
+        self._stale = False
+
+    @property
+    def text(self) -> str:
+        """The text received so far."""
+        if len(self._parts) > 1:
+            self._parts = ["".join(self._parts)]
+        return self._parts[0] if self._parts else ""
+
+    def record(self, completion_event: CompletionEvent) -> None:
+        match completion_event:
+            case CompletionAppend(text, _logprobs):
+                if not self._parts:
+                    self.span.set_attribute(
+                        LANGFUSE_COMPLETION_START_TIME,
+                        json.dumps(dt.datetime.now(dt.UTC).isoformat()),
+                    )
+                self._parts.append(text)
+            case TokenUsage():
+                self.span.set_attributes(completion_event.as_gen_ai_otel_attributes())
+            case FinishReason():
+                self.span.set_attributes(completion_event.as_gen_ai_otel_attributes())
+
+        self._stale = True
+        if self._throttle.tick():
+            self.flush()
+
+    def flush(self) -> None:
+        """Write the text received so far to the span."""
+        if self._stale:
+            self._stale = False
+            self.payloads.set("gen_ai.content.completion", lambda: self.text)
+
+    def end(self) -> None:
+        self.flush()
+        self.span.end()
+
+    def exit(self, exc_type: type[BaseException] | None, exc_value: Any) -> None:
+        if exc_type is not None:
+            self.span.set_status(StatusCode.ERROR, str(exc_value))
+        self.end()
+
 
 class DevCompletionStreamResponse(CompletionStreamResponse):
-    def __init__(self, stream: Generator[Event, None, None], span: trace.Span):
+    def __init__(
+        self,
+        stream: Generator[Event, None, None],
+        span: trace.Span,
+        payloads: SpanPayloads | None = None,
+    ):
         self._stream = stream
         self.span = span
-        self.text: str = ""
+        self._recorder = CompletionSpanRecorder(span, payloads)
         super().__init__()
 
+    @property
+    def text(self) -> str:
+        return self._recorder.text
+
     def __exit__(
         self,
         exc_type: type[BaseException] | None,
         exc_value: BaseException | None,
         traceback: TracebackType | None,
     ) -> bool | None:
-        if exc_type is not None:
-            self.span.set_status(StatusCode.ERROR, str(exc_value))
-        self.span.end()
+        self._recorder.exit(exc_type, exc_value)
         return super().__exit__(exc_type, exc_value, traceback)
 
+    def cancel(self) -> None:
+        """Close the connection to the Kernel and mark the span as cancelled."""
+        if not self._cancelled:
+            self._stream.close()
+            self.span.set_attribute(STREAM_CANCELLED, True)
+        super().cancel()
+
     def next(self) -> CompletionEvent | None:
         """Development implementation of the `next` method.
 
         We can not rely on the user to consume the entire stream. Therefore, the span
-        output is updated on iteration.
+        output is also written when the response is exited.
         """
         if (event := next(self._stream, None)) is None:
             # Ending the span here potentially conflicts with ending the span in the
             # `__exit__` method. However, not all users use this class as a context
             # manager, and we also want to end the span for them, and most span
             # implementations are forgiving about ending the span multiple times.
-            self.span.end()
+            self._recorder.end()
             return None
 
         completion_event = completion_event_from_sse(event)
-        match completion_event:
-            case CompletionAppend(text, _logprobs):
-                if not self.text:
-                    self.span.set_attribute(
-                        LANGFUSE_COMPLETION_START_TIME,
-                        json.dumps(dt.datetime.now(dt.UTC).isoformat()),
-                    )
-                self.text += text
-            case TokenUsage():
-                self.span.set_attributes(completion_event.as_gen_ai_otel_attributes())
-            case FinishReason():
-                self.span.set_attributes(completion_event.as_gen_ai_otel_attributes())
+        self._recorder.record(completion_event)
+        return completion_event
+
+
+class AsyncDevCompletionStreamResponse(AsyncCompletionStreamResponse):
+    """Asyncio implementation of the `DevCompletionStreamResponse`."""
+
+    def __init__(
+        self,
+        stream: AsyncGenerator[Event, None],
+        span: trace.Span,
+        payloads: SpanPayloads | None = None,
+    ):
+        self._stream = stream
+        self.span = span
+        self._recorder = CompletionSpanRecorder(span, payloads)
+
+    @property
+    def text(self) -> str:
+        return self._recorder.text
 
-        self.span.set_attribute("gen_ai.content.completion", self.text)
+    async def __aexit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> bool | None:
+        self._recorder.exit(exc_type, exc_value)
+        return await super().__aexit__(exc_type, exc_value, traceback)
+
+    async def next(self) -> CompletionEvent | None:
+        if (event := await anext(self._stream, None)) is None:
+            self._recorder.end()
+            return None
+
+        completion_event = completion_event_from_sse(event)
+        self._recorder.record(completion_event)
         return completion_event
 
 
 def completion_event_from_sse(event: Event) -> CompletionEvent:
     match event.event:
         case "append":
-            return TypeAdapter(CompletionAppend).validate_python(event.data)
+            # Appends without logprobs are the common case and cheap to check by hand.
+            text, logprobs = event.data.get("text"), event.data.get("logprobs")
+            if type(text) is str and logprobs == []:
+                return CompletionAppend._trusted(text, [])
+            return CompletionAppendAdapter.validate_python(event.data)
         case "end":
             return FinishReasonDeserializer.model_validate(event.data).finish_reason
         case "usage":
@@ -104,6 +212,80 @@ def completion_event_from_sse(event: Event) -> CompletionEvent:
             raise ValueError(f"Unexpected event type: {event.event}")
 
 
+class ChatSpanRecorder:
+    """Record the events of a chat stream on a span.
+
+    Shared between the blocking and the asyncio implementation of the chat stream.
+    See `DevChatStreamResponse` for why the accumulation happens in the SDK. The output
+    message is rebuilt as often as the `StreamUpdates` of the tracing policy allow, and
+    once more when the span ends.
+    """
+
+    def __init__(
+        self,
+        span: trace.Span,
+        request: ChatRequest,
+        payloads: SpanPayloads | None = None,
+    ):
+        self.span = span
+        self.request = request
+        self.payloads = payloads or CAPTURE_ALL.payloads(span, "chat_stream")
+        self.role: str | None = None
+        self.content_buffer: list[MessageAppend] = []
+        self._throttle = self.payloads.throttle()
+        self._stale = False
+
+    def record(self, chat_event: ChatEvent) -> None:
+        match chat_event:
+            case MessageBegin():
+                self.role = chat_event.role
+            case MessageAppend():
+                if not self.content_buffer:
+                    self.span.set_attribute(
+                        LANGFUSE_COMPLETION_START_TIME,
+                        json.dumps(dt.datetime.now(dt.UTC).isoformat()),
+                    )
+                # accumulate the content so we can store the entire response on the span
+                self.content_buffer.append(chat_event)
+            case FinishReason():
+                self.span.set_attributes(chat_event.as_gen_ai_otel_attributes())
+            case TokenUsage():
+                self.span.set_attributes(chat_event.as_gen_ai_otel_attributes())
+
+        self._stale = True
+        if self._throttle.tick():
+            self.flush()
+
+    def flush(self) -> None:
+        """Write the message received so far to the span."""
+        if self._stale:
+            self._stale = False
+            self._update_span_output()
+
+    def end(self) -> None:
+        self.flush()
+        self.span.end()
+
+    def exit(self, exc_type: type[BaseException] | None, exc_value: Any) -> None:
+        if exc_type is not None:
+            self.span.set_status(StatusCode.ERROR, str(exc_value))
+        self.end()
+
+    def _update_span_output(self) -> None:
+        """Construct the already received chat message and store it on the span."""
+        if self.role is not None and self.payloads.enabled:
+            message = Message(Role(self.role), self._received_content())
+            self.payloads.set(
+                "gen_ai.output.messages",
+                lambda: json.dumps([message.as_gen_ai_otel_attributes()]),
+            )
+            set_logfire_attributes(self.payloads, self.request.messages, message)
+
+    def _received_content(self) -> str:
+        """Accumulated content we have received so far."""
+        return "".join([event.content for event in self.content_buffer])
+
+
 class DevChatStreamResponse(ChatStreamResponse):
     """Development implementation of a chat stream response.
 
@@ -131,11 +313,12 @@ class DevChatStreamResponse(ChatStreamResponse):
         stream: Generator[Event, None, None],
         span: trace.Span,
         request: ChatRequest,
+        payloads: SpanPayloads | None = None,
     ):
         self._stream = stream
         self.span = span
         self.request = request
-        self.content_buffer: list[MessageAppend] = []
+        self._recorder = ChatSpanRecorder(span, request, payloads)
         super().__init__()
 
     def __exit__(
@@ -144,79 +327,109 @@ class DevChatStreamResponse(ChatStreamResponse):
         exc_value: BaseException | None,
         traceback: TracebackType | None,
     ) -> bool | None:
-        if exc_type is not None:
-            self.span.set_status(StatusCode.ERROR, str(exc_value))
-        self.span.end()
+        self._recorder.exit(exc_type, exc_value)
         return super().__exit__(exc_type, exc_value, traceback)
 
+    def cancel(self) -> None:
+        """Close the connection to the Kernel and mark the span as cancelled."""
+        if not self._cancelled:
+            self._stream.close()
+            self.span.set_attribute(STREAM_CANCELLED, True)
+        super().cancel()
+
     def _next(self) -> ChatEvent | None:
         """Development implementation of the `next` method.
 
-        We can not rely on the user to consume the entire stream. Therefore, we need to
-        update the span output on each iteration.
+        We can not rely on the user to consume the entire stream. Therefore, the span
+        output is also written when the response is exited.
         """
         if (event := next(self._stream, None)) is None:
             # Ending the span here potentially conflicts with ending the span in the
             # `__exit__` method. However, not all users use this class as a context
             # manager, and we also want to end the span for them, and most span
             # implementations are forgiving about ending the span multiple times.
-            self.span.end()
+            self._recorder.end()
             return None
 
         chat_event = chat_event_from_sse(event)
-        match chat_event:
-            case MessageBegin():
-                self.role = chat_event.role
-            case MessageAppend():
-                if not self.content_buffer:
-                    self.span.set_attribute(
-                        LANGFUSE_COMPLETION_START_TIME,
-                        json.dumps(dt.datetime.now(dt.UTC).isoformat()),
-                    )
-                # accumulate the content so we can store the entire response on the span
-                self.content_buffer.append(chat_event)
-            case FinishReason():
-                self.span.set_attributes(chat_event.as_gen_ai_otel_attributes())
-            case TokenUsage():
-                self.span.set_attributes(chat_event.as_gen_ai_otel_attributes())
-
-        self._update_span_output()
+        if isinstance(chat_event, MessageBegin):
+            self.role = chat_event.role
+        self._recorder.record(chat_event)
         return chat_event
 
-    def _update_span_output(self) -> None:
-        """Construct the already received chat message and store it on the span."""
-        if getattr(self, "role", None) is not None:
-            message = Message(Role(self.role), self._received_content())
-            self.span.set_attribute(
-                "gen_ai.output.messages",
-                json.dumps([message.as_gen_ai_otel_attributes()]),
-            )
-            set_logfire_attributes(self.span, self.request.messages, message)
 
-    def _received_content(self) -> str:
-        """Accumulated content we have received so far."""
-        return "".join([event.content for event in self.content_buffer])
+class AsyncDevChatStreamResponse(AsyncChatStreamResponse):
+    """Asyncio implementation of the `DevChatStreamResponse`."""
+
+    def __init__(
+        self,
+        stream: AsyncGenerator[Event, None],
+        span: trace.Span,
+        request: ChatRequest,
+        payloads: SpanPayloads | None = None,
+    ):
+        self._stream = stream
+        self.span = span
+        self.request = request
+        self._recorder = ChatSpanRecorder(span, request, payloads)
+        super().__init__()
+
+    async def __aexit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> bool | None:
+        self._recorder.exit(exc_type, exc_value)
+        return await super().__aexit__(exc_type, exc_value, traceback)
+
+    async def _next(self) -> ChatEvent | None:
+        if (event := await anext(self._stream, None)) is None:
+            self._recorder.end()
+            return None
+
+        chat_event = chat_event_from_sse(event)
+        if isinstance(chat_event, MessageBegin):
+            self.role = chat_event.role
+        self._recorder.record(chat_event)
+        return chat_event
 
 
 def chat_event_from_sse(event: Event) -> ChatEvent:
     match event.event:
         case "message_begin":
             role = RoleDeserializer.model_validate(event.data).role
-            return MessageBegin(role)
+            return MessageBegin._trusted(role)
         case "reasoning":
-            return TypeAdapter(Reasoning).validate_python(event.data)
+            if type(content := event.data.get("content")) is str:
+                return Reasoning._trusted(content)
+            return ReasoningAdapter.validate_python(event.data)
         case "message_append":
-            return TypeAdapter(MessageAppend).validate_python(event.data)
+            if type(content := event.data.get("content")) is str:
+                return MessageAppend._trusted(content)
+            return MessageAppendAdapter.validate_python(event.data)
         case "message_end":
             return FinishReasonDeserializer.model_validate(event.data).finish_reason
         case "usage":
             return TokenUsageDeserializer.model_validate(event.data).usage
         case "tool_call":
-            return TypeAdapter(ToolCallEvent).validate_python(event.data)
+            return ToolCallEventAdapter.validate_python(event.data)
         case _:
             raise ValueError(f"Unexpected event: {event}")
 
 
+CompletionAppendAdapter = TypeAdapter(CompletionAppend)
+
+
+ReasoningAdapter = TypeAdapter(Reasoning)
+
+
+MessageAppendAdapter = TypeAdapter(MessageAppend)
+
+
+ToolCallEventAdapter = TypeAdapter(ToolCallEvent)
+
+
 class FinishReasonDeserializer(BaseModel):
     finish_reason: FinishReason
 
@@ -251,3 +464,19 @@ ChatRequestListSerializer = RootModel[Sequence[ChatRequest]]
 
 
 ChatListDeserializer = RootModel[list[ChatResponse]]
+
+
+CompletionRequestListAdapter: TypeAdapter[Sequence[CompletionRequest]] = TypeAdapter(
+    Sequence[CompletionRequest]
+)
+
+
+CompletionListAdapter = TypeAdapter(list[Completion])
+
+
+ChatRequestListAdapter: TypeAdapter[Sequence[ChatRequest]] = TypeAdapter(
+    Sequence[ChatRequest]
+)
+
+
+ChatListAdapter = TypeAdapter(list[ChatResponse])
@@ -1,6 +1,6 @@
 from typing import Sequence
 
-from pydantic import RootModel
+from pydantic import RootModel, TypeAdapter
 
 from pharia_skill.csi import Language, SelectLanguageRequest
 
@@ -8,3 +8,13 @@ SelectLanguageRequestSerializer = RootModel[Sequence[SelectLanguageRequest]]
 
 
 SelectLanguageDeserializer = RootModel[list[Language | None]]
+
+
+SelectLanguageRequestListAdapter: TypeAdapter[Sequence[SelectLanguageRequest]] = (
+    TypeAdapter(Sequence[SelectLanguageRequest])
+)
+
+
+SelectLanguageListAdapter: TypeAdapter[list[Language | None]] = TypeAdapter(
+    list[Language | None]
+)
@@ -20,20 +20,29 @@ Langfuse is able to render the conversation history based on these Logfire event
 import json
 from typing import Any
 
-from opentelemetry.trace import Span
-
 from pharia_skill.csi.inference import Message
 
+from .tracing import SpanPayloads
+
 
 def set_logfire_attributes(
-    span: Span, input_messages: list[Message], output_message: Message
+    payloads: SpanPayloads, input_messages: list[Message], output_message: Message
 ) -> None:
-    """Set attributes required for Pydantic Logfire to render chat conversations in the UI."""
-    events = [as_logfire_input_event(m) for m in input_messages]
-    events.append(as_logfire_output_event(output_message))
+    """Set attributes required for Pydantic Logfire to render chat conversations in the UI.
+
+    As the events contain the entire conversation, they are only serialized if the
+    payloads of the span are captured.
+    """
+    if not payloads.enabled:
+        return
+
+    def events() -> str:
+        events = [as_logfire_input_event(m) for m in input_messages]
+        events.append(as_logfire_output_event(output_message))
+        return json.dumps(events)
 
-    span.set_attribute("events", json.dumps(events))
-    span.set_attribute(
+    payloads.set("events", events)
+    payloads.span.set_attribute(
         "logfire.json_schema",
         json.dumps({"type": "object", "properties": {"events": {"type": "array"}}}),
     )
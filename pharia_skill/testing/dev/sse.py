@@ -0,0 +1,118 @@
+"""
+Incremental parser for the server-sent event streams of the PhariaEngine.
+
+The parser is fed with the raw HTTP chunks as they arrive. Incomplete events are kept
+in a single `bytearray` which is searched for the event delimiter without re-scanning
+bytes that have already been looked at, and each event is split into lines and decoded
+exactly once. This keeps the cost per event constant, independent of how long the
+stream is or how the server decides to chunk the response.
+
+Line endings can be `\\n`, `\\r\\n` or `\\r` (even if a `\\r\\n` pair is split across two
+chunks), and multiple `data:` lines of one event are joined with a newline, as
+specified by https://html.spec.whatwg.org/multipage/server-sent-events.html.
+"""
+
+from typing import Any
+
+from pydantic import BaseModel
+from pydantic_core import from_json
+
+
+class Event(BaseModel):
+    event: str
+    data: dict[str, Any]
+
+
+class EventStreamParser:
+    """Turn a byte stream into Engine events, one HTTP chunk at a time.
+
+    Examples::
+
+        parser = EventStreamParser()
+        for chunk in response.iter_content(chunk_size=None):
+            yield from parser.feed(chunk)
+        yield from parser.finish()
+    """
+
+    __slots__ = ("_buffer", "_scanned", "_skip_lf")
+
+    def __init__(self) -> None:
+        self._buffer = bytearray()
+        """Received bytes that do not form a complete event yet."""
+
+        self._scanned = 0
+        """Offset up to which the buffer is known not to contain an event delimiter."""
+
+        self._skip_lf = False
+        """Whether the previous chunk ended with a `\\r` that may be followed by a `\\n`."""
+
+    def feed(self, chunk: bytes) -> list[Event]:
+        """Parse the next chunk of the stream and return all events it completes."""
+        if self._skip_lf:
+            self._skip_lf = False
+            if chunk[:1] == b"\n":
+                chunk = chunk[1:]
+        if b"\r" in chunk:
+            self._skip_lf = chunk.endswith(b"\r")
+            chunk = chunk.replace(b"\r\n", b"\n").replace(b"\r", b"\n")
+
+        buffer = self._buffer
+        buffer += chunk
+        events: list[Event] = []
+        start = 0
+        position = self._scanned
+        while (end := buffer.find(b"\n\n", position)) != -1:
+            if (event := _parse_block(buffer[start:end])) is not None:
+                events.append(event)
+            start = position = end + 2
+        # Only move the incomplete remainder once per chunk, so that the work stays
+        # linear in the size of the stream. The last byte may be the first half of
+        # the next delimiter and is scanned again.
+        if start:
+            del buffer[:start]
+        self._scanned = max(len(buffer) - 1, 0)
+        return events
+
+    def finish(self) -> list[Event]:
+        """Dispatch an event that was not terminated by an empty line at the end of the stream."""
+        block, self._buffer = self._buffer, bytearray()
+        self._scanned = 0
+        event = _parse_block(block)
+        return [] if event is None else [event]
+
+
+def _parse_block(block: bytearray) -> Event | None:
+    """Parse the lines between two empty lines into an event."""
+    lines = block.split(b"\n")
+
+    # Engine events always have this format:
+    # event: <event>
+    # data: <data>
+    if (
+        len(lines) == 2
+        and lines[0].startswith(b"event: ")
+        and lines[1].startswith(b"data: ")
+    ):
+        return Event(event=lines[0][7:].decode(), data=from_json(lines[1][6:]))
+
+    event: str | None = None
+    data: list[bytearray] = []
+    for line in lines:
+        if not line or line[0] == 0x3A:  # ':' starts a comment
+            continue
+        name, sep, value = line.partition(b":")
+        if sep and value[:1] == b" ":
+            value = value[1:]
+        if name == b"data":
+            data.append(value)
+        elif name == b"event":
+            event = value.decode()
+        # Other fields (`id`, `retry`) are not used by the Engine and ignored.
+
+    if event is None and not data:
+        return None
+    if event is None:
+        raise ValueError(f"Unexpected event without type: {bytes(block)!r}")
+    if not data:
+        raise ValueError(f"Unexpected event without data: {event}")
+    return Event(event=event, data=from_json(b"\n".join(data)))
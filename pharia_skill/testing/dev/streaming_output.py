@@ -31,6 +31,18 @@ class MessageRecorder(MessageWriter[Payload]):
 
     The MessageRecorder also validates the stream of items that are written to it.
 
+    For long running streams, e.g. in soak tests, the recorder can be kept at a
+    constant overhead per message: with `keep_items=False`, the individual items are
+    not stored and `items` stays empty, while `messages` still aggregates the stream.
+    When tracing, each item is added as an event to the span of the skill. With
+    `event_chars`, consecutive message or reasoning chunks are merged into one event
+    with at least that many characters, which also records the number of `chunks`.
+
+    Args:
+        keep_items: Whether to store every item in `items`.
+        event_chars: Characters of message or reasoning text to merge into one span
+            event. `None` adds one event per item.
+
     Example::
 
         from pharia_skill import Csi, message_stream, MessageAppend, MessageBegin, MessageEnd
@@ -52,33 +64,91 @@ class MessageRecorder(MessageWriter[Payload]):
             ]
     """
 
-    def __init__(self) -> None:
+    def __init__(self, keep_items: bool = True, event_chars: int | None = None) -> None:
+        if event_chars is not None and event_chars < 1:
+            raise ValueError("`event_chars` must be positive.")
         self.items: list[MessageItem[Payload]] = []
         self.span: trace.Span | None = None
+        self.keep_items = keep_items
+        self.event_chars = event_chars
+        self._last: MessageItem[Payload] | None = None
+        self._messages: list[RecordedMessage[Payload]] = []
+        # Text chunks of the message that has not ended yet, joined on `MessageEnd`.
+        self._content: list[str] = []
+        self._reasoning: list[str] = []
+        # Text chunks of the span event that has not been added yet.
+        self._event_kind: type[MessageAppend] | type[Reasoning] | None = None
+        self._event_parts: list[str] = []
+        self._event_size = 0
 
     def write(self, item: MessageItem[Payload]) -> None:
         """Store and validate the streamed items.
 
         Validating the stream here gives the developer early feedback at test time.
         """
-        # get current span and write an event
+        MessageRecorder._validate_next(self._last, item)
         if self.span is not None:
-            match item:
-                case MessageBegin():
-                    self.span.add_event("message_begin", asdict(item))
-                case Reasoning():
-                    self.span.add_event("reasoning", asdict(item))
-                case MessageAppend():
-                    self.span.add_event("message_append", asdict(item))
-                case MessageEnd(payload=payload):
-                    self.span.add_event(
-                        "message_end",
-                        {"payload": payload.model_dump_json()}
-                        if payload is not None
-                        else {},
-                    )
-        MessageRecorder.validate(self.items, item)
-        self.items.append(item)
+            self._add_event(self.span, item)
+        match item:
+            case MessageBegin(role=role):
+                self._messages.append(RecordedMessage(role=role))
+            case Reasoning(content=content):
+                self._reasoning.append(content)
+            case MessageAppend(text=text):
+                self._content.append(text)
+            case MessageEnd(payload=payload):
+                self._join_parts()
+                self._messages[-1].payload = payload
+        self._last = item
+        if self.keep_items:
+            self.items.append(item)
+
+    def _add_event(self, span: trace.Span, item: MessageItem[Payload]) -> None:
+        """Add a span event for the item, merging text chunks if `event_chars` is set."""
+        if self.event_chars is not None and isinstance(item, MessageAppend | Reasoning):
+            if self._event_kind is not type(item):
+                self.flush_events()
+                self._event_kind = type(item)
+            text = item.text if isinstance(item, MessageAppend) else item.content
+            self._event_parts.append(text)
+            self._event_size += len(text)
+            if self._event_size >= self.event_chars:
+                self.flush_events()
+            return
+
+        self.flush_events()
+        match item:
+            case MessageBegin():
+                span.add_event("message_begin", asdict(item))
+            case Reasoning():
+                span.add_event("reasoning", asdict(item))
+            case MessageAppend():
+                span.add_event("message_append", asdict(item))
+            case MessageEnd(payload=payload):
+                span.add_event(
+                    "message_end",
+                    {"payload": payload.model_dump_json()}
+                    if payload is not None
+                    else {},
+                )
+
+    def flush(self) -> None:
+        """Add the span event for the text chunks that are held back by `event_chars`."""
+        self.flush_events()
+
+    def flush_events(self) -> None:
+        """Add the span event for text chunks that have been merged so far."""
+        if self.span is None or not self._event_parts:
+            return
+        text = "".join(self._event_parts)
+        chunks = len(self._event_parts)
+        if self._event_kind is Reasoning:
+            self.span.add_event("reasoning", {"content": text, "chunks": chunks})
+        else:
+            self.span.add_event("message_append", {"text": text, "chunks": chunks})
+        self._event_kind = None
+        self._event_parts = []
+        self._event_size = 0
 
     @staticmethod
     def validate(
@@ -92,40 +162,47 @@ class MessageRecorder(MessageWriter[Payload]):
         2. Consecutive `MessageBegin`s must be preceded by a `MessageEnd`.
         3. A `MessageEnd` must not be preceded by `MessageEnd`.
         """
+        MessageRecorder._validate_next(existing[-1] if existing else None, item)
 
-        if not existing:
+    @staticmethod
+    def _validate_next(
+        last: MessageItem[Payload] | None, item: MessageItem[Payload]
+    ) -> None:
+        """Apply the rules of `validate`, which only depend on the previous item."""
+        if last is None:
             if not isinstance(item, MessageBegin):
                 raise ValueError("The first item must be a `MessageBegin`")
             return
 
-        if isinstance(item, MessageBegin) and not isinstance(existing[-1], MessageEnd):
+        if isinstance(item, MessageBegin) and not isinstance(last, MessageEnd):
             raise ValueError(
                 "Consecutive `MessageBegin`s must be preceded by a `MessageEnd`"
             )
 
-        if isinstance(item, MessageEnd) and isinstance(existing[-1], MessageEnd):
+        if isinstance(item, MessageEnd) and isinstance(last, MessageEnd):
             raise ValueError(
                 "A `MessageEnd` must not be preceded by another `MessageEnd`"
             )
 
+    def _join_parts(self) -> None:
+        """Move the text chunks of the current message into the recorded message."""
+        message = self._messages[-1]
+        if self._content:
+            message.content += "".join(self._content)
+            self._content = []
+        if self._reasoning:
+            message.reasoning_content += "".join(self._reasoning)
+            self._reasoning = []
+
     def messages(self) -> list[RecordedMessage[Payload]]:
         """Convenience method to aggregate the streamed items into a list of messages.
 
-        Message items are validated when they are written, so we assume that the list is
-        valid.
+        The messages are maintained while the items are written, so this does not
+        depend on the `items` being kept.
         """
-        messages: list[RecordedMessage[Payload]] = []
-        for item in self.items:
-            match item:
-                case MessageBegin(role=role):
-                    messages.append(RecordedMessage(role=role))
-                case Reasoning(content=content):
-                    messages[-1].reasoning_content += content
-                case MessageAppend(text=text):
-                    messages[-1].content += text
-                case MessageEnd(payload=payload):
-                    messages[-1].payload = payload
-        return messages
+        if self._messages:
+            self._join_parts()
+        return [message.model_copy() for message in self._messages]
 
     def skill_output(self) -> str:
         """Serialized output of the skill.
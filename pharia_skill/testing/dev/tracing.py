@@ -0,0 +1,206 @@
+"""
+Control which payloads the `DevCsi` attaches to its spans.
+
+By default, the `DevCsi` records the full input and output of every request on its
+spans. For long prompts, e.g. in RAG applications, serializing these payloads can take
+more CPU time than the request itself and the exporter has to ship them to the
+collector. A `TracingPolicy` limits the size of payload attributes, replaces them by a
+hash or skips them for some CSI functions or some of the spans.
+
+Payloads are only serialized if the span is recording and the policy decided to capture
+them. Attributes that describe a request without its content, e.g. the model, the
+token usage or the finish reason, are always recorded.
+
+For streamed responses, the accumulated output is by default only written to the span
+once the stream ends or is exited. `StreamUpdates` configures intermediate updates.
+"""
+
+import hashlib
+import random
+import time
+from collections.abc import Callable, Collection
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import Protocol
+
+from opentelemetry.trace import Span
+from opentelemetry.util.types import AttributeValue
+
+CONTENT_ATTRIBUTES = frozenset(
+    {
+        "input",
+        "output",
+        "gen_ai.input.messages",
+        "gen_ai.output.messages",
+        "gen_ai.content.prompt",
+        "gen_ai.content.completion",
+        "events",
+    }
+)
+"""Span attributes that hold request or response payloads."""
+
+
+class PayloadMode(str, Enum):
+    """How payloads are recorded on a span.
+
+    Attributes:
+        TRUNCATE: Record the payload, cut off after `max_attribute_bytes`.
+        HASH: Only record the SHA-256 hash and the size of the payload. This allows to
+            tell whether two requests were identical without exporting their content.
+    """
+
+    TRUNCATE = "truncate"
+    HASH = "hash"
+
+
+@dataclass(frozen=True)
+class StreamUpdates:
+    """How often a streamed response writes its accumulated output to the span.
+
+    Rebuilding the output for every event costs time quadratic in the length of the
+    stream. Spans are only exported once they end, so by default the output is only
+    written when the stream is exhausted or exited, including streams that are
+    abandoned early. Intermediate updates are only useful for span processors that
+    inspect spans while they are still open.
+
+    Args:
+        every_events: Update the output after this many events.
+        every_seconds: Update the output if this many seconds passed since the last
+            update.
+
+    Examples::
+
+        policy = TracingPolicy(stream_updates=StreamUpdates(every_seconds=0.1))
+    """
+
+    every_events: int | None = None
+    every_seconds: float | None = None
+
+    def __post_init__(self) -> None:
+        if self.every_events is not None and self.every_events < 1:
+            raise ValueError("`every_events` must be positive.")
+        if self.every_seconds is not None and self.every_seconds < 0:
+            raise ValueError("`every_seconds` must not be negative.")
+
+
+class UpdateThrottle:
+    """Decide for each event of a stream whether the span output is updated."""
+
+    def __init__(self, updates: StreamUpdates):
+        self.updates = updates
+        self._events = 0
+        self._last_update = time.monotonic()
+
+    def tick(self) -> bool:
+        """Count an event and tell if an update is due."""
+        self._events += 1
+        every_events, every_seconds = (
+            self.updates.every_events,
+            self.updates.every_seconds,
+        )
+        due = (every_events is not None and self._events >= every_events) or (
+            every_seconds is not None
+            and time.monotonic() - self._last_update >= every_seconds
+        )
+        if due:
+            self._events = 0
+            self._last_update = time.monotonic()
+        return due
+
+
+@dataclass(frozen=True)
+class TracingPolicy:
+    """Which payloads the `DevCsi` records on its spans.
+
+    Args:
+        max_attribute_bytes: Maximum size of a payload attribute. Longer payloads are
+            truncated. If not set, payloads are recorded in full.
+        mode: Whether to record (truncated) payloads or only their hashes.
+        excluded: Names of the CSI functions whose payloads are never recorded. These
+            are the names of the Engine endpoints, e.g. `chat`, `chat_stream`,
+            `complete`, `completion_stream`, `search` or `chunk_with_offsets`.
+        sample_rate: Share of spans for which the payloads are recorded, between 0 and 1.
+        stream_updates: How often streamed responses update their output on the span.
+
+    Examples::
+
+        policy = TracingPolicy(max_attribute_bytes=4096, excluded={"documents"})
+        csi = DevCsi(project="my-project", tracing=policy)
+    """
+
+    max_attribute_bytes: int | None = None
+    mode: PayloadMode = PayloadMode.TRUNCATE
+    excluded: Collection[str] = field(default_factory=frozenset)
+    sample_rate: float = 1.0
+    stream_updates: StreamUpdates = StreamUpdates()
+
+    def __post_init__(self) -> None:
+        if self.max_attribute_bytes is not None and self.max_attribute_bytes < 0:
+            raise ValueError("`max_attribute_bytes` must not be negative.")
+        if not 0 <= self.sample_rate <= 1:
+            raise ValueError("`sample_rate` must be between 0 and 1.")
+
+    def payloads(self, span: Span, function: str) -> "SpanPayloads":
+        """Decide whether the payloads of a span for the given function are recorded."""
+        capture = (
+            span.is_recording()
+            and function not in self.excluded
+            and (self.sample_rate >= 1 or random.random() < self.sample_rate)
+        )
+        return SpanPayloads(span, self if capture else None)
+
+    def format(self, payload: str | bytes) -> str:
+        """Turn a payload into the value of a span attribute."""
+        data = payload.encode() if isinstance(payload, str) else payload
+        if self.mode == PayloadMode.HASH:
+            return f"sha256:{hashlib.sha256(data).hexdigest()} ({len(data)} bytes)"
+        limit = self.max_attribute_bytes
+        if limit is None or len(data) <= limit:
+            return data.decode() if isinstance(payload, bytes) else payload
+        # Cutting bytes may split a multi-byte character, which is dropped.
+        truncated = data[:limit].decode(errors="ignore")
+        return f"{truncated}... [truncated {len(data) - limit} bytes]"
+
+
+class GenAiAttributes(Protocol):
+    def as_gen_ai_otel_attributes(
+        self, include_content: bool = True
+    ) -> dict[str, AttributeValue]: ...
+
+
+class SpanPayloads:
+    """Record payloads on one span, if the policy decided to capture them."""
+
+    def __init__(self, span: Span, policy: TracingPolicy | None):
+        self.span = span
+        self._policy = policy
+
+    @property
+    def enabled(self) -> bool:
+        return self._policy is not None
+
+    def throttle(self) -> UpdateThrottle:
+        """Throttle the output updates of a streamed response."""
+        policy = self._policy or CAPTURE_ALL
+        return UpdateThrottle(policy.stream_updates)
+
+    def set(self, key: str, payload: Callable[[], str | bytes]) -> None:
+        """Set a payload attribute, only serializing the payload if it is captured."""
+        if self._policy is not None:
+            self.span.set_attribute(key, self._policy.format(payload()))
+
+    def format(self, payload: str) -> str:
+        """Format a payload that has already been serialized."""
+        return self._policy.format(payload) if self._policy is not None else payload
+
+    def set_gen_ai_attributes(self, source: GenAiAttributes) -> None:
+        """Set the GenAI attributes of a request or response, subject to the policy."""
+        attributes = source.as_gen_ai_otel_attributes(include_content=self.enabled)
+        for key in CONTENT_ATTRIBUTES.intersection(attributes):
+            if isinstance(value := attributes[key], str):
+                attributes[key] = self.format(value)
+        self.span.set_attributes(attributes)
+
+
+CAPTURE_ALL = TracingPolicy()
+"""Record all payloads in full."""
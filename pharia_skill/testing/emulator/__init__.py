@@ -0,0 +1,19 @@
+"""
+A local emulator of the CSI endpoints of the PhariaEngine.
+
+The emulator lets the `DevCsi` and Skills run through the complete HTTP path, including
+streaming, without network access, e.g. for load tests in CI. Responses come from a
+`StubBackend`, a `ScriptedBackend` or a `ReplayClient`, and are paced by a
+`LatencyModel`.
+"""
+
+from .backend import ScriptedBackend, StubBackend
+from .pacing import LatencyModel
+from .server import EmulatorServer
+
+__all__ = [
+    "EmulatorServer",
+    "LatencyModel",
+    "ScriptedBackend",
+    "StubBackend",
+]
@@ -0,0 +1,265 @@
+"""
+Answer CSI requests in the serialized format of the PhariaEngine without an Engine.
+
+A backend has the same interface as the `CsiClient` of the `DevCsi`: it receives the
+deserialized JSON body of a `/csi/v1/{function}` request and returns the deserialized
+JSON response, or the server-sent events of a stream. Any `CsiClient` can therefore
+serve as a backend, e.g. a `ReplayClient` that plays back a cassette.
+"""
+
+from collections.abc import Callable, Generator, Iterable, Mapping
+from typing import Any
+
+from pharia_skill import Csi
+from pharia_skill.csi.inference import (
+    ChatEvent,
+    CompletionAppend,
+    CompletionEvent,
+    FinishReason,
+    InvokeRequest,
+    MessageAppend,
+    MessageBegin,
+    Reasoning,
+    TokenUsage,
+    ToolCallEvent,
+    ToolOutput,
+)
+from pharia_skill.testing.dev.chunking import ChunkListAdapter, ChunkRequestListAdapter
+from pharia_skill.testing.dev.client import CsiClient, EngineError, Event
+from pharia_skill.testing.dev.document_index import (
+    DocumentListAdapter,
+    DocumentMetadataListAdapter,
+    DocumentPathListAdapter,
+    SearchRequestListAdapter,
+    SearchResultListAdapter,
+)
+from pharia_skill.testing.dev.inference import (
+    ChatListAdapter,
+    ChatRequestListAdapter,
+    ChatRequestSerializer,
+    CompletionAppendAdapter,
+    CompletionListAdapter,
+    CompletionRequestListAdapter,
+    CompletionRequestSerializer,
+    ToolCallEventAdapter,
+)
+from pharia_skill.testing.dev.language import (
+    SelectLanguageListAdapter,
+    SelectLanguageRequestListAdapter,
+)
+from pharia_skill.testing.dev.tool import InvokeRequestsSerializer
+
+from ..stub import StubCsi
+
+
+class StubBackend(CsiClient):
+    """Serve the requests of the CSI endpoints from a `Csi`, by default a `StubCsi`.
+
+    The request bodies are deserialized into SDK types, passed to the corresponding
+    method of the `Csi`, and the results are serialized the way the Engine would
+    respond. Subclass the `StubCsi` to control the responses. The namespace of tool
+    requests is ignored.
+
+    Args:
+        csi: The `Csi` that answers the requests.
+    """
+
+    def __init__(self, csi: Csi | None = None) -> None:
+        self.csi = csi or StubCsi()
+
+    def run(self, function: str, data: Any) -> Any:
+        csi = self.csi
+        match function:
+            case "chat":
+                return ChatListAdapter.dump_python(
+                    csi.chat_concurrent(ChatRequestListAdapter.validate_python(data)),
+                    mode="json",
+                )
+            case "complete":
+                return CompletionListAdapter.dump_python(
+                    csi.complete_concurrent(
+                        list(CompletionRequestListAdapter.validate_python(data))
+                    ),
+                    mode="json",
+                )
+            case "chunk_with_offsets":
+                return ChunkListAdapter.dump_python(
+                    csi.chunk_concurrent(ChunkRequestListAdapter.validate_python(data)),
+                    mode="json",
+                )
+            case "select_language":
+                return SelectLanguageListAdapter.dump_python(
+                    csi.select_language_concurrent(
+                        SelectLanguageRequestListAdapter.validate_python(data)
+                    ),
+                    mode="json",
+                )
+            case "search":
+                return SearchResultListAdapter.dump_python(
+                    csi.search_concurrent(
+                        SearchRequestListAdapter.validate_python(data)
+                    ),
+                    mode="json",
+                )
+            case "documents":
+                return DocumentListAdapter.dump_python(
+                    csi.documents(DocumentPathListAdapter.validate_python(data)),
+                    mode="json",
+                )
+            case "document_metadata":
+                return DocumentMetadataListAdapter.dump_python(
+                    csi.documents_metadata(
+                        DocumentPathListAdapter.validate_python(data)
+                    ),
+                    mode="json",
+                )
+            case "invoke_tool":
+                body = InvokeRequestsSerializer.model_validate(data)
+                results = csi.invoke_tool_concurrent(
+                    [
+                        InvokeRequest(r.name, {a.name: a.value for a in r.arguments})
+                        for r in body.requests
+                    ]
+                )
+                return [
+                    [{"type": "text", "text": text} for text in result.contents]
+                    if isinstance(result, ToolOutput)
+                    else result.message
+                    for result in results
+                ]
+            case "list_tools":
+                return [
+                    {
+                        "name": tool.name,
+                        "description": tool.description,
+                        "input_schema": tool.parameters,
+                    }
+                    for tool in csi.list_tools()
+                ]
+        raise _not_found(function)
+
+    def stream(
+        self, function: str, data: dict[str, Any]
+    ) -> Generator[Event, None, None]:
+        match function:
+            case "chat_stream":
+                chat = ChatRequestSerializer.model_validate(data)
+                return self._chat_events(chat)
+            case "completion_stream":
+                completion = CompletionRequestSerializer.model_validate(data)
+                return self._completion_events(completion)
+        raise _not_found(function)
+
+    def _chat_events(
+        self, request: ChatRequestSerializer
+    ) -> Generator[Event, None, None]:
+        response = self.csi.chat_stream_step(
+            request.model, request.messages, request.params
+        )
+        with response:
+            yield Event(event="message_begin", data={"role": response.role})
+            while (event := response.next()) is not None:
+                yield chat_event_to_sse(event)
+
+    def _completion_events(
+        self, request: CompletionRequestSerializer
+    ) -> Generator[Event, None, None]:
+        response = self.csi.completion_stream(
+            request.model, request.prompt, request.params
+        )
+        with response:
+            while (event := response.next()) is not None:
+                yield completion_event_to_sse(event)
+
+
+class ScriptedBackend(CsiClient):
+    """Serve each CSI function with a function of the request body.
+
+    Functions without a script are passed on to the fallback backend. This allows to
+    script only the interesting endpoints, e.g. a slow tool, and serve the rest from a
+    `StubBackend`.
+
+    Args:
+        run: Compute the response body of a function from its request body.
+        stream: Compute the events of a streaming function from its request body.
+        fallback: Serves the functions that are not scripted.
+
+    Examples::
+
+        backend = ScriptedBackend(
+            stream={
+                "chat_stream": lambda body: [
+                    Event(event="message_begin", data={"role": "assistant"}),
+                    Event(event="message_append", data={"content": "Hello"}),
+                    Event(event="message_end", data={"finish_reason": "stop"}),
+                ]
+            },
+            fallback=StubBackend(),
+        )
+    """
+
+    def __init__(
+        self,
+        run: Mapping[str, Callable[[Any], Any]] | None = None,
+        stream: Mapping[str, Callable[[dict[str, Any]], Iterable[Event]]] | None = None,
+        fallback: CsiClient | None = None,
+    ) -> None:
+        self.scripts = dict(run or {})
+        self.stream_scripts = dict(stream or {})
+        self.fallback = fallback
+
+    def run(self, function: str, data: Any) -> Any:
+        if (script := self.scripts.get(function)) is not None:
+            return script(data)
+        if self.fallback is not None:
+            return self.fallback.run(function, data)
+        raise _not_found(function)
+
+    def stream(
+        self, function: str, data: dict[str, Any]
+    ) -> Generator[Event, None, None]:
+        if (script := self.stream_scripts.get(function)) is not None:
+            return (event for event in script(data))
+        if self.fallback is not None:
+            return self.fallback.stream(function, data)
+        raise _not_found(function)
+
+
+def chat_event_to_sse(event: ChatEvent) -> Event:
+    """Serialize a chat event the way the Engine streams it."""
+    match event:
+        case MessageBegin(role=role):
+            return Event(event="message_begin", data={"role": role})
+        case Reasoning(content=content):
+            return Event(event="reasoning", data={"content": content})
+        case MessageAppend(content=content):
+            return Event(event="message_append", data={"content": content})
+        case FinishReason():
+            return Event(event="message_end", data={"finish_reason": event.value})
+        case TokenUsage():
+            return Event(event="usage", data={"usage": _usage(event)})
+        case ToolCallEvent():
+            data = ToolCallEventAdapter.dump_python(event, mode="json")
+            return Event(event="tool_call", data=data)
+    raise ValueError(f"Unexpected chat event: {event}")
+
+
+def completion_event_to_sse(event: CompletionEvent) -> Event:
+    """Serialize a completion event the way the Engine streams it."""
+    match event:
+        case CompletionAppend():
+            data = CompletionAppendAdapter.dump_python(event, mode="json")
+            return Event(event="append", data=data)
+        case FinishReason():
+            return Event(event="end", data={"finish_reason": event.value})
+        case TokenUsage():
+            return Event(event="usage", data={"usage": _usage(event)})
+    raise ValueError(f"Unexpected completion event: {event}")
+
+
+def _usage(usage: TokenUsage) -> dict[str, int]:
+    return {"prompt": usage.prompt, "completion": usage.completion}
+
+
+def _not_found(function: str) -> EngineError:
+    return EngineError(f"Unknown CSI function `{function}`.", 404)
@@ -0,0 +1,100 @@
+"""
+Model how long the PhariaEngine takes to answer, so that the emulator responds at a
+realistic pace.
+"""
+
+import math
+import random
+from dataclasses import dataclass
+from typing import Any
+
+from pharia_skill.testing.dev.client import Event
+
+_GENERATING = {"chat", "complete"}
+"""Functions whose response is generated by a model, token by token."""
+
+
+@dataclass(frozen=True)
+class LatencyModel:
+    """Delays of the emulated Engine, derived from the content of its responses.
+
+    Every request waits `request_seconds` before its response, or before the first
+    event of a stream. Model output is then paced at `tokens_per_second`: each text
+    event of a stream is delayed by the time its tokens take to generate, and a
+    non-streamed chat or completion by the time of all completion tokens it reports.
+    Tokens of streamed text are estimated from its length.
+
+    Attributes:
+        request_seconds: Time to the response, or to the first event of a stream.
+        tokens_per_second: Generation speed. `None` sends the output at once.
+        chars_per_token: Characters of text that count as one token.
+        jitter: Relative random variation of every delay, e.g. `0.2` for ±20%.
+        seed: Seed of the jitter, for reproducible runs.
+
+    Examples::
+
+        latency = LatencyModel(request_seconds=0.3, tokens_per_second=50, jitter=0.2)
+        with EmulatorServer(StubBackend(), latency) as server:
+            ...
+    """
+
+    request_seconds: float = 0.0
+    tokens_per_second: float | None = None
+    chars_per_token: float = 4.0
+    jitter: float = 0.0
+    seed: int | None = None
+
+    def __post_init__(self) -> None:
+        if self.request_seconds < 0:
+            raise ValueError("`request_seconds` must not be negative.")
+        if self.tokens_per_second is not None and self.tokens_per_second <= 0:
+            raise ValueError("`tokens_per_second` must be positive.")
+        if self.chars_per_token <= 0:
+            raise ValueError("`chars_per_token` must be positive.")
+        if not 0 <= self.jitter < 1:
+            raise ValueError("`jitter` must be at least 0 and less than 1.")
+
+    def response_delay(self, rng: random.Random, function: str, output: Any) -> float:
+        """Seconds until the response to a non-streamed request is sent."""
+        seconds = self.request_seconds
+        if function in _GENERATING and self.tokens_per_second is not None:
+            tokens = sum(
+                item.get("usage", {}).get("completion", 0)
+                for item in output
+                if isinstance(item, dict)
+            )
+            seconds += tokens / self.tokens_per_second
+        return self._vary(rng, seconds)
+
+    def first_event_delay(self, rng: random.Random) -> float:
+        """Seconds until a stream begins."""
+        return self._vary(rng, self.request_seconds)
+
+    def event_delay(self, rng: random.Random, event: Event) -> float:
+        """Seconds to generate the text of a stream event."""
+        if self.tokens_per_second is None:
+            return 0.0
+        length = len(_text(event))
+        if not length:
+            return 0.0
+        tokens = math.ceil(length / self.chars_per_token)
+        return self._vary(rng, tokens / self.tokens_per_second)
+
+    def _vary(self, rng: random.Random, seconds: float) -> float:
+        if not self.jitter or not seconds:
+            return seconds
+        return seconds * rng.uniform(1 - self.jitter, 1 + self.jitter)
+
+
+def _text(event: Event) -> str:
+    data = event.data
+    match event.event:
+        case "message_append" | "reasoning":
+            return data.get("content") or ""
+        case "append":
+            return data.get("text") or ""
+        case "tool_call":
+            return "".join(
+                chunk.get("arguments") or "" for chunk in data.get("tool_calls", [])
+            )
+    return ""
@@ -0,0 +1,211 @@
+"""
+Serve the CSI endpoints of the PhariaEngine over local HTTP.
+"""
+
+import json
+import random
+import threading
+import time
+from collections.abc import Generator
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import TracebackType
+from typing import Any, Self
+
+from pharia_skill.testing.dev.client import (
+    HTTP_CSI_VERSION,
+    CsiClient,
+    EngineError,
+    Event,
+)
+
+from .pacing import LatencyModel
+
+STREAMING_FUNCTIONS = {"chat_stream", "completion_stream"}
+"""CSI functions that respond with server-sent events."""
+
+
+class EmulatorServer:
+    """A local stand-in for the PhariaEngine, for tests and load tests without network.
+
+    The server answers the `/csi/v1/{function}` requests that the `Client` of the
+    `DevCsi` sends, streaming responses as server-sent events, from a backend: a
+    `StubBackend`, a `ScriptedBackend` or a `ReplayClient` playing back a cassette.
+    Requests are handled on one thread each, so concurrent and batched requests are
+    served in parallel, paced by the latency model.
+
+    Errors raised by the backend as `EngineError` are returned with their status code,
+    other errors with status 500. Errors in the middle of a stream are sent as an
+    `error` event, like the Engine does.
+
+    Args:
+        backend: Answers the requests.
+        latency: How long responses and stream events take. Responds at once if not set.
+        host: Interface to listen on.
+        port: Port to listen on. The default picks a free port.
+
+    Examples::
+
+        def test_skill_at_realistic_pace(monkeypatch):
+            latency = LatencyModel(request_seconds=0.2, tokens_per_second=40)
+            with EmulatorServer(StubBackend(), latency) as server:
+                monkeypatch.setenv("PHARIA_KERNEL_ADDRESS", server.address)
+                csi = DevCsi()
+                run(csi, Input(topic="The meaning of life"))
+    """
+
+    def __init__(
+        self,
+        backend: CsiClient,
+        latency: LatencyModel | None = None,
+        host: str = "127.0.0.1",
+        port: int = 0,
+    ) -> None:
+        self.backend = backend
+        self.latency = latency or LatencyModel()
+        self._random = random.Random(self.latency.seed)
+        self._random_lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), _handler(self))
+        self._server.daemon_threads = True
+        self._thread: threading.Thread | None = None
+
+    @property
+    def address(self) -> str:
+        """The value for `PHARIA_KERNEL_ADDRESS` to send requests to this server."""
+        host, port = self._server.server_address[:2]
+        return f"http://{host!s}:{port}"
+
+    def start(self) -> None:
+        """Serve requests on a background thread."""
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, name="pharia-csi-emulator", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop serving and release the port."""
+        if self._thread is not None:
+            self._server.shutdown()
+            self._thread.join()
+            self._thread = None
+        self._server.server_close()
+
+    def __enter__(self) -> Self:
+        self.start()
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        self.stop()
+
+    def response_delay(self, function: str, output: Any) -> float:
+        with self._random_lock:
+            return self.latency.response_delay(self._random, function, output)
+
+    def first_event_delay(self) -> float:
+        with self._random_lock:
+            return self.latency.first_event_delay(self._random)
+
+    def event_delay(self, event: Event) -> float:
+        with self._random_lock:
+            return self.latency.event_delay(self._random, event)
+
+
+def _handler(emulator: EmulatorServer) -> type[BaseHTTPRequestHandler]:
+    """Bind a request handler class to the emulator that serves the requests."""
+
+    class CsiRequestHandler(_CsiRequestHandler):
+        server_emulator = emulator
+
+    return CsiRequestHandler
+
+
+class _CsiRequestHandler(BaseHTTPRequestHandler):
+    # Keep connections alive, as the `Client` reuses them across requests.
+    protocol_version = "HTTP/1.1"
+    server_emulator: EmulatorServer
+
+    PREFIX = f"/csi/{HTTP_CSI_VERSION}/"
+
+    def do_POST(self) -> None:
+        length = int(self.headers.get("Content-Length", 0))
+        body = self.rfile.read(length)
+        if not self.path.startswith(self.PREFIX):
+            self._send_json(HTTPStatus.NOT_FOUND, f"Unknown path `{self.path}`.")
+            return
+        function = self.path.removeprefix(self.PREFIX)
+        try:
+            data = json.loads(body) if body else None
+            if function in STREAMING_FUNCTIONS:
+                self._stream(function, data)
+            else:
+                self._run(function, data)
+        except EngineError as e:
+            self._send_json(e.status_code, str(e))
+        except Exception as e:
+            self._send_json(HTTPStatus.INTERNAL_SERVER_ERROR, str(e))
+
+    def _run(self, function: str, data: Any) -> None:
+        emulator = self.server_emulator
+        output = emulator.backend.run(function, data)
+        time.sleep(emulator.response_delay(function, output))
+        self._send_json(HTTPStatus.OK, output)
+
+    def _stream(self, function: str, data: Any) -> None:
+        emulator = self.server_emulator
+        time.sleep(emulator.first_event_delay())
+        events = emulator.backend.stream(function, data)
+        # The first event is read before the headers are sent, so that errors of
+        # the backend before the stream begins are responded with a status code.
+        first = next(events, None)
+        self.send_response(HTTPStatus.OK)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        try:
+            if first is not None:
+                time.sleep(emulator.event_delay(first))
+                self._send_event(first)
+                self._send_events(events)
+            self._send_chunk(b"")
+        except (BrokenPipeError, ConnectionResetError):
+            # The client cancelled the stream.
+            self.close_connection = True
+        finally:
+            events.close()
+
+    def _send_events(self, events: Generator[Event, None, None]) -> None:
+        emulator = self.server_emulator
+        try:
+            for event in events:
+                time.sleep(emulator.event_delay(event))
+                self._send_event(event)
+        except (BrokenPipeError, ConnectionResetError):
+            raise
+        except Exception as e:
+            self._send_event(Event(event="error", data={"message": str(e)}))
+
+    def _send_event(self, event: Event) -> None:
+        data = json.dumps(event.data, separators=(",", ":"))
+        self._send_chunk(f"event: {event.event}\ndata: {data}\n\n".encode())
+
+    def _send_chunk(self, payload: bytes) -> None:
+        self.wfile.write(b"%x\r\n%s\r\n" % (len(payload), payload))
+        self.wfile.flush()
+
+    def _send_json(self, status: int, output: Any) -> None:
+        payload = json.dumps(output, separators=(",", ":")).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
@@ -0,0 +1,358 @@
+"""
+Profile Skill invocations at test time.
+
+Inside `profiling()`, every call of a function decorated with `@skill` or
+`@message_stream` is profiled. The profile tells whether a slow Skill is waiting for
+the CSI, e.g. for the model to generate tokens, or whether its own Python code, e.g.
+prompt assembly or parsing of responses, takes the time. The CSI passed to the Skill is
+wrapped in a `TimedCsi`, which measures the time spent in CSI calls. The time of the
+invocation is also split into the CPU time of the thread that runs the Skill and the
+time the thread was blocked, be it by the CSI, by other I/O or by locks. The hot
+functions of the invocation are found by a deterministic or a sampling profiler.
+
+The results are attached to the span of the invocation and collected in the list that
+`profiling()` yields.
+"""
+
+import contextvars
+import cProfile
+import itertools
+import pstats
+import sys
+import threading
+import time
+from collections import Counter
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from enum import Enum
+from pathlib import Path
+from types import CodeType, FrameType
+from typing import TYPE_CHECKING, Protocol
+
+from opentelemetry.trace import Span
+
+from .timed import TimedCsi, run_streams
+
+if TYPE_CHECKING:
+    from pharia_skill import Csi
+
+WALL_SECONDS = "pharia.profile.wall_seconds"
+CPU_SECONDS = "pharia.profile.cpu_seconds"
+CSI_SECONDS = "pharia.profile.csi_seconds"
+BLOCKED_SECONDS = "pharia.profile.blocked_seconds"
+HOT_FUNCTIONS = "pharia.profile.hot_functions"
+PROFILE_FILE = "pharia.profile.file"
+
+
+class ProfilerMode(str, Enum):
+    """How the hot functions of an invocation are found.
+
+    Attributes:
+        DETERMINISTIC: Trace every function call with `cProfile`. The times are exact,
+            but tracing slows down code that makes many small calls. The profile is
+            dumped as a `.pstats` file.
+        SAMPLING: Record the stack of the Skill thread in a fixed interval. The
+            overhead is low and independent of the code, but short invocations
+            collect few samples. The profile is dumped as a `.collapsed` file of
+            folded stacks, as read by flame graph tools.
+    """
+
+    DETERMINISTIC = "deterministic"
+    SAMPLING = "sampling"
+
+
+@dataclass(frozen=True)
+class ProfilePolicy:
+    """How Skill invocations are profiled.
+
+    Args:
+        mode: Which profiler finds the hot functions.
+        top: Number of hot functions attached to the span.
+        interval: Seconds between two samples of the sampling profiler.
+        output_dir: Directory to dump the profile of each invocation to. If not set,
+            no files are written.
+
+    Examples::
+
+        with profiling(ProfilePolicy(mode=ProfilerMode.SAMPLING)) as profiles:
+            my_skill(csi, input)
+        print(profiles[0].csi_seconds, profiles[0].hot_functions)
+    """
+
+    mode: ProfilerMode = ProfilerMode.DETERMINISTIC
+    top: int = 10
+    interval: float = 0.001
+    output_dir: Path | None = None
+
+    def __post_init__(self) -> None:
+        if self.top < 0:
+            raise ValueError("`top` must not be negative.")
+        if self.interval <= 0:
+            raise ValueError("`interval` must be positive.")
+
+
+@dataclass(frozen=True)
+class HotFunction:
+    """A function that the Skill spent time in.
+
+    Attributes:
+        name: Name of the function.
+        location: File and line of the function.
+        seconds: Wall time spent in the function itself, without the Python functions
+            it called. This includes the time the function waited, e.g. for a
+            response of the CSI. The sampling profiler estimates it from the number
+            of samples.
+    """
+
+    name: str
+    location: str
+    seconds: float
+
+    def __str__(self) -> str:
+        return f"{self.name} ({self.location}) {self.seconds * 1000:.1f}ms"
+
+
+@dataclass(frozen=True)
+class SkillProfile:
+    """The profile of a single Skill invocation.
+
+    Attributes:
+        skill: Name of the Skill function.
+        wall_seconds: Duration of the invocation.
+        cpu_seconds: CPU time of the thread running the Skill.
+        csi_seconds: Time spent in CSI calls, summed over all calls. Calls that the
+            Skill makes from several threads at once can add up to more than the
+            wall time.
+        blocked_seconds: Time the thread was not running, as the difference between
+            the wall time and the CPU time. This includes waiting for the CSI, but also
+            for other I/O or for locks.
+        hot_functions: The functions with the most time spent in them, starting with
+            the hottest.
+        file: The file the profile was dumped to.
+    """
+
+    skill: str
+    wall_seconds: float
+    cpu_seconds: float
+    csi_seconds: float = 0.0
+    hot_functions: list[HotFunction] = field(default_factory=list)
+    file: Path | None = None
+
+    @property
+    def blocked_seconds(self) -> float:
+        return max(self.wall_seconds - self.cpu_seconds, 0.0)
+
+
+@dataclass
+class _Session:
+    policy: ProfilePolicy
+    profiles: list[SkillProfile]
+    counter: Iterator[int] = field(default_factory=itertools.count)
+    lock: threading.Lock = field(default_factory=threading.Lock)
+
+
+_session: contextvars.ContextVar[_Session | None] = contextvars.ContextVar(
+    "profiling_session", default=None
+)
+
+_active: contextvars.ContextVar[bool] = contextvars.ContextVar(
+    "profiling_active", default=False
+)
+"""Whether an invocation is already profiled, e.g. a Skill that calls another Skill."""
+
+
+@contextmanager
+def profiling(
+    policy: ProfilePolicy | None = None,
+) -> Iterator[list[SkillProfile]]:
+    """Profile the Skill invocations in this context.
+
+    The context is inherited by threads that copy it, e.g. the runs of
+    `pharia-skill bench`. The profiles are appended to the yielded list as the
+    invocations finish.
+
+    Args:
+        policy: How the invocations are profiled.
+    """
+    session = _Session(policy or ProfilePolicy(), [])
+    if session.policy.output_dir is not None:
+        session.policy.output_dir.mkdir(parents=True, exist_ok=True)
+    token = _session.set(session)
+    try:
+        yield session.profiles
+    finally:
+        _session.reset(token)
+
+
+@contextmanager
+def profile_invocation(
+    func: Callable[..., object], span: Span, csi: "Csi"
+) -> Iterator["Csi"]:
+    """Profile the invocation of a Skill if profiling is enabled.
+
+    This is called by the test time wrappers of `@skill` and `@message_stream`. The
+    yielded CSI is to be passed to the Skill, so that its calls are timed.
+    """
+    session = _session.get()
+    if session is None or _active.get():
+        yield csi
+        return
+
+    timed = TimedCsi(csi)
+    streams = run_streams.get()
+    if streams is None:
+        streams = []
+    streams_token = run_streams.set(streams)
+
+    profiler: _Profiler = (
+        _DeterministicProfiler()
+        if session.policy.mode == ProfilerMode.DETERMINISTIC
+        else _SamplingProfiler(func.__code__, session.policy.interval)
+    )
+    token = _active.set(True)
+    start, cpu_start = time.perf_counter(), time.thread_time()
+    profiler.start()
+    try:
+        yield timed
+    finally:
+        profiler.stop()
+        wall, cpu = time.perf_counter() - start, time.thread_time() - cpu_start
+        _active.reset(token)
+        timed.finish_streams(streams)
+        run_streams.reset(streams_token)
+
+        file = None
+        if session.policy.output_dir is not None:
+            with session.lock:
+                index = next(session.counter)
+            file = profiler.dump(session.policy.output_dir / f"{func.__name__}-{index}")
+        profile = SkillProfile(
+            skill=func.__name__,
+            wall_seconds=wall,
+            cpu_seconds=cpu,
+            csi_seconds=sum(stats.seconds for stats in timed.stats.values()),
+            hot_functions=profiler.hot_functions(session.policy.top),
+            file=file,
+        )
+        with session.lock:
+            session.profiles.append(profile)
+        _record(span, profile)
+
+
+def _record(span: Span, profile: SkillProfile) -> None:
+    span.set_attributes(
+        {
+            WALL_SECONDS: profile.wall_seconds,
+            CPU_SECONDS: profile.cpu_seconds,
+            CSI_SECONDS: profile.csi_seconds,
+            BLOCKED_SECONDS: profile.blocked_seconds,
+            HOT_FUNCTIONS: [str(function) for function in profile.hot_functions],
+        }
+    )
+    if profile.file is not None:
+        span.set_attribute(PROFILE_FILE, str(profile.file))
+
+
+class _Profiler(Protocol):
+    def start(self) -> None: ...
+
+    def stop(self) -> None: ...
+
+    def hot_functions(self, top: int) -> list[HotFunction]: ...
+
+    def dump(self, path: Path) -> Path | None: ...
+
+
+class _DeterministicProfiler(_Profiler):
+    def __init__(self) -> None:
+        self.profile = cProfile.Profile()
+        self.enabled = False
+
+    def start(self) -> None:
+        try:
+            self.profile.enable()
+            self.enabled = True
+        except ValueError:
+            # Since Python 3.12, only one `cProfile` can be active per process. Other
+            # invocations that run at the same time are timed, but not profiled.
+            pass
+
+    def stop(self) -> None:
+        if self.enabled:
+            self.profile.disable()
+
+    def hot_functions(self, top: int) -> list[HotFunction]:
+        if not self.enabled:
+            return []
+        stats = pstats.Stats(self.profile).stats  # type: ignore[attr-defined]
+        functions = [
+            HotFunction(name=name, location=f"{file}:{line}", seconds=own_time)
+            for (file, line, name), (_, _, own_time, _, _) in stats.items()
+            if name != "<method 'disable' of '_lsprof.Profiler' objects>"
+        ]
+        functions.sort(key=lambda function: function.seconds, reverse=True)
+        return functions[:top]
+
+    def dump(self, path: Path) -> Path | None:
+        if not self.enabled:
+            return None
+        path = path.with_suffix(".pstats")
+        self.profile.dump_stats(path)
+        return path
+
+
+class _SamplingProfiler(_Profiler):
+    """Sample the stack of the calling thread from a background thread.
+
+    Only the frames below the Skill function are recorded, so that the stacks do not
+    contain the frames of the test runner.
+    """
+
+    def __init__(self, code: CodeType, interval: float):
+        self.code = code
+        self.interval = interval
+        self.thread_id = threading.get_ident()
+        self.stacks: Counter[tuple[tuple[str, str], ...]] = Counter()
+        self.stopped = threading.Event()
+        self.sampler = threading.Thread(target=self._sample, daemon=True)
+
+    def start(self) -> None:
+        self.sampler.start()
+
+    def stop(self) -> None:
+        self.stopped.set()
+        self.sampler.join()
+
+    def _sample(self) -> None:
+        while not self.stopped.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is not None and (stack := self._stack(frame)):
+                self.stacks[stack] += 1
+
+    def _stack(self, frame: FrameType | None) -> tuple[tuple[str, str], ...]:
+        stack = []
+        while frame is not None:
+            code = frame.f_code
+            stack.append((code.co_name, f"{code.co_filename}:{code.co_firstlineno}"))
+            if code is self.code:
+                return tuple(reversed(stack))
+            frame = frame.f_back
+        return ()
+
+    def hot_functions(self, top: int) -> list[HotFunction]:
+        leaves: Counter[tuple[str, str]] = Counter()
+        for stack, count in self.stacks.items():
+            leaves[stack[-1]] += count
+        return [
+            HotFunction(name=name, location=location, seconds=count * self.interval)
+            for (name, location), count in leaves.most_common(top)
+        ]
+
+    def dump(self, path: Path) -> Path | None:
+        path = path.with_suffix(".collapsed")
+        with path.open("w") as file:
+            for stack, count in self.stacks.items():
+                frames = ";".join(f"{name} ({location})" for name, location in stack)
+                file.write(f"{frames} {count}\n")
+        return path
@@ -0,0 +1,491 @@
+"""
+SimulatedCsi adds the timing and the failures of a real inference backend to a CSI.
+
+The `StubCsi` answers instantly and streams whole messages at once. Skills that
+orchestrate many calls, e.g. with concurrent requests, streams or tool loops, behave
+differently once every call takes time and the backend can only serve a limited number
+of requests at once. The `SimulatedCsi` models this offline and reproducibly, so that
+orchestration strategies can be compared without a PhariaEngine.
+"""
+
+import math
+import random
+import threading
+import time
+from collections.abc import Callable, Generator, Mapping, Sequence
+from dataclasses import dataclass
+from types import TracebackType
+from typing import TypeVar
+
+from pharia_skill import (
+    ChatParams,
+    ChatRequest,
+    ChatResponse,
+    Chunk,
+    ChunkRequest,
+    Completion,
+    CompletionParams,
+    CompletionRequest,
+    Csi,
+    Document,
+    DocumentPath,
+    InvokeRequest,
+    JsonSerializable,
+    Language,
+    Message,
+    SearchRequest,
+    SearchResult,
+    SelectLanguageRequest,
+    TokenUsage,
+    Tool,
+    ToolRegistry,
+    ToolResult,
+)
+from pharia_skill.csi.inference import (
+    ChatEvent,
+    ChatStreamResponse,
+    ChatStreams,
+    CompletionAppend,
+    CompletionEvent,
+    CompletionStreamResponse,
+    CompletionStreams,
+    MessageAppend,
+    MessageBegin,
+    Reasoning,
+)
+from pharia_skill.csi.inference.multiplex import _interleave, _open_streams
+
+from .dev.client import EngineError
+from .stub import StubCsi
+
+T = TypeVar("T")
+
+_Z95 = 1.6448536269514722
+"""The 95th percentile of the standard normal distribution."""
+
+
+@dataclass(frozen=True)
+class Latency:
+    """Log-normal distribution of a delay, given by its median and 95th percentile.
+
+    Latencies of network services are skewed: most calls are close to the median, a
+    few take much longer. A log-normal distribution captures this with two numbers
+    that are easy to read off a dashboard.
+
+    Attributes:
+        median: Half of the delays are shorter, in seconds.
+        p95: 95% of the delays are shorter, in seconds. Without it, the delay is
+            always the median.
+
+    Examples::
+
+        Latency(median=0.8, p95=2.5)
+    """
+
+    median: float
+    p95: float | None = None
+
+    def __post_init__(self) -> None:
+        if self.median < 0:
+            raise ValueError("`median` must not be negative.")
+        if self.p95 is not None and self.p95 < self.median:
+            raise ValueError("`p95` must not be smaller than `median`.")
+
+    def sample(self, rng: random.Random) -> float:
+        """Draw a delay in seconds."""
+        if self.p95 is None or self.p95 == self.median or self.median == 0:
+            return self.median
+        sigma = math.log(self.p95 / self.median) / _Z95
+        return rng.lognormvariate(math.log(self.median), sigma)
+
+
+class SimulatedFailure(EngineError):
+    """A failure injected by the `SimulatedCsi`.
+
+    It is an `EngineError` with status 503, so it is handled like an unavailable
+    PhariaEngine.
+    """
+
+    def __init__(self, method: str) -> None:
+        super().__init__(f"Simulated failure of `{method}`.", 503)
+        self.method = method
+
+
+class SimulatedCsi(Csi):
+    """Wrap a CSI to respond with the latency, throughput and failures of a backend.
+
+    Every request waits for a delay drawn from the latency of its method. Chat and
+    completion streams wait for the time to first token, and then release their text
+    in pieces of `chars_per_token` characters at `tokens_per_second`. Non-streamed
+    chats and completions additionally take the time to generate the completion tokens
+    they report.
+
+    With `max_concurrency`, the simulated backend serves at most that many requests at
+    once. A `*_concurrent` call takes the free slots, up to one per request, and
+    queues its requests on them. A stream holds its slot until it has ended. Requests
+    that find no free slot wait, like in a saturated backend.
+
+    Methods are named like the CSI methods without the `_concurrent` suffix, e.g.
+    `chat`, `complete`, `chat_stream`, `completion_stream`, `search`, `chunk`,
+    `select_language`, `documents`, `documents_metadata`, `invoke_tool` and
+    `list_tools`. The latency of `chat_stream` and `completion_stream` is their time
+    to first token.
+
+    Args:
+        csi: The CSI that computes the responses. Defaults to a `StubCsi`.
+        latency: Latency of the methods with the given names.
+        default_latency: Latency of all other methods.
+        time_to_first_token: Latency until a stream begins, unless the latency of
+            `chat_stream` or `completion_stream` is given.
+        tokens_per_second: Generation speed of the models. `None` generates instantly.
+        chars_per_token: Characters of streamed text released as one token.
+        max_concurrency: Number of requests the backend serves at once.
+        failure_rate: Probability that a request raises a `SimulatedFailure`, for all
+            methods or by method name.
+        seed: Seed of the latencies and failures, for reproducible runs.
+
+    Examples::
+
+        csi = SimulatedCsi(
+            latency={"search": Latency(median=0.15, p95=0.4)},
+            time_to_first_token=Latency(median=0.5, p95=1.5),
+            tokens_per_second=40,
+            max_concurrency=8,
+            failure_rate={"invoke_tool": 0.05},
+            seed=42,
+        )
+        result = run(csi, input)
+    """
+
+    _tool_registry: ToolRegistry | None = None
+
+    def __init__(
+        self,
+        csi: Csi | None = None,
+        latency: Mapping[str, Latency] | None = None,
+        default_latency: Latency | None = None,
+        time_to_first_token: Latency | None = None,
+        tokens_per_second: float | None = None,
+        chars_per_token: int = 4,
+        max_concurrency: int | None = None,
+        failure_rate: float | Mapping[str, float] = 0.0,
+        seed: int | None = None,
+    ):
+        if tokens_per_second is not None and tokens_per_second <= 0:
+            raise ValueError("`tokens_per_second` must be positive.")
+        if chars_per_token < 1:
+            raise ValueError("`chars_per_token` must be at least 1.")
+        if max_concurrency is not None and max_concurrency < 1:
+            raise ValueError("`max_concurrency` must be at least 1.")
+        rates = (
+            failure_rate.values()
+            if isinstance(failure_rate, Mapping)
+            else [failure_rate]
+        )
+        if any(not 0 <= rate <= 1 for rate in rates):
+            raise ValueError("`failure_rate` must be between 0 and 1.")
+        self.csi = csi or StubCsi()
+        self.latency = dict(latency or {})
+        self.default_latency = default_latency or Latency(0.0)
+        self.time_to_first_token = time_to_first_token or Latency(0.0)
+        self.tokens_per_second = tokens_per_second
+        self.chars_per_token = chars_per_token
+        self.failure_rate = failure_rate
+        self._max_concurrency = max_concurrency
+        self._random = random.Random(seed)
+        self._random_lock = threading.Lock()
+        self._slots = (
+            threading.BoundedSemaphore(max_concurrency)
+            if max_concurrency is not None
+            else None
+        )
+
+    def _draw(self, latency: Latency) -> float:
+        with self._random_lock:
+            return latency.sample(self._random)
+
+    def _fails(self, method: str) -> bool:
+        rate = (
+            self.failure_rate.get(method, 0.0)
+            if isinstance(self.failure_rate, Mapping)
+            else self.failure_rate
+        )
+        if not rate:
+            return False
+        with self._random_lock:
+            return self._random.random() < rate
+
+    def _acquire(self) -> None:
+        if self._slots is not None:
+            self._slots.acquire()
+
+    def _release(self) -> None:
+        if self._slots is not None:
+            self._slots.release()
+
+    def _generation_seconds(self, usage: TokenUsage | None) -> float:
+        if self.tokens_per_second is None or usage is None:
+            return 0.0
+        return usage.completion / self.tokens_per_second
+
+    def _serve(
+        self,
+        method: str,
+        size: int,
+        respond: Callable[[], list[T]],
+        usage: Callable[[T], TokenUsage | None] = lambda _: None,
+    ) -> list[T]:
+        """Compute the responses of a batch and let each request take its time."""
+        failed = [self._fails(method) for _ in range(size)]
+        responses = respond()
+        delays = [
+            self._draw(self.latency.get(method, self.default_latency))
+            + self._generation_seconds(usage(response))
+            for response in responses
+        ]
+        self._occupy(delays)
+        if any(failed):
+            raise SimulatedFailure(method)
+        return responses
+
+    def _occupy(self, delays: list[float]) -> None:
+        """Hold slots of the backend for the duration of a batch of requests.
+
+        The batch waits for one slot and takes the other free slots, up to one per
+        request. Each request is queued on the slot that becomes free first, and a slot
+        is released once its last request is done. Slots that other callers release in
+        the meantime are not taken up by the batch.
+        """
+        if not delays:
+            return
+        slots = self._acquire_free(len(delays))
+        busy_until = [0.0] * slots
+        for delay in delays:
+            slot = busy_until.index(min(busy_until))
+            busy_until[slot] += delay
+        start = time.monotonic()
+        try:
+            for end in sorted(busy_until):
+                time.sleep(max(start + end - time.monotonic(), 0.0))
+                self._release()
+                slots -= 1
+        finally:
+            for _ in range(slots):
+                self._release()
+
+    def _acquire_free(self, wanted: int) -> int:
+        """Wait for one slot and take up to `wanted` slots in total, if they are free."""
+        if self._slots is None:
+            return wanted
+        self._slots.acquire()
+        taken = 1
+        while taken < wanted and self._slots.acquire(blocking=False):
+            taken += 1
+        return taken
+
+    def invoke_tool_concurrent(
+        self, requests: Sequence[InvokeRequest]
+    ) -> list[ToolResult]:
+        return self._serve(
+            "invoke_tool",
+            len(requests),
+            lambda: self.csi.invoke_tool_concurrent(requests),
+        )
+
+    def list_tools(self) -> list[Tool]:
+        return self._serve("list_tools", 1, lambda: [self.csi.list_tools()])[0]
+
+    def tool_registry(self) -> ToolRegistry:
+        if self._tool_registry is None:
+            self._tool_registry = ToolRegistry(self.list_tools)
+        return self._tool_registry
+
+    def complete_concurrent(
+        self, requests: Sequence[CompletionRequest]
+    ) -> list[Completion]:
+        return self._serve(
+            "complete",
+            len(requests),
+            lambda: self.csi.complete_concurrent(list(requests)),
+            lambda completion: completion.usage,
+        )
+
+    def chat_concurrent(self, requests: Sequence[ChatRequest]) -> list[ChatResponse]:
+        return self._serve(
+            "chat",
+            len(requests),
+            lambda: self.csi.chat_concurrent(requests),
+            lambda response: response.usage,
+        )
+
+    def chunk_concurrent(self, requests: Sequence[ChunkRequest]) -> list[list[Chunk]]:
+        return self._serve(
+            "chunk", len(requests), lambda: self.csi.chunk_concurrent(requests)
+        )
+
+    def select_language_concurrent(
+        self, requests: Sequence[SelectLanguageRequest]
+    ) -> list[Language | None]:
+        return self._serve(
+            "select_language",
+            len(requests),
+            lambda: self.csi.select_language_concurrent(requests),
+        )
+
+    def search_concurrent(
+        self, requests: Sequence[SearchRequest]
+    ) -> list[list[SearchResult]]:
+        return self._serve(
+            "search", len(requests), lambda: self.csi.search_concurrent(requests)
+        )
+
+    def documents(self, document_paths: Sequence[DocumentPath]) -> list[Document]:
+        return self._serve(
+            "documents", len(document_paths), lambda: self.csi.documents(document_paths)
+        )
+
+    def documents_metadata(
+        self, document_paths: Sequence[DocumentPath]
+    ) -> list[JsonSerializable]:
+        return self._serve(
+            "documents_metadata",
+            len(document_paths),
+            lambda: self.csi.documents_metadata(document_paths),
+        )
+
+    def _completion_stream(
+        self, model: str, prompt: str, params: CompletionParams
+    ) -> CompletionStreamResponse:
+        if self._fails("completion_stream"):
+            raise SimulatedFailure("completion_stream")
+        response = self.csi._completion_stream(model, prompt, params)
+        return _SimulatedCompletionStreamResponse(self._paced_completion(response))
+
+    def _chat_stream(
+        self, model: str, messages: list[Message], params: ChatParams
+    ) -> ChatStreamResponse:
+        if self._fails("chat_stream"):
+            raise SimulatedFailure("chat_stream")
+        response = self.csi._chat_stream(model, messages, params)
+        return _SimulatedChatStreamResponse(self._paced_chat(response))
+
+    def completion_stream_concurrent(
+        self, requests: Sequence[CompletionRequest]
+    ) -> CompletionStreams:
+        """Open the streams in parallel, so that their times to first token overlap."""
+        responses = _open_streams(
+            lambda r: self._completion_stream(r.model, r.prompt, r.params),
+            requests,
+            self._max_concurrency or len(requests),
+        )
+        return CompletionStreams(
+            responses, _interleave(responses, CompletionStreamResponse._read)
+        )
+
+    def chat_stream_concurrent(self, requests: Sequence[ChatRequest]) -> ChatStreams:
+        """Open the streams in parallel, so that their times to first token overlap."""
+        responses = _open_streams(
+            lambda r: self._chat_stream(r.model, r.messages, r.params),
+            requests,
+            self._max_concurrency or len(requests),
+        )
+        return ChatStreams(responses, _interleave(responses, ChatStreamResponse.next))
+
+    def _paced_chat(
+        self, response: ChatStreamResponse
+    ) -> Generator[ChatEvent, None, None]:
+        self._acquire()
+        try:
+            time.sleep(
+                self._draw(self.latency.get("chat_stream", self.time_to_first_token))
+            )
+            yield MessageBegin._trusted(response.role)
+            while (event := response.next()) is not None:
+                match event:
+                    case MessageAppend(content=content):
+                        for piece in self._tokens(content):
+                            yield MessageAppend._trusted(piece)
+                    case Reasoning(content=content):
+                        for piece in self._tokens(content):
+                            yield Reasoning._trusted(piece)
+                    case _:
+                        yield event
+        finally:
+            self._release()
+            response.__exit__(None, None, None)
+
+    def _paced_completion(
+        self, response: CompletionStreamResponse
+    ) -> Generator[CompletionEvent, None, None]:
+        self._acquire()
+        try:
+            time.sleep(
+                self._draw(
+                    self.latency.get("completion_stream", self.time_to_first_token)
+                )
+            )
+            # Merge the appends into tokens, so that the pace does not depend on how
+            # the wrapped CSI chunks the text.
+            pending = ""
+            while (event := response.next()) is not None:
+                if isinstance(event, CompletionAppend) and not event.logprobs:
+                    pending += event.text
+                    while len(pending) >= self.chars_per_token:
+                        piece = pending[: self.chars_per_token]
+                        pending = pending[self.chars_per_token :]
+                        yield self._paced(CompletionAppend._trusted(piece, []))
+                    continue
+                if pending:
+                    yield self._paced(CompletionAppend._trusted(pending, []))
+                    pending = ""
+                yield event
+            if pending:
+                yield self._paced(CompletionAppend._trusted(pending, []))
+        finally:
+            self._release()
+            response.__exit__(None, None, None)
+
+    def _tokens(self, text: str) -> Generator[str, None, None]:
+        for start in range(0, len(text), self.chars_per_token):
+            yield self._paced(text[start : start + self.chars_per_token])
+
+    def _paced(self, token: T) -> T:
+        """Wait for the time it takes to generate one token."""
+        if self.tokens_per_second is not None:
+            time.sleep(1 / self.tokens_per_second)
+        return token
+
+
+class _SimulatedChatStreamResponse(ChatStreamResponse):
+    def __init__(self, stream: Generator[ChatEvent, None, None]):
+        self._stream = stream
+        super().__init__()
+
+    def _next(self) -> ChatEvent | None:
+        return next(self._stream, None)
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> bool | None:
+        self._stream.close()
+        return None
+
+
+class _SimulatedCompletionStreamResponse(CompletionStreamResponse):
+    def __init__(self, stream: Generator[CompletionEvent, None, None]):
+        self._stream = stream
+
+    def next(self) -> CompletionEvent | None:
+        return next(self._stream, None)
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> bool | None:
+        self._stream.close()
+        return None
@@ -27,6 +27,7 @@ from pharia_skill import (
     SelectLanguageRequest,
     Text,
     TokenUsage,
+    ToolRegistry,
     ToolResult,
 )
 from pharia_skill.csi.inference import (
@@ -75,6 +76,8 @@ class StubCsi(Csi):
             assert result.haiku == "Whispers in the dark\\nEchoes of a fleeting dream\\nMeaning lost in space"
     """
 
+    _tool_registry: ToolRegistry | None = None
+
     def invoke_tool_concurrent(
         self, requests: Sequence[InvokeRequest]
     ) -> list[ToolResult]:
@@ -83,6 +86,11 @@ class StubCsi(Csi):
     def list_tools(self) -> list[Tool]:
         return []
 
+    def tool_registry(self) -> ToolRegistry:
+        if self._tool_registry is None:
+            self._tool_registry = ToolRegistry(self.list_tools)
+        return self._tool_registry
+
     def _completion_stream(
         self, model: str, prompt: str, params: CompletionParams
     ) -> CompletionStreamResponse:
@@ -95,9 +103,9 @@ class StubCsi(Csi):
 
         def generator() -> Generator[CompletionEvent, None, None]:
             for char in prompt:
-                yield CompletionAppend(char, [])
+                yield CompletionAppend._trusted(char, [])
             yield FinishReason.STOP
-            yield TokenUsage(len(prompt), len(prompt))
+            yield TokenUsage._trusted(len(prompt), len(prompt))
 
         return StubCompletionStreamResponse(generator())
 
@@ -114,17 +122,17 @@ class StubCsi(Csi):
 
         def generator() -> Generator[ChatEvent, None, None]:
             total_usage = 0
-            yield MessageBegin("assistant")
-            yield Reasoning("I am thinking...")
+            yield MessageBegin._trusted("assistant")
+            yield Reasoning._trusted("I am thinking...")
             for message in messages:
                 assert message.content is not None, (
                     "stub Csi only supports messages with content"
                 )
                 content = message.content
                 total_usage += len(content)
-                yield MessageAppend(content)
+                yield MessageAppend._trusted(content)
             yield FinishReason.STOP
-            yield TokenUsage(total_usage, total_usage)
+            yield TokenUsage._trusted(total_usage, total_usage)
 
         return StubChatStreamResponse(generator())
 
@@ -0,0 +1,223 @@
+"""
+Time the CSI calls of a Skill.
+
+The `TimedCsi` is shared by the `pharia-skill bench` command and by profiling at test
+time. Both wrap the CSI a Skill runs against and read the time spent per CSI method
+once the Skill has finished.
+"""
+
+import contextvars
+import threading
+import time
+from collections.abc import Iterator, Sequence
+from contextlib import contextmanager
+from dataclasses import dataclass
+
+from pharia_skill import (
+    ChatParams,
+    ChatRequest,
+    ChatResponse,
+    Chunk,
+    ChunkRequest,
+    Completion,
+    CompletionParams,
+    CompletionRequest,
+    Csi,
+    Document,
+    DocumentPath,
+    InvokeRequest,
+    JsonSerializable,
+    Language,
+    Message,
+    SearchRequest,
+    SearchResult,
+    SelectLanguageRequest,
+    TokenUsage,
+    Tool,
+    ToolRegistry,
+    ToolResult,
+)
+from pharia_skill.csi.inference import (
+    ChatStreamResponse,
+    ChatStreams,
+    CompletionStreamResponse,
+    CompletionStreams,
+)
+
+_Stream = ChatStreamResponse | CompletionStreamResponse
+
+OpenedStream = tuple["TimedCsi", str, float, _Stream]
+"""A stream, with the `TimedCsi` that opened it, the method name and the opening time."""
+
+run_streams: contextvars.ContextVar[list[OpenedStream] | None] = contextvars.ContextVar(
+    "run_streams", default=None
+)
+"""Streams opened by the current run.
+
+Every `TimedCsi` in a stack of wrappers adds the streams it opened, e.g. while a Skill
+is profiled during a benchmark.
+"""
+
+
+@dataclass
+class MethodStats:
+    """Time spent in one CSI method, summed over all runs.
+
+    Attributes:
+        calls: Number of calls.
+        seconds: Total time of the calls. Streams count until they have been read to
+            the end, or until they were opened if they were not read to the end.
+    """
+
+    calls: int = 0
+    seconds: float = 0.0
+
+
+class TimedCsi(Csi):
+    """Wrap a CSI to sum up the time spent in each of its methods.
+
+    Calls are recorded under the name of the CSI method, independent of whether the
+    Skill used the single or the `*_concurrent` variant. The token usage of chat and
+    completion responses is summed up as well. Streams are timed once the run that
+    opened them has finished, so they are attributed their full duration if the Skill
+    read them to the end.
+
+    Args:
+        csi: The CSI that serves the calls.
+    """
+
+    def __init__(self, csi: Csi):
+        self.csi = csi
+        self.stats: dict[str, MethodStats] = {}
+        self.usage = TokenUsage(prompt=0, completion=0)
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def _timed(self, name: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._record(name, time.perf_counter() - start)
+
+    def _record(
+        self, name: str, seconds: float, usage: TokenUsage | None = None
+    ) -> None:
+        with self._lock:
+            stats = self.stats.setdefault(name, MethodStats())
+            stats.calls += 1
+            stats.seconds += seconds
+            if usage is not None:
+                self.usage = TokenUsage(
+                    prompt=self.usage.prompt + usage.prompt,
+                    completion=self.usage.completion + usage.completion,
+                )
+
+    def _add_usage(self, usages: Sequence[TokenUsage | None]) -> None:
+        with self._lock:
+            prompt = sum(usage.prompt for usage in usages if usage is not None)
+            completion = sum(usage.completion for usage in usages if usage is not None)
+            self.usage = TokenUsage(
+                prompt=self.usage.prompt + prompt,
+                completion=self.usage.completion + completion,
+            )
+
+    def _opened(self, name: str, start: float, response: _Stream) -> None:
+        streams = run_streams.get()
+        if streams is None:
+            self._record(name, time.perf_counter() - start)
+        else:
+            streams.append((self, name, time.perf_counter() - start, response))
+
+    def finish_streams(self, streams: list[OpenedStream]) -> None:
+        """Record the streams that this CSI opened in a run that has finished."""
+        for timed, name, opening, response in streams:
+            if timed is not self:
+                continue
+            duration = response.timings().duration
+            self._record(name, max(opening, duration or 0.0), response._usage)
+
+    def invoke_tool_concurrent(
+        self, requests: Sequence[InvokeRequest]
+    ) -> list[ToolResult]:
+        with self._timed("invoke_tool"):
+            return self.csi.invoke_tool_concurrent(requests)
+
+    def list_tools(self) -> list[Tool]:
+        with self._timed("list_tools"):
+            return self.csi.list_tools()
+
+    def tool_registry(self) -> ToolRegistry:
+        return self.csi.tool_registry()
+
+    def complete_concurrent(
+        self, requests: Sequence[CompletionRequest]
+    ) -> list[Completion]:
+        with self._timed("complete"):
+            completions = self.csi.complete_concurrent(list(requests))
+        self._add_usage([completion.usage for completion in completions])
+        return completions
+
+    def _completion_stream(
+        self, model: str, prompt: str, params: CompletionParams
+    ) -> CompletionStreamResponse:
+        start = time.perf_counter()
+        response = self.csi._completion_stream(model, prompt, params)
+        self._opened("completion_stream", start, response)
+        return response
+
+    def completion_stream_concurrent(
+        self, requests: Sequence[CompletionRequest]
+    ) -> CompletionStreams:
+        start = time.perf_counter()
+        streams = self.csi.completion_stream_concurrent(requests)
+        for response in streams.responses:
+            self._opened("completion_stream", start, response)
+        return streams
+
+    def chunk_concurrent(self, requests: Sequence[ChunkRequest]) -> list[list[Chunk]]:
+        with self._timed("chunk"):
+            return self.csi.chunk_concurrent(requests)
+
+    def chat_concurrent(self, requests: Sequence[ChatRequest]) -> list[ChatResponse]:
+        with self._timed("chat"):
+            responses = self.csi.chat_concurrent(requests)
+        self._add_usage([response.usage for response in responses])
+        return responses
+
+    def _chat_stream(
+        self, model: str, messages: list[Message], params: ChatParams
+    ) -> ChatStreamResponse:
+        start = time.perf_counter()
+        response = self.csi._chat_stream(model, messages, params)
+        self._opened("chat_stream", start, response)
+        return response
+
+    def chat_stream_concurrent(self, requests: Sequence[ChatRequest]) -> ChatStreams:
+        start = time.perf_counter()
+        streams = self.csi.chat_stream_concurrent(requests)
+        for response in streams.responses:
+            self._opened("chat_stream", start, response)
+        return streams
+
+    def select_language_concurrent(
+        self, requests: Sequence[SelectLanguageRequest]
+    ) -> list[Language | None]:
+        with self._timed("select_language"):
+            return self.csi.select_language_concurrent(requests)
+
+    def search_concurrent(
+        self, requests: Sequence[SearchRequest]
+    ) -> list[list[SearchResult]]:
+        with self._timed("search"):
+            return self.csi.search_concurrent(requests)
+
+    def documents(self, document_paths: Sequence[DocumentPath]) -> list[Document]:
+        with self._timed("documents"):
+            return self.csi.documents(document_paths)
+
+    def documents_metadata(
+        self, document_paths: Sequence[DocumentPath]
+    ) -> list[JsonSerializable]:
+        with self._timed("documents_metadata"):
+            return self.csi.documents_metadata(document_paths)
@@ -5,6 +5,7 @@ from pharia_skill.csi.inference import (
     ChatStreamResponse,
     CompletionStreamResponse,
     Tool,
+    ToolRegistry,
 )
 
 from ..bindings.imports import chunking as wit_chunking
@@ -103,6 +104,11 @@ class WitCsi(Csi):
             for tool in wit_tool.list_tools()
         ]
 
+    def tool_registry(self) -> ToolRegistry:
+        # A `WitCsi` is created for every request, while the tools only change with the
+        # namespace configuration. Sharing the registry saves listing them every time.
+        return _tool_registry
+
     def _completion_stream(
         self, model: str, prompt: str, params: CompletionParams
     ) -> CompletionStreamResponse:
@@ -164,3 +170,6 @@ class WitCsi(Csi):
         requests = [document_path_to_wit(path) for path in document_paths]
         metadata = wit_document_index.document_metadata(requests)
         return [json.loads(metadata) if metadata else None for metadata in metadata]
+
+
+_tool_registry = ToolRegistry(lambda: WitCsi().list_tools())
@@ -51,6 +51,8 @@ from ..csi import (
 
 
 class WitCompletionStreamResponse(CompletionStreamResponse):
+    _released = False
+
     def __init__(self, stream: "wit.CompletionStream"):
         self._stream = stream
 
@@ -64,9 +66,15 @@ class WitCompletionStreamResponse(CompletionStreamResponse):
         exc_value: BaseException | None,
         traceback: TracebackType | None,
     ) -> bool | None:
+        # The resource is dropped on exit, it must neither be released nor read twice.
+        if self._released:
+            return None
+        self._released = True
         return self._stream.__exit__(exc_type, exc_value, traceback)
 
     def next(self) -> CompletionEvent | None:
+        if self._released:
+            return None
         match self._stream.next():
             case wit.CompletionEvent_Append(value):
                 return completion_append_from_wit(value)
@@ -79,6 +87,8 @@ class WitCompletionStreamResponse(CompletionStreamResponse):
 
 
 class WitChatStreamResponse(ChatStreamResponse):
+    _released = False
+
     def __init__(self, stream: "wit.ChatStream"):
         self._stream = stream
         super().__init__()
@@ -93,14 +103,20 @@ class WitChatStreamResponse(ChatStreamResponse):
         exc_value: BaseException | None,
         traceback: TracebackType | None,
     ) -> bool | None:
+        # The resource is dropped on exit, it must neither be released nor read twice.
+        if self._released:
+            return None
+        self._released = True
         return self._stream.__exit__(exc_type, exc_value, traceback)
 
     def _next(self) -> ChatEvent | None:
+        if self._released:
+            return None
         match self._stream.next():
             case wit.ChatEvent_MessageBegin(value):
-                return MessageBegin(value)
+                return MessageBegin._trusted(value)
             case wit.ChatEvent_Reasoning(value):
-                return Reasoning(value)
+                return Reasoning._trusted(value)
             case wit.ChatEvent_MessageAppend(value):
                 return message_append_from_wit(value)
             case wit.ChatEvent_MessageEnd(value):
@@ -254,7 +270,7 @@ def distribution_from_wit(distribution: wit.Distribution) -> Distribution:
 
 
 def token_usage_from_wit(usage: wit.TokenUsage) -> TokenUsage:
-    return TokenUsage(prompt=usage.prompt, completion=usage.completion)
+    return TokenUsage._trusted(usage.prompt, usage.completion)
 
 
 def tool_call_chunk_from_wit(tool_call_chunk: wit.ToolCallChunk) -> ToolCallChunk:
@@ -267,16 +283,14 @@ def tool_call_chunk_from_wit(tool_call_chunk: wit.ToolCallChunk) -> ToolCallChun
 
 
 def completion_append_from_wit(append: wit.CompletionAppend) -> CompletionAppend:
-    return CompletionAppend(
-        text=append.text,
-        logprobs=[
-            distribution_from_wit(distribution) for distribution in append.logprobs
-        ],
+    return CompletionAppend._trusted(
+        append.text,
+        [distribution_from_wit(distribution) for distribution in append.logprobs],
     )
 
 
 def message_append_from_wit(append: wit.MessageAppend) -> MessageAppend:
-    return MessageAppend(content=append.content)
+    return MessageAppend._trusted(append.content)
 
 
 def completion_from_wit(completion: wit.Completion) -> Completion:
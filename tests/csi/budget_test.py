@@ -0,0 +1,106 @@
+import pytest
+
+from pharia_skill import AgentBudget, BudgetExceeded, Csi, Message, agent
+from pharia_skill.csi import ChatParams, ChatStreamResponse, Tool
+from pharia_skill.csi.inference import (
+    ChatEvent,
+    FinishReason,
+    MessageAppend,
+    MessageBegin,
+    TokenUsage,
+    ToolCallChunk,
+    ToolCallEvent,
+)
+from pharia_skill.csi.inference.budget import AgentRun, budget_scope
+from pharia_skill.message_stream import AgentInput, MessageWriter
+from pharia_skill.testing import MessageRecorder, StubCsi
+from tests.csi.inference_test import MockChatStreamResponse
+
+
+class LoopingCsi(StubCsi):
+    """A model that calls a tool in every turn, unless it is told not to."""
+
+    def __init__(self) -> None:
+        self.params: list[ChatParams] = []
+
+    def list_tools(self) -> list[Tool]:
+        return [Tool(name="search")]
+
+    def _chat_stream(
+        self, model: str, messages: list[Message], params: ChatParams
+    ) -> ChatStreamResponse:
+        self.params.append(params)
+        events: list[ChatEvent] = [MessageBegin(role="assistant")]
+        if params.tool_choice == "none":
+            events += [MessageAppend("Done"), FinishReason.STOP]
+        else:
+            chunk = ToolCallChunk(0, f"{len(self.params)}", "search", "{}")
+            events += [ToolCallEvent([chunk]), FinishReason.TOOL_CALLS]
+        events.append(TokenUsage(prompt=100, completion=10))
+        return MockChatStreamResponse(events)
+
+
+def test_model_answers_without_tools_after_max_turns():
+    # Given a model that never stops calling tools
+    csi = LoopingCsi()
+    messages = [Message.user("Research this")]
+
+    # When chatting with a budget of three turns
+    budget = AgentBudget(max_turns=3)
+    response = csi.chat_stream("model", messages, tools=["search"], budget=budget)
+
+    # Then the fourth turn is the final answer without tools
+    assert [p.tool_choice for p in csi.params] == [None, None, None, "none"]
+    assert response.consume_message().content == "Done"
+
+
+def test_budget_exceeded_is_raised_without_final_answer():
+    csi = LoopingCsi()
+    budget = AgentBudget(max_tokens=200, final_answer=False)
+
+    with pytest.raises(BudgetExceeded) as e:
+        csi.chat_stream("model", [Message.user("Hi")], tools=["search"], budget=budget)
+
+    assert e.value.reason == "220 tokens"
+
+
+def test_budget_scope_is_used_by_default():
+    csi = LoopingCsi()
+
+    with budget_scope(AgentBudget(max_turns=1)):
+        csi.chat_stream("model", [Message.user("Hi")], tools=["search"])
+
+    assert len(csi.params) == 2
+
+
+def test_old_tool_outputs_are_elided_above_byte_threshold():
+    # Given a conversation with three long tool outputs
+    messages = [Message.user("Hi")] + [
+        Message.tool("x" * 100, tool_call_id=str(i)) for i in range(3)
+    ]
+    budget = AgentBudget(
+        compact_above_bytes=250, keep_tool_outputs=1, elided_output_chars=10
+    )
+
+    # When compacting
+    AgentRun(budget).compact(messages)
+
+    # Then only the oldest output is elided, as that suffices
+    assert messages[1].content == "xxxxxxxxxx... [elided 90 characters]"
+    assert messages[1].tool_call_id == "0"
+    assert messages[2].content == messages[3].content == "x" * 100
+
+
+def test_agent_budget_applies_to_chat_streams_of_the_agent():
+    # Given an agent with a budget of one turn
+    @agent(budget=AgentBudget(max_turns=1))
+    def research(csi: Csi, writer: MessageWriter[None], input: AgentInput) -> None:
+        csi.chat_stream("model", input.as_chat_messages(), tools=["search"])
+
+    # When running it
+    csi = LoopingCsi()
+    input = AgentInput.model_validate({"messages": [{"role": "user", "content": "Hi"}]})
+    research(csi, MessageRecorder[None](), input)
+
+    # Then the second turn is the final answer
+    assert [p.tool_choice for p in csi.params] == [None, "none"]
@@ -0,0 +1,123 @@
+import asyncio
+import threading
+import time
+from typing import Sequence
+
+from pharia_skill import InvokeRequest, Message, ToolDispatcher, ToolOutput
+from pharia_skill.csi.inference import ToolCall, ToolError, ToolResult
+from pharia_skill.testing import StubCsi
+
+
+class RecordingCsi(StubCsi):
+    """Echo the arguments of each tool and record the batches."""
+
+    def __init__(self) -> None:
+        self.batches: list[list[InvokeRequest]] = []
+
+    def invoke_tool_concurrent(
+        self, requests: Sequence[InvokeRequest]
+    ) -> list[ToolResult]:
+        self.batches.append(list(requests))
+        return [
+            ToolError("unknown tool")
+            if request.name == "missing"
+            else ToolOutput([f"{request.name}{request.arguments}"])
+            for request in requests
+        ]
+
+
+def test_tool_calls_of_a_turn_are_invoked_in_one_batch():
+    # Given a turn with three tool calls, two of which are identical
+    csi = RecordingCsi()
+    tool_calls = [
+        ToolCall("a", "add", {"x": 1, "y": 2}),
+        ToolCall("b", "missing", {}),
+        ToolCall("c", "add", {"y": 2, "x": 1}),
+    ]
+    messages: list[Message] = []
+
+    # When handling the tool calls
+    csi._handle_tool_calls(tool_calls, messages)
+
+    # Then the distinct calls are invoked in one batch
+    assert [r.name for r in csi.batches[0]] == ["add", "missing"]
+    assert len(csi.batches) == 1
+
+    # And there is one tool message per tool call, in the order of the tool calls
+    assert [m.tool_call_id for m in messages[1:]] == ["a", "b", "c"]
+    assert messages[1].content == messages[3].content == "add{'x': 1, 'y': 2}"
+    assert messages[2].content == 'failed[stderr]:{"error": unknown tool}[/stderr]'
+
+
+def test_cached_outputs_are_reused_across_turns():
+    csi = RecordingCsi()
+    dispatcher = ToolDispatcher(cache=True)
+    tool_calls = [ToolCall("a", "add", {"x": 1}), ToolCall("b", "missing", {})]
+
+    dispatcher.dispatch(csi.invoke_tool_concurrent, tool_calls)
+    dispatcher.dispatch(csi.invoke_tool_concurrent, tool_calls)
+
+    # Only the failed call is invoked again
+    assert [[r.name for r in batch] for batch in csi.batches] == [
+        ["add", "missing"],
+        ["missing"],
+    ]
+
+
+def test_tool_that_times_out_is_reported_as_error():
+    # Given a slow tool with a timeout
+    release = threading.Event()
+
+    def invoke(requests: Sequence[InvokeRequest]) -> list[ToolResult]:
+        if requests[0].name == "slow":
+            release.wait()
+        return [ToolOutput(["done"]) for _ in requests]
+
+    dispatcher = ToolDispatcher(timeouts={"slow": 0.01})
+    tool_calls = [ToolCall("a", "slow", {}), ToolCall("b", "fast", {})]
+
+    # When dispatching
+    messages = dispatcher.dispatch(invoke, tool_calls)
+    release.set()
+
+    # Then the slow tool is reported as failed, while the fast one succeeds
+    assert messages[0].content == (
+        'failed[stderr]:{"error": The tool `slow` did not respond within 0.01s.}[/stderr]'
+    )
+    assert messages[1].content == "done"
+
+
+def test_batches_with_different_timeouts_run_concurrently():
+    # Given two tools with different timeouts that take 50ms each
+    def invoke(requests: Sequence[InvokeRequest]) -> list[ToolResult]:
+        time.sleep(0.05)
+        return [ToolOutput(["done"]) for _ in requests]
+
+    dispatcher = ToolDispatcher(timeouts={"a": 1, "b": 2})
+    tool_calls = [
+        ToolCall("a", "a", {}),
+        ToolCall("b", "b", {}),
+        ToolCall("c", "c", {}),
+    ]
+
+    # When dispatching
+    start = time.perf_counter()
+    messages = dispatcher.dispatch(invoke, tool_calls)
+    elapsed = time.perf_counter() - start
+
+    # Then the batches overlap instead of adding up
+    assert [m.content for m in messages] == ["done"] * 3
+    assert elapsed < 0.1
+
+
+def test_async_tool_that_times_out_is_reported_as_error():
+    async def invoke(requests: Sequence[InvokeRequest]) -> list[ToolResult]:
+        await asyncio.sleep(1)
+        return [ToolOutput(["done"]) for _ in requests]
+
+    dispatcher = ToolDispatcher(default_timeout=0.01)
+    messages = asyncio.run(
+        dispatcher.dispatch_async(invoke, [ToolCall("a", "slow", {})])
+    )
+
+    assert "did not respond" in str(messages[0].content)
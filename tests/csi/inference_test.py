@@ -1,14 +1,24 @@
+import pytest
 from pydantic import BaseModel
 
 from pharia_skill.csi import Logprob, Message, Role
 from pharia_skill.csi.inference import (
     ChatEvent,
     ChatStreamResponse,
+    CompletionAppend,
+    CompletionEvent,
+    CompletionStreamResponse,
+    CompletionStreams,
+    FinishReason,
+    LatencyStats,
     MessageAppend,
     MessageBegin,
+    Reasoning,
+    TokenUsage,
     ToolCall,
     ToolCallChunk,
     ToolCallEvent,
+    timing,
 )
 from pharia_skill.csi.inference.types import _merge_tool_call_chunks
 
@@ -44,6 +54,16 @@ class MockChatStreamResponse(ChatStreamResponse):
         return None
 
 
+class MockCompletionStreamResponse(CompletionStreamResponse):
+    def __init__(self, events: list[CompletionEvent]) -> None:
+        self.events = events
+
+    def next(self) -> CompletionEvent | None:
+        if self.events:
+            return self.events.pop(0)
+        return None
+
+
 def test_chat_stream_response_no_tool_call():
     # Given a chat stream response that returns multiple events
     events: list[ChatEvent] = [
@@ -150,6 +170,27 @@ def test_message_helper():
     assert message.content == "Hello, world!"
 
 
+def test_message_helper_separates_reasoning():
+    events: list[ChatEvent] = [
+        MessageBegin._trusted("assistant"),
+        Reasoning._trusted("Let me "),
+        MessageAppend._trusted("Hello, "),
+        Reasoning._trusted("think."),
+        MessageAppend._trusted("world!"),
+    ]
+    response = MockChatStreamResponse(events)
+
+    message = response.consume_message()
+
+    assert message.content == "Hello, world!"
+    assert message.reasoning_content == "Let me think."
+
+
+def test_trusted_events_equal_validated_events():
+    assert MessageAppend._trusted("Hi") == MessageAppend(content="Hi")
+    assert not hasattr(MessageAppend._trusted("Hi"), "__dict__")
+
+
 def test_message_helper_after_stream_is_consumed():
     # Given a chat stream response that returns multiple events
     events: list[ChatEvent] = [
@@ -280,3 +321,155 @@ def test_name_spread_across_chunks():
     assert tool_calls[1].id == "def"
     assert tool_calls[1].name == "subtract"
     assert tool_calls[1].arguments == {}
+
+
+def test_chat_stream_timings(monkeypatch: pytest.MonkeyPatch):
+    # Given a clock that advances by one second per read and a stream with usage
+    clock = iter(range(100))
+    monkeypatch.setattr(
+        "pharia_skill.csi.inference.timing.time.monotonic", lambda: next(clock)
+    )
+    events: list[ChatEvent] = [
+        MessageBegin(role="assistant"),
+        MessageAppend(content="Hello, "),
+        MessageAppend(content="world"),
+        MessageAppend(content="!"),
+        FinishReason.STOP,
+        TokenUsage(prompt=1, completion=3),
+    ]
+    response = MockChatStreamResponse(events)
+
+    # When consuming the stream
+    response.consume_message()
+    timings = response.timings()
+
+    # Then the clock started with the first read and every append counts as token
+    assert timings.time_to_first_token == 1
+    assert timings.inter_token_latency == LatencyStats(p50=1, p95=1, max=1)
+    assert timings.duration == 4
+    assert timings.tokens_per_second == 1
+
+
+def test_completion_stream_timings_are_taken_for_multiplexed_reads(
+    monkeypatch: pytest.MonkeyPatch,
+):
+    # Given a clock that advances by one second per read and a completion stream
+    clock = iter(range(100))
+    monkeypatch.setattr(
+        "pharia_skill.csi.inference.timing.time.monotonic", lambda: next(clock)
+    )
+    events: list[CompletionEvent] = [
+        CompletionAppend(text="Hello", logprobs=[]),
+        CompletionAppend(text="!", logprobs=[]),
+        FinishReason.STOP,
+        TokenUsage(prompt=1, completion=2),
+    ]
+    response = MockCompletionStreamResponse(events)
+
+    # When the stream is read via `CompletionStreams` instead of `stream()`
+    with CompletionStreams([response]) as streams:
+        for _ in streams:
+            pass
+
+    # Then the tokens and the end of the stream are recorded
+    timings = response.timings()
+    assert timings.time_to_first_token == 1
+    assert timings.duration == 3
+    assert timings.tokens_per_second == 1
+
+
+def test_timings_of_unconsumed_stream_are_incomplete():
+    events: list[ChatEvent] = [MessageBegin(role="assistant")]
+    response = MockChatStreamResponse(events)
+
+    timings = response.timings()
+
+    assert timings.time_to_first_token is None
+    assert timings.inter_token_latency is None
+    assert timings.tokens_per_second is None
+
+
+def test_latency_percentiles_use_nearest_rank():
+    stats = timing._latency_stats([float(gap) for gap in range(100, 0, -1)])
+
+    assert stats == LatencyStats(p50=50, p95=95, max=100)
+
+
+def test_stream_until_predicate_cancels_stream():
+    # Given a chat stream response with three appends
+    events: list[ChatEvent] = [
+        MessageBegin(role="assistant"),
+        MessageAppend(content="Hello"),
+        MessageAppend(content="."),
+        MessageAppend(content=" More"),
+        FinishReason.STOP,
+        TokenUsage(prompt=1, completion=3),
+    ]
+    response = MockChatStreamResponse(events)
+
+    # When streaming until the end of the first sentence
+    appends = list(response.stream(until=lambda event: event.content == "."))
+
+    # Then the matching event is the last one yielded
+    assert appends == [MessageAppend(content="Hello"), MessageAppend(content=".")]
+
+    # And the stream is cancelled
+    assert response.next() is None
+    with pytest.raises(RuntimeError, match="cancelled"):
+        response.usage()
+
+
+def test_cancel_discards_peeked_events():
+    events: list[ChatEvent] = [
+        MessageBegin(role="assistant"),
+        MessageAppend(content="Hello"),
+    ]
+    response = MockChatStreamResponse(events)
+    assert response.tool_calls() is None
+
+    response.cancel()
+    response.cancel()
+
+    assert list(response.stream()) == []
+    assert response.timings().duration is not None
+
+
+def test_stream_tool_calls_yields_each_call_once_its_arguments_are_closed():
+    # Given a stream where the second tool call is generated after the first
+    events: list[ChatEvent] = [
+        MessageBegin(role="assistant"),
+        ToolCallEvent([ToolCallChunk(index=0, id="a", name="add", arguments='{"x"')]),
+        ToolCallEvent([ToolCallChunk(index=0, arguments=": 1}")]),
+        ToolCallEvent([ToolCallChunk(index=1, id="b", name="sub", arguments="{")]),
+        ToolCallEvent([ToolCallChunk(index=1, arguments='"y": 2}')]),
+        FinishReason.TOOL_CALLS,
+        TokenUsage(prompt=1, completion=4),
+    ]
+    response = MockChatStreamResponse(events)
+
+    # When streaming the tool calls
+    tool_calls = response.stream_tool_calls()
+
+    # Then the first tool call is available before the second one is read
+    first = next(tool_calls)
+    assert first == ToolCall(id="a", name="add", arguments={"x": 1})
+    assert len(response.events) == 4
+
+    # And the remaining tool call follows
+    assert list(tool_calls) == [ToolCall(id="b", name="sub", arguments={"y": 2})]
+
+    # And the tool calls and the rest of the stream are still available
+    assert response.tool_calls() == [first, ToolCall("b", "sub", {"y": 2})]
+    assert response.finish_reason() == FinishReason.TOOL_CALLS
+
+
+def test_stream_tool_calls_of_message_yields_nothing():
+    events: list[ChatEvent] = [
+        MessageBegin(role="assistant"),
+        MessageAppend(content="Hello"),
+    ]
+    response = MockChatStreamResponse(events)
+
+    assert list(response.stream_tool_calls()) == []
+    assert response.tool_calls() is None
+    assert response.consume_message().content == "Hello"
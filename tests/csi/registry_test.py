@@ -0,0 +1,97 @@
+import threading
+
+import pytest
+
+from pharia_skill import ToolRegistry
+from pharia_skill.csi import Tool
+from tests.csi.csi_test import SpyCsi
+
+
+class CountingCsi(SpyCsi):
+    def __init__(self) -> None:
+        super().__init__()
+        self.listings = 0
+
+    def list_tools(self) -> list[Tool]:
+        self.listings += 1
+        return super().list_tools()
+
+
+def test_tools_are_listed_once_per_csi():
+    # Given a csi
+    csi = CountingCsi()
+
+    # When looking up tool schemas twice
+    csi._list_tool_schemas(["dummy"])
+    schemas = csi._list_tool_schemas(["dummy2", "dummy"])
+
+    # Then the tools are only listed once, and returned in the listed order
+    assert csi.listings == 1
+    assert [tool.name for tool in schemas] == ["dummy", "dummy2"]
+    assert csi.tool_registry().get("dummy2") == schemas[1]
+
+
+def test_tools_are_listed_again_after_ttl_or_invalidation(
+    monkeypatch: pytest.MonkeyPatch,
+):
+    # Given a registry with a time to live of ten seconds
+    now = 0.0
+    monkeypatch.setattr(
+        "pharia_skill.csi.inference.registry.time.monotonic", lambda: now
+    )
+    csi = CountingCsi()
+    registry = ToolRegistry(csi.list_tools, ttl=10)
+    registry.tools()
+
+    # When the time to live has passed
+    now = 10.0
+    registry.tools()
+
+    # Then the tools are listed again
+    assert csi.listings == 2
+
+    # And also after invalidating the registry
+    registry.invalidate()
+    registry.tools()
+    assert csi.listings == 3
+
+
+def test_prefetch_lists_tools_in_background():
+    # Given a registry whose listing blocks until released
+    release = threading.Event()
+    tools = [Tool(name="slow")]
+
+    def list_tools() -> list[Tool]:
+        release.wait()
+        return tools
+
+    registry = ToolRegistry(list_tools, background=True)
+
+    # When prefetching
+    registry.prefetch()
+
+    # Then the caller is not blocked, and a lookup waits for the prefetch
+    release.set()
+    assert registry.select(["slow"]) == tools
+
+
+def test_failed_prefetch_is_logged_and_retried(caplog: pytest.LogCaptureFixture):
+    # Given a registry whose first listing fails
+    calls: list[None] = []
+
+    def list_tools() -> list[Tool]:
+        calls.append(None)
+        if len(calls) == 1:
+            raise ConnectionError("Engine unavailable")
+        return [Tool(name="search")]
+
+    registry = ToolRegistry(list_tools, background=True)
+
+    # When prefetching
+    registry.prefetch()
+    assert registry._prefetch is not None
+    registry._prefetch.join()
+
+    # Then the error is logged and the next lookup lists the tools again
+    assert "Prefetching the tools failed" in caplog.text
+    assert registry.get("search") == Tool(name="search")
@@ -0,0 +1,43 @@
+import pytest
+
+from pharia_skill.csi.inference.streaming_json import JsonObjectScanner
+
+
+def test_object_is_complete_once_closed():
+    # Given a scanner
+    scanner = JsonObjectScanner()
+
+    # When feeding a nested object in fragments
+    fragments = ['{"a": {"b"', ": [1, 2]", "}", ', "c": 3', "}"]
+    results = [scanner.feed(fragment) for fragment in fragments]
+
+    # Then it is only complete after the last fragment
+    assert results == [False, False, False, False, True]
+    assert scanner.value() == {"a": {"b": [1, 2]}, "c": 3}
+
+
+def test_brackets_and_escaped_quotes_in_strings_are_ignored():
+    scanner = JsonObjectScanner()
+
+    assert not scanner.feed('{"code": "if (x) { y[0] = \\"}\\" ')
+    assert not scanner.feed('}"')
+    assert scanner.feed("}")
+    assert scanner.value() == {"code": 'if (x) { y[0] = "}" }'}
+
+
+def test_escape_split_across_fragments():
+    scanner = JsonObjectScanner()
+
+    assert not scanner.feed('{"quote": "\\')
+    assert not scanner.feed('"}')
+    assert scanner.feed('"}')
+    assert scanner.value() == {"quote": '"}'}
+
+
+def test_data_after_complete_object_raises():
+    scanner = JsonObjectScanner()
+    assert scanner.feed('{"a": 1} ')
+    assert scanner.feed("\n")
+
+    with pytest.raises(ValueError):
+        scanner.feed("{")
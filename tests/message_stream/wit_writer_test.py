@@ -0,0 +1,85 @@
+import time
+
+import pytest
+
+from pharia_skill.bindings.imports import streaming_output as wit
+from pharia_skill.message_stream.wit_writer import WitMessageWriter
+from pharia_skill.message_stream.writer import FlushPolicy
+
+
+class FakeOutput(wit.StreamOutput):
+    """Record the items that cross the host boundary."""
+
+    def __init__(self) -> None:
+        self.items: list[wit.MessageItem] = []
+
+    def write(self, item: wit.MessageItem) -> None:
+        self.items.append(item)
+
+    def __exit__(self, *args: object) -> None:
+        pass
+
+
+def test_unbuffered_writer_writes_every_item():
+    output = FakeOutput()
+    writer = WitMessageWriter[None](output)
+
+    writer.begin_message()
+    writer.append_to_message("Hello, ")
+    writer.append_to_message("world!")
+
+    assert len(output.items) == 3
+
+
+def test_buffered_writer_merges_consecutive_chunks():
+    # Given a buffered writer
+    output = FakeOutput()
+    writer = WitMessageWriter[None](output, FlushPolicy(max_seconds=None))
+
+    # When writing reasoning and message chunks
+    with writer:
+        writer.begin_message("assistant")
+        writer.append_to_reasoning("Let me ")
+        writer.append_to_reasoning("think.")
+        writer.append_to_message("Hello, ")
+        writer.append_to_message("world!")
+        writer.end_message()
+
+    # Then consecutive chunks of the same kind are merged, keeping the order
+    assert output.items == [
+        wit.MessageItem_MessageBegin(wit.BeginAttributes(role="assistant")),
+        wit.MessageItem_Reasoning("Let me think."),
+        wit.MessageItem_MessageAppend("Hello, world!"),
+        wit.MessageItem_MessageEnd(None),
+    ]
+    assert writer.metrics.items == 6
+    assert writer.metrics.output_writes == 4
+
+
+def test_buffered_writer_flushes_on_byte_threshold():
+    output = FakeOutput()
+    writer = WitMessageWriter[None](output, FlushPolicy(max_bytes=4, max_seconds=None))
+
+    for chunk in ["ab", "cd", "e"]:
+        writer.append_to_message(chunk)
+
+    assert output.items == [wit.MessageItem_MessageAppend("abcd")]
+    writer.flush()
+    assert output.items[-1] == wit.MessageItem_MessageAppend("e")
+
+
+def test_buffered_writer_flushes_on_age(monkeypatch: pytest.MonkeyPatch):
+    # Given a writer that flushes text older than one second
+    now = 0.0
+    monkeypatch.setattr(time, "monotonic", lambda: now)
+    output = FakeOutput()
+    writer = WitMessageWriter[None](output, FlushPolicy(max_seconds=1))
+
+    # When a chunk arrives one second after the first one
+    writer.append_to_message("a")
+    now = 1.0
+    writer.append_to_message("b")
+
+    # Then both are written, and the delay of the first is recorded
+    assert output.items == [wit.MessageItem_MessageAppend("ab")]
+    assert writer.metrics.max_delay_seconds == 1
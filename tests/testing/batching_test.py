@@ -0,0 +1,141 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Sequence
+
+import pytest
+
+from pharia_skill import (
+    ChunkParams,
+    Completion,
+    CompletionRequest,
+    Language,
+    SelectLanguageRequest,
+)
+from pharia_skill.testing import BatchingCsi, StubCsi
+from pharia_skill.testing.batching import _Batcher
+
+
+class RecordingCsi(StubCsi):
+    """Record the size of every batch and fail on demand."""
+
+    def __init__(self, error: Exception | None = None) -> None:
+        self.batch_sizes: list[int] = []
+        self.error = error
+        self.lock = threading.Lock()
+
+    def complete_concurrent(
+        self, requests: Sequence[CompletionRequest]
+    ) -> list[Completion]:
+        with self.lock:
+            self.batch_sizes.append(len(requests))
+        if self.error is not None:
+            raise self.error
+        return super().complete_concurrent(requests)
+
+    def select_language_concurrent(
+        self, requests: Sequence[SelectLanguageRequest]
+    ) -> list[Language | None]:
+        with self.lock:
+            self.batch_sizes.append(len(requests))
+        return super().select_language_concurrent(requests)
+
+
+def test_single_calls_from_many_threads_are_batched():
+    # Given a batching csi around a recording csi
+    inner = RecordingCsi()
+    csi = BatchingCsi(inner, max_wait=0.05, max_batch_size=8)
+
+    # When completing from many threads at once
+    with ThreadPoolExecutor(max_workers=32) as executor:
+        prompts = [f"{i}" for i in range(32)]
+        completions = list(
+            executor.map(lambda prompt: csi.complete("model", prompt), prompts)
+        )
+
+    # Then every caller receives its own completion
+    assert [completion.text for completion in completions] == prompts
+
+    # And the calls have been sent in a few batches
+    assert sum(inner.batch_sizes) == 32
+    assert len(inner.batch_sizes) < 32
+    assert max(inner.batch_sizes) <= 8
+
+
+def test_batch_is_sent_after_max_wait():
+    # Given a batching csi with a large batch size
+    inner = RecordingCsi()
+    csi = BatchingCsi(inner, max_wait=0.001, max_batch_size=100)
+
+    # When a single call is made
+    language = csi.select_language("Hallo", [Language.German])
+
+    # Then it is sent on its own once the window has passed
+    assert language == Language.German
+    assert inner.batch_sizes == [1]
+
+
+def test_error_is_raised_for_every_caller_in_the_batch():
+    # Given a csi that fails
+    inner = RecordingCsi(error=ValueError("Engine unavailable"))
+    csi = BatchingCsi(inner, max_wait=0.05, max_batch_size=4)
+
+    def complete(prompt: str) -> Exception | None:
+        try:
+            csi.complete("model", prompt)
+        except ValueError as e:
+            return e
+        return None
+
+    # When completing from multiple threads
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        errors = list(executor.map(complete, ["a", "b", "c", "d"]))
+
+    # Then each caller receives the error
+    assert all(isinstance(error, ValueError) for error in errors)
+
+
+def test_wrong_number_of_responses_fails_every_caller():
+    # Given a dispatch that drops the last response of a batch
+    batcher = _Batcher[str, str](lambda batch: batch[:-1], 0.05, 4)
+
+    # When calling from multiple threads
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        futures = [executor.submit(batcher, request) for request in "abcd"]
+
+        # Then no caller waits forever, each one receives the error
+        for future in futures:
+            with pytest.raises(ValueError, match="Expected"):
+                future.result(timeout=1)
+
+
+class Interrupt(BaseException):
+    pass
+
+
+def test_base_exception_fails_every_caller_and_reaches_the_leader():
+    def dispatch(batch: list[str]) -> list[str]:
+        raise Interrupt()
+
+    batcher = _Batcher[str, str](dispatch, 0.05, 2)
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        futures = [executor.submit(batcher, request) for request in "ab"]
+
+        for future in futures:
+            with pytest.raises(Interrupt):
+                future.result(timeout=1)
+
+
+def test_other_methods_are_passed_through():
+    csi = BatchingCsi(StubCsi())
+
+    chunks = csi.chunk("text", ChunkParams("model", max_tokens=64))
+    completions = csi.complete_concurrent([CompletionRequest("model", "a")])
+
+    assert chunks[0].text == "text"
+    assert completions[0].text == "a"
+
+
+def test_max_batch_size_must_be_positive():
+    with pytest.raises(ValueError):
+        BatchingCsi(StubCsi(), max_batch_size=0)
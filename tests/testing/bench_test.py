@@ -0,0 +1,115 @@
+import json
+from pathlib import Path
+
+import pytest
+from pydantic import BaseModel
+from typer.testing import CliRunner
+
+from pharia_skill import Csi, Message, MessageWriter, message_stream, skill
+from pharia_skill.cli import app
+from pharia_skill.testing import StubCsi
+from pharia_skill.testing.bench import bench, input_model
+
+
+class Input(BaseModel):
+    topic: str
+
+
+class Output(BaseModel):
+    text: str
+
+
+@skill
+def echo(csi: Csi, input: Input) -> Output:
+    if input.topic == "fail":
+        raise ValueError("Unknown topic")
+    response = csi.chat("model", [Message.user(input.topic)])
+    assert response.message.content is not None
+    return Output(text=response.message.content)
+
+
+@message_stream
+def stream_echo(csi: Csi, writer: MessageWriter[None], input: Input) -> None:
+    with csi.chat_stream("model", [Message.user(input.topic)]) as response:
+        writer.forward_response(response)
+
+
+def test_input_model_is_found_through_the_decorator():
+    assert input_model(echo) == (Input, False)
+    assert input_model(stream_echo) == (Input, True)
+
+
+def test_bench_reports_latency_csi_time_and_usage():
+    # Given a Skill and two inputs
+    inputs = [Input(topic="oak"), Input(topic="river")]
+
+    # When running it ten times on four threads
+    report = bench(echo, StubCsi(), inputs, runs=10, concurrency=4)
+
+    # Then every run is measured and the chat calls are accounted for
+    assert report.runs == 10 and report.errors == 0
+    assert report.latency is not None
+    assert report.latency.p50 <= report.latency.p99 <= report.latency.max
+    assert report.time_to_first_append is None
+    assert report.csi["chat"].calls == 10
+    assert report.usage.prompt == 5 * len("oak") + 5 * len("river")
+    assert report.to_json()["throughput"] > 0
+
+
+def test_bench_measures_time_to_first_append_and_stream_usage():
+    report = bench(stream_echo, StubCsi(), [Input(topic="oak")], runs=3)
+
+    assert report.time_to_first_append is not None
+    assert report.csi["chat_stream"].calls == 3
+    assert report.usage.completion == 3 * len("oak")
+
+
+def test_failed_runs_are_counted():
+    inputs = [Input(topic="oak"), Input(topic="fail")]
+
+    report = bench(echo, StubCsi(), inputs, runs=4)
+
+    assert report.errors == 2
+    assert report.error_messages == ["ValueError: Unknown topic"]
+
+
+def test_bench_command_prints_json_report(tmp_path: Path):
+    # Given a file with inputs
+    inputs = tmp_path / "inputs.jsonl"
+    inputs.write_text('{"topic": "oak"}\n{"topic": "river"}\n')
+
+    # When benchmarking the streaming Skill against the emulator
+    result = CliRunner().invoke(
+        app,
+        [
+            "bench",
+            f"{__name__}:stream_echo",
+            "--inputs",
+            str(inputs),
+            "--runs",
+            "4",
+            "--concurrency",
+            "2",
+            "--csi",
+            "emulator",
+            "--json",
+        ],
+    )
+
+    # Then the report is printed as JSON
+    assert result.exit_code == 0, result.output
+    report = json.loads(result.output)
+    assert report["runs"] == 4
+    assert report["csi"]["chat_stream"]["calls"] == 4
+    assert report["time_to_first_append_seconds"]["p50"] > 0
+
+
+def test_bench_command_rejects_a_skill_without_module():
+    result = CliRunner().invoke(app, ["bench", "echo", "--inputs", "x.jsonl"])
+
+    assert result.exit_code == 1
+
+
+def test_bench_needs_at_least_one_run():
+    with pytest.raises(ValueError):
+        bench(echo, StubCsi(), [Input(topic="oak")], runs=0)
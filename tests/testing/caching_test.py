@@ -0,0 +1,173 @@
+from pathlib import Path
+from typing import Sequence
+
+from pharia_skill import (
+    ChatParams,
+    ChatRequest,
+    ChatResponse,
+    ChunkParams,
+    ChunkRequest,
+    Completion,
+    CompletionParams,
+    CompletionRequest,
+    Message,
+)
+from pharia_skill.testing import (
+    CachePolicy,
+    CachingCsi,
+    MemoryCache,
+    SqliteCache,
+    StubCsi,
+)
+
+GREEDY = CompletionParams(temperature=0.0)
+
+
+class RecordingCsi(StubCsi):
+    """Record every request that reaches the wrapped CSI."""
+
+    def __init__(self) -> None:
+        self.requests: list[list[object]] = []
+
+    def complete_concurrent(
+        self, requests: Sequence[CompletionRequest]
+    ) -> list[Completion]:
+        self.requests.append(list(requests))
+        return super().complete_concurrent(requests)
+
+    def chat_concurrent(self, requests: Sequence[ChatRequest]) -> list[ChatResponse]:
+        self.requests.append(list(requests))
+        return super().chat_concurrent(requests)
+
+
+def test_repeated_request_is_served_from_cache():
+    # Given a caching csi
+    inner = RecordingCsi()
+    csi = CachingCsi(inner)
+
+    # When completing the same prompt twice without sampling
+    first = csi.complete("model", "prompt", GREEDY)
+    second = csi.complete("model", "prompt", GREEDY)
+
+    # Then the wrapped csi is only called once
+    assert len(inner.requests) == 1
+    assert first == second
+    assert (csi.hits, csi.misses) == (1, 1)
+
+
+def test_only_misses_are_forwarded_and_merged_in_order():
+    # Given a caching csi which has seen one of the prompts
+    inner = RecordingCsi()
+    csi = CachingCsi(inner)
+    csi.complete("model", "b", GREEDY)
+
+    # When completing a batch containing the cached prompt
+    requests = [
+        CompletionRequest("model", prompt, GREEDY) for prompt in ["a", "b", "c"]
+    ]
+    completions = csi.complete_concurrent(requests)
+
+    # Then only the uncached prompts are forwarded
+    assert [r.prompt for r in inner.requests[-1]] == ["a", "c"]  # type: ignore
+
+    # And the results are in the order of the requests
+    assert [completion.text for completion in completions] == ["a", "b", "c"]
+
+
+def test_sampled_requests_are_not_cached_by_default():
+    inner = RecordingCsi()
+    csi = CachingCsi(inner)
+    params = ChatParams(temperature=0.7)
+
+    csi.chat("model", [Message.user("Hi")], params)
+    csi.chat("model", [Message.user("Hi")], params)
+
+    assert len(inner.requests) == 2
+
+
+def test_requests_at_the_default_temperature_are_not_cached():
+    inner = RecordingCsi()
+    csi = CachingCsi(inner)
+
+    csi.complete("model", "prompt")
+    csi.complete("model", "prompt")
+
+    assert len(inner.requests) == 2
+
+
+def test_sampled_requests_are_cached_if_forced():
+    inner = RecordingCsi()
+    csi = CachingCsi(inner, policies={"complete": CachePolicy.ALWAYS})
+    params = CompletionParams(temperature=0.7)
+
+    csi.complete("model", "prompt", params)
+    csi.complete("model", "prompt", params)
+
+    assert len(inner.requests) == 1
+
+
+def test_caching_can_be_disabled_per_method():
+    inner = RecordingCsi()
+    csi = CachingCsi(inner, policies={"complete": CachePolicy.NEVER})
+
+    csi.complete("model", "prompt")
+    csi.complete("model", "prompt")
+
+    assert len(inner.requests) == 2
+
+
+def test_cached_response_can_be_mutated_by_caller():
+    csi = CachingCsi(StubCsi())
+    params = ChunkParams("model", max_tokens=64)
+
+    chunks = csi.chunk("text", params)
+    chunks.clear()
+
+    assert len(csi.chunk_concurrent([ChunkRequest("text", params)])[0]) == 1
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = MemoryCache(max_size=2)
+    cache.set("a", b"a")
+    cache.set("b", b"b")
+
+    cache.get("a")
+    cache.set("c", b"c")
+
+    assert cache.get("a") == b"a"
+    assert cache.get("b") is None
+
+
+def test_entries_expire_after_ttl():
+    cache = MemoryCache(ttl=0)
+    cache.set("a", b"a")
+
+    assert cache.get("a") is None
+
+
+def test_sqlite_cache_persists_responses(tmp_path: Path):
+    # Given a caching csi that has written a response to disk
+    path = tmp_path / "cache.sqlite"
+    CachingCsi(StubCsi(), disk=SqliteCache(path)).complete("model", "prompt", GREEDY)
+
+    # When a new caching csi is created with the same database
+    inner = RecordingCsi()
+    csi = CachingCsi(inner, disk=SqliteCache(path))
+    completion = csi.complete("model", "prompt", GREEDY)
+
+    # Then the response is served from disk
+    assert completion.text == "prompt"
+    assert inner.requests == []
+
+
+def test_sqlite_cache_deletes_expired_entries(tmp_path: Path):
+    # Given a database with an entry that has expired
+    path = tmp_path / "cache.sqlite"
+    SqliteCache(path).set("a", b"a")
+
+    # When opening it with a ttl
+    cache = SqliteCache(path, ttl=0)
+
+    # Then the expired entry is deleted from the file
+    rows = cache._connection.execute("SELECT COUNT(*) FROM responses").fetchone()
+    assert rows == (0,)
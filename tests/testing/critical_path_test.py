@@ -0,0 +1,329 @@
+import io
+import json
+from collections.abc import Generator, Sequence
+from pathlib import Path
+
+import pytest
+from opentelemetry import trace
+from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.sdk.trace.export import ConsoleSpanExporter, SimpleSpanProcessor
+from opentelemetry.sdk.trace.export.in_memory_span_exporter import (
+    InMemorySpanExporter,
+)
+from pydantic import BaseModel
+from typer.testing import CliRunner
+
+from pharia_skill import (
+    Csi,
+    Cursor,
+    DocumentPath,
+    IndexPath,
+    Message,
+    SearchRequest,
+    SearchResult,
+    skill,
+)
+from pharia_skill.cli import app
+from pharia_skill.testing import DevCsi, EmulatorServer, StubBackend, StubCsi
+from pharia_skill.testing.critical_path import (
+    SpanRecord,
+    analyze,
+    critical_path,
+    load_spans,
+)
+
+
+class Input(BaseModel):
+    topics: list[str]
+
+
+class Output(BaseModel):
+    answer: str
+
+
+@skill
+def research(csi: Csi, input: Input) -> Output:
+    index = IndexPath("ns", "collection", "index")
+    results = [csi.search(index, topic) for topic in input.topics]
+    document = csi.document(results[0][0].document_path)
+    content = str(document.contents[0])
+    response = csi.chat("model", [Message.user(f"Summarize {content}")])
+    assert response.message.content is not None
+    return Output(answer=response.message.content)
+
+
+@pytest.fixture
+def provider(monkeypatch: pytest.MonkeyPatch) -> TracerProvider:
+    provider = TracerProvider()
+    monkeypatch.setattr(trace, "get_tracer", provider.get_tracer)
+    return provider
+
+
+@pytest.fixture
+def csi(monkeypatch: pytest.MonkeyPatch) -> Generator[DevCsi, None, None]:
+    with EmulatorServer(StubBackend()) as server:
+        monkeypatch.setenv("PHARIA_KERNEL_ADDRESS", server.address)
+        yield DevCsi()
+
+
+class IndexCsi(StubCsi):
+    """Return the documents of the searched index, as the Document Index does."""
+
+    def search_concurrent(
+        self, requests: Sequence[SearchRequest]
+    ) -> list[list[SearchResult]]:
+        return [
+            [
+                SearchResult(
+                    document_path=DocumentPath(
+                        request.index_path.namespace,
+                        request.index_path.collection,
+                        f"{request.query}.txt",
+                    ),
+                    content=f"All about {request.query}",
+                    score=1.0,
+                    start=Cursor(item=0, position=0),
+                    end=Cursor(item=0, position=0),
+                )
+            ]
+            for request in requests
+        ]
+
+
+def span(
+    name: str, start: float, end: float, parent: str | None = "run", **attributes: str
+) -> SpanRecord:
+    return SpanRecord(name, "trace", name, parent, start, end, attributes)
+
+
+def test_independent_searches_are_reported(provider: TracerProvider, csi: DevCsi):
+    # Given the spans of a Skill that searches for three topics one after another
+    exporter = InMemorySpanExporter()
+    provider.add_span_processor(SimpleSpanProcessor(exporter))
+    research(csi, Input(topics=["oak", "river", "stone"]))
+
+    # When analyzing the trace
+    (run,) = analyze(exporter.get_finished_spans())
+
+    # Then the searches can be made in one call, but the document and chat depend
+    # on their results
+    assert run.run.name == "research"
+    assert [call.function for call in run.calls] == [
+        "search",
+        "search",
+        "search",
+        "documents",
+        "chat",
+    ]
+    (group,) = run.sequential
+    assert [call.function for call in group.calls] == ["search"] * 3
+    assert group.suggestion == "csi.search_concurrent"
+    assert 0 < group.saving_seconds < sum(call.duration for call in group.calls)
+    assert run.unknown == 0
+
+    # And the critical path covers the whole run
+    assert run.critical_path[0].start == run.run.start
+    assert run.critical_path[-1].end == run.run.end
+    assert run.csi_seconds + run.own_seconds == pytest.approx(run.run.duration)
+
+
+def test_searches_in_the_same_index_are_independent(
+    provider: TracerProvider, monkeypatch: pytest.MonkeyPatch
+):
+    # Given the spans of a Skill whose searches return documents of the searched index
+    exporter = InMemorySpanExporter()
+    provider.add_span_processor(SimpleSpanProcessor(exporter))
+    with EmulatorServer(StubBackend(IndexCsi())) as server:
+        monkeypatch.setenv("PHARIA_KERNEL_ADDRESS", server.address)
+        research(DevCsi(), Input(topics=["oak", "river"]))
+
+    # When analyzing the trace
+    (run,) = analyze(exporter.get_finished_spans())
+
+    # Then the namespace and collection of the results do not link the searches,
+    # while the document fetched by the name of a result depends on the search
+    (group,) = run.sequential
+    assert [call.function for call in group.calls] == ["search"] * 2
+    assert [call.function for call in run.calls[2:]] == ["documents", "chat"]
+
+
+def test_critical_path_skips_calls_that_ran_concurrently():
+    # Given a run with two overlapping calls, followed by a third one
+    run = span("run", 0.0, 10.0, parent=None)
+    short = span("search", 1.0, 3.0)
+    long = span("chat model", 1.0, 5.0)
+    last = span("chat model-2", 6.0, 9.0)
+
+    # When finding the critical path
+    path = critical_path(run, [short, long, last])
+
+    # Then it goes through the longer of the overlapping calls
+    assert [(s.start, s.end, s.call) for s in path] == [
+        (0.0, 1.0, None),
+        (1.0, 5.0, long),
+        (5.0, 6.0, None),
+        (6.0, 9.0, last),
+        (9.0, 10.0, None),
+    ]
+
+
+def test_calls_without_payloads_are_assumed_to_be_dependent():
+    spans = [
+        span("run", 0.0, 3.0, parent=None),
+        span("search", 0.0, 1.0),
+        span("search-2", 1.0, 2.0, input="{}", output="{}"),
+    ]
+
+    (run,) = analyze(spans)
+
+    assert run.sequential == []
+    assert run.unknown == 1
+
+
+def test_output_appearing_in_a_later_prompt_is_a_dependency():
+    answer = "The capital of France is Paris, a city on the Seine."
+    spans = [
+        span("run", 0.0, 3.0, parent=None),
+        span(
+            "text_completion model",
+            0.0,
+            1.0,
+            **{"gen_ai.content.prompt": "Hi", "gen_ai.content.completion": answer},
+        ),
+        span(
+            "chat model",
+            1.0,
+            2.0,
+            **{
+                "gen_ai.input.messages": json.dumps(
+                    [{"role": "user", "content": f"Translate: {answer[:30]}"}]
+                ),
+                "gen_ai.output.messages": "[]",
+            },
+        ),
+    ]
+
+    (run,) = analyze(spans)
+
+    assert run.sequential == []
+
+
+def test_output_copied_from_any_position_is_a_dependency():
+    # Given a completion of which a slice off its start is copied into a later prompt
+    answer = "Oaks grow slowly and can live for more than a thousand years."
+    spans = [
+        span("run", 0.0, 3.0, parent=None),
+        span(
+            "text_completion a",
+            0.0,
+            1.0,
+            **{"gen_ai.content.prompt": "Hi", "gen_ai.content.completion": answer},
+        ),
+        span(
+            "text_completion b",
+            1.0,
+            2.0,
+            **{
+                "gen_ai.content.prompt": f"Summarize: {answer[5:35]}",
+                "gen_ai.content.completion": "Done",
+            },
+        ),
+    ]
+
+    # When analyzing the run, then the later completion depends on the earlier one
+    (run,) = analyze(spans)
+    assert run.sequential == []
+
+
+def test_independent_streams_are_suggested_to_be_streamed_concurrently():
+    started = {"langfuse.observation.completion_start_time": '"2026-01-01"'}
+    spans = [
+        span("run", 0.0, 3.0, parent=None),
+        span("chat model", 0.0, 1.0, input="{}", output="{}", **started),
+        span("chat model-2", 1.0, 2.0, input="{}", output="{}", **started),
+    ]
+
+    (run,) = analyze(spans)
+
+    (group,) = run.sequential
+    assert group.suggestion == "csi.chat_stream_concurrent"
+
+
+def test_spans_are_loaded_from_console_and_otlp_json(
+    provider: TracerProvider, csi: DevCsi, tmp_path: Path
+):
+    # Given a trace written by the console exporter
+    out = io.StringIO()
+    provider.add_span_processor(SimpleSpanProcessor(ConsoleSpanExporter(out=out)))
+    research(csi, Input(topics=["oak", "river"]))
+    console = tmp_path / "console.json"
+    console.write_text(out.getvalue())
+
+    # And a single span in the OTLP JSON encoding
+    otlp = tmp_path / "otlp.json"
+    otlp.write_text(
+        json.dumps(
+            {
+                "resourceSpans": [
+                    {
+                        "scopeSpans": [
+                            {
+                                "spans": [
+                                    {
+                                        "traceId": "AB",
+                                        "spanId": "01",
+                                        "name": "search",
+                                        "startTimeUnixNano": "1000000000",
+                                        "endTimeUnixNano": "3000000000",
+                                        "attributes": [
+                                            {
+                                                "key": "input",
+                                                "value": {"stringValue": "{}"},
+                                            }
+                                        ],
+                                    }
+                                ]
+                            }
+                        ]
+                    }
+                ]
+            }
+        )
+    )
+
+    # When loading them, then the spans are read
+    (run,) = analyze(load_spans(console))
+    assert len(run.sequential) == 1
+    assert load_spans(otlp) == [
+        SpanRecord("search", "ab", "01", None, 1.0, 3.0, {"input": "{}"})
+    ]
+
+
+def test_critical_path_command_prints_json(
+    provider: TracerProvider, csi: DevCsi, tmp_path: Path
+):
+    out = io.StringIO()
+    provider.add_span_processor(SimpleSpanProcessor(ConsoleSpanExporter(out=out)))
+    research(csi, Input(topics=["oak", "river"]))
+    traces = tmp_path / "traces.json"
+    traces.write_text(out.getvalue())
+
+    result = CliRunner().invoke(app, ["critical-path", str(traces), "--json"])
+
+    assert result.exit_code == 0, result.output
+    (run,) = json.loads(result.output)
+    assert run["name"] == "research"
+    assert run["sequential"][0]["calls"] == ["search", "search"]
+
+    result = CliRunner().invoke(app, ["critical-path", str(traces)])
+    assert result.exit_code == 0, result.output
+    assert "search_concurrent" in result.output
+
+
+def test_invalid_trace_file_is_rejected(tmp_path: Path):
+    traces = tmp_path / "traces.json"
+    traces.write_text("{not json")
+
+    result = CliRunner().invoke(app, ["critical-path", str(traces)])
+
+    assert result.exit_code == 1
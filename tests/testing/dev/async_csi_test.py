@@ -0,0 +1,229 @@
+import asyncio
+import json
+from typing import Any, AsyncGenerator
+
+import httpx
+import pytest
+
+from pharia_skill import (
+    ChatParams,
+    CompletionParams,
+    CompletionRequest,
+    FinishReason,
+    Message,
+    TokenUsage,
+)
+from pharia_skill.testing import AsyncDevCsi
+from pharia_skill.testing.dev.client import AsyncClient, AsyncCsiClient, Event
+from pharia_skill.testing.dev.tracing import TracingPolicy
+from tests.studio.conftest import SpyExporter
+
+
+class AsyncStubCsiClient(AsyncCsiClient):
+    """Use the `AsyncDevCsi` without doing any http calls to the Engine."""
+
+    def __init__(self, events: list[Event] | None = None) -> None:
+        self.events = events or []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def run(self, function: str, data: Any) -> Any:
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(0.01)
+        self.in_flight -= 1
+        match function:
+            case "complete":
+                return [
+                    {
+                        "text": request["prompt"],
+                        "finish_reason": "stop",
+                        "logprobs": [],
+                        "usage": {"prompt": 1, "completion": 1},
+                    }
+                    for request in data
+                ]
+            case _:
+                return {}
+
+    async def stream(
+        self, function: str, data: dict[str, Any]
+    ) -> AsyncGenerator[Event, None]:
+        async def events() -> AsyncGenerator[Event, None]:
+            for event in self.events:
+                yield event
+
+        return events()
+
+
+def test_concurrent_completions_share_one_event_loop():
+    # Given an async csi backed by a stub client
+    client = AsyncStubCsiClient()
+    csi = AsyncDevCsi._with_client(client)
+
+    # When doing many completion requests concurrently
+    async def main() -> list[str]:
+        completions = await asyncio.gather(
+            *(csi.complete("llama-3.1-8b-instruct", f"{i}") for i in range(50))
+        )
+        return [completion.text for completion in completions]
+
+    texts = asyncio.run(main())
+
+    # Then all requests are in flight at the same time and the order is kept
+    assert client.max_in_flight == 50
+    assert texts == [f"{i}" for i in range(50)]
+
+
+def test_async_completion_is_traced():
+    # Given an async csi with a spy exporter
+    csi = AsyncDevCsi._with_client(AsyncStubCsiClient())
+    spy = SpyExporter()
+    csi.set_span_exporter(spy)
+
+    # When doing a completion request
+    request = CompletionRequest("llama-3.1-8b-instruct", "Say hello to Bob")
+    asyncio.run(csi.complete_concurrent([request]))
+
+    # Then the span carries the same attributes as for the `DevCsi`
+    assert len(spy.spans) == 1
+    span = spy.spans[0]
+    assert span.name == "text_completion llama-3.1-8b-instruct"
+    assert span.attributes is not None
+    assert span.attributes["gen_ai.content.completion"] == "Say hello to Bob"
+
+
+def test_async_csi_applies_the_tracing_policy():
+    # Given an async csi that excludes completion payloads from its spans
+    policy = TracingPolicy(excluded={"complete"})
+    csi = AsyncDevCsi._with_client(AsyncStubCsiClient(), tracing=policy)
+    spy = SpyExporter()
+    csi.set_span_exporter(spy)
+
+    # When doing a single and a batched completion request
+    request = CompletionRequest("llama-3.1-8b-instruct", "Say hello to Bob")
+    asyncio.run(csi.complete_concurrent([request]))
+    asyncio.run(csi.complete_concurrent([request, request]))
+
+    # Then neither span carries a payload
+    assert len(spy.spans) == 2
+    for span in spy.spans:
+        assert span.attributes is not None
+        assert "gen_ai.content.completion" not in span.attributes
+        assert "input" not in span.attributes
+        assert "output" not in span.attributes
+
+
+def test_async_chat_stream():
+    # Given an async csi that streams a chat response
+    events = [
+        Event(event="message_begin", data={"role": "assistant"}),
+        Event(event="message_append", data={"content": "Hello, ", "logprobs": []}),
+        Event(event="message_append", data={"content": "world!", "logprobs": []}),
+        Event(event="message_end", data={"finish_reason": "stop"}),
+        Event(event="usage", data={"usage": {"prompt": 1, "completion": 2}}),
+    ]
+    csi = AsyncDevCsi._with_client(AsyncStubCsiClient(events))
+    spy = SpyExporter()
+    csi.set_span_exporter(spy)
+
+    # When consuming the stream
+    async def main() -> tuple[str, list[str], FinishReason, TokenUsage]:
+        response = await csi.chat_stream_step(
+            "llama-3.1-8b-instruct", [Message.user("Hi")], ChatParams()
+        )
+        async with response:
+            chunks = [event.content async for event in response.stream()]
+            return (
+                response.role,
+                chunks,
+                await response.finish_reason(),
+                await response.usage(),
+            )
+
+    role, chunks, finish_reason, usage = asyncio.run(main())
+
+    # Then the events, finish reason and usage are available
+    assert role == "assistant"
+    assert chunks == ["Hello, ", "world!"]
+    assert finish_reason == FinishReason.STOP
+    assert usage == TokenUsage(prompt=1, completion=2)
+
+    # And the output is recorded on the span
+    assert len(spy.spans) == 1
+    assert spy.spans[0].attributes is not None
+    output = spy.spans[0].attributes["gen_ai.output.messages"]
+    assert isinstance(output, str)
+    assert json.loads(output) == [{"role": "assistant", "content": "Hello, world!"}]
+
+
+def test_async_completion_stream():
+    # Given an async csi that streams a completion
+    events = [
+        Event(event="append", data={"text": "Hello", "logprobs": []}),
+        Event(event="end", data={"finish_reason": "length"}),
+        Event(event="usage", data={"usage": {"prompt": 1, "completion": 1}}),
+    ]
+    csi = AsyncDevCsi._with_client(AsyncStubCsiClient(events))
+
+    # When consuming the stream
+    async def main() -> tuple[list[str], FinishReason]:
+        response = await csi.completion_stream(
+            "llama-3.1-8b-instruct", "Hi", CompletionParams()
+        )
+        async with response:
+            texts = [append.text async for append in response.stream()]
+            return texts, await response.finish_reason()
+
+    texts, finish_reason = asyncio.run(main())
+
+    # Then the completion is received
+    assert texts == ["Hello"]
+    assert finish_reason == FinishReason.LENGTH
+
+
+def test_async_client_parses_server_sent_events(monkeypatch: pytest.MonkeyPatch):
+    # Given an async client talking to an Engine that splits events across chunks
+    monkeypatch.setenv("PHARIA_KERNEL_ADDRESS", "http://engine")
+    body = (
+        b'event: append\ndata: {"text": "Hel'
+        b'lo", "logprobs": []}\n\nevent: end\ndata: {"finish_reason": "stop"}\n\n'
+    )
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        assert request.url == "http://engine/csi/v1/completion_stream"
+        return httpx.Response(200, content=body)
+
+    client = AsyncClient()
+    client.session = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+    # When streaming events
+    async def main() -> list[Event]:
+        events = await client.stream("completion_stream", {})
+        return [event async for event in events]
+
+    events = asyncio.run(main())
+
+    # Then the events are stitched together
+    assert events == [
+        Event(event="append", data={"text": "Hello", "logprobs": []}),
+        Event(event="end", data={"finish_reason": "stop"}),
+    ]
+
+
+def test_async_client_raises_on_error_status(monkeypatch: pytest.MonkeyPatch):
+    # Given an async client talking to an Engine that rejects the request
+    monkeypatch.setenv("PHARIA_KERNEL_ADDRESS", "http://engine")
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(400, json={"error": "csi-version"})
+
+    client = AsyncClient()
+    client.session = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+    # When doing a request
+    with pytest.raises(Exception) as e:
+        asyncio.run(client.run("complete", {}))
+
+    # Then the JSON is decoded in the error message
+    assert "Original Error: {'error': 'csi-version'}" in str(e.value)
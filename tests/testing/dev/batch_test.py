@@ -0,0 +1,199 @@
+import threading
+import time
+from typing import Any, Generator
+
+import pytest
+
+from pharia_skill import ChunkParams, ChunkRequest, CompletionRequest, InvokeRequest
+from pharia_skill.testing import DevCsi
+from pharia_skill.testing.dev.client import CsiClient, EngineError, Event
+from tests.studio.conftest import SpyExporter
+
+
+class EchoCsiClient(CsiClient):
+    """Answer every request with one result per item, failing on demand."""
+
+    def __init__(self, failures: list[Exception] | None = None) -> None:
+        self.failures = failures or []
+        self.batches: list[list[Any]] = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.lock = threading.Lock()
+
+    def run(self, function: str, data: Any) -> Any:
+        with self.lock:
+            self.batches.append(data)
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+            failure = self.failures.pop(0) if self.failures else None
+        # Make later sub-batches finish first to check that the order is kept.
+        time.sleep(0.01 / len(self.batches))
+        with self.lock:
+            self.in_flight -= 1
+        if failure is not None:
+            raise failure
+
+        match function:
+            case "complete":
+                return [
+                    {
+                        "text": request["prompt"],
+                        "finish_reason": "stop",
+                        "logprobs": [],
+                        "usage": {"prompt": 1, "completion": 1},
+                    }
+                    for request in data
+                ]
+            case "chunk_with_offsets":
+                return [
+                    [{"text": request["text"], "byte_offset": 0, "character_offset": 0}]
+                    for request in data
+                ]
+            case _:
+                return {}
+
+    def stream(
+        self, function: str, data: dict[str, Any]
+    ) -> Generator[Event, None, None]:
+        yield from []
+
+
+def completion_requests(n: int) -> list[CompletionRequest]:
+    return [CompletionRequest("llama-3.1-8b-instruct", f"{i}") for i in range(n)]
+
+
+def test_large_batches_are_split_and_reassembled_in_order():
+    # Given a dev csi with a maximum batch size
+    client = EchoCsiClient()
+    csi = DevCsi._with_client(client, max_batch_size=10, max_parallel_batches=4)
+
+    # When completing more requests than fit into one batch
+    completions = csi.complete_concurrent(completion_requests(95))
+
+    # Then the requests are sent in sub-batches, several of them in parallel
+    assert [len(batch) for batch in client.batches].count(10) == 9
+    assert sorted(len(batch) for batch in client.batches)[0] == 5
+    assert 1 < client.max_in_flight <= 4
+
+    # And the results are in the order of the requests
+    assert [completion.text for completion in completions] == [
+        f"{i}" for i in range(95)
+    ]
+
+
+def test_batches_below_the_limit_are_sent_at_once():
+    client = EchoCsiClient()
+    csi = DevCsi._with_client(client, max_batch_size=10)
+
+    csi.complete_concurrent(completion_requests(10))
+
+    assert len(client.batches) == 1
+
+
+def test_batches_of_run_based_methods_are_split():
+    # Given a dev csi with a maximum batch size
+    client = EchoCsiClient()
+    csi = DevCsi._with_client(client, max_batch_size=2)
+    params = ChunkParams("llama-3.1-8b-instruct", max_tokens=64)
+
+    # When chunking multiple texts
+    requests = [ChunkRequest(f"{i}", params) for i in range(5)]
+    chunks = csi.chunk_concurrent(requests)
+
+    # Then the texts are chunked in sub-batches
+    assert len(client.batches) == 3
+    assert [chunk[0].text for chunk in chunks] == ["0", "1", "2", "3", "4"]
+
+
+def test_sub_batch_is_retried_on_transient_error():
+    # Given a client that fails with a gateway timeout once
+    client = EchoCsiClient(failures=[EngineError("Gateway Timeout", 504)])
+    csi = DevCsi._with_client(client, max_batch_size=10, max_parallel_batches=1)
+    csi.RETRY_BACKOFF = 0
+
+    # When completing requests in multiple sub-batches
+    completions = csi.complete_concurrent(completion_requests(20))
+
+    # Then only the failed sub-batch is sent again
+    assert len(client.batches) == 3
+    assert client.batches[0] == client.batches[1]
+    assert len(completions) == 20
+
+
+def test_non_transient_error_is_not_retried():
+    # Given a client that rejects the request
+    client = EchoCsiClient(failures=[EngineError("Bad Request", 400)])
+    csi = DevCsi._with_client(client)
+
+    # When completing
+    with pytest.raises(EngineError):
+        csi.complete_concurrent(completion_requests(1))
+
+    # Then the request is not retried
+    assert len(client.batches) == 1
+
+
+def test_retries_are_limited():
+    # Given a client that is unavailable
+    client = EchoCsiClient(failures=[EngineError("Unavailable", 503)] * 3)
+    csi = DevCsi._with_client(client, max_retries=2)
+    csi.RETRY_BACKOFF = 0
+
+    # When completing
+    with pytest.raises(EngineError):
+        csi.complete_concurrent(completion_requests(1))
+
+    # Then the request is sent once and retried twice
+    assert len(client.batches) == 3
+
+
+def test_tool_invocations_are_not_retried():
+    # Given a client with a gateway error and a csi that retries transient failures
+    client = EchoCsiClient(failures=[EngineError("Bad Gateway", 502)])
+    csi = DevCsi._with_client(client, max_retries=2)
+    csi._namespace = "test-beta"
+    csi.RETRY_BACKOFF = 0
+
+    # When invoking a tool
+    with pytest.raises(EngineError):
+        csi.invoke_tool_concurrent([InvokeRequest("add", {"a": 1, "b": 2})])
+
+    # Then the tool is only invoked once, as it may have side effects
+    assert len(client.batches) == 1
+
+
+def test_sub_batch_spans_are_children_of_request_span():
+    # Given a dev csi with a maximum batch size and a spy exporter
+    csi = DevCsi._with_client(EchoCsiClient(), max_batch_size=2)
+    spy = SpyExporter()
+    csi.set_span_exporter(spy)
+
+    # When completing requests in multiple sub-batches
+    csi.complete_concurrent(completion_requests(4))
+
+    # Then there is one span per sub-batch below the span of the whole request
+    *batch_spans, parent = spy.spans
+    assert parent.name == "text_completion"
+    assert [span.name for span in batch_spans] == ["complete batch"] * 2
+    assert parent.context is not None
+    for span in batch_spans:
+        assert span.parent is not None
+        assert span.parent.span_id == parent.context.span_id
+
+
+def test_failed_request_span_keeps_its_input():
+    # Given a dev csi whose client rejects the request
+    client = EchoCsiClient(failures=[EngineError("Bad Request", 400)])
+    csi = DevCsi._with_client(client)
+    spy = SpyExporter()
+    csi.set_span_exporter(spy)
+
+    # When chunking
+    with pytest.raises(EngineError):
+        csi.chunk_concurrent([ChunkRequest("text", ChunkParams("model", 64))])
+
+    # Then the span of the failed request records its input
+    (span,) = spy.spans
+    assert span.attributes is not None
+    assert "text" in str(span.attributes["input"])
+    assert "output" not in span.attributes
@@ -0,0 +1,115 @@
+import time
+from pathlib import Path
+from typing import Any, Generator
+
+import pytest
+
+from pharia_skill import ChatParams, CompletionParams, Message
+from pharia_skill.testing import DevCsi, RecordingClient, ReplayClient
+from pharia_skill.testing.dev.client import CsiClient, EngineError, Event
+
+
+class FakeEngineClient(CsiClient):
+    """Answer completion requests and stream a fixed chat response."""
+
+    def run(self, function: str, data: Any) -> Any:
+        if function == "select_language":
+            raise EngineError("Bad Request", 400)
+        return [
+            {
+                "text": request["prompt"],
+                "finish_reason": "stop",
+                "logprobs": [],
+                "usage": {"prompt": 1, "completion": 1},
+            }
+            for request in data
+        ]
+
+    def stream(
+        self, function: str, data: dict[str, Any]
+    ) -> Generator[Event, None, None]:
+        yield Event(event="message_begin", data={"role": "assistant"})
+        yield Event(event="message_append", data={"content": "Hi", "logprobs": []})
+        yield Event(event="message_end", data={"finish_reason": "stop"})
+        yield Event(event="usage", data={"usage": {"prompt": 1, "completion": 1}})
+
+
+@pytest.fixture
+def cassette(tmp_path: Path) -> Path:
+    """Record a completion, a chat stream and a failing request."""
+    path = tmp_path / "cassette.jsonl.gz"
+    with RecordingClient(FakeEngineClient(), path) as client:
+        csi = DevCsi._with_client(client)
+        csi.complete("model", "Hello", CompletionParams(max_tokens=1))
+        csi.chat_stream("model", [Message.user("Hi")], ChatParams()).consume_message()
+        with pytest.raises(EngineError):
+            csi.select_language("Hallo", [])
+    return path
+
+
+def test_completion_is_replayed(cassette: Path):
+    csi = DevCsi._with_client(ReplayClient(cassette))
+
+    completion = csi.complete("model", "Hello", CompletionParams(max_tokens=1))
+
+    assert completion.text == "Hello"
+
+
+def test_chat_stream_is_replayed(cassette: Path):
+    csi = DevCsi._with_client(ReplayClient(cassette))
+
+    response = csi.chat_stream("model", [Message.user("Hi")], ChatParams())
+
+    assert response.consume_message().content == "Hi"
+    assert response.usage().prompt == 1
+
+
+def test_recorded_error_is_raised(cassette: Path):
+    csi = DevCsi._with_client(ReplayClient(cassette))
+
+    with pytest.raises(EngineError) as e:
+        csi.select_language("Hallo", [])
+
+    assert e.value.status_code == 400
+
+
+def test_unrecorded_request_raises(cassette: Path):
+    csi = DevCsi._with_client(ReplayClient(cassette))
+
+    with pytest.raises(ValueError, match="No interaction"):
+        csi.complete("model", "Something else")
+
+
+def test_responses_to_identical_requests_are_replayed_in_order(tmp_path: Path):
+    # Given a cassette with two identical requests and different responses
+    path = tmp_path / "cassette.jsonl.gz"
+    with RecordingClient(FakeEngineClient(), path) as recorder:
+        recorder.run("complete", [{"prompt": "a"}])
+        recorder.run("complete", [{"prompt": "a"}])
+    replay = ReplayClient(path)
+    replay._interactions[next(iter(replay._interactions))][1]["output"] = "second"
+
+    # When replaying the request three times
+    outputs = [replay.run("complete", [{"prompt": "a"}]) for _ in range(3)]
+
+    # Then the responses are returned in order and the last one is repeated
+    assert outputs[1:] == ["second", "second"]
+
+
+def test_realtime_replay_waits_for_recorded_duration(tmp_path: Path):
+    # Given a cassette with a slow response
+    class SlowClient(FakeEngineClient):
+        def run(self, function: str, data: Any) -> Any:
+            time.sleep(0.05)
+            return super().run(function, data)
+
+    path = tmp_path / "cassette.jsonl.gz"
+    with RecordingClient(SlowClient(), path) as recorder:
+        recorder.run("complete", [{"prompt": "a"}])
+
+    # When replaying it in realtime
+    start = time.perf_counter()
+    ReplayClient(path, realtime=True).run("complete", [{"prompt": "a"}])
+
+    # Then the replay takes as long as the original request
+    assert time.perf_counter() - start >= 0.05
@@ -1,6 +1,7 @@
 import json
 import os
-from typing import Sequence
+import time
+from typing import Any, Generator, Sequence
 from unittest.mock import Mock, patch
 
 import pytest
@@ -10,6 +11,7 @@ from opentelemetry.sdk.trace.export import SpanExporter, SpanExportResult
 
 from pharia_skill import (
     ChatParams,
+    ChatRequest,
     ChunkParams,
     CompletionParams,
     Csi,
@@ -27,7 +29,9 @@ from pharia_skill import (
 )
 from pharia_skill.csi.inference import MessageAppend
 from pharia_skill.testing import DevCsi, MessageRecorder
-from pharia_skill.testing.dev.client import Client
+from pharia_skill.testing.dev.client import Client, CsiClient, Event
+from pharia_skill.testing.dev.inference import STREAM_CANCELLED
+from tests.studio.conftest import SpyExporter
 
 
 @pytest.fixture(scope="module")
@@ -463,3 +467,114 @@ def test_listing_tools_without_namespace_raises_error():
 
     # Then an error is raised
     assert "Specifying a namespace when constructing" in str(e.value)
+
+
+class DelayedStreamClient(CsiClient):
+    """Stream the name of the model, one character per event, with a delay each."""
+
+    def __init__(self, delays: dict[str, float]):
+        self.delays = delays
+
+    def run(self, function: str, data: Any) -> Any:
+        raise NotImplementedError
+
+    def stream(
+        self, function: str, data: dict[str, Any]
+    ) -> Generator[Event, None, None]:
+        model, delay = data["model"], self.delays[data["model"]]
+        yield Event(event="message_begin", data={"role": "assistant"})
+        for char in model:
+            time.sleep(delay)
+            yield Event(event="message_append", data={"content": char})
+        yield Event(event="message_end", data={"finish_reason": "stop"})
+        usage = {"prompt": 1, "completion": len(model)}
+        yield Event(event="usage", data={"usage": usage})
+
+
+def test_chat_stream_concurrent_yields_events_as_they_arrive():
+    # Given a csi where the stream of the first request is slower than the second
+    csi = DevCsi._with_client(DelayedStreamClient({"slow": 0.05, "fast": 0}))
+    requests = [
+        ChatRequest(model, [Message.user("Hi")], ChatParams())
+        for model in ("slow", "fast")
+    ]
+
+    # When streaming both requests concurrently
+    with csi.chat_stream_concurrent(requests) as streams:
+        appends = [
+            (index, event.content)
+            for index, event in streams
+            if isinstance(event, MessageAppend)
+        ]
+
+    # Then the events of the fast stream arrive first
+    assert appends[:4] == [(1, "f"), (1, "a"), (1, "s"), (1, "t")]
+    assert "".join(c for index, c in appends if index == 0) == "slow"
+
+    # And the usage of each stream is available
+    assert streams.responses[0].usage().completion == 4
+    assert streams.responses[1].finish_reason() == FinishReason.STOP
+
+
+class EndlessStreamClient(CsiClient):
+    """Stream appends until the stream is closed, like a long generation."""
+
+    def __init__(self) -> None:
+        self.closed = False
+
+    def run(self, function: str, data: Any) -> Any:
+        raise NotImplementedError
+
+    def stream(
+        self, function: str, data: dict[str, Any]
+    ) -> Generator[Event, None, None]:
+        try:
+            if function == "chat_stream":
+                yield Event(event="message_begin", data={"role": "assistant"})
+            while True:
+                if function == "chat_stream":
+                    yield Event(event="message_append", data={"content": "a"})
+                else:
+                    yield Event(event="append", data={"text": "a", "logprobs": []})
+        finally:
+            self.closed = True
+
+
+def test_cancelled_chat_stream_closes_connection_and_marks_span():
+    # Given a dev csi that streams without end
+    client = EndlessStreamClient()
+    csi = DevCsi._with_client(client)
+    spy = SpyExporter()
+    csi.set_span_exporter(spy)
+
+    # When streaming until three appends have been received
+    received: list[str] = []
+    with csi.chat_stream("model", [Message.user("Hi")], ChatParams()) as response:
+        for event in response.stream(until=lambda _: len(received) == 2):
+            received.append(event.content)
+
+    # Then the stream of the client is closed
+    assert received == ["a", "a", "a"]
+    assert client.closed
+
+    # And the span records the cancellation and the received output
+    attributes = spy.spans[0].attributes
+    assert attributes is not None
+    assert attributes[STREAM_CANCELLED] is True
+    output = json.loads(str(attributes["gen_ai.output.messages"]))
+    assert output[0]["content"] == "aaa"
+
+
+def test_cancelled_completion_stream_closes_connection():
+    client = EndlessStreamClient()
+    csi = DevCsi._with_client(client)
+    spy = SpyExporter()
+    csi.set_span_exporter(spy)
+
+    response = csi.completion_stream("model", "Hi", CompletionParams())
+    chunks = [c.text for c in response.stream(until=lambda c: True)]
+    response.cancel()
+
+    assert chunks == ["a"]
+    assert client.closed
+    assert len(spy.spans) == 1
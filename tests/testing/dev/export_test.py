@@ -0,0 +1,121 @@
+import threading
+from typing import Sequence
+
+from opentelemetry.sdk.trace import ReadableSpan
+from opentelemetry.sdk.trace.export import SpanExportResult
+
+from pharia_skill import IndexPath
+from pharia_skill.testing import BackgroundExporter, DevCsi, DropPolicy
+from tests.studio.conftest import SpyExporter, StubCsiClient
+
+
+class BlockingExporter(SpyExporter):
+    """Block the export until it is released."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.release = threading.Event()
+
+    def export(self, spans: Sequence[ReadableSpan]) -> SpanExportResult:
+        self.release.wait()
+        return super().export(spans)
+
+
+def span(name: str) -> ReadableSpan:
+    return ReadableSpan(name=name)
+
+
+def test_spans_are_exported_in_batches():
+    # Given a background exporter with a batch size of two
+    spy = SpyExporter()
+    exporter = BackgroundExporter(spy, max_batch_size=2, schedule_delay=60)
+
+    # When exporting three spans and flushing
+    for name in ("a", "b", "c"):
+        exporter.export([span(name)])
+    exporter.force_flush()
+
+    # Then all spans are exported in two batches
+    assert [s.name for s in spy.spans] == ["a", "b", "c"]
+    metrics = exporter.metrics
+    assert metrics.exported == 3
+    assert metrics.batches == 2
+    exporter.shutdown()
+
+
+def test_newest_spans_are_dropped_if_queue_is_full():
+    exporter = BackgroundExporter(SpyExporter(), max_queue_size=2, schedule_delay=60)
+
+    for name in ("a", "b", "c"):
+        exporter.export([span(name)])
+
+    assert [s.name for s in exporter._queue] == ["a", "b"]
+    assert exporter.metrics.dropped == 1
+    exporter.shutdown()
+
+
+def test_oldest_spans_are_dropped_if_queue_is_full():
+    exporter = BackgroundExporter(
+        SpyExporter(), max_queue_size=2, schedule_delay=60, drop=DropPolicy.OLDEST
+    )
+
+    for name in ("a", "b", "c"):
+        exporter.export([span(name)])
+
+    assert [s.name for s in exporter._queue] == ["b", "c"]
+    exporter.shutdown()
+
+
+def test_export_does_not_block_on_wrapped_exporter():
+    # Given a background exporter whose wrapped exporter is stuck
+    blocking = BlockingExporter()
+    exporter = BackgroundExporter(blocking, max_batch_size=1, schedule_delay=0)
+
+    # When exporting a span
+    result = exporter.export([span("a")])
+
+    # Then the span is accepted without waiting for the wrapped exporter
+    assert result == SpanExportResult.SUCCESS
+    assert blocking.spans == []
+
+    # And it is exported once the wrapped exporter is released
+    blocking.release.set()
+    exporter.shutdown()
+    assert [s.name for s in blocking.spans] == ["a"]
+
+
+def test_dev_csi_exports_in_background():
+    # Given a dev csi with a background exporter
+    csi = DevCsi._with_client(StubCsiClient())
+    spy = SpyExporter()
+    csi.set_span_exporter(spy, background=True)
+    exporter = csi.existing_exporter()
+    assert isinstance(exporter, BackgroundExporter)
+
+    # When searching and flushing the exporter
+    csi.search(IndexPath("namespace", "collection", "index"), "query")
+    exporter.force_flush()
+
+    # Then the span reaches the wrapped exporter
+    assert spy.spans[0].name == "search"
+
+
+def test_replaced_background_exporter_is_shut_down():
+    # Given a dev csi with a background exporter that holds a span
+    csi = DevCsi._with_client(StubCsiClient())
+    first = SpyExporter()
+    previous = BackgroundExporter(first, schedule_delay=60)
+    csi.set_span_exporter(previous)
+    csi.search(IndexPath("namespace", "collection", "index"), "query")
+
+    # When replacing the exporter
+    second = SpyExporter()
+    csi.set_span_exporter(second)
+
+    # Then the queued span has been exported to the first exporter
+    assert len(first.spans) == 1
+    assert csi.existing_exporter() == second
+
+    # And the worker of the replaced exporter has stopped
+    assert previous._worker is not None
+    assert not previous._worker.is_alive()
@@ -0,0 +1,67 @@
+import json
+from typing import Any, Generator
+
+from pharia_skill import ChatParams, ChatRequest, Message
+from pharia_skill.testing import DevCsi
+from pharia_skill.testing.dev.client import RawCsiClient
+from pharia_skill.testing.dev.inference import (
+    ChatRequestListAdapter,
+    ChatRequestListSerializer,
+)
+from pharia_skill.testing.dev.sse import Event
+
+
+class RawEchoClient(RawCsiClient):
+    """Answer chat requests with raw bytes and fail if the dict based path is used."""
+
+    def __init__(self) -> None:
+        self.bodies: list[bytes] = []
+
+    def run(self, function: str, data: Any) -> Any:
+        raise AssertionError("`run` must not be called if `run_raw` is available")
+
+    def run_raw(self, function: str, body: bytes) -> bytes:
+        self.bodies.append(body)
+        return json.dumps(
+            [
+                {
+                    "message": {"role": "assistant", "content": request["model"]},
+                    "finish_reason": "stop",
+                    "logprobs": [],
+                    "usage": {"prompt": 1, "completion": 1},
+                }
+                for request in json.loads(body)
+            ]
+        ).encode()
+
+    def stream(
+        self, function: str, data: dict[str, Any]
+    ) -> Generator[Event, None, None]:
+        yield from []
+
+
+def chat_request(model: str) -> ChatRequest:
+    messages = [Message.system("You are a poet."), Message.user("Write a haiku.")]
+    return ChatRequest(model, messages, ChatParams(max_tokens=64, temperature=0.5))
+
+
+def test_raw_client_receives_serialized_body():
+    # Given a dev csi with a client that accepts raw bodies
+    client = RawEchoClient()
+    csi = DevCsi._with_client(client)
+
+    # When sending chat requests
+    responses = csi.chat_concurrent([chat_request("a"), chat_request("b")])
+
+    # Then the body is sent as bytes and the response is parsed from bytes
+    assert len(client.bodies) == 1
+    assert [response.message.content for response in responses] == ["a", "b"]
+
+
+def test_raw_body_matches_dict_serialization():
+    requests = [chat_request("a"), chat_request("b")]
+
+    raw = ChatRequestListAdapter.dump_json(requests)
+    dumped = ChatRequestListSerializer(root=requests).model_dump(mode="json")
+
+    assert json.loads(raw) == dumped
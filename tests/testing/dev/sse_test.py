@@ -0,0 +1,72 @@
+import pytest
+
+from pharia_skill.testing.dev.sse import Event, EventStreamParser
+
+
+def parse(*chunks: bytes) -> list[Event]:
+    parser = EventStreamParser()
+    events = [event for chunk in chunks for event in parser.feed(chunk)]
+    return events + parser.finish()
+
+
+STREAM = (
+    b'event: message_begin\ndata: {"role": "assistant"}\n\n'
+    b'event: message_append\ndata: {"content": "Hello", "logprobs": []}\n\n'
+    b'event: message_end\ndata: {"finish_reason": "stop"}\n\n'
+)
+
+EXPECTED = [
+    Event(event="message_begin", data={"role": "assistant"}),
+    Event(event="message_append", data={"content": "Hello", "logprobs": []}),
+    Event(event="message_end", data={"finish_reason": "stop"}),
+]
+
+
+def test_events_in_one_chunk():
+    assert parse(STREAM) == EXPECTED
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 7, 64])
+def test_events_split_across_chunks(chunk_size: int):
+    # Given a stream that is split into arbitrary chunks
+    chunks = [STREAM[i : i + chunk_size] for i in range(0, len(STREAM), chunk_size)]
+
+    # Then the events are stitched together
+    assert parse(*chunks) == EXPECTED
+
+
+@pytest.mark.parametrize("line_ending", [b"\r\n", b"\r"])
+def test_line_endings(line_ending: bytes):
+    # Given a stream with other line endings, split in every possible position
+    stream = STREAM.replace(b"\n", line_ending)
+
+    for i in range(len(stream)):
+        # Then the same events are parsed
+        assert parse(stream[:i], stream[i:]) == EXPECTED
+
+
+def test_multi_line_data_is_joined_with_newline():
+    # Given an event with the JSON spread over multiple data lines
+    stream = b'event: usage\ndata: {"usage":\ndata: {"prompt": 1, "completion": 2}}\n\n'
+
+    # Then the data lines are joined
+    assert parse(stream) == [
+        Event(event="usage", data={"usage": {"prompt": 1, "completion": 2}})
+    ]
+
+
+def test_comments_and_unknown_fields_are_ignored():
+    stream = b': keep-alive\n\nid: 1\nevent: end\ndata:{"finish_reason": "stop"}\n\n'
+
+    assert parse(stream) == [Event(event="end", data={"finish_reason": "stop"})]
+
+
+def test_unterminated_event_at_end_of_stream():
+    assert parse(b'event: end\ndata: {"finish_reason": "stop"}') == [
+        Event(event="end", data={"finish_reason": "stop"})
+    ]
+
+
+def test_event_without_data_raises():
+    with pytest.raises(ValueError):
+        parse(b"event: end\n\n")
@@ -1,4 +1,5 @@
 import pytest
+from opentelemetry.sdk.trace import ReadableSpan, TracerProvider
 from pydantic import BaseModel
 
 from pharia_skill import Csi
@@ -178,3 +179,84 @@ def test_message_recorder_json_output_with_multiple_messages():
         output
         == '[{"role":"assistant","content":"Hello!","reasoning_content":"Thinking..."},{"role":"assistant","content":"Hi!","reasoning_content":""}]'
     )
+
+
+def test_messages_are_aggregated_without_keeping_items():
+    # Given a recorder that does not keep the items
+    recorder = MessageRecorder[None](keep_items=False)
+
+    # When writing two messages
+    recorder.write(MessageBegin(role="assistant"))
+    recorder.write(Reasoning(content="Thinking"))
+    recorder.write(MessageAppend(text="Hello"))
+    recorder.write(MessageAppend(text="!"))
+    recorder.write(MessageEnd(payload=None))
+    recorder.write(MessageBegin(role="assistant"))
+    recorder.write(MessageAppend(text="Hi"))
+
+    # Then the messages are available, including the one that has not ended
+    assert recorder.items == []
+    assert recorder.messages() == [
+        RecordedMessage(
+            role="assistant", content="Hello!", reasoning_content="Thinking"
+        ),
+        RecordedMessage(role="assistant", content="Hi"),
+    ]
+
+    # And the stream continues after the messages have been read
+    recorder.write(MessageAppend(text="!"))
+    assert recorder.messages()[-1].content == "Hi!"
+
+
+def test_items_are_validated_without_keeping_items():
+    recorder = MessageRecorder[None](keep_items=False)
+    recorder.write(MessageBegin(role="assistant"))
+
+    with pytest.raises(ValueError):
+        recorder.write(MessageBegin(role="assistant"))
+
+
+def test_span_events_are_coalesced():
+    # Given a recorder that merges at least 10 characters into one span event
+    span = TracerProvider().get_tracer(__name__).start_span("skill")
+    recorder = MessageRecorder[None](event_chars=10)
+    recorder.span = span
+
+    # When writing reasoning and message chunks
+    recorder.write(MessageBegin(role="assistant"))
+    recorder.write(Reasoning(content="Thinking"))
+    for _ in range(12):
+        recorder.write(MessageAppend(text="abc"))
+    recorder.write(MessageEnd(payload=None))
+    span.end()
+
+    # Then the chunks are merged per kind until they reach 10 characters
+    assert isinstance(span, ReadableSpan)
+    events = [(event.name, dict(event.attributes or {})) for event in span.events]
+    assert events == [
+        ("message_begin", {"role": "assistant"}),
+        ("reasoning", {"content": "Thinking", "chunks": 1}),
+        ("message_append", {"text": "abc" * 4, "chunks": 4}),
+        ("message_append", {"text": "abc" * 4, "chunks": 4}),
+        ("message_append", {"text": "abc" * 4, "chunks": 4}),
+        ("message_end", {}),
+    ]
+
+
+def test_flush_adds_the_merged_span_event():
+    # Given a recorder that holds back a chunk shorter than `event_chars`
+    span = TracerProvider().get_tracer(__name__).start_span("skill")
+    recorder = MessageRecorder[None](event_chars=10)
+    recorder.span = span
+    recorder.write(MessageBegin(role="assistant"))
+    recorder.write(MessageAppend(text="abc"))
+
+    # When flushing the recorder through the `MessageWriter` interface
+    writer: MessageWriter[None] = recorder
+    writer.flush()
+    span.end()
+
+    # Then the pending chunk is added as an event
+    assert isinstance(span, ReadableSpan)
+    assert span.events[-1].name == "message_append"
+    assert dict(span.events[-1].attributes or {}) == {"text": "abc", "chunks": 1}
@@ -0,0 +1,117 @@
+import json
+
+from pharia_skill import ChatParams, CompletionParams, IndexPath, Message
+from pharia_skill.testing import DevCsi, PayloadMode, StreamUpdates, TracingPolicy
+from pharia_skill.testing.dev.client import Event
+from pharia_skill.testing.dev.tracing import UpdateThrottle
+from tests.studio.conftest import SpyExporter, StubCsiClient
+
+
+def traced_csi(policy: TracingPolicy) -> tuple[DevCsi, SpyExporter]:
+    csi = DevCsi._with_client(StubCsiClient(), tracing=policy)
+    spy = SpyExporter()
+    csi.set_span_exporter(spy)
+    return csi, spy
+
+
+def test_payloads_are_truncated_to_max_attribute_bytes():
+    # Given a policy that limits payloads to 10 bytes
+    csi, spy = traced_csi(TracingPolicy(max_attribute_bytes=10))
+
+    # When completing
+    csi.complete("model", "A rather long prompt", CompletionParams())
+
+    # Then the prompt and the completion are truncated
+    attributes = spy.spans[0].attributes
+    assert attributes is not None
+    assert attributes["gen_ai.content.prompt"] == "A rather l... [truncated 10 bytes]"
+    assert (
+        attributes["gen_ai.content.completion"] == "Hello, wor... [truncated 3 bytes]"
+    )
+
+    # And the attributes without content are recorded as usual
+    assert attributes["gen_ai.request.model"] == "model"
+    assert attributes["gen_ai.usage.output_tokens"] == 1
+
+
+def test_only_hash_of_payload_is_recorded():
+    csi, spy = traced_csi(TracingPolicy(mode=PayloadMode.HASH))
+
+    csi.complete("model", "prompt", CompletionParams())
+
+    attributes = spy.spans[0].attributes
+    assert attributes is not None
+    prompt = attributes["gen_ai.content.prompt"]
+    assert isinstance(prompt, str)
+    assert prompt.startswith("sha256:") and prompt.endswith("(6 bytes)")
+
+
+def test_payloads_of_excluded_functions_are_not_recorded():
+    # Given a policy that excludes searches
+    csi, spy = traced_csi(TracingPolicy(excluded={"search"}))
+
+    # When searching
+    csi.search(IndexPath("namespace", "collection", "index"), "query")
+
+    # Then the span has no input and output
+    attributes = spy.spans[0].attributes
+    assert attributes is not None
+    assert "input" not in attributes
+    assert "output" not in attributes
+
+
+def test_payloads_are_not_recorded_if_not_sampled():
+    csi, spy = traced_csi(TracingPolicy(sample_rate=0))
+
+    csi.complete("model", "prompt", CompletionParams())
+
+    attributes = spy.spans[0].attributes
+    assert attributes is not None
+    assert "gen_ai.content.prompt" not in attributes
+    assert attributes["gen_ai.request.model"] == "model"
+
+
+def chat_events(*contents: str) -> list[Event]:
+    return [
+        Event(event="message_begin", data={"role": "assistant"}),
+        *[
+            Event(event="message_append", data={"content": content, "logprobs": []})
+            for content in contents
+        ],
+        Event(event="message_end", data={"finish_reason": "stop"}),
+        Event(event="usage", data={"usage": {"prompt": 1, "completion": 1}}),
+    ]
+
+
+def test_abandoned_stream_records_received_output():
+    # Given a csi that streams three message appends
+    csi, spy = traced_csi(TracingPolicy())
+    assert isinstance(csi.client, StubCsiClient)
+    csi.client.events = chat_events("Hello", ", ", "world!")
+
+    # When only consuming the first two appends
+    with csi.chat_stream("model", [Message.user("Hi")], ChatParams()) as response:
+        stream = response.stream()
+        next(stream)
+        next(stream)
+
+    # Then the span holds the content received until the stream was exited
+    attributes = spy.spans[0].attributes
+    assert attributes is not None
+    output = attributes["gen_ai.output.messages"]
+    assert isinstance(output, str)
+    assert json.loads(output)[0]["content"] == "Hello, "
+
+
+def test_update_throttle_counts_events():
+    throttle = UpdateThrottle(StreamUpdates(every_events=3))
+
+    due = [throttle.tick() for _ in range(6)]
+
+    assert due == [False, False, True, False, False, True]
+
+
+def test_update_throttle_without_limits_only_updates_at_end():
+    throttle = UpdateThrottle(StreamUpdates())
+
+    assert not any(throttle.tick() for _ in range(100))
@@ -0,0 +1,133 @@
+import random
+import time
+from collections.abc import Generator
+
+import pytest
+
+from pharia_skill import (
+    ChatParams,
+    ChunkParams,
+    CompletionParams,
+    DocumentPath,
+    IndexPath,
+    Language,
+    Message,
+)
+from pharia_skill.csi.inference import MessageAppend, ToolOutput
+from pharia_skill.testing import (
+    DevCsi,
+    EmulatorServer,
+    LatencyModel,
+    ScriptedBackend,
+    StubBackend,
+    StubCsi,
+)
+from pharia_skill.testing.dev.client import EngineError, Event
+
+
+@pytest.fixture
+def emulator(monkeypatch: pytest.MonkeyPatch) -> Generator[EmulatorServer, None, None]:
+    with EmulatorServer(StubBackend()) as server:
+        monkeypatch.setenv("PHARIA_KERNEL_ADDRESS", server.address)
+        yield server
+
+
+def test_dev_csi_requests_are_answered_by_the_stub_csi(emulator: EmulatorServer):
+    # Given a DevCsi talking to an emulator backed by the StubCsi
+    csi = DevCsi(namespace="test")
+    stub = StubCsi()
+    messages = [Message.user("Hello")]
+    document = DocumentPath("ns", "collection", "name")
+
+    # When making requests over HTTP, then the responses match the StubCsi
+    assert csi.chat("model", messages) == stub.chat("model", messages)
+    assert csi.complete("model", "Hi", CompletionParams()) == stub.complete(
+        "model", "Hi", CompletionParams()
+    )
+    assert csi.search(IndexPath("a", "b", "c"), "query") == stub.search(
+        IndexPath("a", "b", "c"), "query"
+    )
+    assert csi.document(document) == stub.document(document)
+    assert csi.chunk("text", ChunkParams("model", 10)) == stub.chunk(
+        "text", ChunkParams("model", 10)
+    )
+    assert csi.select_language("Hallo", [Language.German]) == Language.German
+    assert csi.list_tools() == []
+    assert csi.invoke_tool("add", a=1) == ToolOutput(contents=[])
+
+
+def test_chat_and_completion_streams_are_sent_as_events(emulator: EmulatorServer):
+    csi = DevCsi()
+
+    with csi.chat_stream_step("model", [Message.user("Hello")], ChatParams()) as chat:
+        assert chat.role == "assistant"
+        events = list(chat.stream())
+    with csi.completion_stream("model", "Hi", CompletionParams()) as completion:
+        text = "".join(append.text for append in completion.stream())
+        usage = completion.usage()
+
+    assert [e.content for e in events if isinstance(e, MessageAppend)] == ["Hello"]
+    assert chat.usage().prompt == 5
+    assert text == "Hi"
+    assert usage.completion == 2
+
+
+def test_scripted_stream_error_is_raised(monkeypatch: pytest.MonkeyPatch):
+    # Given a scripted backend whose stream fails after the first message append
+    def failing(body: dict[str, object]) -> Generator[Event, None, None]:
+        yield Event(event="message_begin", data={"role": "assistant"})
+        yield Event(event="message_append", data={"content": "Hel"})
+        raise RuntimeError("model crashed")
+
+    backend = ScriptedBackend(stream={"chat_stream": failing})
+
+    with EmulatorServer(backend) as server:
+        monkeypatch.setenv("PHARIA_KERNEL_ADDRESS", server.address)
+        csi = DevCsi()
+
+        # When streaming, then the error event is raised by the DevCsi
+        response = csi.chat_stream_step("model", [Message.user("Hi")], ChatParams())
+        with pytest.raises(ValueError, match="model crashed"):
+            response.consume_message()
+
+        # And functions that are not scripted respond with 404
+        with pytest.raises(EngineError) as error:
+            csi.chat("model", [Message.user("Hi")])
+        assert error.value.status_code == 404
+
+
+def test_latency_model_paces_the_stream(monkeypatch: pytest.MonkeyPatch):
+    # Given an emulator with a time to first token and a token rate
+    latency = LatencyModel(request_seconds=0.05, tokens_per_second=100)
+    with EmulatorServer(StubBackend(), latency) as server:
+        monkeypatch.setenv("PHARIA_KERNEL_ADDRESS", server.address)
+        csi = DevCsi()
+
+        # When streaming 20 one character tokens
+        start = time.perf_counter()
+        with csi.completion_stream("model", "x" * 20, CompletionParams()) as response:
+            text = "".join(append.text for append in response.stream())
+        elapsed = time.perf_counter() - start
+
+    # Then the stream takes the time to first token plus 20 tokens at 100 per second
+    assert text == "x" * 20
+    assert elapsed >= 0.05 + 20 * 0.01
+
+
+def test_latency_model_estimates_tokens_from_text():
+    latency = LatencyModel(tokens_per_second=10, chars_per_token=4)
+    rng = random.Random(0)
+
+    append = Event(event="message_append", data={"content": "12345678"})
+    usage = Event(event="usage", data={"usage": {"prompt": 1, "completion": 1}})
+    chat = [{"usage": {"prompt": 1, "completion": 30}}]
+
+    assert latency.event_delay(rng, append) == pytest.approx(0.2)
+    assert latency.event_delay(rng, usage) == 0.0
+    assert latency.response_delay(rng, "chat", chat) == pytest.approx(3.0)
+    assert latency.response_delay(rng, "search", chat) == 0.0
+
+
+def test_jitter_must_be_below_one():
+    with pytest.raises(ValueError):
+        LatencyModel(jitter=1.0)
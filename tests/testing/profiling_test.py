@@ -0,0 +1,145 @@
+from collections.abc import Generator
+from pathlib import Path
+
+import pytest
+from opentelemetry import trace
+from opentelemetry.sdk.trace import ReadableSpan, TracerProvider
+from opentelemetry.sdk.trace.export import SimpleSpanProcessor
+from opentelemetry.sdk.trace.export.in_memory_span_exporter import (
+    InMemorySpanExporter,
+)
+from pydantic import BaseModel
+
+from pharia_skill import Csi, Message, MessageWriter, message_stream, skill
+from pharia_skill.testing import (
+    Latency,
+    MessageRecorder,
+    ProfilePolicy,
+    ProfilerMode,
+    SimulatedCsi,
+    StubCsi,
+    profiling,
+)
+
+
+class Input(BaseModel):
+    topic: str
+
+
+class Output(BaseModel):
+    text: str
+
+
+def assemble_prompt(topic: str) -> str:
+    return " ".join(f"{topic}-{i}" for i in range(20_000))
+
+
+@skill
+def slow_prompt(csi: Csi, input: Input) -> Output:
+    prompt = assemble_prompt(input.topic)
+    response = csi.chat("model", [Message.user(prompt[:10])])
+    assert response.message.content is not None
+    return Output(text=response.message.content)
+
+
+@message_stream
+def streaming(csi: Csi, writer: MessageWriter[None], input: Input) -> None:
+    with csi.chat_stream("model", [Message.user(input.topic)]) as response:
+        writer.forward_response(response)
+
+
+@pytest.fixture
+def spans(
+    monkeypatch: pytest.MonkeyPatch,
+) -> Generator[InMemorySpanExporter, None, None]:
+    exporter = InMemorySpanExporter()
+    provider = TracerProvider()
+    provider.add_span_processor(SimpleSpanProcessor(exporter))
+    monkeypatch.setattr(trace, "get_tracer", provider.get_tracer)
+    yield exporter
+
+
+def skill_span(exporter: InMemorySpanExporter, name: str) -> ReadableSpan:
+    return next(span for span in exporter.get_finished_spans() if span.name == name)
+
+
+def test_skills_are_not_profiled_by_default(spans: InMemorySpanExporter):
+    slow_prompt(StubCsi(), Input(topic="oak"))
+
+    attributes = skill_span(spans, "slow_prompt").attributes
+    assert attributes is not None
+    assert "pharia.profile.wall_seconds" not in attributes
+
+
+def test_time_is_split_into_csi_and_cpu_time(spans: InMemorySpanExporter):
+    # Given a CSI that takes 100ms for a chat request
+    csi = SimulatedCsi(latency={"chat": Latency(0.1)})
+
+    # When running a Skill that assembles a long prompt
+    with profiling() as profiles:
+        slow_prompt(csi, Input(topic="oak"))
+
+    # Then the chat request is CSI time and the prompt assembly is CPU time
+    (profile,) = profiles
+    assert profile.skill == "slow_prompt"
+    assert 0.1 <= profile.csi_seconds <= profile.wall_seconds
+    assert profile.cpu_seconds > 0
+    assert any(__file__ in f.location for f in profile.hot_functions)
+
+    # And the profile is attached to the span of the Skill
+    attributes = skill_span(spans, "slow_prompt").attributes
+    assert attributes is not None
+    assert attributes["pharia.profile.csi_seconds"] == profile.csi_seconds
+    hot_functions = attributes["pharia.profile.hot_functions"]
+    assert isinstance(hot_functions, tuple) and len(hot_functions) <= 10
+
+
+def test_sampling_profiler_dumps_collapsed_stacks(
+    spans: InMemorySpanExporter, tmp_path: Path
+):
+    # Given a sampling profiler that writes its profiles to a directory
+    policy = ProfilePolicy(mode=ProfilerMode.SAMPLING, output_dir=tmp_path)
+    csi = SimulatedCsi(latency={"chat": Latency(0.05)})
+
+    # When running a Skill twice
+    with profiling(policy) as profiles:
+        slow_prompt(csi, Input(topic="oak"))
+        slow_prompt(csi, Input(topic="oak"))
+
+    # Then each invocation is dumped as folded stacks starting at the Skill
+    assert [p.file for p in profiles] == [
+        tmp_path / "slow_prompt-0.collapsed",
+        tmp_path / "slow_prompt-1.collapsed",
+    ]
+    assert profiles[0].file is not None
+    lines = profiles[0].file.read_text().splitlines()
+    assert lines and all(line.startswith("slow_prompt (") for line in lines)
+    assert profiles[0].hot_functions
+
+
+def test_streams_are_counted_as_csi_time():
+    # Given a CSI whose chat streams take 50ms until the first token
+    csi = SimulatedCsi(time_to_first_token=Latency(0.05))
+
+    # When profiling a message stream Skill that forwards a chat stream
+    with profiling() as profiles:
+        streaming(csi, MessageRecorder[None](), Input(topic="oak"))
+
+    # Then the whole stream is CSI time
+    (profile,) = profiles
+    assert profile.csi_seconds >= 0.05
+
+
+def test_deterministic_profiler_dumps_pstats(tmp_path: Path):
+    with profiling(ProfilePolicy(top=3, output_dir=tmp_path)) as profiles:
+        streaming(StubCsi(), MessageRecorder[None](), Input(topic="oak"))
+
+    (profile,) = profiles
+    assert profile.file == tmp_path / "streaming-0.pstats"
+    assert profile.file.exists()
+    assert len(profile.hot_functions) == 3
+
+
+def test_interval_must_be_positive():
+    with pytest.raises(ValueError):
+        ProfilePolicy(interval=0)
@@ -0,0 +1,209 @@
+import random
+import threading
+import time
+
+import pytest
+
+from pharia_skill import (
+    ChatParams,
+    ChatRequest,
+    CompletionParams,
+    IndexPath,
+    Message,
+    SearchRequest,
+)
+from pharia_skill.csi.inference import MessageAppend, Reasoning
+from pharia_skill.testing import (
+    Latency,
+    SimulatedCsi,
+    SimulatedFailure,
+    StubCsi,
+)
+
+
+def test_latency_is_reproducible_with_a_seed():
+    latency = Latency(median=0.2, p95=1.0)
+
+    first = [latency.sample(random.Random(7)) for _ in range(3)]
+    second = [latency.sample(random.Random(7)) for _ in range(3)]
+
+    assert first == second
+    assert Latency(median=0.2).sample(random.Random(7)) == 0.2
+
+
+def test_latency_matches_median_and_p95():
+    # Given a skewed latency distribution
+    latency = Latency(median=0.2, p95=1.0)
+    rng = random.Random(0)
+
+    # When drawing many samples
+    samples = sorted(latency.sample(rng) for _ in range(20_000))
+
+    # Then their median and 95th percentile match the distribution
+    assert samples[10_000] == pytest.approx(0.2, rel=0.05)
+    assert samples[19_000] == pytest.approx(1.0, rel=0.1)
+
+
+def test_p95_must_not_be_below_median():
+    with pytest.raises(ValueError):
+        Latency(median=1.0, p95=0.5)
+
+
+def test_chat_stream_is_split_into_paced_tokens():
+    # Given a simulated CSI with a time to first token and a token rate
+    csi = SimulatedCsi(
+        time_to_first_token=Latency(0.05),
+        tokens_per_second=100,
+        chars_per_token=2,
+    )
+
+    # When streaming a response
+    start = time.perf_counter()
+    with csi.chat_stream_step("model", [Message.user("abcde")], ChatParams()) as r:
+        events = list(r.stream())
+    elapsed = time.perf_counter() - start
+
+    # Then the text arrives in tokens of two characters
+    appends = [e.content for e in events if isinstance(e, MessageAppend)]
+    reasoning = [e.content for e in events if isinstance(e, Reasoning)]
+    assert appends == ["ab", "cd", "e"]
+    assert "".join(reasoning) == "I am thinking..."
+
+    # And takes the time to first token plus the time of all tokens
+    tokens = len(appends) + len(reasoning)
+    assert elapsed >= 0.05 + tokens * 0.01
+    time_to_first_token = r.timings().time_to_first_token
+    assert time_to_first_token is not None and time_to_first_token >= 0.05
+    assert r.usage().completion == 5
+
+
+def test_stream_latency_is_the_time_to_first_token():
+    # Given a simulated CSI with a latency for chat streams only
+    csi = SimulatedCsi(latency={"chat_stream": Latency(0.05)})
+
+    # When streaming a chat and a completion
+    with csi.chat_stream_step("model", [Message.user("Hi")], ChatParams()) as chat:
+        chat.consume_message()
+    with csi.completion_stream("model", "Hi", CompletionParams()) as completion:
+        list(completion.stream())
+
+    # Then only the chat waits for the latency before its first token
+    chat_ttft = chat.timings().time_to_first_token
+    completion_ttft = completion.timings().time_to_first_token
+    assert chat_ttft is not None and chat_ttft >= 0.05
+    assert completion_ttft is not None and completion_ttft < 0.05
+
+
+def test_completion_stream_keeps_its_text():
+    csi = SimulatedCsi(chars_per_token=3)
+
+    with csi.completion_stream("model", "abcdefg", CompletionParams()) as response:
+        texts = [append.text for append in response.stream()]
+
+    assert texts == ["abc", "def", "g"]
+    assert response.usage().completion == 7
+
+
+def test_concurrent_requests_queue_up_beyond_the_concurrency_limit():
+    # Given a backend that serves two requests at once, each taking 50ms
+    csi = SimulatedCsi(default_latency=Latency(0.05), max_concurrency=2)
+    requests = [SearchRequest(IndexPath("a", "b", "c"), "q") for _ in range(4)]
+
+    # When searching four times concurrently
+    start = time.perf_counter()
+    results = csi.search_concurrent(requests)
+    elapsed = time.perf_counter() - start
+
+    # Then the requests are served in two rounds
+    assert results == StubCsi().search_concurrent(requests)
+    assert 0.1 <= elapsed < 0.15 + 0.1
+
+
+def test_streams_hold_their_slot_until_they_end():
+    # Given a backend that serves one request at a time
+    csi = SimulatedCsi(max_concurrency=1)
+    stream = csi.chat_stream_step("model", [Message.user("Hi")], ChatParams())
+
+    # When a chat is requested while a stream is open
+    done = threading.Event()
+
+    def chat() -> None:
+        csi.chat("model", [Message.user("Hi")])
+        done.set()
+
+    thread = threading.Thread(target=chat)
+    thread.start()
+
+    # Then the chat waits until the stream is closed
+    assert not done.wait(0.05)
+    stream.__exit__(None, None, None)
+    assert done.wait(1)
+    thread.join()
+
+
+def test_stream_tokens_of_concurrent_streams_overlap():
+    csi = SimulatedCsi(time_to_first_token=Latency(0.05))
+    requests = [ChatRequest("model", [Message.user("Hi")]) for _ in range(4)]
+
+    start = time.perf_counter()
+    streams = csi.chat_stream_concurrent(requests)
+    for _ in streams:
+        pass
+    elapsed = time.perf_counter() - start
+
+    assert elapsed < 4 * 0.05
+
+
+def test_leaving_concurrent_streams_early_frees_their_slots():
+    # Given a backend that serves two requests at a time
+    csi = SimulatedCsi(max_concurrency=2, tokens_per_second=100)
+    requests = [ChatRequest("model", [Message.user("x" * 40)]) for _ in range(2)]
+
+    # When two streams are left after their first event
+    with csi.chat_stream_concurrent(requests) as streams:
+        next(iter(streams))
+
+    # Then both streams are cancelled and a chat does not wait for a slot
+    assert all(response._cancelled for response in streams.responses)
+    start = time.perf_counter()
+    csi.chat("model", [Message.user("Hi")])
+    assert time.perf_counter() - start < 0.1
+
+
+def test_non_streamed_chat_takes_the_time_to_generate_its_tokens():
+    csi = SimulatedCsi(tokens_per_second=100)
+
+    start = time.perf_counter()
+    response = csi.chat("model", [Message.user("x" * 10)])
+    elapsed = time.perf_counter() - start
+
+    assert response.usage.completion == 10
+    assert elapsed >= 0.1
+
+
+def test_failures_are_injected_reproducibly():
+    # Given two simulated CSIs with the same seed and failure rate
+    def outcomes(seed: int) -> list[bool]:
+        csi = SimulatedCsi(failure_rate={"search": 0.5}, seed=seed)
+        result = []
+        for _ in range(20):
+            try:
+                csi.search(IndexPath("a", "b", "c"), "q")
+                result.append(True)
+            except SimulatedFailure as error:
+                assert error.status_code == 503
+                result.append(False)
+        return result
+
+    # When searching, then both fail for the same requests
+    assert outcomes(1) == outcomes(1)
+    assert True in outcomes(1) and False in outcomes(1)
+
+    # And methods without a failure rate never fail
+    csi = SimulatedCsi(failure_rate={"search": 1.0})
+    assert csi.chat("model", [Message.user("Hi")]).message.content == "Hi"
+
+
+def test_invalid_failure_rate_is_rejected():
+    with pytest.raises(ValueError):
+        SimulatedCsi(failure_rate=1.5)
@@ -1,4 +1,12 @@
-from pharia_skill import CompletionParams, CompletionRequest
+from pharia_skill import (
+    ChatParams,
+    ChatRequest,
+    CompletionParams,
+    CompletionRequest,
+    FinishReason,
+    Message,
+)
+from pharia_skill.csi.inference import MessageAppend
 from pharia_skill.testing import StubCsi
 
 
@@ -15,3 +23,43 @@ def test_complete():
     # then
     assert completions[0].text == "prompt_1"
     assert completions[1].text == "prompt_2"
+
+
+def test_chat_stream_concurrent_interleaves_events():
+    # given
+    params = ChatParams()
+    requests = [
+        ChatRequest("model", [Message.user("a"), Message.user("b")], params),
+        ChatRequest("model", [Message.user("c")], params),
+    ]
+
+    # when
+    csi = StubCsi()
+    with csi.chat_stream_concurrent(requests) as streams:
+        appends = [
+            (index, event.content)
+            for index, event in streams
+            if isinstance(event, MessageAppend)
+        ]
+
+    # then
+    assert appends == [(0, "a"), (1, "c"), (0, "b")]
+    assert streams.responses[0].usage().prompt == 2
+    assert streams.responses[1].finish_reason() == FinishReason.STOP
+
+
+def test_leaving_chat_stream_concurrent_early_cancels_unfinished_streams():
+    # given
+    params = ChatParams()
+    requests = [
+        ChatRequest("model", [Message.user("a"), Message.user("b")], params),
+        ChatRequest("model", [Message.user("c")], params),
+    ]
+
+    # when leaving the streams after the first event
+    csi = StubCsi()
+    with csi.chat_stream_concurrent(requests) as streams:
+        next(iter(streams))
+
+    # then the streams that have not ended are cancelled
+    assert all(response._cancelled for response in streams.responses)